@@ -70,6 +70,8 @@ __all__ = [
     "WebPageSearchResult",
     "SearchSettings",
     "select_search_filters",
+    "IterativeScan",
+    "HydeMode",
     "SearchMode",
     "HybridSearchSettings",
     "Token",
@@ -87,6 +89,9 @@ __all__ = [
     "AppConfig",
     "Provider",
     "ProviderConfig",
+    "TracingSettings",
+    "ContextPackingSettings",
+    "StreamingSettings",
     "AuthConfig",
     "AuthProvider",
     "CryptoConfig",
@@ -94,10 +99,16 @@ __all__ = [
     "EmailConfig",
     "EmailProvider",
     "LimitSettings",
+    "RAGCacheSettings",
+    "SearchCacheSettings",
     "DatabaseConfig",
     "DatabaseProvider",
+    "EmbeddingCache",
+    "EmbeddingCacheSettings",
     "EmbeddingConfig",
     "EmbeddingProvider",
+    "EmbeddingStoreSettings",
+    "InMemoryEmbeddingCache",
     "CompletionConfig",
     "CompletionProvider",
     "RecursiveCharacterTextSplitter",
@@ -8,12 +8,12 @@ from typing import AsyncGenerator, Optional, Tuple
 from core.base import AsyncSyncMeta, LLMChatCompletion, Message, syncable
 from core.base.agent import Agent, Conversation
 from core.utils import (
+    CitationScanner,
     CitationTracker,
     SearchResultsCollector,
     SSEFormatter,
     convert_nonserializable_objects,
     dump_obj,
-    find_new_citation_spans,
 )
 
 logger = logging.getLogger()
@@ -175,15 +175,18 @@ class R2RAgent(Agent, metaclass=CombinedMeta):
                     )
                     await self.conversation.add_message(assistant_msg)
 
-                    # If there are multiple tool_calls, call them sequentially here
-                    for tool_call in message.tool_calls:
-                        await self.handle_function_or_tool_call(
-                            tool_call.function.name,
-                            tool_call.function.arguments,
-                            tool_id=tool_call.id,
-                            *args,
-                            **kwargs,
-                        )
+                    await self.handle_tool_calls(
+                        [
+                            (
+                                tool_call.function.name,
+                                tool_call.function.arguments,
+                                tool_call.id,
+                            )
+                            for tool_call in message.tool_calls
+                        ],
+                        *args,
+                        **kwargs,
+                    )
                 else:
                     await self.conversation.add_message(
                         Message(role="assistant", content=message.content)
@@ -338,14 +341,18 @@ class R2RAgent(Agent, metaclass=CombinedMeta):
 
                 # Process the tool calls
                 if message.tool_calls:
-                    for tool_call in message.tool_calls:
-                        await self.handle_function_or_tool_call(
-                            tool_call.function.name,
-                            tool_call.function.arguments,
-                            tool_id=tool_call.id,
-                            *args,
-                            **kwargs,
-                        )
+                    await self.handle_tool_calls(
+                        [
+                            (
+                                tool_call.function.name,
+                                tool_call.function.arguments,
+                                tool_call.id,
+                            )
+                            for tool_call in message.tool_calls
+                        ],
+                        *args,
+                        **kwargs,
+                    )
 
 
 class R2RStreamingAgent(R2RAgent):
@@ -385,6 +392,7 @@ class R2RStreamingAgent(R2RAgent):
 
         # Initialize citation tracker for this run
         citation_tracker = CitationTracker()
+        citation_scanner = CitationScanner(citation_tracker)
 
         # Dictionary to store citation payloads by ID
         citation_payloads = {}
@@ -451,8 +459,8 @@ class R2RStreamingAgent(R2RAgent):
                                 yield line
 
                             # (b) Find new citation spans in the accumulated text
-                            new_citation_spans = find_new_citation_spans(
-                                partial_text_buffer, citation_tracker
+                            new_citation_spans = citation_scanner.scan(
+                                partial_text_buffer
                             )
 
                             # Process each new citation span
@@ -557,13 +565,14 @@ class R2RStreamingAgent(R2RAgent):
                                 calls_list, partial_text_buffer
                             )
 
-                            # (c) Execute each tool call in parallel
-                            await asyncio.gather(
-                                *[
-                                    self.handle_function_or_tool_call(
+                            # (c) Execute the tool calls, in parallel where
+                            #     the tools allow it
+                            await self.handle_tool_calls(
+                                [
+                                    (
                                         c["name"],
                                         c["arguments"],
-                                        tool_id=c["tool_call_id"],
+                                        c["tool_call_id"],
                                     )
                                     for c in calls_list
                                 ]
@@ -572,6 +581,7 @@ class R2RStreamingAgent(R2RAgent):
                             # Reset buffer & calls
                             pending_tool_calls.clear()
                             partial_text_buffer = ""
+                            citation_scanner.reset()
 
                         elif finish_reason == "stop":
                             # Handle thinking if present
@@ -833,6 +843,7 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
 
         # Initialize citation tracker for this run
         citation_tracker = CitationTracker()
+        citation_scanner = CitationScanner(citation_tracker)
 
         # Dictionary to store citation payloads by ID
         citation_payloads = {}
@@ -863,6 +874,7 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
 
                     # Create state variables for each iteration
                     iteration_buffer = ""
+                    citation_scanner.reset()
                     yielded_first_event = False
                     in_action_block = False
                     is_thinking = False
@@ -957,8 +969,8 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
                                     delta.content = post_thought_text
 
                             # (b) Find new citation spans in the accumulated text
-                            new_citation_spans = find_new_citation_spans(
-                                iteration_buffer, citation_tracker
+                            new_citation_spans = citation_scanner.scan(
+                                iteration_buffer
                             )
 
                             # Process each new citation span
@@ -1075,9 +1087,8 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
                     )
 
                     if len(action_matches) > 0:
-                        # Process each ToolCall
-                        xml_toolcalls = "<ToolCalls>"
-
+                        # Collect the ToolCalls, to run them together
+                        xml_calls = []
                         for action_block in action_matches:
                             tool_calls_text = []
                             # Look for ToolCalls wrapper, or use the raw action block
@@ -1099,57 +1110,73 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
                                         self._parse_single_tool_call(tc_block)
                                     )
                                     if tool_name:
-                                        # Emit SSE event for tool call
-                                        tool_call_id = (
-                                            f"call_{abs(hash(tc_block))}"
-                                        )
-                                        call_evt_data = {
-                                            "tool_call_id": tool_call_id,
-                                            "name": tool_name,
-                                            "arguments": json.dumps(
-                                                tool_params
-                                            ),
-                                        }
-                                        async for line in (
-                                            SSEFormatter.yield_tool_call_event(
-                                                call_evt_data
-                                            )
-                                        ):
-                                            yield line
-
-                                        try:
-                                            tool_result = await self.handle_function_or_tool_call(
+                                        xml_calls.append(
+                                            (
                                                 tool_name,
                                                 json.dumps(tool_params),
-                                                tool_id=tool_call_id,
-                                                save_messages=False,
+                                                f"call_{abs(hash(tc_block))}",
                                             )
-                                            result_content = tool_result.llm_formatted_result
-                                        except Exception as e:
-                                            result_content = f"Error in tool '{tool_name}': {str(e)}"
-
-                                        xml_toolcalls += (
-                                            f"<ToolCall>"
-                                            f"<Name>{tool_name}</Name>"
-                                            f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                            f"<Result>{result_content}</Result>"
-                                            f"</ToolCall>"
                                         )
 
-                                        # Emit SSE tool result for non-result tools
-                                        result_data = {
-                                            "tool_call_id": tool_call_id,
-                                            "role": "tool",
-                                            "content": json.dumps(
-                                                convert_nonserializable_objects(
-                                                    result_content
-                                                )
-                                            ),
-                                        }
-                                        async for line in SSEFormatter.yield_tool_result_event(
-                                            result_data
-                                        ):
-                                            yield line
+                        # Emit SSE events for the tool calls
+                        for tool_name, arguments, tool_call_id in xml_calls:
+                            call_evt_data = {
+                                "tool_call_id": tool_call_id,
+                                "name": tool_name,
+                                "arguments": arguments,
+                            }
+                            async for (
+                                line
+                            ) in SSEFormatter.yield_tool_call_event(
+                                call_evt_data
+                            ):
+                                yield line
+
+                        tool_results = await self.handle_tool_calls(
+                            xml_calls,
+                            save_messages=False,
+                            return_exceptions=True,
+                        )
+
+                        xml_toolcalls = "<ToolCalls>"
+                        for (
+                            tool_name,
+                            arguments,
+                            tool_call_id,
+                        ), tool_result in zip(
+                            xml_calls, tool_results, strict=True
+                        ):
+                            if isinstance(tool_result, BaseException):
+                                result_content = f"Error in tool '{tool_name}': {str(tool_result)}"
+                            else:
+                                result_content = (
+                                    tool_result.llm_formatted_result
+                                )
+
+                            xml_toolcalls += (
+                                f"<ToolCall>"
+                                f"<Name>{tool_name}</Name>"
+                                f"<Parameters>{arguments}</Parameters>"
+                                f"<Result>{result_content}</Result>"
+                                f"</ToolCall>"
+                            )
+
+                            # Emit SSE tool result for non-result tools
+                            result_data = {
+                                "tool_call_id": tool_call_id,
+                                "role": "tool",
+                                "content": json.dumps(
+                                    convert_nonserializable_objects(
+                                        result_content
+                                    )
+                                ),
+                            }
+                            async for (
+                                line
+                            ) in SSEFormatter.yield_tool_result_event(
+                                result_data
+                            ):
+                                yield line
 
                         xml_toolcalls += "</ToolCalls>"
                         pre_action_text = iteration_buffer[
@@ -1372,7 +1399,7 @@ class R2RXMLToolsAgent(R2RAgent):
         # Process any tool calls in the content
         action_matches = self.ACTION_PATTERN.findall(content)
         if action_matches:
-            xml_toolcalls = "<ToolCalls>"
+            xml_calls = []
             for action_block in action_matches:
                 tool_calls_text = []
                 # Look for ToolCalls wrapper, or use the raw action block
@@ -1383,7 +1410,7 @@ class R2RXMLToolsAgent(R2RAgent):
                 else:
                     tool_calls_text.append(action_block)
 
-                # Process each ToolCall
+                # Collect each ToolCall, to run them together
                 for calls_region in tool_calls_text:
                     calls_found = self.TOOLCALL_PATTERN.findall(calls_region)
                     for tc_block in calls_found:
@@ -1391,36 +1418,36 @@ class R2RXMLToolsAgent(R2RAgent):
                             tc_block
                         )
                         if tool_name:
-                            tool_call_id = f"call_{abs(hash(tc_block))}"
-                            try:
-                                tool_result = (
-                                    await self.handle_function_or_tool_call(
-                                        tool_name,
-                                        json.dumps(tool_params),
-                                        tool_id=tool_call_id,
-                                        save_messages=False,
-                                    )
+                            xml_calls.append(
+                                (
+                                    tool_name,
+                                    json.dumps(tool_params),
+                                    f"call_{abs(hash(tc_block))}",
                                 )
+                            )
 
-                                # Add tool result to XML
-                                xml_toolcalls += (
-                                    f"<ToolCall>"
-                                    f"<Name>{tool_name}</Name>"
-                                    f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                    f"<Result>{tool_result.llm_formatted_result}</Result>"
-                                    f"</ToolCall>"
-                                )
+            tool_results = await self.handle_tool_calls(
+                xml_calls, save_messages=False, return_exceptions=True
+            )
 
-                            except Exception as e:
-                                logger.error(f"Error in tool call: {str(e)}")
-                                # Add error to XML
-                                xml_toolcalls += (
-                                    f"<ToolCall>"
-                                    f"<Name>{tool_name}</Name>"
-                                    f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                    f"<Result>Error: {str(e)}</Result>"
-                                    f"</ToolCall>"
-                                )
+            xml_toolcalls = "<ToolCalls>"
+            for (tool_name, arguments, _), tool_result in zip(
+                xml_calls, tool_results, strict=True
+            ):
+                if isinstance(tool_result, BaseException):
+                    logger.error(f"Error in tool call: {str(tool_result)}")
+                    result_content = f"Error: {str(tool_result)}"
+                else:
+                    result_content = tool_result.llm_formatted_result
+
+                # Add tool result, or error, to XML
+                xml_toolcalls += (
+                    f"<ToolCall>"
+                    f"<Name>{tool_name}</Name>"
+                    f"<Parameters>{arguments}</Parameters>"
+                    f"<Result>{result_content}</Result>"
+                    f"</ToolCall>"
+                )
 
             xml_toolcalls += "</ToolCalls>"
             pre_action_text = content[: content.find(action_block)]
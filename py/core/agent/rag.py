@@ -11,7 +11,7 @@ from core.base.abstractions import (
     SearchSettings,
 )
 from core.base.agent.tools.registry import ToolRegistry
-from core.base.providers import DatabaseProvider
+from core.base.providers import ContextPackingSettings, DatabaseProvider
 from core.providers import (
     AnthropicCompletionProvider,
     LiteLLMCompletionProvider,
@@ -21,6 +21,7 @@ from core.providers import (
 from core.utils import (
     SearchResultsCollector,
     num_tokens,
+    pack_search_results_for_llm,
 )
 
 from ..base.agent.agent import RAGAgentConfig
@@ -55,6 +56,7 @@ class RAGAgentMixin:
         max_tool_context_length=10_000,
         max_context_window_tokens=512_000,
         tool_registry: Optional[ToolRegistry] = None,
+        context_packing: Optional[ContextPackingSettings] = None,
         **kwargs,
     ):
         # Save references to the retrieval logic
@@ -66,6 +68,7 @@ class RAGAgentMixin:
         self.max_context_window_tokens = max_context_window_tokens
         self.search_results_collector = SearchResultsCollector()
         self.tool_registry = tool_registry or ToolRegistry()
+        self.context_packing = context_packing
 
         super().__init__(*args, **kwargs)
 
@@ -99,11 +102,42 @@ class RAGAgentMixin:
 
         logger.debug(f"Registered {len(self._tools)} RAG tools.")
 
+    def _pack_search_results(
+        self, results: AggregateSearchResult
+    ) -> Optional[tuple[str, int]]:
+        """The best results that fit in the tool context, rather than the
+        first ones, and their tokens, when context packing is enabled."""
+        settings = self.context_packing
+        if settings is None or not settings.enabled:
+            return None
+        try:
+            packed = pack_search_results_for_llm(
+                results,
+                self.max_tool_context_length,
+                max_chunks_per_document=settings.max_chunks_per_document,
+                dedup_threshold=settings.dedup_threshold,
+            )
+        except Exception as e:
+            # e.g. the tokenizer could not be downloaded
+            logger.warning(f"Context packing failed: {e}")
+            return None
+        if packed.dropped:
+            logger.debug(
+                f"Dropped {len(packed.dropped)} search results from the tool context"
+            )
+        return packed.context, packed.tokens
+
     def format_search_results_for_llm(
         self, results: AggregateSearchResult
     ) -> str:
-        context = format_search_results_for_llm(results)
-        context_tokens = num_tokens(context) + 1
+        packed = self._pack_search_results(results)
+        if packed is None:
+            context = format_search_results_for_llm(results)
+            context_tokens = num_tokens(context) + 1
+        else:
+            # Web, document and tool results are kept whole, and may not fit
+            context, tokens = packed
+            context_tokens = tokens + 1
         frac_to_return = self.max_tool_context_length / (context_tokens)
 
         if frac_to_return > 1:
@@ -134,6 +168,7 @@ class R2RRAGAgent(RAGAgentMixin, R2RAgent):
         file_search_method: Callable,
         tool_registry: Optional[ToolRegistry] = None,
         max_tool_context_length: int = 20_000,
+        context_packing: Optional[ContextPackingSettings] = None,
     ):
         # Initialize base R2RAgent
         R2RAgent.__init__(
@@ -157,6 +192,7 @@ class R2RRAGAgent(RAGAgentMixin, R2RAgent):
             file_search_method=file_search_method,
             content_method=content_method,
             tool_registry=tool_registry,
+            context_packing=context_packing,
         )
 
         self._register_tools()
@@ -184,6 +220,7 @@ class R2RXMLToolsRAGAgent(RAGAgentMixin, R2RXMLToolsAgent):
         file_search_method: Callable,
         tool_registry: Optional[ToolRegistry] = None,
         max_tool_context_length: int = 20_000,
+        context_packing: Optional[ContextPackingSettings] = None,
     ):
         # Initialize base R2RAgent
         R2RXMLToolsAgent.__init__(
@@ -207,6 +244,7 @@ class R2RXMLToolsRAGAgent(RAGAgentMixin, R2RXMLToolsAgent):
             file_search_method=file_search_method,
             content_method=content_method,
             tool_registry=tool_registry,
+            context_packing=context_packing,
         )
 
         self._register_tools()
@@ -235,6 +273,7 @@ class R2RStreamingRAGAgent(RAGAgentMixin, R2RStreamingAgent):
         file_search_method: Callable,
         tool_registry: Optional[ToolRegistry] = None,
         max_tool_context_length: int = 10_000,
+        context_packing: Optional[ContextPackingSettings] = None,
     ):
         # Force streaming on
         config.stream = True
@@ -261,6 +300,7 @@ class R2RStreamingRAGAgent(RAGAgentMixin, R2RStreamingAgent):
             content_method=content_method,
             file_search_method=file_search_method,
             tool_registry=tool_registry,
+            context_packing=context_packing,
         )
 
         self._register_tools()
@@ -295,6 +335,7 @@ class R2RXMLToolsStreamingRAGAgent(RAGAgentMixin, R2RXMLStreamingAgent):
         file_search_method: Callable,
         tool_registry: Optional[ToolRegistry] = None,
         max_tool_context_length: int = 10_000,
+        context_packing: Optional[ContextPackingSettings] = None,
     ):
         # Force streaming on
         config.stream = True
@@ -321,6 +362,7 @@ class R2RXMLToolsStreamingRAGAgent(RAGAgentMixin, R2RXMLStreamingAgent):
             content_method=content_method,
             file_search_method=file_search_method,
             tool_registry=tool_registry,
+            context_packing=context_packing,
         )
 
         self._register_tools()
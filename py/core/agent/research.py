@@ -65,6 +65,7 @@ class ResearchAgentMixin(RAGAgentMixin):
             content_method=content_method,
             file_search_method=file_search_method,
             max_tool_context_length=max_tool_context_length,
+            context_packing=app_config.context_packing,
             **kwargs,
         )
 
@@ -116,6 +117,7 @@ class ResearchAgentMixin(RAGAgentMixin):
                 "required": ["query"],
             },
             context=self,
+            concurrency_safe=True,
         )
 
     def reasoning_tool(self) -> Tool:
@@ -145,6 +147,7 @@ class ResearchAgentMixin(RAGAgentMixin):
                 },
                 "required": ["query"],
             },
+            concurrency_safe=True,
         )
 
     def critique_tool(self) -> Tool:
@@ -516,6 +519,7 @@ class R2RResearchAgent(ResearchAgentMixin, R2RRAGAgent):
             content_method=content_method,
             file_search_method=file_search_method,
             max_tool_context_length=max_tool_context_length,
+            context_packing=app_config.context_packing,
         )
 
         # Then initialize the ResearchAgentMixin
@@ -576,6 +580,7 @@ class R2RStreamingResearchAgent(ResearchAgentMixin, R2RStreamingRAGAgent):
             content_method=content_method,
             file_search_method=file_search_method,
             max_tool_context_length=max_tool_context_length,
+            context_packing=app_config.context_packing,
         )
 
         # Then initialize the ResearchAgentMixin
@@ -635,6 +640,7 @@ class R2RXMLToolsResearchAgent(ResearchAgentMixin, R2RXMLToolsRAGAgent):
             content_method=content_method,
             file_search_method=file_search_method,
             max_tool_context_length=max_tool_context_length,
+            context_packing=app_config.context_packing,
         )
 
         # Then initialize the ResearchAgentMixin
@@ -693,6 +699,7 @@ class R2RXMLToolsStreamingResearchAgent(
             content_method=content_method,
             file_search_method=file_search_method,
             max_tool_context_length=max_tool_context_length,
+            context_packing=app_config.context_packing,
         )
 
         # Then initialize the ResearchAgentMixin
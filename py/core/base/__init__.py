@@ -52,6 +52,8 @@ __all__ = [
     "WebPageSearchResult",
     "SearchSettings",
     "select_search_filters",
+    "IterativeScan",
+    "HydeMode",
     "SearchMode",
     "HybridSearchSettings",
     # User abstractions
@@ -81,6 +83,9 @@ __all__ = [
     "AppConfig",
     "Provider",
     "ProviderConfig",
+    "TracingSettings",
+    "ContextPackingSettings",
+    "StreamingSettings",
     # Auth provider
     "AuthConfig",
     "AuthProvider",
@@ -89,6 +94,8 @@ __all__ = [
     "CryptoProvider",
     # Database providers
     "LimitSettings",
+    "RAGCacheSettings",
+    "SearchCacheSettings",
     "DatabaseConfig",
     "DatabaseProvider",
     "Handler",
@@ -97,13 +104,18 @@ __all__ = [
     "EmailConfig",
     "EmailProvider",
     # Embedding provider
+    "EmbeddingCache",
+    "EmbeddingCacheSettings",
     "EmbeddingConfig",
     "EmbeddingProvider",
+    "EmbeddingStoreSettings",
+    "InMemoryEmbeddingCache",
     # File provider
     "FileConfig",
     "FileProvider",
     # Ingestion provider
     "IngestionConfig",
+    "ParserPoolSettings",
     "IngestionProvider",
     "ChunkingStrategy",
     # LLM provider
@@ -47,6 +47,8 @@ from shared.abstractions.search import (
     GraphSearchResultType,
     GraphSearchSettings,
     HybridSearchSettings,
+    HydeMode,
+    IterativeScan,
     SearchMode,
     SearchSettings,
     WebPageSearchResult,
@@ -121,6 +123,8 @@ __all__ = [
     "WebPageSearchResult",
     "SearchSettings",
     "select_search_filters",
+    "IterativeScan",
+    "HydeMode",
     "SearchMode",
     "HybridSearchSettings",
     # Graph abstractions
@@ -44,6 +44,8 @@ class AgentConfig(BaseModel):
     stream: bool = False
     include_tools: bool = True
     max_iterations: int = 10
+    # Tool calls of a single model turn that may run at the same time
+    max_concurrent_tool_calls: int = 5
 
     @classmethod
     def create(cls: Type["AgentConfig"], **kwargs: Any) -> "AgentConfig":
@@ -218,32 +220,9 @@ class Agent(ABC):
                 tool_result.stream_result = tool.stream_function(raw_result)
 
             if save_messages:
-                await self.conversation.add_message(
-                    Message(
-                        role="tool" if tool_id else "function",
-                        content=str(tool_result.llm_formatted_result),
-                        name=function_name,
-                        tool_call_id=tool_id,
-                    )
-                )
-                # HACK - to fix issues with claude thinking + tool use [https://github.com/anthropics/anthropic-cookbook/blob/main/extended_thinking/extended_thinking_with_tool_use.ipynb]
-                logger.debug(
-                    f"Extended thinking - Claude needs a particular message continuation which however breaks other models. Model in use : {self.rag_generation_config.model}"
-                )
-                is_anthropic = (
-                    self.rag_generation_config.model
-                    and "anthropic/" in self.rag_generation_config.model
+                await self._add_tool_result_message(
+                    function_name, tool_id, tool_result
                 )
-                if (
-                    self.rag_generation_config.extended_thinking
-                    and is_anthropic
-                ):
-                    await self.conversation.add_message(
-                        Message(
-                            role="user",
-                            content="Continue...",
-                        )
-                    )
 
             self.tool_calls.append(
                 {
@@ -253,6 +232,113 @@ class Agent(ABC):
             )
         return tool_result
 
+    async def _add_tool_result_message(
+        self,
+        function_name: str,
+        tool_id: Optional[str],
+        tool_result: ToolResult,
+    ) -> None:
+        await self.conversation.add_message(
+            Message(
+                role="tool" if tool_id else "function",
+                content=str(tool_result.llm_formatted_result),
+                name=function_name,
+                tool_call_id=tool_id,
+            )
+        )
+        # HACK - to fix issues with claude thinking + tool use [https://github.com/anthropics/anthropic-cookbook/blob/main/extended_thinking/extended_thinking_with_tool_use.ipynb]
+        logger.debug(
+            f"Extended thinking - Claude needs a particular message continuation which however breaks other models. Model in use : {self.rag_generation_config.model}"
+        )
+        is_anthropic = (
+            self.rag_generation_config.model
+            and "anthropic/" in self.rag_generation_config.model
+        )
+        if self.rag_generation_config.extended_thinking and is_anthropic:
+            await self.conversation.add_message(
+                Message(
+                    role="user",
+                    content="Continue...",
+                )
+            )
+
+    async def handle_tool_calls(
+        self,
+        tool_calls: list[tuple[str, str, Optional[str]]],
+        *args,
+        save_messages: bool = True,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[ToolResult | BaseException]:
+        """Runs the `(function_name, function_arguments, tool_id)` calls of a
+        model turn.
+
+        Consecutive calls of concurrency safe tools run together, at most
+        `config.max_concurrent_tool_calls` at a time, and other calls run on
+        their own once the calls before them are done. Results, and their
+        tool messages, follow the order of the calls. With
+        `return_exceptions`, a failed call returns its exception instead of
+        failing the others.
+        """
+        semaphore = asyncio.Semaphore(
+            max(1, self.config.max_concurrent_tool_calls)
+        )
+
+        async def call(function_name, function_arguments, tool_id):
+            async with semaphore:
+                return await self.handle_function_or_tool_call(
+                    function_name,
+                    function_arguments,
+                    tool_id,
+                    False,
+                    *args,
+                    **kwargs,
+                )
+
+        def is_concurrency_safe(function_name):
+            tool = next(
+                (t for t in self.tools if t.name == function_name), None
+            )
+            return tool is not None and tool.concurrency_safe
+
+        async def run(segment):
+            if len(segment) == 1:
+                try:
+                    results = [await call(*segment[0])]
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results = [e]
+            else:
+                results = await asyncio.gather(
+                    *(call(*c) for c in segment),
+                    return_exceptions=return_exceptions,
+                )
+            if save_messages:
+                for (function_name, _, tool_id), result in zip(
+                    segment, results, strict=True
+                ):
+                    if isinstance(result, ToolResult):
+                        await self._add_tool_result_message(
+                            function_name, tool_id, result
+                        )
+            return results
+
+        results: list[ToolResult | BaseException] = []
+        batch: list[tuple[str, str, Optional[str]]] = []
+        for tool_call in tool_calls:
+            if is_concurrency_safe(tool_call[0]):
+                batch.append(tool_call)
+                continue
+            # Other tools may depend on the results before them
+            if batch:
+                results.extend(await run(batch))
+                batch = []
+            results.extend(await run([tool_call]))
+        if batch:
+            results.extend(await run(batch))
+        return results
+
 
 # TODO - Move agents to provider pattern
 class RAGAgentConfig(AgentConfig):
@@ -261,6 +347,7 @@ class RAGAgentConfig(AgentConfig):
     stream: bool = False
     include_tools: bool = True
     max_iterations: int = 10
+    max_concurrent_tool_calls: int = 5
     # tools: list[str] = [] # HACK - unused variable.
 
     # Default RAG tools
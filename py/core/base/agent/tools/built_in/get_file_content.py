@@ -37,6 +37,7 @@ class GetFileContentTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(
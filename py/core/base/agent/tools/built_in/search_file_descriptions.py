@@ -30,6 +30,7 @@ class SearchFileDescriptionsTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, query: str, *args, **kwargs):
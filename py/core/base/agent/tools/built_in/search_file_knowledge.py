@@ -29,6 +29,7 @@ class SearchFileKnowledgeTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, query: str, *args, **kwargs):
@@ -36,6 +36,7 @@ class TavilyExtractTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, url: str, *args, **kwargs):
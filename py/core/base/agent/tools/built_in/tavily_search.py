@@ -40,6 +40,7 @@ class TavilySearchTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, query: str, *args, **kwargs):
@@ -37,6 +37,7 @@ class WebScrapeTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, url: str, *args, **kwargs):
@@ -26,6 +26,7 @@ class WebSearchTool(Tool):
             },
             results_function=self.execute,
             llm_format_function=None,
+            concurrency_safe=True,
         )
 
     async def execute(self, query: str, *args, **kwargs):
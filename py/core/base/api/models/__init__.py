@@ -92,6 +92,7 @@ from shared.api.models.retrieval.responses import (
     ToolResultEvent,
     UnknownEvent,
     WrappedAgentResponse,
+    WrappedBatchSearchResponse,
     WrappedCompletionResponse,
     WrappedDocumentSearchResponse,
     WrappedEmbeddingResponse,
@@ -199,6 +200,7 @@ __all__ = [
     "AgentResponse",
     "WrappedDocumentSearchResponse",
     "WrappedSearchResponse",
+    "WrappedBatchSearchResponse",
     "WrappedVectorSearchResponse",
     "WrappedCompletionResponse",
     "WrappedRAGResponse",
@@ -1,12 +1,25 @@
 """Abstract base class for parsers."""
 
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Generic, TypeVar
+from typing import AsyncGenerator, ClassVar, Generic, Iterator, TypeVar
 
 T = TypeVar("T")
 
 
 class AsyncParser(ABC, Generic[T]):
+    # CPU-bound parsers do their work in `extract`, which the ingestion
+    # provider runs in a worker process, off the event loop
+    cpu_bound: ClassVar[bool] = False
+
     @abstractmethod
     async def ingest(self, data: T, **kwargs) -> AsyncGenerator[str, None]:
         pass
+
+    @classmethod
+    def extract(cls, data: T, **kwargs) -> Iterator[str]:
+        """Parses `data` synchronously, for parsers that are `cpu_bound`.
+
+        It may run in another process, so it can only depend on its
+        arguments and the parser class.
+        """
+        raise NotImplementedError
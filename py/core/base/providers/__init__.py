@@ -1,5 +1,12 @@
 from .auth import AuthConfig, AuthProvider
-from .base import AppConfig, Provider, ProviderConfig
+from .base import (
+    AppConfig,
+    ContextPackingSettings,
+    Provider,
+    ProviderConfig,
+    StreamingSettings,
+    TracingSettings,
+)
 from .crypto import CryptoConfig, CryptoProvider
 from .database import (
     DatabaseConfig,
@@ -8,14 +15,24 @@ from .database import (
     Handler,
     LimitSettings,
     PostgresConfigurationSettings,
+    RAGCacheSettings,
+    SearchCacheSettings,
 )
 from .email import EmailConfig, EmailProvider
-from .embedding import EmbeddingConfig, EmbeddingProvider
+from .embedding import (
+    EmbeddingCache,
+    EmbeddingCacheSettings,
+    EmbeddingConfig,
+    EmbeddingProvider,
+    EmbeddingStoreSettings,
+    InMemoryEmbeddingCache,
+)
 from .file import FileConfig, FileProvider
 from .ingestion import (
     ChunkingStrategy,
     IngestionConfig,
     IngestionProvider,
+    ParserPoolSettings,
 )
 from .llm import CompletionConfig, CompletionProvider
 from .ocr import OCRConfig, OCRProvider
@@ -30,6 +47,9 @@ __all__ = [
     "AppConfig",
     "Provider",
     "ProviderConfig",
+    "TracingSettings",
+    "ContextPackingSettings",
+    "StreamingSettings",
     # Crypto provider
     "CryptoConfig",
     "CryptoProvider",
@@ -37,6 +57,8 @@ __all__ = [
     "DatabaseConnectionManager",
     "DatabaseConfig",
     "LimitSettings",
+    "RAGCacheSettings",
+    "SearchCacheSettings",
     "PostgresConfigurationSettings",
     "DatabaseProvider",
     "Handler",
@@ -44,13 +66,18 @@ __all__ = [
     "EmailConfig",
     "EmailProvider",
     # Embedding provider
+    "EmbeddingCache",
+    "EmbeddingCacheSettings",
     "EmbeddingConfig",
     "EmbeddingProvider",
+    "EmbeddingStoreSettings",
+    "InMemoryEmbeddingCache",
     # File provider
     "FileConfig",
     "FileProvider",
     # Ingestion provider
     "IngestionConfig",
+    "ParserPoolSettings",
     "IngestionProvider",
     "ChunkingStrategy",
     # LLM provider
@@ -3,6 +3,8 @@ from typing import Any, Optional, Type
 
 from pydantic import BaseModel
 
+from core.utils.tracing import DEFAULT_HISTOGRAM_BUCKETS
+
 
 class InnerConfig(BaseModel, ABC):
     """A base provider configuration class."""
@@ -29,6 +31,43 @@ class InnerConfig(BaseModel, ABC):
         return instance
 
 
+class TracingSettings(BaseModel):
+    """Settings of the latency tracing of search, RAG and agent requests."""
+
+    enabled: bool = False
+    # Fraction of requests traced into the latency histograms
+    sample_rate: float = 1.0
+    # Upper bounds, in seconds, of the latency histogram buckets
+    histogram_buckets: list[float] = list(DEFAULT_HISTOGRAM_BUCKETS)
+    # Stages that are never timed, e.g. `db.query` to trim overhead
+    excluded_stages: list[str] = []
+
+
+class ContextPackingSettings(BaseModel):
+    """Settings of the packing of search results into RAG prompts."""
+
+    enabled: bool = False
+    # Token budget of the search results in the prompt
+    max_tokens: int = 16_000
+    # Chunks of a document beyond this many only fill the budget left by
+    # the other documents
+    max_chunks_per_document: Optional[int] = 3
+    # Fraction of its text a chunk must share with a packed chunk to be
+    # dropped as a duplicate
+    dedup_threshold: Optional[float] = 0.8
+
+
+class StreamingSettings(BaseModel):
+    """Settings of the writing of SSE streams to clients."""
+
+    # Events that arrive this soon after the first unsent one share a write
+    flush_interval_ms: int = 20
+    # A write is sent once it holds this many bytes
+    max_chunk_bytes: int = 256
+    # Events of a stream waiting for a slow client before it is held back
+    max_pending_events: int = 64
+
+
 class AppConfig(InnerConfig):
     project_name: Optional[str] = None
     user_tools_path: Optional[str] = None
@@ -42,6 +81,13 @@ class AppConfig(InnerConfig):
     audio_lm: Optional[str] = None
     reasoning_llm: Optional[str] = None
     planning_llm: Optional[str] = None
+    # Upper bound on the sub-query searches RAG-Fusion runs at the same time
+    max_concurrent_sub_query_searches: int = 4
+    # Upper bound on the searches of a batch request run at the same time
+    max_concurrent_batch_searches: int = 16
+    tracing: TracingSettings = TracingSettings()
+    context_packing: ContextPackingSettings = ContextPackingSettings()
+    streaming: StreamingSettings = StreamingSettings()
 
     # File extension to max-size mapping
     # These are examples; adjust sizes as needed.
@@ -2,12 +2,13 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Sequence, cast
+from typing import Any, Literal, Optional, Sequence, cast
 from uuid import UUID
 
 from pydantic import BaseModel
 
 from core.base.abstractions import (
+    ChunkSearchSettings,
     GraphCreationSettings,
     GraphEnrichmentSettings,
     GraphSearchSettings,
@@ -38,6 +39,7 @@ class DatabaseConnectionManager(ABC):
         self,
         query: str,
         params: Optional[dict[str, Any] | Sequence[Any]] = None,
+        local_settings: Optional[dict[str, str]] = None,
     ):
         pass
 
@@ -122,6 +124,28 @@ class MaintenanceSettings(BaseModel):
     vacuum_full: bool = False
 
 
+class RAGCacheSettings(BaseModel):
+    """Semantic cache of RAG responses, looked up by query embedding."""
+
+    enabled: bool = False
+    # Minimum cosine similarity between two queries to share a response
+    similarity_threshold: float = 0.95
+    ttl_seconds: float = 86400
+
+
+class SearchCacheSettings(BaseModel):
+    """Cache of search results, looked up by exact query and settings."""
+
+    enabled: bool = False
+    # "memory" caches results in each process, "postgres" shares them
+    # between processes through an unlogged table
+    backend: Literal["memory", "postgres"] = "memory"
+    # Least recently used results are evicted beyond this many entries, in
+    # the "memory" backend
+    max_size: int = 1024
+    ttl_seconds: float = 300
+
+
 class DatabaseConfig(ProviderConfig):
     """A base database configuration class."""
 
@@ -140,6 +164,12 @@ class DatabaseConfig(ProviderConfig):
     collection_summary_system_prompt: str = "system"
     collection_summary_prompt: str = "collection_summary"
     disable_create_extension: bool = False
+    # Text search configuration (regconfig) used to index and query chunks
+    text_search_config: str = "english"
+    # Server defaults for the vector index tuning parameters of chunk search
+    chunk_search_settings: ChunkSearchSettings = ChunkSearchSettings()
+    # Per collection INT1 oversampling factors, override the default above
+    collection_oversampling_factors: dict[UUID, int] = {}
 
     # Graph settings
     batch_size: Optional[int] = 1
@@ -157,6 +187,10 @@ class DatabaseConfig(ProviderConfig):
 
     # Maintenance settings
     maintenance: MaintenanceSettings = MaintenanceSettings()
+    # Semantic cache of RAG responses
+    rag_cache: RAGCacheSettings = RAGCacheSettings()
+    # Exact-match cache of search results
+    search_cache: SearchCacheSettings = SearchCacheSettings()
     route_limits: dict[str, LimitSettings] = {}
     user_limits: dict[UUID, LimitSettings] = {}
 
@@ -1,14 +1,19 @@
 import asyncio
+import hashlib
 import logging
 import random
 import time
-from abc import abstractmethod
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from enum import Enum
 from typing import Any, Optional
 
 from litellm import AuthenticationError
+from pydantic import BaseModel
 
 from core.base.abstractions import VectorQuantizationSettings
+from core.utils import tracing
 
 from ..abstractions import (
     ChunkSearchResult,
@@ -18,6 +23,67 @@ from .base import Provider, ProviderConfig
 logger = logging.getLogger()
 
 
+class EmbeddingCacheSettings(BaseModel):
+    """Settings for the query embedding cache."""
+
+    enabled: bool = True
+    max_size: int = 1024
+    ttl_seconds: float = 3600
+    # Share cached embeddings between processes through Postgres
+    shared: bool = False
+
+
+class EmbeddingStoreSettings(BaseModel):
+    """Settings for the content addressed store of document embeddings."""
+
+    enabled: bool = False
+    # Least recently used embeddings are evicted beyond this many entries
+    max_entries: int = 100_000
+
+
+class EmbeddingCache(ABC):
+    """Storage tier for cached embeddings, keyed by `EmbeddingProvider`."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[list[float]]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, embedding: list[float]) -> None:
+        pass
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    """A per-process LRU cache whose entries expire after `ttl_seconds`."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[list[float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return embedding
+
+    async def set(self, key: str, embedding: list[float]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
 class EmbeddingConfig(ProviderConfig):
     provider: str
     base_model: str
@@ -32,6 +98,8 @@ class EmbeddingConfig(ProviderConfig):
     quantization_settings: VectorQuantizationSettings = (
         VectorQuantizationSettings()
     )
+    cache_settings: EmbeddingCacheSettings = EmbeddingCacheSettings()
+    store_settings: EmbeddingStoreSettings = EmbeddingStoreSettings()
 
     def validate_config(self) -> None:
         if self.provider not in self.supported_providers:
@@ -59,6 +127,18 @@ class EmbeddingProvider(Provider):
         self.semaphore = asyncio.Semaphore(config.concurrent_request_limit)
         self.current_requests = 0
 
+        cache_settings = config.cache_settings
+        self.cache: Optional[InMemoryEmbeddingCache] = (
+            InMemoryEmbeddingCache(
+                cache_settings.max_size, cache_settings.ttl_seconds
+            )
+            if cache_settings.enabled
+            else None
+        )
+        # Optional second tier shared between processes, e.g. Postgres
+        self.shared_cache: Optional[EmbeddingCache] = None
+        self.cache_metrics = {"hits": 0, "shared_hits": 0, "misses": 0}
+
     async def _execute_with_backoff_async(self, task: dict[str, Any]):
         retries = 0
         backoff = self.config.initial_backoff
@@ -113,7 +193,142 @@ class EmbeddingProvider(Provider):
             "text": text,
             "stage": stage,
         }
-        return await self._execute_with_backoff_async(task)
+        with tracing.span("embedding"):
+            return await self._execute_with_backoff_async(task)
+
+    def content_key(self, text: str, **kwargs) -> str:
+        """Content address of the embedding of `text`: a hash of the model,
+        the dimension and the text."""
+        model = kwargs.get("model", self.config.base_model)
+        dimension = kwargs.get("dimensions", self.config.base_dimension)
+        return hashlib.sha256(
+            f"{model}\x00{dimension}\x00{text}".encode()
+        ).hexdigest()
+
+    def _cache_key(self, text: str, **kwargs) -> str:
+        """Key of a query embedding, with Unicode and whitespace
+        normalized."""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return self.content_key(normalized, **kwargs)
+
+    async def _get_cached_embedding(self, key: str) -> Optional[list[float]]:
+        """Looks up an embedding in the in-process cache, then in the shared
+        cache if one is configured."""
+        assert self.cache is not None
+        embedding = await self.cache.get(key)
+        if embedding is not None:
+            self.cache_metrics["hits"] += 1
+            return embedding
+
+        if self.shared_cache is not None:
+            try:
+                embedding = await self.shared_cache.get(key)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache lookup failed: {e}")
+            if embedding is not None:
+                self.cache_metrics["shared_hits"] += 1
+                await self.cache.set(key, embedding)
+                return embedding
+
+        self.cache_metrics["misses"] += 1
+        return None
+
+    async def _cache_embedding(self, key: str, embedding: list[float]):
+        assert self.cache is not None
+        await self.cache.set(key, embedding)
+        if self.shared_cache is not None:
+            try:
+                await self.shared_cache.set(key, embedding)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache update failed: {e}")
+
+    async def async_get_query_embedding(
+        self,
+        text: str,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> list[float]:
+        """Embeds a search query, serving repeated queries from the cache.
+
+        The in-process cache is checked first, then the shared cache if one
+        is configured. Pass `use_cache=False` to always call the model.
+        """
+        if not use_cache or self.cache is None:
+            return await self.async_get_embedding(text, **kwargs)
+
+        key = self._cache_key(text, **kwargs)
+        embedding = await self._get_cached_embedding(key)
+        if embedding is None:
+            embedding = await self.async_get_embedding(text, **kwargs)
+            await self._cache_embedding(key, embedding)
+        return embedding
+
+    async def async_get_query_embeddings(
+        self,
+        texts: list[str],
+        use_cache: bool = True,
+        **kwargs,
+    ) -> list[list[float]]:
+        """Embeds several search queries with a single call to the model.
+
+        Queries found in the cache are not sent to the model, and neither
+        are repeated queries.
+        """
+        if not texts:
+            return []
+        if not use_cache or self.cache is None:
+            return await self.async_get_embeddings(texts, **kwargs)
+
+        keys = [self._cache_key(text, **kwargs) for text in texts]
+        embeddings: dict[str, list[float]] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key in embeddings or key in missing:
+                continue
+            embedding = await self._get_cached_embedding(key)
+            if embedding is None:
+                missing[key] = text
+            else:
+                embeddings[key] = embedding
+
+        if missing:
+            new_embeddings = await self.async_get_embeddings(
+                list(missing.values()), **kwargs
+            )
+            for key, new_embedding in zip(
+                missing, new_embeddings, strict=True
+            ):
+                embeddings[key] = new_embedding
+                await self._cache_embedding(key, new_embedding)
+        return [embeddings[key] for key in keys]
+
+    def get_cache_metrics(self) -> dict[str, Any]:
+        """Hit and miss counts of the query embedding cache."""
+        lookups = sum(self.cache_metrics.values())
+        hits = self.cache_metrics["hits"] + self.cache_metrics["shared_hits"]
+        return {
+            **self.cache_metrics,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": len(self.cache) if self.cache is not None else 0,
+        }
+
+    def get_cache_counters(self) -> dict[str, tuple[str, int]]:
+        """The hit and miss counts of the query embedding cache as
+        Prometheus counters, by name, with their help text."""
+        return {
+            "r2r_query_embedding_cache_hits_total": (
+                "Query embeddings found in the in-process cache.",
+                self.cache_metrics["hits"],
+            ),
+            "r2r_query_embedding_cache_shared_hits_total": (
+                "Query embeddings found in the shared cache.",
+                self.cache_metrics["shared_hits"],
+            ),
+            "r2r_query_embedding_cache_misses_total": (
+                "Query embeddings not found in the cache.",
+                self.cache_metrics["misses"],
+            ),
+        }
 
     def get_embedding(
         self,
@@ -135,7 +350,8 @@ class EmbeddingProvider(Provider):
             "texts": texts,
             "stage": stage,
         }
-        return await self._execute_with_backoff_async(task)
+        with tracing.span("embedding"):
+            return await self._execute_with_backoff_async(task)
 
     def get_embeddings(
         self,
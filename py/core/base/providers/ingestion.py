@@ -3,7 +3,7 @@ from abc import ABC
 from enum import Enum
 from typing import TYPE_CHECKING, Any, ClassVar, Optional
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 from core.base.abstractions import ChunkEnrichmentSettings
 
@@ -23,6 +23,20 @@ class ChunkingStrategy(str, Enum):
     BY_TITLE = "by_title"
 
 
+class ParserPoolSettings(BaseModel):
+    """Settings of the worker processes that CPU-bound parsers run in."""
+
+    # Workers parsing at once. With 0, CPU-bound parsers run in the server
+    # process, like the others
+    max_workers: int = 2
+    # Documents a worker parses before it is replaced by a fresh one
+    max_tasks_per_worker: int = 50
+    # Address space a worker may use, None for no limit
+    max_memory_mb: Optional[int] = 4_096
+    # Time a document may take to parse before its worker is killed
+    task_timeout_seconds: float = 300.0
+
+
 class IngestionConfig(ProviderConfig):
     _defaults: ClassVar[dict] = {
         "app": AppConfig(),
@@ -48,6 +62,10 @@ class IngestionConfig(ProviderConfig):
         "parser_overrides": {},
         "extra_fields": {},
         "automatic_extraction": False,
+        "bulk_upsert_threshold": 1_000,
+        "pipeline_queue_size": 256,
+        "storage_concurrency": 4,
+        "parser_pool": ParserPoolSettings(),
     }
 
     provider: str = Field(
@@ -137,6 +155,28 @@ class IngestionConfig(ProviderConfig):
             "document_summary_max_length"
         ]
     )
+    bulk_upsert_threshold: int = Field(
+        default_factory=lambda: IngestionConfig._defaults[
+            "bulk_upsert_threshold"
+        ]
+    )
+    # Chunks, or vectors, waiting between two stages of an ingestion, which
+    # bounds its memory use
+    pipeline_queue_size: int = Field(
+        default_factory=lambda: IngestionConfig._defaults[
+            "pipeline_queue_size"
+        ]
+    )
+    # Storage batches of an ingestion written at once, each on its own
+    # pooled connection
+    storage_concurrency: int = Field(
+        default_factory=lambda: IngestionConfig._defaults[
+            "storage_concurrency"
+        ]
+    )
+    parser_pool: ParserPoolSettings = Field(
+        default_factory=lambda: IngestionConfig._defaults["parser_pool"]
+    )
 
     @classmethod
     def set_default(cls, **kwargs):
@@ -186,3 +226,7 @@ class IngestionProvider(Provider, ABC):
         self.config: IngestionConfig = config
         self.llm_provider = llm_provider
         self.database_provider: "PostgresDatabaseProvider" = database_provider
+
+    def close(self) -> None:
+        """Releases what the provider holds, when the server shuts down."""
+        pass
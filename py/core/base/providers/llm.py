@@ -13,6 +13,7 @@ from core.base.abstractions import (
     LLMChatCompletion,
     LLMChatCompletionChunk,
 )
+from core.utils import tracing
 
 from .base import Provider, ProviderConfig
 
@@ -178,9 +179,10 @@ class CompletionProvider(Provider):
             "generation_config": generation_config,
             "kwargs": kwargs,
         }
-        response = await self._execute_with_backoff_async(
-            task=task, apply_timeout=apply_timeout
-        )
+        with tracing.span("llm.completion"):
+            response = await self._execute_with_backoff_async(
+                task=task, apply_timeout=apply_timeout
+            )
         return LLMChatCompletion(**response.dict())
 
     async def aget_completion_stream(
@@ -195,7 +197,14 @@ class CompletionProvider(Provider):
             "generation_config": generation_config,
             "kwargs": kwargs,
         }
+        start = time.perf_counter()
+        first_chunk = True
         async for chunk in self._execute_with_backoff_async_stream(task):
+            if first_chunk:
+                first_chunk = False
+                tracing.record(
+                    "llm.time_to_first_token", time.perf_counter() - start
+                )
             if isinstance(chunk, dict):
                 yield LLMChatCompletionChunk(**chunk)
                 continue
@@ -211,6 +220,10 @@ class CompletionProvider(Provider):
                     if chunk.choices[0].finish_reason != "eos"
                     else "stop"
                 )  # hardcode `eos` to `stop` for consistency
+                if chunk.choices[0].finish_reason is not None:
+                    tracing.record(
+                        "llm.generation", time.perf_counter() - start
+                    )
                 try:
                     yield LLMChatCompletionChunk(**(chunk.dict()))
                 except Exception as e:
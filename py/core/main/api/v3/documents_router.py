@@ -2328,7 +2328,9 @@ class DocumentsRouter(BaseRouterV3):
             )
 
             query_embedding = (
-                await self.providers.embedding.async_get_embedding(query)
+                await self.providers.embedding.async_get_query_embedding(
+                    query, use_cache=effective_settings.use_embedding_cache
+                )
             )
             results = await self.services.retrieval.search_documents(
                 query=query,
@@ -16,12 +16,14 @@ from core.base import (
 )
 from core.base.api.models import (
     WrappedAgentResponse,
+    WrappedBatchSearchResponse,
     WrappedCompletionResponse,
     WrappedEmbeddingResponse,
     WrappedLLMChatCompletion,
     WrappedRAGResponse,
     WrappedSearchResponse,
 )
+from core.utils import SSEWriter
 
 from ...abstractions import R2RProviders, R2RServices
 from ...config import R2RConfig
@@ -29,6 +31,9 @@ from .base_router import BaseRouterV3
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on the number of queries of a batch search request
+MAX_BATCH_SEARCH_QUERIES = 1000
+
 
 def merge_search_settings(
     base: SearchSettings, overrides: SearchSettings
@@ -56,6 +61,19 @@ class RetrievalRouter(BaseRouterV3):
     def _register_workflows(self):
         pass
 
+    def _event_stream_response(self, events) -> StreamingResponse:
+        """Stream SSE events, coalescing those that arrive close together."""
+        settings = self.config.app.streaming
+        return StreamingResponse(
+            SSEWriter(
+                events,
+                flush_interval=settings.flush_interval_ms / 1000,
+                max_chunk_bytes=settings.max_chunk_bytes,
+                max_pending_events=settings.max_pending_events,
+            ),
+            media_type="text/event-stream",
+        )
+
     def _prepare_search_settings(
         self,
         auth_user: Any,
@@ -237,6 +255,131 @@ class RetrievalRouter(BaseRouterV3):
             )
             return results  # type: ignore
 
+        @self.router.post(
+            "/retrieval/search/batch",
+            dependencies=[Depends(self.rate_limit_dependency)],
+            summary="Batch Search R2R",
+            openapi_extra={
+                "x-codeSamples": [
+                    {
+                        "lang": "Python",
+                        "source": textwrap.dedent(
+                            """
+                            from r2r import R2RClient
+
+                            client = R2RClient()
+                            # if using auth, do client.login(...)
+
+                            response = client.retrieval.search_batch(
+                                queries=[
+                                    "What is DeepSeek R1?",
+                                    "Who trained DeepSeek R1?",
+                                ],
+                                search_settings={"limit": 5},
+                            )
+                            """
+                        ),
+                    },
+                    {
+                        "lang": "Shell",
+                        "source": textwrap.dedent(
+                            """
+                            curl -X POST "http://localhost:7272/v3/retrieval/search/batch" \\
+                                -H "Content-Type: application/json" \\
+                                -H "Authorization: Bearer YOUR_API_KEY" \\
+                                -d '{
+                                "queries": ["What is DeepSeek R1?", "Who trained DeepSeek R1?"],
+                                "search_settings": {"limit": 5}
+                            }'
+                            """
+                        ),
+                    },
+                ]
+            },
+        )
+        @self.base_endpoint
+        async def search_batch_app(
+            queries: list[str] = Body(
+                ...,
+                description="Search queries, answered in the same order",
+            ),
+            search_mode: SearchMode = Body(
+                default=SearchMode.custom,
+                description=(
+                    "Search mode of all queries, as in `/retrieval/search`."
+                ),
+            ),
+            search_settings: Optional[SearchSettings] = Body(
+                None,
+                description=(
+                    "Search settings shared by all queries, as in `/retrieval/search`."
+                ),
+            ),
+            query_search_settings: Optional[
+                list[Optional[SearchSettings]]
+            ] = Body(
+                None,
+                description=(
+                    "Optional settings of each query, in the order of `queries`. "
+                    "The fields they set override the shared `search_settings`."
+                ),
+            ),
+            auth_user=Depends(self.providers.auth.auth_wrapper()),
+        ) -> WrappedBatchSearchResponse:
+            """Perform many search queries in a single request.
+
+            Each query is searched like with `/retrieval/search`, with the
+            shared `search_settings`, overridden by its own entry of
+            `query_search_settings` if there is one. The queries are
+            embedded together and searched concurrently, which is much
+            faster than searching them one by one, like for offline
+            evaluations.
+
+            The results are returned in the order of the queries.
+            """
+            if not queries:
+                raise R2RException("Queries cannot be empty", 400)
+            if any(not query for query in queries):
+                raise R2RException("Query cannot be empty", 400)
+            if len(queries) > MAX_BATCH_SEARCH_QUERIES:
+                raise R2RException(
+                    f"A batch search can have at most {MAX_BATCH_SEARCH_QUERIES} queries",
+                    400,
+                )
+            if query_search_settings is not None and len(
+                query_search_settings
+            ) != len(queries):
+                raise R2RException(
+                    "`query_search_settings` must have one entry per query",
+                    400,
+                )
+
+            effective_settings = []
+            for i in range(len(queries)):
+                settings = search_settings
+                overrides = (
+                    query_search_settings[i] if query_search_settings else None
+                )
+                if overrides is not None:
+                    settings = (
+                        merge_search_settings(settings, overrides)
+                        if settings is not None
+                        else overrides
+                    )
+                effective_settings.append(
+                    self._prepare_search_settings(
+                        auth_user,
+                        search_mode,
+                        # Settings are mutated with the user filters
+                        settings.model_copy(deep=True) if settings else None,
+                    )
+                )
+            results = await self.services.retrieval.search_batch(
+                queries=queries,
+                search_settings=effective_settings,
+            )
+            return results  # type: ignore
+
         @self.router.post(
             "/retrieval/rag",
             dependencies=[Depends(self.rate_limit_dependency)],
@@ -407,21 +550,7 @@ class RetrievalRouter(BaseRouterV3):
 
             if rag_generation_config.stream:
                 # ========== Streaming path ==========
-                async def stream_generator():
-                    try:
-                        async for chunk in response:
-                            if len(chunk) > 1024:
-                                for i in range(0, len(chunk), 1024):
-                                    yield chunk[i : i + 1024]
-                            else:
-                                yield chunk
-                    except GeneratorExit:
-                        # Clean up if needed, then return
-                        return
-
-                return StreamingResponse(
-                    stream_generator(), media_type="text/event-stream"
-                )  # type: ignore
+                return self._event_stream_response(response)  # type: ignore
             else:
                 return response
 
@@ -723,22 +852,7 @@ class RetrievalRouter(BaseRouterV3):
                 )
 
                 if effective_generation_config.stream:
-
-                    async def stream_generator():
-                        try:
-                            async for chunk in response:
-                                if len(chunk) > 1024:
-                                    for i in range(0, len(chunk), 1024):
-                                        yield chunk[i : i + 1024]
-                                else:
-                                    yield chunk
-                        except GeneratorExit:
-                            # Clean up if needed, then return
-                            return
-
-                    return StreamingResponse(  # type: ignore
-                        stream_generator(), media_type="text/event-stream"
-                    )
+                    return self._event_stream_response(response)  # type: ignore
                 else:
                     return response
             except Exception as e:
@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 
 import psutil
 from fastapi import Depends
+from fastapi.responses import StreamingResponse
 
 from core.base import R2RException
 from core.base.api.models import (
@@ -12,6 +13,7 @@ from core.base.api.models import (
     WrappedServerStatsResponse,
     WrappedSettingsResponse,
 )
+from core.utils.tracing import render_prometheus
 
 from ...abstractions import R2RProviders, R2RServices
 from ...config import R2RConfig
@@ -184,3 +186,46 @@ class SystemRouter(BaseRouterV3):
                 "cpu_usage": psutil.cpu_percent(),
                 "memory_usage": psutil.virtual_memory().percent,
             }
+
+        @self.router.get(
+            "/system/metrics",
+            dependencies=[Depends(self.rate_limit_dependency)],
+            response_class=StreamingResponse,
+            openapi_extra={
+                "x-codeSamples": [
+                    {
+                        "lang": "cURL",
+                        "source": textwrap.dedent("""
+                            curl -X GET "https://api.example.com/v3/system/metrics" \\
+                                 -H "Authorization: Bearer YOUR_API_KEY"
+                            """),
+                    },
+                ]
+            },
+        )
+        @self.base_endpoint
+        async def metrics(
+            auth_user=Depends(self.providers.auth.auth_wrapper()),
+        ) -> StreamingResponse:
+            """Latency histograms of the stages of search, RAG and agent
+            requests, and hit and miss counts of the query embedding cache,
+            in the Prometheus text format.
+
+            Only sampled requests are counted in the histograms, see
+            `[app.tracing]`.
+            """
+            if not auth_user.is_superuser:
+                raise R2RException(
+                    "Only a superuser can call the `system/metrics` endpoint.",
+                    403,
+                )
+            return StreamingResponse(
+                iter(
+                    [
+                        render_prometheus(
+                            self.providers.completion_embedding.get_cache_counters()
+                        )
+                    ]
+                ),
+                media_type="text/plain; version=0.0.4",
+            )
@@ -46,6 +46,7 @@ async def lifespan(app: FastAPI):
 
     # # Shutdown
     scheduler.shutdown()
+    r2r_app.providers.ingestion.close()
 
 
 async def create_r2r_app(
@@ -2,6 +2,7 @@ import logging
 import os
 from typing import Any, Type
 
+from ...utils.tracing import configure_tracing
 from ..abstractions import R2RProviders, R2RServices
 from ..api.v3.chunks_router import ChunksRouter
 from ..api.v3.collections_router import CollectionsRouter
@@ -45,6 +46,8 @@ class R2RBuilder:
     async def build(self, *args, **kwargs) -> R2RApp:
         provider_factory = R2RProviderFactory
 
+        configure_tracing(**self.config.app.tracing.model_dump())
+
         try:
             user_tools_path = (
                 os.getenv("R2R_USER_TOOLS_PATH") or "../docker/user_tools"
@@ -219,12 +219,25 @@ class R2RProviderFactory:
             raise ValueError(
                 f"Database provider {db_config.provider} not supported"
             )
+        # Query embeddings are cached by the completion embedding provider
+        cache_settings = self.config.completion_embedding.cache_settings
+        # Document embeddings are stored for the ingestion embedding provider
+        store_settings = self.config.embedding.store_settings
 
         database_provider = PostgresDatabaseProvider(
             db_config,
             dimension,
             crypto_provider=crypto_provider,
             quantization_type=quantization_type,
+            prefix_dimension=self.config.embedding.quantization_settings.prefix_dimension,
+            embedding_cache_ttl=(
+                cache_settings.ttl_seconds
+                if cache_settings.enabled and cache_settings.shared
+                else None
+            ),
+            embedding_store_max_entries=(
+                store_settings.max_entries if store_settings.enabled else None
+            ),
         )
         await database_provider.initialize()
         return database_provider
@@ -436,6 +449,11 @@ class R2RProviderFactory:
             )
         )
 
+        if database_provider.embedding_cache_handler is not None:
+            completion_embedding_provider.shared_cache = (
+                database_provider.embedding_cache_handler
+            )
+
         file_provider = self.create_file_provider(
             config=self.config.file, database_provider=database_provider
         )
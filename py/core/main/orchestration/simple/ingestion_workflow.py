@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from typing import AsyncGenerator, AsyncIterable, TypeVar
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -20,6 +22,61 @@ from ...services import IngestionService
 
 logger = logging.getLogger()
 
+T = TypeVar("T")
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class _Pipeline:
+    """Runs the stages of an ingestion concurrently, each in its own task,
+    with a bounded queue after each stage so that a stage is held back by
+    the stages after it rather than buffering the whole document."""
+
+    _END = object()
+
+    def __init__(self, queue_size: int):
+        self.queue_size = max(1, queue_size)
+        self._tasks: list[asyncio.Task] = []
+
+    def stage(self, source: AsyncIterable[T]) -> AsyncGenerator[T, None]:
+        """Runs `source` ahead of its consumer by up to `queue_size`
+        items."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def produce():
+            try:
+                async for item in source:
+                    await queue.put(item)
+            except Exception as e:
+                await queue.put(_Failure(e))
+                return
+            finally:
+                if hasattr(source, "aclose"):
+                    await source.aclose()
+            await queue.put(self._END)
+
+        self._tasks.append(asyncio.create_task(produce()))
+
+        async def consume():
+            while (item := await queue.get()) is not self._END:
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+
+        return consume()
+
+    async def __aenter__(self) -> "_Pipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Stages are done unless a later stage failed
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
 
 def simple_ingestion_factory(service: IngestionService):
     async def ingest_files(input_data):
@@ -46,46 +103,71 @@ def simple_ingestion_factory(service: IngestionService):
             )
 
             ingestion_config = parsed_data["ingestion_config"]
-            extractions_generator = service.parse_file(
-                document_info=document_info,
-                ingestion_config=ingestion_config,
+            summarize = not ingestion_config.get(
+                "skip_document_summary", False
             )
-            extractions = [
-                extraction.model_dump()
-                async for extraction in extractions_generator
-            ]
-
-            # 2) Sum tokens
+            summary_chunks: list[dict] = []
+            summary_task = None
             total_tokens = 0
-            for chunk_dict in extractions:
-                text_data = chunk_dict["data"]
-                if not isinstance(text_data, str):
-                    text_data = text_data.decode("utf-8", errors="ignore")
-                total_tokens += num_tokens(text_data)
-            document_info.total_tokens = total_tokens
-
-            if not ingestion_config.get("skip_document_summary", False):
-                await service.update_document_status(
+            total_chunks = 0
+
+            async def parsed_chunks():
+                nonlocal summary_task, total_tokens, total_chunks
+                async for extraction in service.parse_file(
                     document_info=document_info,
-                    status=IngestionStatus.AUGMENTING,
-                )
-                await service.augment_document_info(document_info, extractions)
+                    ingestion_config=ingestion_config,
+                ):
+                    # 2) Sum tokens
+                    text_data = extraction.data
+                    if not isinstance(text_data, str):
+                        text_data = text_data.decode("utf-8", errors="ignore")
+                    total_tokens += num_tokens(text_data)
+
+                    if (
+                        summarize
+                        and len(summary_chunks)
+                        < service.config.ingestion.chunks_for_document_summary
+                    ):
+                        summary_chunks.append(extraction.model_dump())
+
+                    if total_chunks == 0:
+                        await service.update_document_status(
+                            document_info, status=IngestionStatus.EMBEDDING
+                        )
+                    total_chunks += 1
+                    yield extraction
+
+                # The summary is written while the last chunks are embedded
+                if summarize:
+                    summary_task = asyncio.create_task(
+                        service.augment_document_info(
+                            document_info, summary_chunks
+                        )
+                    )
 
-            await service.update_document_status(
-                document_info, status=IngestionStatus.EMBEDDING
-            )
-            embedding_generator = service.embed_document(extractions)
-            embeddings = [
-                embedding.model_dump()
-                async for embedding in embedding_generator
-            ]
+            # Parsing, embedding and storage overlap, with at most
+            # `pipeline_queue_size` chunks and vectors between them
+            try:
+                async with _Pipeline(
+                    service.config.ingestion.pipeline_queue_size
+                ) as pipeline:
+                    extractions = pipeline.stage(parsed_chunks())
+                    embeddings = pipeline.stage(
+                        service.embed_document(extractions)
+                    )
+                    async for _ in service.store_embeddings(embeddings):
+                        pass
+                document_info.total_tokens = total_tokens
 
-            await service.update_document_status(
-                document_info, status=IngestionStatus.STORING
-            )
-            storage_generator = service.store_embeddings(embeddings)
-            async for _ in storage_generator:
-                pass
+                if summary_task is not None:
+                    await service.update_document_status(
+                        document_info=document_info,
+                        status=IngestionStatus.AUGMENTING,
+                    )
+                    await summary_task
+            finally:
+                if summary_task is not None and not summary_task.done():
+                    summary_task.cancel()
 
             await service.finalize_ingestion(document_info)
 
@@ -260,7 +342,7 @@ def simple_ingestion_factory(service: IngestionService):
                 collection_ids = [collection_ids]
             collection_ids = [UUID(id_str) for id_str in collection_ids]
 
-            extractions = [
+            extractions = (
                 DocumentChunk(
                     id=(
                         generate_extraction_id(document_id, i)
@@ -272,22 +354,19 @@ def simple_ingestion_factory(service: IngestionService):
                     owner_id=document_info.owner_id,
                     data=chunk.text,
                     metadata=parsed_data["metadata"],
-                ).model_dump()
+                )
                 for i, chunk in enumerate(parsed_data["chunks"])
-            ]
-
-            embedding_generator = service.embed_document(extractions)
-            embeddings = [
-                embedding.model_dump()
-                async for embedding in embedding_generator
-            ]
-
-            await service.update_document_status(
-                document_info, status=IngestionStatus.STORING
             )
-            storage_generator = service.store_embeddings(embeddings)
-            async for _ in storage_generator:
-                pass
+
+            # Embedding and storage overlap
+            async with _Pipeline(
+                service.config.ingestion.pipeline_queue_size
+            ) as pipeline:
+                embeddings = pipeline.stage(
+                    service.embed_document(extractions)
+                )
+                async for _ in service.store_embeddings(embeddings):
+                    pass
 
             await service.finalize_ingestion(document_info)
 
@@ -1,8 +1,16 @@
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Any, AsyncGenerator, Optional, Sequence
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Iterable,
+    Optional,
+    Sequence,
+)
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -30,6 +38,7 @@ from core.base.abstractions import (
     VectorTableName,
 )
 from core.base.api.models import User
+from core.utils import iterate_async
 from shared.abstractions import PDFParsingError, PopplerNotFoundError
 
 from ..abstractions import R2RProviders
@@ -327,14 +336,16 @@ class IngestionService:
 
     async def embed_document(
         self,
-        chunked_documents: list[dict],
+        chunked_documents: Iterable[dict | DocumentChunk]
+        | AsyncIterable[dict | DocumentChunk],
         embedding_batch_size: int = 8,
     ) -> AsyncGenerator[VectorEntry, None]:
         """Inline replacement for the old embedding_pipe.run(...).
 
-        Batches the embedding calls and yields VectorEntry objects.
+        Batches the embedding calls and yields VectorEntry objects, as soon
+        as their batch is embedded. Chunks may be streamed in.
         """
-        if not chunked_documents:
+        if isinstance(chunked_documents, Sequence) and not chunked_documents:
             return
 
         concurrency_limit = (
@@ -356,9 +367,7 @@ class IngestionService:
                 for ex in batch
             ]
             # Retrieve embeddings in bulk
-            vectors = await self.providers.embedding.async_get_embeddings(
-                texts,  # list of strings
-            )
+            vectors = await self._embed_texts(texts)
             # Zip them back together
             results = []
             for raw_vector, extraction in zip(vectors, batch, strict=False):
@@ -382,130 +391,206 @@ class IngestionService:
         async def run_process_batch(batch: list[DocumentChunk]):
             return await process_batch(batch)
 
-        # Convert each chunk dict to a DocumentChunk
-        for chunk_dict in chunked_documents:
-            extraction = DocumentChunk.from_dict(chunk_dict)
-            extraction_batch.append(extraction)
-
-            # If we hit a batch threshold, spawn a task
-            if len(extraction_batch) >= embedding_batch_size:
-                tasks.add(
-                    asyncio.create_task(run_process_batch(extraction_batch))
+        try:
+            # Convert each chunk dict to a DocumentChunk
+            async for chunk in iterate_async(chunked_documents):
+                extraction = (
+                    chunk
+                    if isinstance(chunk, DocumentChunk)
+                    else DocumentChunk.from_dict(chunk)
                 )
-                extraction_batch = []
+                extraction_batch.append(extraction)
 
-            # If tasks are at concurrency limit, wait for the first to finish
-            while len(tasks) >= concurrency_limit:
-                done, tasks = await asyncio.wait(
-                    tasks, return_when=asyncio.FIRST_COMPLETED
-                )
+                # If we hit a batch threshold, spawn a task
+                if len(extraction_batch) >= embedding_batch_size:
+                    tasks.add(
+                        asyncio.create_task(
+                            run_process_batch(extraction_batch)
+                        )
+                    )
+                    extraction_batch = []
+
+                # If tasks are at concurrency limit, wait for the first to finish
+                while len(tasks) >= concurrency_limit:
+                    done, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for t in done:
+                        for vector_entry in await t:
+                            yield vector_entry
+
+                # Pass on finished batches while more chunks stream in
+                done = {t for t in tasks if t.done()}
+                tasks -= done
                 for t in done:
                     for vector_entry in await t:
                         yield vector_entry
 
-        # Handle any leftover items
-        if extraction_batch:
-            tasks.add(asyncio.create_task(run_process_batch(extraction_batch)))
+            # Handle any leftover items
+            if extraction_batch:
+                tasks.add(
+                    asyncio.create_task(run_process_batch(extraction_batch))
+                )
 
-        # Gather remaining tasks
-        for future_task in asyncio.as_completed(tasks):
-            for vector_entry in await future_task:
-                yield vector_entry
+            # Gather remaining tasks
+            for future_task in asyncio.as_completed(tasks):
+                for vector_entry in await future_task:
+                    yield vector_entry
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embeds texts, reusing the embeddings of identical texts from the
+        embedding store when it is enabled.
+
+        Only the texts missing from the store are sent to the embedding
+        provider, and their embeddings are added to the store.
+        """
+        store = self.providers.database.embedding_store_handler
+        if store is None:
+            return await self.providers.embedding.async_get_embeddings(texts)
+
+        keys = [self.providers.embedding.content_key(text) for text in texts]
+        embeddings = await store.get_embeddings(list(set(keys)))
+
+        missing = {
+            key: text
+            for key, text in zip(keys, texts, strict=True)
+            if key not in embeddings
+        }
+        if missing:
+            new_embeddings = dict(
+                zip(
+                    missing,
+                    await self.providers.embedding.async_get_embeddings(
+                        list(missing.values())
+                    ),
+                    strict=True,
+                )
+            )
+            await store.store_embeddings(new_embeddings)
+            embeddings.update(new_embeddings)
+
+        logger.debug(
+            f"Embedded {len(missing)} of {len(texts)} texts, "
+            f"{len(texts) - len(missing)} were reused from the embedding store"
+        )
+        return [embeddings[key] for key in keys]
 
     async def store_embeddings(
         self,
-        embeddings: Sequence[dict | VectorEntry],
+        embeddings: Sequence[dict | VectorEntry]
+        | AsyncIterable[dict | VectorEntry],
         storage_batch_size: int = 128,
     ) -> AsyncGenerator[str, None]:
         """Inline replacement for the old vector_storage_pipe.run(...).
 
         Batches up the vector entries, enforces usage limits, stores them, and
         yields a success/error string (or you could yield a StorageResult).
-        """
-        if not embeddings:
-            return
+        Entries may be streamed in.
 
-        vector_entries: list[VectorEntry] = []
-        for item in embeddings:
-            if isinstance(item, VectorEntry):
-                vector_entries.append(item)
-            else:
-                vector_entries.append(VectorEntry.from_dict(item))
+        The chunk limit of each owner is looked up once, and room for a batch
+        is reserved in the transaction that stores it. Up to
+        `storage_concurrency` batches are stored at once.
+        """
+        # Large ingestions are stored in batches big enough for the COPY
+        # path. The size of a stream is not known, so it is stored in such
+        # batches, and whatever is left at its end
+        bulk_upsert_threshold = self.config.ingestion.bulk_upsert_threshold
+        if isinstance(embeddings, Sequence):
+            if not embeddings:
+                return
+            if len(embeddings) >= bulk_upsert_threshold:
+                storage_batch_size = max(
+                    storage_batch_size, bulk_upsert_threshold
+                )
+        else:
+            storage_batch_size = max(storage_batch_size, bulk_upsert_threshold)
 
-        vector_batch: list[VectorEntry] = []
+        concurrency_limit = self.config.ingestion.storage_concurrency
+        max_chunks: dict[UUID, Optional[int]] = {}
         document_counts: dict[UUID, int] = {}
+        tasks: set[asyncio.Task] = set()
 
-        # We'll track usage from the first user we see; if your scenario allows
-        # multiple user owners in a single ingestion, you'd need to refine usage checks.
-        current_usage = None
-        user_id_for_usage_check: UUID | None = None
-
-        count = 0
-
-        for msg in vector_entries:
-            # If we haven't set usage yet, do so on the first chunk
-            if current_usage is None:
-                user_id_for_usage_check = msg.owner_id
-                usage_data = (
-                    await self.providers.database.chunks_handler.list_chunks(
-                        limit=1,
-                        offset=0,
-                        filters={"owner_id": msg.owner_id},
+        async def store_batch(batch: list[VectorEntry]) -> Optional[str]:
+            start = time.perf_counter()
+            try:
+                await self._upsert_vector_entries(
+                    batch,
+                    max_chunks={
+                        owner_id: limit
+                        for owner_id in {entry.owner_id for entry in batch}
+                        if (limit := max_chunks[owner_id]) is not None
+                    },
+                )
+            except R2RException as e:
+                logger.error(e.message)
+                return e.message
+            except Exception as e:
+                logger.error(f"Failed to store vector batch: {e}")
+                return f"Error: {e}"
+            logger.info(
+                f"Stored a batch of {len(batch)} vector entries in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+            for entry in batch:
+                document_counts[entry.document_id] = (
+                    document_counts.get(entry.document_id, 0) + 1
+                )
+            return None
+
+        async def start_batch(batch: list[VectorEntry]):
+            new_owners = {
+                entry.owner_id for entry in batch
+            } - max_chunks.keys()
+            if new_owners:
+                max_chunks.update(
+                    zip(
+                        new_owners,
+                        await asyncio.gather(
+                            *(
+                                self._get_max_chunks(owner_id)
+                                for owner_id in new_owners
+                            )
+                        ),
+                        strict=True,
                     )
                 )
-                current_usage = usage_data["total_entries"]
+            tasks.add(asyncio.create_task(store_batch(batch)))
 
-            # Figure out the user's limit
-            user = await self.providers.database.users_handler.get_user_by_id(
-                msg.owner_id
-            )
-            max_chunks = (
-                self.providers.database.config.app.default_max_chunks_per_user
-                if self.providers.database.config.app
-                else 1e10
-            )
-            if user.limits_overrides and "max_chunks" in user.limits_overrides:
-                max_chunks = user.limits_overrides["max_chunks"]
+        vector_batch: list[VectorEntry] = []
+        try:
+            async for item in iterate_async(embeddings):
+                vector_batch.append(
+                    item
+                    if isinstance(item, VectorEntry)
+                    else VectorEntry.from_dict(item)
+                )
 
-            # Add to our local batch
-            vector_batch.append(msg)
-            document_counts[msg.document_id] = (
-                document_counts.get(msg.document_id, 0) + 1
-            )
-            count += 1
+                # Once we hit our batch size, store them
+                if len(vector_batch) >= storage_batch_size:
+                    await start_batch(vector_batch)
+                    vector_batch = []
 
-            # Check usage
-            if (
-                current_usage is not None
-                and (current_usage + len(vector_batch) + count) > max_chunks
-            ):
-                error_message = f"User {msg.owner_id} has exceeded the maximum number of allowed chunks: {max_chunks}"
-                logger.error(error_message)
-                yield error_message
-                continue
-
-            # Once we hit our batch size, store them
-            if len(vector_batch) >= storage_batch_size:
-                try:
-                    await (
-                        self.providers.database.chunks_handler.upsert_entries(
-                            vector_batch
-                        )
+                while len(tasks) >= concurrency_limit:
+                    done, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
                     )
-                except Exception as e:
-                    logger.error(f"Failed to store vector batch: {e}")
-                    yield f"Error: {e}"
-                vector_batch.clear()
+                    for t in done:
+                        if error_message := t.result():
+                            yield error_message
 
-        # Store any leftover items
-        if vector_batch:
-            try:
-                await self.providers.database.chunks_handler.upsert_entries(
-                    vector_batch
-                )
-            except Exception as e:
-                logger.error(f"Failed to store final vector batch: {e}")
-                yield f"Error: {e}"
+            # Store any leftover items
+            if vector_batch:
+                await start_batch(vector_batch)
+
+            for future_task in asyncio.as_completed(tasks):
+                if error_message := await future_task:
+                    yield error_message
+        finally:
+            for t in tasks:
+                t.cancel()
 
         # Summaries
         for doc_id, cnt in document_counts.items():
@@ -513,6 +598,34 @@ class IngestionService:
             logger.info(info_msg)
             yield info_msg
 
+    async def _get_max_chunks(self, owner_id: UUID) -> Optional[int]:
+        """The chunk limit of a user, None if they have none."""
+        app_config = self.providers.database.config.app
+        if not app_config:
+            return None
+        user = await self.providers.database.users_handler.get_user_by_id(
+            owner_id
+        )
+        if user.limits_overrides and "max_chunks" in user.limits_overrides:
+            return user.limits_overrides["max_chunks"]
+        return app_config.default_max_chunks_per_user
+
+    async def _upsert_vector_entries(
+        self,
+        entries: list[VectorEntry],
+        max_chunks: Optional[dict[UUID, int]] = None,
+    ) -> None:
+        """Stores vector entries, switching to the COPY based bulk upsert once
+        the batch reaches `bulk_upsert_threshold` entries.
+
+        `max_chunks` maps owners to the chunk limit they must stay within.
+        """
+        chunks_handler = self.providers.database.chunks_handler
+        if len(entries) >= self.config.ingestion.bulk_upsert_threshold:
+            await chunks_handler.bulk_upsert_entries(entries, max_chunks)
+        else:
+            await chunks_handler.upsert_entries(entries, max_chunks)
+
     async def finalize_ingestion(
         self, document_info: DocumentResponse
     ) -> None:
@@ -751,9 +864,7 @@ class IngestionService:
             chunk["metadata"]["chunk_enrichment_status"] = "failed"
 
         # Re-embed
-        data = await self.providers.embedding.async_get_embedding(
-            updated_chunk_text
-        )
+        data = (await self._embed_texts([updated_chunk_text]))[0]
         chunk["metadata"]["original_text"] = chunk["text"]
 
         return VectorEntry(
@@ -819,9 +930,7 @@ class IngestionService:
         )
 
         # Insert the newly enriched entries
-        await self.providers.database.chunks_handler.upsert_entries(
-            new_vector_entries
-        )
+        await self._upsert_vector_entries(new_vector_entries)
         return len(new_vector_entries)
 
     async def list_chunks(
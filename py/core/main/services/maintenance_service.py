@@ -46,6 +46,46 @@ class MaintenanceService(Service):
 
         self.scheduled_jobs.append(job)
 
+        # Expire entries of the shared query embedding cache
+        if self.providers.database.embedding_cache_handler is not None:
+            job = await self.providers.scheduler.add_job(
+                self.clean_expired_embeddings,
+                trigger="interval",
+                hours=1,
+            )
+            self.scheduled_jobs.append(job)
+
+        # Bound the size of the document embedding store
+        if self.providers.database.embedding_store_handler is not None:
+            job = await self.providers.scheduler.add_job(
+                self.evict_stored_embeddings,
+                trigger="interval",
+                hours=1,
+            )
+            self.scheduled_jobs.append(job)
+
+        # Expire entries of the RAG response cache
+        if self.providers.database.rag_cache_handler is not None:
+            job = await self.providers.scheduler.add_job(
+                self.clean_expired_rag_responses,
+                trigger="interval",
+                hours=1,
+            )
+            self.scheduled_jobs.append(job)
+
+        # Expire entries of the shared search result cache
+        search_cache_handler = self.providers.database.search_cache_handler
+        if (
+            search_cache_handler is not None
+            and search_cache_handler.settings.backend == "postgres"
+        ):
+            job = await self.providers.scheduler.add_job(
+                self.clean_expired_search_results,
+                trigger="interval",
+                hours=1,
+            )
+            self.scheduled_jobs.append(job)
+
     def _parse_cron_schedule(self, cron_schedule: str) -> dict:
         """Parse a cron schedule string into kwargs for APScheduler"""
         parts = cron_schedule.split()
@@ -116,3 +156,31 @@ class MaintenanceService(Service):
             )
         except Exception as e:
             logger.error(f"Table vacuum failed for {table_name}: {str(e)}")
+
+    async def clean_expired_embeddings(self):
+        """Remove expired entries from the shared embedding cache"""
+        try:
+            await self.providers.database.embedding_cache_handler.clean_expired_embeddings()  # type: ignore
+        except Exception as e:
+            logger.error(f"Embedding cache cleanup failed: {str(e)}")
+
+    async def evict_stored_embeddings(self):
+        """Evict least recently used entries from the embedding store"""
+        try:
+            await self.providers.database.embedding_store_handler.evict()  # type: ignore
+        except Exception as e:
+            logger.error(f"Embedding store eviction failed: {str(e)}")
+
+    async def clean_expired_rag_responses(self):
+        """Remove expired entries from the RAG response cache"""
+        try:
+            await self.providers.database.rag_cache_handler.clean_expired_responses()  # type: ignore
+        except Exception as e:
+            logger.error(f"RAG cache cleanup failed: {str(e)}")
+
+    async def clean_expired_search_results(self):
+        """Remove expired entries from the shared search result cache"""
+        try:
+            await self.providers.database.search_cache_handler.clean_expired_results()  # type: ignore
+        except Exception as e:
+            logger.error(f"Search cache cleanup failed: {str(e)}")
@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
 from copy import deepcopy
@@ -6,6 +8,7 @@ from datetime import datetime
 from typing import Any, AsyncGenerator, Literal, Optional
 from uuid import UUID
 
+import numpy as np
 from fastapi import HTTPException
 
 from core import (
@@ -29,6 +32,7 @@ from core.base import (
     GraphRelationshipResult,
     GraphSearchResult,
     GraphSearchResultType,
+    HydeMode,
     IngestionStatus,
     Message,
     R2RException,
@@ -39,14 +43,16 @@ from core.base import (
 from core.base.agent.tools.registry import ToolRegistry
 from core.base.api.models import RAGResponse, User
 from core.utils import (
+    CitationScanner,
     CitationTracker,
     SearchResultsCollector,
     SSEFormatter,
     dump_collector,
     dump_obj,
     extract_citations,
-    find_new_citation_spans,
     num_tokens_from_messages,
+    pack_search_results_for_llm,
+    tracing,
 )
 from shared.api.models.management.responses import MessageResponse
 
@@ -146,6 +152,7 @@ class AgentFactory:
                         knowledge_search_method=knowledge_search_method,
                         content_method=content_method,
                         file_search_method=file_search_method,
+                        context_packing=app_config.context_packing,
                     )
                 else:
                     return R2RStreamingRAGAgent(
@@ -158,6 +165,7 @@ class AgentFactory:
                         knowledge_search_method=knowledge_search_method,
                         content_method=content_method,
                         file_search_method=file_search_method,
+                        context_packing=app_config.context_packing,
                         tool_registry=tool_registry,
                     )
             else:
@@ -172,6 +180,7 @@ class AgentFactory:
                         knowledge_search_method=knowledge_search_method,
                         content_method=content_method,
                         file_search_method=file_search_method,
+                        context_packing=app_config.context_packing,
                         tool_registry=tool_registry,
                     )
                 else:
@@ -185,6 +194,7 @@ class AgentFactory:
                         knowledge_search_method=knowledge_search_method,
                         content_method=content_method,
                         file_search_method=file_search_method,
+                        context_packing=app_config.context_packing,
                         tool_registry=tool_registry,
                     )
         else:
@@ -260,6 +270,7 @@ class RetrievalService(Service):
         self,
         query: str,
         search_settings: SearchSettings = SearchSettings(),
+        precomputed_vector: Optional[list[float]] = None,
         *args,
         **kwargs,
     ) -> AggregateSearchResult:
@@ -267,55 +278,163 @@ class RetrievalService(Service):
         Depending on search_settings.search_strategy, fan out
         to basic, hyde, or rag_fusion method. Each returns
         an AggregateSearchResult that includes chunk + graph results.
+
+        The basic strategy searches with `precomputed_vector`, if given,
+        instead of embedding the query.
         """
         strategy = search_settings.search_strategy.lower()
 
-        if strategy == "hyde":
-            return await self._hyde_search(query, search_settings)
-        elif strategy == "rag_fusion":
-            return await self._rag_fusion_search(query, search_settings)
-        else:
-            # 'vanilla', 'basic', or anything else...
-            return await self._basic_search(query, search_settings)
+        with tracing.start_trace(
+            "search", force=search_settings.include_timings
+        ) as trace:
+            # Identical searches may be served from the cache
+            search_cache = self.providers.database.search_cache_handler
+            cache_key = None
+            results = None
+            if search_cache is not None and search_settings.use_search_cache:
+                with tracing.span("search_cache"):
+                    try:
+                        cache_key = await search_cache.search_key(
+                            query,
+                            search_settings.filters,
+                            self._search_cache_settings_key(search_settings),
+                            graph_search=search_settings.graph_settings.enabled,
+                        )
+                        cached = await search_cache.get(cache_key)
+                        if cached is not None:
+                            results = AggregateSearchResult.model_validate(
+                                cached
+                            )
+                    except Exception as e:
+                        logger.warning(f"Search cache lookup failed: {e}")
+
+            if results is None:
+                with tracing.span("search"):
+                    if strategy == "hyde":
+                        results = await self._hyde_search(
+                            query, search_settings
+                        )
+                    elif strategy == "rag_fusion":
+                        results = await self._rag_fusion_search(
+                            query, search_settings
+                        )
+                    else:
+                        # 'vanilla', 'basic', or anything else...
+                        results = await self._basic_search(
+                            query, search_settings, precomputed_vector
+                        )
+                if cache_key is not None:
+                    try:
+                        await search_cache.set(  # type: ignore
+                            cache_key, results.model_dump(mode="json")
+                        )
+                    except Exception as e:
+                        logger.warning(f"Search cache update failed: {e}")
+
+        if trace is not None and search_settings.include_timings:
+            results.timings = trace.as_dict()
+        return results
+
+    async def search_batch(
+        self,
+        queries: list[str],
+        search_settings: list[SearchSettings],
+    ) -> list[AggregateSearchResult]:
+        """
+        Runs many searches, with the settings of each query.
+
+        The queries of basic semantic or hybrid searches are embedded with a
+        single call to the embedding provider, and all searches run
+        concurrently, bounded by the `max_concurrent_batch_searches` setting.
+        Results are returned in the order of the queries.
+        """
+        if len(queries) != len(search_settings):
+            raise R2RException(
+                "Each query must have its own search settings.", 400
+            )
+
+        # 1) Embed the queries of basic searches in one batch; the other
+        #    strategies embed their own rephrasings of the query
+        query_vectors: list[Optional[list[float]]] = [None] * len(queries)
+        to_embed = [
+            i
+            for i, settings in enumerate(search_settings)
+            if settings.search_strategy.lower() not in ("hyde", "rag_fusion")
+            and (settings.use_semantic_search or settings.use_hybrid_search)
+        ]
+        if to_embed:
+            embeddings = await self.providers.completion_embedding.async_get_query_embeddings(
+                [queries[i] for i in to_embed],
+                use_cache=all(
+                    search_settings[i].use_embedding_cache for i in to_embed
+                ),
+            )
+            for i, embedding in zip(to_embed, embeddings, strict=True):
+                query_vectors[i] = embedding
+
+        # 2) Search concurrently
+        semaphore = asyncio.Semaphore(
+            self.config.app.max_concurrent_batch_searches
+        )
+
+        async def bounded_search(i: int) -> AggregateSearchResult:
+            async with semaphore:
+                return await self.search(
+                    queries[i], search_settings[i], query_vectors[i]
+                )
+
+        return list(
+            await asyncio.gather(
+                *(bounded_search(i) for i in range(len(queries)))
+            )
+        )
 
     async def _basic_search(
-        self, query: str, search_settings: SearchSettings
+        self,
+        query: str,
+        search_settings: SearchSettings,
+        precomputed_vector: Optional[list[float]] = None,
     ) -> AggregateSearchResult:
         """
-        1) Possibly embed the query (if semantic or hybrid).
-        2) Chunk search.
-        3) Graph search.
+        1) Possibly embed the query (if semantic or hybrid), unless a
+           precomputed vector is given.
+        2) Chunk search and
+        3) graph search, concurrently.
         4) Combine into an AggregateSearchResult.
         """
         # -- 1) Possibly embed the query
-        query_vector = None
-        if (
+        query_vector = precomputed_vector
+        if query_vector is None and (
             search_settings.use_semantic_search
             or search_settings.use_hybrid_search
         ):
-            query_vector = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    text=query
-                )
+            query_vector = await self.providers.completion_embedding.async_get_query_embedding(
+                query, use_cache=search_settings.use_embedding_cache
             )
 
-        # -- 2) Chunk search
-        chunk_results = []
-        if search_settings.chunk_settings.enabled:
-            chunk_results = await self._vector_search_logic(
+        # -- 2) Chunk search and 3) graph search, run concurrently
+        async def chunk_search() -> list[ChunkSearchResult]:
+            if not search_settings.chunk_settings.enabled:
+                return []
+            return await self._vector_search_logic(
                 query_text=query,
                 search_settings=search_settings,
                 precomputed_vector=query_vector,  # Pass in the vector we just computed (if any)
             )
 
-        # -- 3) Graph search
-        graph_results = []
-        if search_settings.graph_settings.enabled:
-            graph_results = await self._graph_search_logic(
-                query_text=query,
-                search_settings=search_settings,
-                precomputed_vector=query_vector,  # same idea
-            )
+        async def graph_search() -> list[GraphSearchResult]:
+            if not search_settings.graph_settings.enabled:
+                return []
+            with tracing.span("graph_search"):
+                return await self._graph_search_logic(
+                    query_text=query,
+                    search_settings=search_settings,
+                    precomputed_vector=query_vector,  # same idea
+                )
+
+        chunk_results, graph_results = await asyncio.gather(
+            chunk_search(), graph_search()
+        )
 
         # -- 4) Combine
         return AggregateSearchResult(
@@ -328,40 +447,78 @@ class RetrievalService(Service):
     ) -> AggregateSearchResult:
         """
         Implements 'RAG Fusion':
-        1) Generate N sub-queries from the user query
-        2) For each sub-query => do chunk & graph search
+        1) Start searching the original user query
+        2) Generate N-1 sub-queries from it, embed them in one batch and
+           search them concurrently (or, with `stream_sub_queries`, search
+           each one as soon as the LLM has generated it)
         3) Combine / fuse all retrieved results using Reciprocal Rank Fusion
         4) Return an AggregateSearchResult
         """
 
-        # 1) Generate sub-queries from the user’s original query
-        #    Typically you want the original query to remain in the set as well,
-        #    so that we do not lose the exact user intent.
-        sub_queries = [query]
-        if search_settings.num_sub_queries > 1:
-            # Generate (num_sub_queries - 1) rephrasings
-            # (Or just generate exactly search_settings.num_sub_queries,
-            #  and remove the first if you prefer.)
-            extra = await self._generate_similar_queries(
-                query=query,
-                num_sub_queries=search_settings.num_sub_queries - 1,
-            )
-            sub_queries.extend(extra)
-
-        # 2) For each sub-query => do chunk + graph search
-        #    We’ll store them in a structure so we can fuse them.
-        #    chunk_results_list is a list of lists of ChunkSearchResult
-        #    graph_results_list is a list of lists of GraphSearchResult
-        chunk_results_list = []
-        graph_results_list = []
-
-        for sq in sub_queries:
-            # Recompute or reuse the embedding if desired
-            # (You could do so, but not mandatory if you have a local approach)
-            # chunk + graph search
-            aggr = await self._basic_search(sq, search_settings)
-            chunk_results_list.append(aggr.chunk_search_results)
-            graph_results_list.append(aggr.graph_search_results)
+        # 1) The original query is searched right away, so that it does not
+        #    wait for the LLM to generate the rephrasings.
+        #    The searches of all sub-queries share a bounded semaphore.
+        semaphore = asyncio.Semaphore(
+            self.config.app.max_concurrent_sub_query_searches
+        )
+
+        async def bounded_search(
+            sub_query: str, query_vector: Optional[list[float]] = None
+        ) -> AggregateSearchResult:
+            async with semaphore:
+                return await self._basic_search(
+                    sub_query, search_settings, query_vector
+                )
+
+        search_tasks = [asyncio.create_task(bounded_search(query))]
+
+        # 2) Generate (num_sub_queries - 1) rephrasings and search each of
+        #    them concurrently.
+        num_rephrasings = search_settings.num_sub_queries - 1
+        try:
+            if search_settings.stream_sub_queries:
+                # Search every rephrasing as soon as the LLM has produced it
+                async for sub_query in self._stream_similar_queries(
+                    query=query, num_sub_queries=num_rephrasings
+                ):
+                    search_tasks.append(
+                        asyncio.create_task(bounded_search(sub_query))
+                    )
+            else:
+                # Embed all rephrasings with a single embedding call
+                sub_queries = await self._generate_similar_queries(
+                    query=query, num_sub_queries=num_rephrasings
+                )
+                query_vectors: list[Optional[list[float]]] = [None] * len(
+                    sub_queries
+                )
+                if sub_queries and (
+                    search_settings.use_semantic_search
+                    or search_settings.use_hybrid_search
+                ):
+                    query_vectors = list(
+                        await self.providers.completion_embedding.async_get_query_embeddings(
+                            sub_queries,
+                            use_cache=search_settings.use_embedding_cache,
+                        )
+                    )
+                search_tasks.extend(
+                    asyncio.create_task(bounded_search(sub_query, vector))
+                    for sub_query, vector in zip(
+                        sub_queries, query_vectors, strict=True
+                    )
+                )
+            aggregates = await asyncio.gather(*search_tasks)
+        except BaseException:
+            for task in search_tasks:
+                task.cancel()
+            raise
+
+        # chunk_results_list is a list of lists of ChunkSearchResult and
+        # graph_results_list a list of lists of GraphSearchResult, one per
+        # sub-query, with the original query first.
+        chunk_results_list = [aggr.chunk_search_results for aggr in aggregates]
+        graph_results_list = [aggr.graph_search_results for aggr in aggregates]
 
         # 3) Fuse the chunk results and fuse the graph results.
         #    We'll use a simple RRF approach: each sub-query's result list
@@ -380,13 +537,14 @@ class RetrievalService(Service):
         # of the fused results by the user’s original query.
         # E.g.:
         if fused_chunk_results:
-            fused_chunk_results = (
-                await self.providers.completion_embedding.arerank(
-                    query=query,
-                    results=fused_chunk_results,
-                    limit=search_settings.limit,
+            with tracing.span("rerank"):
+                fused_chunk_results = (
+                    await self.providers.completion_embedding.arerank(
+                        query=query,
+                        results=fused_chunk_results,
+                        limit=search_settings.limit,
+                    )
                 )
-            )
 
         # Sort or slice the graph results if needed:
         if fused_graph_results and search_settings.include_scores:
@@ -402,6 +560,20 @@ class RetrievalService(Service):
             graph_search_results=fused_graph_results,
         )
 
+    @staticmethod
+    def _similar_queries_messages(
+        query: str, num_sub_queries: int
+    ) -> list[dict]:
+        # In production, you'd fetch a prompt from your prompts DB:
+        # Something like:
+        prompt = f"""
+    You are a helpful assistant. The user query is: "{query}"
+    Generate {num_sub_queries} alternative search queries that capture
+    slightly different phrasings or expansions while preserving the core meaning.
+    Return each alternative on its own line.
+        """
+        return [{"role": "system", "content": prompt}]
+
     async def _generate_similar_queries(
         self, query: str, num_sub_queries: int = 2
     ) -> list[str]:
@@ -417,15 +589,6 @@ class RetrievalService(Service):
         if num_sub_queries < 1:
             return []
 
-        # In production, you'd fetch a prompt from your prompts DB:
-        # Something like:
-        prompt = f"""
-    You are a helpful assistant. The user query is: "{query}"
-    Generate {num_sub_queries} alternative search queries that capture
-    slightly different phrasings or expansions while preserving the core meaning.
-    Return each alternative on its own line.
-        """
-
         # For a short generation, we can set minimal tokens
         gen_config = GenerationConfig(
             model=self.config.app.fast_llm,
@@ -434,7 +597,7 @@ class RetrievalService(Service):
             stream=False,
         )
         response = await self.providers.llm.aget_completion(
-            messages=[{"role": "system", "content": prompt}],
+            messages=self._similar_queries_messages(query, num_sub_queries),
             generation_config=gen_config,
         )
         raw_text = (
@@ -447,6 +610,39 @@ class RetrievalService(Service):
         lines = [line.strip() for line in raw_text.split("\n") if line.strip()]
         return lines[:num_sub_queries]
 
+    async def _stream_similar_queries(
+        self, query: str, num_sub_queries: int = 2
+    ) -> AsyncGenerator[str, None]:
+        """Like `_generate_similar_queries`, but streams the completion and
+        yields each alternative query as soon as its line is complete."""
+        if num_sub_queries < 1:
+            return
+
+        gen_config = GenerationConfig(
+            model=self.config.app.fast_llm,
+            max_tokens=128,
+            temperature=0.8,
+            stream=True,
+        )
+
+        buffer = ""
+        num_yielded = 0
+        async for chunk in self.providers.llm.aget_completion_stream(
+            messages=self._similar_queries_messages(query, num_sub_queries),
+            generation_config=gen_config,
+        ):
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            buffer += chunk.choices[0].delta.content
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip() and num_yielded < num_sub_queries:
+                    num_yielded += 1
+                    yield line.strip()
+
+        if buffer.strip() and num_yielded < num_sub_queries:
+            yield buffer.strip()
+
     def _reciprocal_rank_fusion_chunks(
         self, list_of_rankings: list[list[ChunkSearchResult]], k: float = 60.0
     ) -> list[ChunkSearchResult]:
@@ -555,8 +751,9 @@ class RetrievalService(Service):
         self, query: str, search_settings: SearchSettings
     ) -> AggregateSearchResult:
         """
-        1) Generate N hypothetical docs via LLM
-        2) For each doc => embed => parallel chunk search & graph search
+        1) Generate N hypothetical docs via LLM and embed them in one batch
+        2) For each doc => parallel chunk search & graph search, or with
+           `hyde_mode="centroid"` a single search with the mean embedding
         3) Merge chunk results => optional re-rank => top K
         4) Merge graph results => (optionally re-rank or keep them distinct)
         """
@@ -564,19 +761,35 @@ class RetrievalService(Service):
         hyde_docs = await self._run_hyde_generation(
             query=query, num_sub_queries=search_settings.num_sub_queries
         )
+        hyde_vectors = await self.providers.completion_embedding.async_get_query_embeddings(
+            hyde_docs, use_cache=search_settings.use_embedding_cache
+        )
+
+        if search_settings.hyde_mode == HydeMode.centroid and hyde_vectors:
+            # A single search, already reranked against the user's query
+            centroid = np.mean(np.asarray(hyde_vectors), axis=0)
+            norm = np.linalg.norm(centroid)
+            if norm > 0:
+                centroid /= norm
+            return await self._basic_search(
+                query, search_settings, centroid.tolist()
+            )
 
         chunk_all = []
         graph_all = []
 
         # We'll gather the per-doc searches in parallel
         tasks = []
-        for hypothetical_text in hyde_docs:
+        for hypothetical_text, hypothetical_vector in zip(
+            hyde_docs, hyde_vectors, strict=True
+        ):
             tasks.append(
                 asyncio.create_task(
                     self._fanout_chunk_and_graph_search(
                         user_text=query,  # The user’s original query
                         alt_text=hypothetical_text,  # The hypothetical doc
                         search_settings=search_settings,
+                        precomputed_vector=hypothetical_vector,
                     )
                 )
             )
@@ -592,14 +805,15 @@ class RetrievalService(Service):
 
         # 3) Re-rank chunk results with the original query
         if chunk_all:
-            chunk_all = await self.providers.completion_embedding.arerank(
-                query=query,  # final user query
-                results=chunk_all,
-                limit=int(
-                    search_settings.limit * search_settings.num_sub_queries
-                ),
-                # no limit on results - limit=search_settings.limit,
-            )
+            with tracing.span("rerank"):
+                chunk_all = await self.providers.completion_embedding.arerank(
+                    query=query,  # final user query
+                    results=chunk_all,
+                    limit=int(
+                        search_settings.limit * search_settings.num_sub_queries
+                    ),
+                    # no limit on results - limit=search_settings.limit,
+                )
 
         # 4) If needed, re-rank graph results or just slice top-K by score
         if search_settings.include_scores and graph_all:
@@ -618,35 +832,27 @@ class RetrievalService(Service):
         user_text: str,
         alt_text: str,
         search_settings: SearchSettings,
+        precomputed_vector: Optional[list[float]] = None,
     ) -> tuple[list[ChunkSearchResult], list[GraphSearchResult]]:
         """
-        1) embed alt_text (HyDE doc or sub-query, etc.)
-        2) chunk search + graph search with that embedding
+        1) embed alt_text (HyDE doc or sub-query, etc.), unless its
+           embedding is given
+        2) chunk search + graph search with that embedding, concurrently
         """
         # Precompute the embedding of alt_text
-        vec = await self.providers.completion_embedding.async_get_embedding(
-            text=alt_text
-        )
-
-        # chunk search
-        chunk_results = []
-        if search_settings.chunk_settings.enabled:
-            chunk_results = await self._vector_search_logic(
-                query_text=user_text,  # used for text-based stuff & re-ranking
-                search_settings=search_settings,
-                precomputed_vector=vec,  # use the alt_text vector for semantic/hybrid
+        vec = precomputed_vector
+        if vec is None:
+            vec = await self.providers.completion_embedding.async_get_query_embedding(
+                alt_text, use_cache=search_settings.use_embedding_cache
             )
 
-        # graph search
-        graph_results = []
-        if search_settings.graph_settings.enabled:
-            graph_results = await self._graph_search_logic(
-                query_text=user_text,  # or alt_text if you prefer
-                search_settings=search_settings,
-                precomputed_vector=vec,
-            )
-
-        return (chunk_results, graph_results)
+        # chunk search + graph search; user_text is used for text-based
+        # stuff & re-ranking, the alt_text vector for semantic/hybrid
+        aggregate = await self._basic_search(user_text, search_settings, vec)
+        return (
+            aggregate.chunk_search_results or [],
+            aggregate.graph_search_results or [],
+        )
 
     async def _vector_search_logic(
         self,
@@ -669,10 +875,8 @@ class RetrievalService(Service):
             search_settings.use_semantic_search
             or search_settings.use_hybrid_search
         ):
-            query_vector = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    text=query_text
-                )
+            query_vector = await self.providers.completion_embedding.async_get_query_embedding(
+                query_text, use_cache=search_settings.use_embedding_cache
             )
 
         # 2) Choose which search to run
@@ -682,40 +886,42 @@ class RetrievalService(Service):
         ) or search_settings.use_hybrid_search:
             if query_vector is None:
                 raise ValueError("Hybrid search requires a precomputed vector")
-            raw_results = (
-                await self.providers.database.chunks_handler.hybrid_search(
-                    query_vector=query_vector,
-                    query_text=query_text,
-                    search_settings=search_settings,
+            with tracing.span("chunk_search.hybrid"):
+                raw_results = (
+                    await self.providers.database.chunks_handler.hybrid_search(
+                        query_vector=query_vector,
+                        query_text=query_text,
+                        search_settings=search_settings,
+                    )
                 )
-            )
         elif search_settings.use_fulltext_search:
-            raw_results = (
-                await self.providers.database.chunks_handler.full_text_search(
+            with tracing.span("chunk_search.fulltext"):
+                raw_results = await self.providers.database.chunks_handler.full_text_search(
                     query_text=query_text,
                     search_settings=search_settings,
                 )
-            )
         elif search_settings.use_semantic_search:
             if query_vector is None:
                 raise ValueError(
                     "Semantic search requires a precomputed vector"
                 )
-            raw_results = (
-                await self.providers.database.chunks_handler.semantic_search(
+            with tracing.span("chunk_search.semantic"):
+                raw_results = await self.providers.database.chunks_handler.semantic_search(
                     query_vector=query_vector,
                     search_settings=search_settings,
                 )
-            )
         else:
             raise ValueError(
                 "At least one of use_fulltext_search or use_semantic_search must be True"
             )
 
         # 3) Re-rank
-        reranked = await self.providers.completion_embedding.arerank(
-            query=query_text, results=raw_results, limit=search_settings.limit
-        )
+        with tracing.span("rerank"):
+            reranked = await self.providers.completion_embedding.arerank(
+                query=query_text,
+                results=raw_results,
+                limit=search_settings.limit,
+            )
 
         # 4) Possibly augment text or metadata
         final_results = []
@@ -738,7 +944,8 @@ class RetrievalService(Service):
         Mirrors your previous GraphSearch approach:
         • if precomputed_vector is supplied, use that
         • otherwise embed query_text
-        • search entities, relationships, communities
+        • search entities, relationships, communities (in a single
+          UNION ALL query when `graph_settings.fused` is set)
         • return results
         """
         results: list[GraphSearchResult] = []
@@ -749,63 +956,37 @@ class RetrievalService(Service):
         # 1) Possibly embed
         query_embedding = precomputed_vector
         if query_embedding is None:
-            query_embedding = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    query_text
-                )
+            query_embedding = await self.providers.completion_embedding.async_get_query_embedding(
+                query_text, use_cache=search_settings.use_embedding_cache
             )
 
         base_limit = search_settings.limit
         graph_limits = search_settings.graph_settings.limits or {}
+        limits = {
+            search_type: graph_limits.get(search_type, base_limit)
+            for search_type in ("entities", "relationships", "communities")
+        }
+        graphs_handler = self.providers.database.graphs_handler
 
-        # Entity search
-        entity_limit = graph_limits.get("entities", base_limit)
-        entity_cursor = self.providers.database.graphs_handler.graph_search(
-            query_text,
-            search_type="entities",
-            limit=entity_limit,
-            query_embedding=query_embedding,
-            property_names=["name", "description", "id"],
-            filters=search_settings.filters,
-        )
-        async for ent in entity_cursor:
-            score = ent.get("similarity_score")
-            metadata = ent.get("metadata", {})
-            if isinstance(metadata, str):
-                try:
-                    metadata = json.loads(metadata)
-                except Exception as e:
-                    pass
-
-            results.append(
-                GraphSearchResult(
-                    id=ent.get("id", None),
-                    content=GraphEntityResult(
-                        name=ent.get("name", ""),
-                        description=ent.get("description", ""),
-                        id=ent.get("id", None),
-                    ),
-                    result_type=GraphSearchResultType.ENTITY,
-                    score=score if search_settings.include_scores else None,
-                    metadata=(
-                        {
-                            **(metadata or {}),
-                            "associated_query": query_text,
-                        }
-                        if search_settings.include_metadatas
-                        else {}
-                    ),
-                )
+        # 2) Search entities, relationships and communities, either with a
+        #    single UNION ALL query or with one query per result type
+        if search_settings.graph_settings.fused:
+            rows = await graphs_handler.graph_search_all(
+                query_embedding=query_embedding,
+                limits=limits,
+                filters=search_settings.filters,
             )
+            for row in rows:
+                results.append(
+                    self._graph_search_result(
+                        row["search_type"], row, query_text, search_settings
+                    )
+                )
+            return results
 
-        # Relationship search
-        rel_limit = graph_limits.get("relationships", base_limit)
-        rel_cursor = self.providers.database.graphs_handler.graph_search(
-            query_text,
-            search_type="relationships",
-            limit=rel_limit,
-            query_embedding=query_embedding,
-            property_names=[
+        property_names = {
+            "entities": ["name", "description", "id"],
+            "relationships": [
                 "id",
                 "subject",
                 "predicate",
@@ -814,88 +995,86 @@ class RetrievalService(Service):
                 "subject_id",
                 "object_id",
             ],
-            filters=search_settings.filters,
-        )
-        async for rel in rel_cursor:
-            score = rel.get("similarity_score")
-            metadata = rel.get("metadata", {})
-            if isinstance(metadata, str):
-                try:
-                    metadata = json.loads(metadata)
-                except Exception as e:
-                    pass
-
-            results.append(
-                GraphSearchResult(
-                    id=ent.get("id", None),
-                    content=GraphRelationshipResult(
-                        id=rel.get("id", None),
-                        subject=rel.get("subject", ""),
-                        predicate=rel.get("predicate", ""),
-                        object=rel.get("object", ""),
-                        subject_id=rel.get("subject_id", None),
-                        object_id=rel.get("object_id", None),
-                        description=rel.get("description", ""),
-                    ),
-                    result_type=GraphSearchResultType.RELATIONSHIP,
-                    score=score if search_settings.include_scores else None,
-                    metadata=(
-                        {
-                            **(metadata or {}),
-                            "associated_query": query_text,
-                        }
-                        if search_settings.include_metadatas
-                        else {}
-                    ),
-                )
+            "communities": ["id", "name", "summary"],
+        }
+        for search_type, limit in limits.items():
+            cursor = graphs_handler.graph_search(
+                query_text,
+                search_type=search_type,
+                limit=limit,
+                query_embedding=query_embedding,
+                property_names=property_names[search_type],
+                filters=search_settings.filters,
             )
-
-        # Community search
-        comm_limit = graph_limits.get("communities", base_limit)
-        comm_cursor = self.providers.database.graphs_handler.graph_search(
-            query_text,
-            search_type="communities",
-            limit=comm_limit,
-            query_embedding=query_embedding,
-            property_names=[
-                "id",
-                "name",
-                "summary",
-            ],
-            filters=search_settings.filters,
-        )
-        async for comm in comm_cursor:
-            score = comm.get("similarity_score")
-            metadata = comm.get("metadata", {})
-            if isinstance(metadata, str):
-                try:
-                    metadata = json.loads(metadata)
-                except Exception as e:
-                    pass
-
-            results.append(
-                GraphSearchResult(
-                    id=ent.get("id", None),
-                    content=GraphCommunityResult(
-                        id=comm.get("id", None),
-                        name=comm.get("name", ""),
-                        summary=comm.get("summary", ""),
-                    ),
-                    result_type=GraphSearchResultType.COMMUNITY,
-                    score=score if search_settings.include_scores else None,
-                    metadata=(
-                        {
-                            **(metadata or {}),
-                            "associated_query": query_text,
-                        }
-                        if search_settings.include_metadatas
-                        else {}
-                    ),
+            async for row in cursor:
+                results.append(
+                    self._graph_search_result(
+                        search_type, row, query_text, search_settings
+                    )
                 )
-            )
 
         return results
 
+    @staticmethod
+    def _graph_search_result(
+        search_type: str,
+        row: dict[str, Any],
+        query_text: str,
+        search_settings: SearchSettings,
+    ) -> GraphSearchResult:
+        """Builds a GraphSearchResult from a graph search row."""
+        score = row.get("similarity_score")
+        metadata = row.get("metadata", {})
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except Exception:
+                pass
+
+        content: (
+            GraphEntityResult | GraphRelationshipResult | GraphCommunityResult
+        )
+        if search_type == "entities":
+            content = GraphEntityResult(
+                name=row.get("name", ""),
+                description=row.get("description", ""),
+                id=row.get("id", None),
+            )
+            result_type = GraphSearchResultType.ENTITY
+        elif search_type == "relationships":
+            content = GraphRelationshipResult(
+                id=row.get("id", None),
+                subject=row.get("subject", ""),
+                predicate=row.get("predicate", ""),
+                object=row.get("object", ""),
+                subject_id=row.get("subject_id", None),
+                object_id=row.get("object_id", None),
+                description=row.get("description", ""),
+            )
+            result_type = GraphSearchResultType.RELATIONSHIP
+        else:
+            content = GraphCommunityResult(
+                id=row.get("id", None),
+                name=row.get("name", ""),
+                summary=row.get("summary", ""),
+            )
+            result_type = GraphSearchResultType.COMMUNITY
+
+        return GraphSearchResult(
+            id=row.get("id", None),
+            content=content,
+            result_type=result_type,
+            score=score if search_settings.include_scores else None,
+            metadata=(
+                {
+                    **(metadata or {}),
+                    "associated_query": query_text,
+                }
+                if search_settings.include_metadatas
+                else {}
+            ),
+        )
+
     async def _run_hyde_generation(
         self,
         query: str,
@@ -946,10 +1125,8 @@ class RetrievalService(Service):
         query_embedding: Optional[list[float]] = None,
     ) -> list[DocumentResponse]:
         if query_embedding is None:
-            query_embedding = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    query
-                )
+            query_embedding = await self.providers.completion_embedding.async_get_query_embedding(
+                query, use_cache=settings.use_embedding_cache
             )
 
         return (
@@ -997,7 +1174,10 @@ class RetrievalService(Service):
             try:
                 import math
 
-                if not math.isnan(configured_dim) and dimension != configured_dim:
+                if (
+                    not math.isnan(configured_dim)
+                    and dimension != configured_dim
+                ):
                     raise R2RException(
                         status_code=400,
                         message=(
@@ -1016,7 +1196,9 @@ class RetrievalService(Service):
 
         # Only LiteLLM embedding provider safely supports per-call model override
         provider_name = getattr(
-            getattr(self.providers.completion_embedding, "config", None), "provider", None
+            getattr(self.providers.completion_embedding, "config", None),
+            "provider",
+            None,
         )
 
         kwargs: dict = {}
@@ -1041,9 +1223,6 @@ class RetrievalService(Service):
         query: str,
         rag_generation_config: GenerationConfig,
         search_settings: SearchSettings = SearchSettings(),
-        system_prompt_name: str | None = None,
-        task_prompt_name: str | None = None,
-        include_web_search: bool = False,
         **kwargs,
     ) -> Any:
         """
@@ -1054,18 +1233,82 @@ class RetrievalService(Service):
         2) Build system+task prompts => messages
         3) If not streaming => normal LLM call => return RAGResponse
         4) If streaming => return an async generator of SSE lines
+
+        With `search_settings.include_timings`, the stage timings of the
+        request are returned in the response metadata.
         """
+        trace = tracing.new_trace("rag", force=search_settings.include_timings)
+        with tracing.activate(trace, finish=False):
+            response = await self._rag(
+                query, rag_generation_config, search_settings, **kwargs
+            )
+
+        if trace is None:
+            return response
+        if inspect.isasyncgen(response):
+            # The final answer event carries the timings of a stream
+            return tracing.traced_stream(response, trace)
+        trace.finish()
+        if search_settings.include_timings:
+            response.metadata["timings"] = trace.as_dict()
+        return response
+
+    async def _rag(
+        self,
+        query: str,
+        rag_generation_config: GenerationConfig,
+        search_settings: SearchSettings,
+        system_prompt_name: str | None = None,
+        task_prompt_name: str | None = None,
+        include_web_search: bool = False,
+        **kwargs,
+    ) -> Any:
         # 1) Possibly fix up any UUID filters in search_settings
         for f, val in list(search_settings.filters.items()):
             if isinstance(val, UUID):
                 search_settings.filters[f] = str(val)
 
         try:
+            # Near-identical questions may be answered from the cache
+            rag_cache = self.providers.database.rag_cache_handler
+            cache_key = None
+            cache_versions: list[tuple[str, int]] = []
+            if (
+                rag_cache is not None
+                and search_settings.use_rag_cache
+                and not rag_generation_config.stream
+                and not include_web_search
+            ):
+                with tracing.span("rag_cache"):
+                    # Read before searching, so that a response generated
+                    # while the chunks it searched changed isn't stored
+                    cache_versions = await rag_cache.scope_versions(
+                        search_settings.filters
+                    )
+                    cache_key = await self._rag_cache_key(
+                        query,
+                        rag_generation_config,
+                        search_settings,
+                        system_prompt_name=system_prompt_name,
+                        task_prompt_name=task_prompt_name,
+                        task_prompt=kwargs.get("task_prompt"),
+                    )
+                    cached = await rag_cache.get_response(*cache_key)
+                if cached is not None:
+                    cached_response, similarity = cached
+                    rag_resp = RAGResponse.from_dict(cached_response)
+                    rag_resp.metadata["cache"] = {
+                        "hit": True,
+                        "similarity": similarity,
+                    }
+                    return rag_resp
+
             # 2) Perform search => aggregated_results
             aggregated_results = await self.search(query, search_settings)
             # 3) Optionally add web search results if flag is enabled
             if include_web_search:
-                web_results = await self._perform_web_search(query)
+                with tracing.span("web_search"):
+                    web_results = await self._perform_web_search(query)
                 # Merge web search results with existing aggregated results
                 if web_results and web_results.web_search_results:
                     if not aggregated_results.web_search_results:
@@ -1076,22 +1319,25 @@ class RetrievalService(Service):
                         aggregated_results.web_search_results.extend(
                             web_results.web_search_results
                         )
-            # 3) Build context from aggregator
-            collector = SearchResultsCollector()
-            collector.add_aggregate_result(aggregated_results)
-            context_str = format_search_results_for_llm(aggregated_results)
-
-            # 4) Prepare system+task messages
-            system_prompt_name = system_prompt_name or "system"
-            task_prompt_name = task_prompt_name or "rag"
-            task_prompt = kwargs.get("task_prompt")
-
-            messages = await self.providers.database.prompts_handler.get_message_payload(
-                system_prompt_name=system_prompt_name,
-                task_prompt_name=task_prompt_name,
-                task_inputs={"query": query, "context": context_str},
-                task_prompt=task_prompt,
-            )
+            with tracing.span("prompt_assembly"):
+                # 3) Build context from aggregator
+                collector = SearchResultsCollector()
+                collector.add_aggregate_result(aggregated_results)
+                context_str, context_report = self._build_rag_context(
+                    aggregated_results, rag_generation_config
+                )
+
+                # 4) Prepare system+task messages
+                system_prompt_name = system_prompt_name or "system"
+                task_prompt_name = task_prompt_name or "rag"
+                task_prompt = kwargs.get("task_prompt")
+
+                messages = await self.providers.database.prompts_handler.get_message_payload(
+                    system_prompt_name=system_prompt_name,
+                    task_prompt_name=task_prompt_name,
+                    task_inputs={"query": query, "context": context_str},
+                    task_prompt=task_prompt,
+                )
 
             # 5) Check streaming vs. non-streaming
             if not rag_generation_config.stream:
@@ -1127,6 +1373,17 @@ class RetrievalService(Service):
                     metadata=metadata,
                     completion=llm_text or "",
                 )
+                if context_report is not None:
+                    rag_resp.metadata["context"] = context_report
+                if cache_key is not None:
+                    try:
+                        await rag_cache.store_response(  # type: ignore
+                            *cache_key,
+                            response=rag_resp.to_dict(),
+                            versions=cache_versions,
+                        )
+                    except Exception as e:
+                        logger.warning(f"RAG cache update failed: {e}")
                 return rag_resp
 
             else:
@@ -1140,6 +1397,7 @@ class RetrievalService(Service):
 
                     # Initialize citation tracker to manage citation state
                     citation_tracker = CitationTracker()
+                    citation_scanner = CitationScanner(citation_tracker)
 
                     # Store citation payloads by ID for reuse
                     citation_payloads = {}
@@ -1183,8 +1441,8 @@ class RetrievalService(Service):
                                 # (a) Extract citations from updated buffer
                                 #     For each *new* short ID, emit an SSE "citation" event
                                 # Find new citation spans in the accumulated text
-                                new_citation_spans = find_new_citation_spans(
-                                    partial_text_buffer, citation_tracker
+                                new_citation_spans = citation_scanner.scan(
+                                    partial_text_buffer
                                 )
 
                                 # Process each new citation span
@@ -1263,12 +1521,25 @@ class RetrievalService(Service):
                                         )
 
                                 # (c) Emit final answer + all collected citations
-                                final_answer_evt = {
+                                final_answer_evt: dict[str, Any] = {
                                     "id": "msg_final",
                                     "object": "rag.final_answer",
                                     "generated_answer": partial_text_buffer,
                                     "citations": consolidated_citations,
                                 }
+                                final_metadata: dict[str, Any] = {}
+                                trace = tracing.current_trace()
+                                if (
+                                    trace is not None
+                                    and search_settings.include_timings
+                                ):
+                                    final_metadata["timings"] = trace.as_dict()
+                                if context_report is not None:
+                                    final_metadata["context"] = context_report
+                                if final_metadata:
+                                    final_answer_evt["metadata"] = (
+                                        final_metadata
+                                    )
                                 async for (
                                     line
                                 ) in SSEFormatter.yield_final_answer_event(
@@ -1299,6 +1570,96 @@ class RetrievalService(Service):
                 detail=f"Internal RAG Error - {str(e)}",
             ) from e
 
+    def _build_rag_context(
+        self,
+        results: AggregateSearchResult,
+        rag_generation_config: GenerationConfig,
+    ) -> tuple[str, Optional[dict[str, Any]]]:
+        """The search results context of a RAG prompt and, when context
+        packing is enabled, a report of its tokens and dropped results."""
+        settings = self.config.app.context_packing
+        if not settings.enabled:
+            return format_search_results_for_llm(results), None
+
+        # Tokenizers are named after the model, without its provider
+        model = (rag_generation_config.model or "").split("/")[-1]
+        try:
+            packed = pack_search_results_for_llm(
+                results,
+                max_tokens=settings.max_tokens,
+                model=model,
+                max_chunks_per_document=settings.max_chunks_per_document,
+                dedup_threshold=settings.dedup_threshold,
+            )
+        except Exception as e:
+            # e.g. the tokenizer could not be downloaded
+            logger.warning(f"Context packing failed: {e}")
+            return format_search_results_for_llm(results), None
+        if packed.dropped:
+            logger.debug(
+                f"Dropped {len(packed.dropped)} search results from the RAG context"
+            )
+        return packed.context, {
+            "tokens": packed.tokens,
+            "dropped": packed.dropped,
+        }
+
+    @staticmethod
+    def _search_cache_settings_key(search_settings: SearchSettings) -> str:
+        """Hash of the search settings that change the results of a search,
+        besides its filters."""
+        settings = search_settings.model_dump(
+            mode="json",
+            exclude={
+                "filters",
+                "include_timings",
+                "use_embedding_cache",
+                "use_rag_cache",
+                "use_search_cache",
+            },
+        )
+        return hashlib.sha256(
+            json.dumps(settings, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    async def _rag_cache_key(
+        self,
+        query: str,
+        rag_generation_config: GenerationConfig,
+        search_settings: SearchSettings,
+        **prompt_settings: Optional[str],
+    ) -> tuple[list[float], dict[str, Any], str, str]:
+        """The query embedding, filters, hash of the search, generation and
+        prompt settings, and model that key a RAG response in the cache."""
+        query_vector = await self.providers.completion_embedding.async_get_query_embedding(
+            query, use_cache=search_settings.use_embedding_cache
+        )
+        settings = {
+            "search": search_settings.model_dump(
+                mode="json",
+                exclude={
+                    "filters",
+                    "include_timings",
+                    "use_embedding_cache",
+                    "use_rag_cache",
+                    "use_search_cache",
+                },
+            ),
+            "generation": rag_generation_config.model_dump(
+                mode="json", exclude={"stream"}
+            ),
+            "prompts": prompt_settings,
+        }
+        settings_key = hashlib.sha256(
+            json.dumps(settings, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return (
+            query_vector,
+            search_settings.filters,
+            settings_key,
+            rag_generation_config.model or "",
+        )
+
     def _find_item_by_shortid(
         self, sid: str, collector: SearchResultsCollector
     ) -> Optional[tuple[str, Any, int]]:
@@ -1320,6 +1681,36 @@ class RetrievalService(Service):
         return None
 
     async def agent(
+        self,
+        rag_generation_config: GenerationConfig,
+        search_settings: SearchSettings = SearchSettings(),
+        **kwargs,
+    ):
+        """
+        Runs the agent (see `_agent`) in a latency trace. With
+        `search_settings.include_timings`, the stage timings of the request
+        are returned in the metadata of the assistant message.
+        """
+        trace = tracing.new_trace(
+            "agent", force=search_settings.include_timings
+        )
+        with tracing.activate(trace, finish=False):
+            response = await self._agent(
+                rag_generation_config=rag_generation_config,
+                search_settings=search_settings,
+                **kwargs,
+            )
+
+        if trace is None:
+            return response
+        if inspect.isasyncgen(response):
+            return tracing.traced_stream(response, trace)
+        trace.finish()
+        if search_settings.include_timings:
+            response["messages"][-1].metadata["timings"] = trace.as_dict()
+        return response
+
+    async def _agent(
         self,
         rag_generation_config: GenerationConfig,
         rag_tools: Optional[list[str]] = None,
@@ -1,6 +1,6 @@
 # type: ignore
 from io import BytesIO
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator
 
 from docx import Document
 
@@ -15,6 +15,8 @@ from core.base.providers import (
 class DOCXParser(AsyncParser[str | bytes]):
     """A parser for DOCX data."""
 
+    cpu_bound = True
+
     def __init__(
         self,
         config: IngestionConfig,
@@ -30,9 +32,14 @@ class DOCXParser(AsyncParser[str | bytes]):
         self, data: str | bytes, *args, **kwargs
     ) -> AsyncGenerator[str, None]:  # type: ignore
         """Ingest DOCX data and yield text from each paragraph."""
+        for text in self.extract(data, **kwargs):
+            yield text
+
+    @classmethod
+    def extract(cls, data: str | bytes, **kwargs) -> Iterator[str]:
         if isinstance(data, str):
             raise ValueError("DOCX data must be in bytes format.")
 
-        doc = self.Document(BytesIO(data))
+        doc = Document(BytesIO(data))
         for paragraph in doc.paragraphs:
             yield paragraph.text
@@ -7,7 +7,7 @@ import string
 import time
 import unicodedata
 from io import BytesIO
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator
 
 import pdf2image
 from mistralai.models import OCRResponse
@@ -360,6 +360,8 @@ class VLMPDFParser(AsyncParser[str | bytes]):
 class BasicPDFParser(AsyncParser[str | bytes]):
     """A parser for PDF data."""
 
+    cpu_bound = True
+
     def __init__(
         self,
         config: IngestionConfig,
@@ -375,9 +377,14 @@ class BasicPDFParser(AsyncParser[str | bytes]):
         self, data: str | bytes, **kwargs
     ) -> AsyncGenerator[str, None]:
         """Ingest PDF data and yield text from each page."""
+        for page_text in self.extract(data, **kwargs):
+            yield page_text
+
+    @classmethod
+    def extract(cls, data: str | bytes, **kwargs) -> Iterator[str]:
         if isinstance(data, str):
             raise ValueError("PDF data must be in bytes format.")
-        pdf = self.PdfReader(BytesIO(data))
+        pdf = PdfReader(BytesIO(data))
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text is not None:
@@ -1,6 +1,6 @@
 # type: ignore
 from io import BytesIO
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator
 
 from pptx import Presentation
 
@@ -15,6 +15,8 @@ from core.base.providers import (
 class PPTXParser(AsyncParser[str | bytes]):
     """A parser for PPT data."""
 
+    cpu_bound = True
+
     def __init__(
         self,
         config: IngestionConfig,
@@ -30,10 +32,15 @@ class PPTXParser(AsyncParser[str | bytes]):
         self, data: str | bytes, **kwargs
     ) -> AsyncGenerator[str, None]:  # type: ignore
         """Ingest PPT data and yield text from each slide."""
+        for text in self.extract(data, **kwargs):
+            yield text
+
+    @classmethod
+    def extract(cls, data: str | bytes, **kwargs) -> Iterator[str]:
         if isinstance(data, str):
             raise ValueError("PPT data must be in bytes format.")
 
-        prs = self.Presentation(BytesIO(data))
+        prs = Presentation(BytesIO(data))
         for slide in prs.slides:
             for shape in slide.shapes:
                 if hasattr(shape, "text"):
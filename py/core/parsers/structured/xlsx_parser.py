@@ -1,6 +1,6 @@
 # type: ignore
 from io import BytesIO
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator
 
 import networkx as nx
 import numpy as np
@@ -17,6 +17,8 @@ from core.base.providers import (
 class XLSXParser(AsyncParser[str | bytes]):
     """A parser for XLSX data."""
 
+    cpu_bound = True
+
     def __init__(
         self,
         config: IngestionConfig,
@@ -32,10 +34,15 @@ class XLSXParser(AsyncParser[str | bytes]):
         self, data: bytes, *args, **kwargs
     ) -> AsyncGenerator[str, None]:
         """Ingest XLSX data and yield text from each row."""
+        for text in self.extract(data, **kwargs):
+            yield text
+
+    @classmethod
+    def extract(cls, data: bytes, **kwargs) -> Iterator[str]:
         if isinstance(data, str):
             raise ValueError("XLSX data must be in bytes format.")
 
-        wb = self.load_workbook(filename=BytesIO(data))
+        wb = load_workbook(filename=BytesIO(data))
         for sheet in wb.worksheets:
             for row in sheet.iter_rows(values_only=True):
                 yield ", ".join(map(str, row))
@@ -44,6 +51,8 @@ class XLSXParser(AsyncParser[str | bytes]):
 class XLSXParserAdvanced(AsyncParser[str | bytes]):
     """A parser for XLSX data."""
 
+    cpu_bound = True
+
     # identifies connected components in the excel graph and extracts data from each component
     def __init__(
         self, config: IngestionConfig, llm_provider: CompletionProvider
@@ -54,13 +63,12 @@ class XLSXParserAdvanced(AsyncParser[str | bytes]):
         self.np = np
         self.load_workbook = load_workbook
 
-    def connected_components(self, arr):
-        g = self.nx.grid_2d_graph(len(arr), len(arr[0]))
-        empty_cell_indices = list(
-            zip(*self.np.where(arr is None), strict=False)
-        )
+    @classmethod
+    def connected_components(cls, arr):
+        g = nx.grid_2d_graph(len(arr), len(arr[0]))
+        empty_cell_indices = list(zip(*np.where(arr is None), strict=False))
         g.remove_nodes_from(empty_cell_indices)
-        components = self.nx.connected_components(g)
+        components = nx.connected_components(g)
         for component in components:
             rows, cols = zip(*component, strict=False)
             min_row, max_row = min(rows), max(rows)
@@ -73,16 +81,25 @@ class XLSXParserAdvanced(AsyncParser[str | bytes]):
         self, data: bytes, num_col_times_num_rows: int = 100, *args, **kwargs
     ) -> AsyncGenerator[str, None]:
         """Ingest XLSX data and yield text from each connected component."""
+        for text in self.extract(
+            data, num_col_times_num_rows=num_col_times_num_rows, **kwargs
+        ):
+            yield text
+
+    @classmethod
+    def extract(
+        cls, data: bytes, num_col_times_num_rows: int = 100, **kwargs
+    ) -> Iterator[str]:
         if isinstance(data, str):
             raise ValueError("XLSX data must be in bytes format.")
 
-        workbook = self.load_workbook(filename=BytesIO(data))
+        workbook = load_workbook(filename=BytesIO(data))
 
         for ws in workbook.worksheets:
-            ws_data = self.np.array(
+            ws_data = np.array(
                 [[cell.value for cell in row] for row in ws.iter_rows()]
             )
-            for table in self.connected_components(ws_data):
+            for table in cls.connected_components(ws_data):
                 # parse like a csv parser, assumes that the first row has column names
                 if len(table) <= 1:
                     continue
@@ -7,6 +7,9 @@ from typing import Optional
 import asyncpg
 
 from core.base.providers import DatabaseConnectionManager
+from core.utils import tracing
+
+from .vector_codecs import register_vector_codecs
 
 logger = logging.getLogger()
 
@@ -30,6 +33,7 @@ class SemaphoreConnectionPool:
                 self.connection_string,
                 max_size=self.postgres_configuration_settings.max_connections,
                 statement_cache_size=self.postgres_configuration_settings.statement_cache_size,
+                init=register_vector_codecs,
             )
 
             logger.info(
@@ -46,6 +50,11 @@ class SemaphoreConnectionPool:
             async with self.pool.acquire() as conn:
                 yield conn
 
+    async def reset_connections(self):
+        """Recycle pooled connections so that new ones re-run the connection
+        init hook, e.g. after the vector extension has been created."""
+        await self.pool.expire_connections()
+
     async def close(self):
         await self.pool.close()
 
@@ -158,72 +167,94 @@ class PostgresConnectionManager(DatabaseConnectionManager):
     async def execute_query(self, query, params=None, isolation_level=None):
         if not self.pool:
             raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
-            if isolation_level:
-                async with conn.transaction(isolation=isolation_level):
+        with tracing.span("db.query"):
+            async with self.pool.get_connection() as conn:
+                if isolation_level:
+                    async with conn.transaction(isolation=isolation_level):
+                        if params:
+                            return await conn.execute(query, *params)
+                        else:
+                            return await conn.execute(query)
+                else:
                     if params:
                         return await conn.execute(query, *params)
                     else:
                         return await conn.execute(query)
-            else:
-                if params:
-                    return await conn.execute(query, *params)
-                else:
-                    return await conn.execute(query)
 
     async def execute_many(self, query, params=None, batch_size=1000):
         if not self.pool:
             raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
-            async with conn.transaction():
-                if params:
-                    results = []
-                    for i in range(0, len(params), batch_size):
-                        param_batch = params[i : i + batch_size]
-                        result = await conn.executemany(query, param_batch)
-                        results.append(result)
-                    return results
-                else:
-                    return await conn.executemany(query)
-
-    async def fetch_query(self, query, params=None):
-        if not self.pool:
-            raise ValueError("PostgresConnectionManager is not initialized.")
-        try:
+        with tracing.span("db.query"):
             async with self.pool.get_connection() as conn:
                 async with conn.transaction():
-                    return (
-                        await conn.fetch(query, *params)
-                        if params
-                        else await conn.fetch(query)
-                    )
-        except asyncpg.exceptions.DuplicatePreparedStatementError:
-            error_msg = textwrap.dedent("""
-                Database Configuration Error
-
-                Your database provider does not support statement caching.
-
-                To fix this, either:
-                • Set R2R_POSTGRES_STATEMENT_CACHE_SIZE=0 in your environment
-                • Add statement_cache_size = 0 to your database configuration:
+                    if params:
+                        results = []
+                        for i in range(0, len(params), batch_size):
+                            param_batch = params[i : i + batch_size]
+                            result = await conn.executemany(query, param_batch)
+                            results.append(result)
+                        return results
+                    else:
+                        return await conn.executemany(query)
 
-                    [database.postgres_configuration_settings]
-                    statement_cache_size = 0
+    async def fetch_query(self, query, params=None, local_settings=None):
+        """Runs a query in its own transaction.
 
-                This is required when using connection poolers like PgBouncer or
-                managed database services like Supabase.
-            """).strip()
-            raise ValueError(error_msg) from None
+        `local_settings` maps configuration parameters to values that are
+        set for the duration of the transaction only, like `SET LOCAL`.
+        """
+        if not self.pool:
+            raise ValueError("PostgresConnectionManager is not initialized.")
+        with tracing.span("db.query"):
+            try:
+                async with self.pool.get_connection() as conn:
+                    async with conn.transaction():
+                        if local_settings:
+                            await conn.execute(
+                                "SELECT "
+                                + ", ".join(
+                                    f"set_config(${2 * i + 1}, ${2 * i + 2}, true)"
+                                    for i in range(len(local_settings))
+                                ),
+                                *(
+                                    item
+                                    for name_value in local_settings.items()
+                                    for item in name_value
+                                ),
+                            )
+                        return (
+                            await conn.fetch(query, *params)
+                            if params
+                            else await conn.fetch(query)
+                        )
+            except asyncpg.exceptions.DuplicatePreparedStatementError:
+                error_msg = textwrap.dedent("""
+                    Database Configuration Error
+
+                    Your database provider does not support statement caching.
+
+                    To fix this, either:
+                    • Set R2R_POSTGRES_STATEMENT_CACHE_SIZE=0 in your environment
+                    • Add statement_cache_size = 0 to your database configuration:
+
+                        [database.postgres_configuration_settings]
+                        statement_cache_size = 0
+
+                    This is required when using connection poolers like PgBouncer or
+                    managed database services like Supabase.
+                """).strip()
+                raise ValueError(error_msg) from None
 
     async def fetchrow_query(self, query, params=None):
         if not self.pool:
             raise ValueError("PostgresConnectionManager is not initialized.")
-        async with self.pool.get_connection() as conn:
-            async with conn.transaction():
-                if params:
-                    return await conn.fetchrow(query, *params)
-                else:
-                    return await conn.fetchrow(query)
+        with tracing.span("db.query"):
+            async with self.pool.get_connection() as conn:
+                async with conn.transaction():
+                    if params:
+                        return await conn.fetchrow(query, *params)
+                    else:
+                        return await conn.fetchrow(query)
 
     @asynccontextmanager
     async def transaction(self, isolation_level=None):
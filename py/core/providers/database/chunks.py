@@ -1,4 +1,4 @@
-import copy
+import asyncio
 import json
 import logging
 import math
@@ -11,11 +11,13 @@ import numpy as np
 
 from core.base import (
     ChunkSearchResult,
+    ChunkSearchSettings,
     Handler,
     IndexArgsHNSW,
     IndexArgsIVFFlat,
     IndexMeasure,
     IndexMethod,
+    IterativeScan,
     R2RException,
     SearchSettings,
     VectorEntry,
@@ -27,9 +29,29 @@ from core.base.utils import _decorate_vector_type
 from .base import PostgresConnectionManager
 from .filters import apply_filters
 from .utils import psql_quote_literal
+from .vector_codecs import vector_to_list
 
 logger = logging.getLogger()
 
+# pgvector limits the dimension of the vectors that HNSW and IVFFlat can index
+MAX_INDEX_DIMENSIONS = {
+    VectorQuantizationType.FP32: 2000,
+    VectorQuantizationType.FP16: 4000,
+    VectorQuantizationType.INT1: 64000,
+}
+
+# Trigger, and its function, keeping `vec_prefix` in sync with `vec`
+PREFIX_TRIGGER_NAME = "chunks_vec_prefix_sync"
+
+# Two-stage search: first stage candidates fetched per requested result
+DEFAULT_OVERSAMPLING_FACTOR = 20
+DEFAULT_MAX_OVERSAMPLING_FACTOR = 160
+# Adaptive oversampling widens the candidate pool while the reranked
+# distances of the results are within this range of each other
+ADAPTIVE_OVERSAMPLING_SPREAD = 0.02
+# Upper bound pgvector accepts for hnsw.ef_search
+HNSW_MAX_EF_SEARCH = 1000
+
 
 def index_measure_to_ops(
     measure: IndexMeasure,
@@ -41,8 +63,8 @@ def index_measure_to_ops(
 def quantize_vector_to_binary(
     vector: list[float] | np.ndarray,
     threshold: float = 0.0,
-) -> bytes:
-    """Quantizes a float vector to a binary vector string for PostgreSQL bit
+) -> np.ndarray:
+    """Quantizes a float vector to a binary vector for the PostgreSQL bit
     type. Used when quantization_type is INT1.
 
     Args:
@@ -50,19 +72,41 @@ def quantize_vector_to_binary(
         threshold (float, optional): Threshold for binarization. Defaults to 0.0.
 
     Returns:
-        str: Binary string representation for PostgreSQL bit type
+        np.ndarray: Boolean array, sent to PostgreSQL by the binary bit codec
     """
     # Convert input to numpy array if it isn't already
     if not isinstance(vector, np.ndarray):
-        vector = np.array(vector)
-
-    # Convert to binary (1 where value > threshold, 0 otherwise)
-    binary_vector = (vector > threshold).astype(int)
-
-    # Convert to string of 1s and 0s
-    # Convert to string of 1s and 0s, then to bytes
-    binary_string = "".join(map(str, binary_vector))
-    return binary_string.encode("ascii")
+        vector = np.asarray(vector, dtype=np.float32)
+
+    # 1 where value > threshold, 0 otherwise
+    return vector > threshold
+
+
+def _filtered_collection_ids(filters: Any) -> set[UUID]:
+    """Collects the collection ids referenced by `collection_id` and
+    `collection_ids` conditions anywhere in a filter."""
+    collection_ids: set[UUID] = set()
+    if isinstance(filters, list):
+        for item in filters:
+            collection_ids |= _filtered_collection_ids(item)
+    elif isinstance(filters, dict):
+        for key, value in filters.items():
+            if key in ("collection_id", "collection_ids"):
+                conditions = value if isinstance(value, dict) else {"": value}
+                for condition in conditions.values():
+                    values = (
+                        condition
+                        if isinstance(condition, (list, tuple, set))
+                        else [condition]
+                    )
+                    for collection_id in values:
+                        try:
+                            collection_ids.add(UUID(str(collection_id)))
+                        except ValueError:
+                            continue
+            else:
+                collection_ids |= _filtered_collection_ids(value)
+    return collection_ids
 
 
 class HybridSearchIntermediateResult(TypedDict):
@@ -81,12 +125,162 @@ class PostgresChunksHandler(Handler):
         connection_manager: PostgresConnectionManager,
         dimension: int | float,
         quantization_type: VectorQuantizationType,
+        text_search_config: str = "english",
+        search_defaults: Optional[ChunkSearchSettings] = None,
+        collection_oversampling_factors: Optional[dict[UUID, int]] = None,
+        prefix_dimension: Optional[int] = None,
     ):
         super().__init__(project_name, connection_manager)
         self.dimension = dimension
         self.quantization_type = quantization_type
+        self.text_search_config = text_search_config
+        self.search_defaults = search_defaults or ChunkSearchSettings()
+        self.collection_oversampling_factors = {
+            UUID(str(collection_id)): factor
+            for collection_id, factor in (
+                collection_oversampling_factors or {}
+            ).items()
+        }
+        self.supports_iterative_scan = True
+        if prefix_dimension is not None and not (
+            0 < prefix_dimension < self.dimension
+        ):
+            raise ValueError(
+                f"The prefix dimension must be between 0 and the vector dimension {self.dimension}, got {prefix_dimension}."
+            )
+        self.prefix_dimension = prefix_dimension
+
+    @property
+    def _regconfig(self) -> str:
+        """The text search configuration as a SQL `regconfig` literal."""
+        return f"{psql_quote_literal(self.text_search_config)}::regconfig"
+
+    def _ts_query(self, param: str) -> str:
+        return f"websearch_to_tsquery({self._regconfig}, {param})"
+
+    def _resolve_chunk_setting(
+        self, search_settings: SearchSettings, name: str
+    ) -> Any:
+        """Returns a chunk search setting from the request, falling back to
+        the server default."""
+        value = getattr(search_settings.chunk_settings, name)
+        if value is not None:
+            return value
+        return getattr(self.search_defaults, name)
+
+    def _oversampling_factor(self, search_settings: SearchSettings) -> int:
+        """Resolves the two-stage search oversampling factor for a search.
+
+        The request takes precedence, then the overrides of the collections
+        referenced by the filters (the largest one, if several apply) and
+        finally the server default.
+        """
+        if search_settings.chunk_settings.oversampling_factor is not None:
+            return search_settings.chunk_settings.oversampling_factor
+        collection_factors = [
+            self.collection_oversampling_factors[collection_id]
+            for collection_id in _filtered_collection_ids(
+                search_settings.filters
+            )
+            if collection_id in self.collection_oversampling_factors
+        ]
+        if collection_factors:
+            return max(collection_factors)
+        return (
+            self.search_defaults.oversampling_factor
+            or DEFAULT_OVERSAMPLING_FACTOR
+        )
+
+    def _use_prefix_search(self, search_settings: SearchSettings) -> bool:
+        return bool(
+            self.prefix_dimension
+            and self.quantization_type != VectorQuantizationType.INT1
+            and self._resolve_chunk_setting(search_settings, "prefix_search")
+        )
+
+    def _index_settings(
+        self, search_settings: SearchSettings
+    ) -> dict[str, str]:
+        """Returns the pgvector index parameters to set for a search.
+
+        Values from the request take precedence over the server defaults;
+        parameters unset in both keep the database defaults.
+        """
+
+        def resolve(name: str) -> Any:
+            return self._resolve_chunk_setting(search_settings, name)
+
+        settings: dict[str, str] = {}
+        if (ef_search := resolve("ef_search")) is not None:
+            settings["hnsw.ef_search"] = str(ef_search)
+        if (probes := resolve("probes")) is not None:
+            settings["ivfflat.probes"] = str(probes)
+        iterative_scan = resolve("iterative_scan")
+        max_scan_tuples = resolve("max_scan_tuples")
+        if not self.supports_iterative_scan:
+            # Iterative index scans were added in pgvector 0.8
+            iterative_scan = max_scan_tuples = None
+        if iterative_scan is not None:
+            iterative_scan = IterativeScan(iterative_scan)
+            settings["hnsw.iterative_scan"] = iterative_scan.value
+            # IVFFlat scans do not support strict ordering
+            if iterative_scan != IterativeScan.strict_order:
+                settings["ivfflat.iterative_scan"] = iterative_scan.value
+        if max_scan_tuples is not None:
+            settings["hnsw.max_scan_tuples"] = str(max_scan_tuples)
+        return settings
+
+    @property
+    def vector_storage_type(self) -> VectorQuantizationType:
+        """The quantization used to store the `vec` column.
+
+        FP16 stores `vec` as `halfvec`. INT1 keeps full precision vectors in
+        `vec` next to the `vec_binary` column used for the first search stage.
+        """
+        if self.quantization_type == VectorQuantizationType.FP16:
+            return VectorQuantizationType.FP16
+        return VectorQuantizationType.FP32
+
+    def _vector_dim(self) -> str:
+        return "" if math.isnan(self.dimension) else f"({self.dimension})"
+
+    async def _get_vec_column_type(self) -> Optional[str]:
+        """Returns the type name of the existing `vec` column, if any."""
+        query = """
+        SELECT t.typname
+        FROM pg_attribute a
+        JOIN pg_class c ON a.attrelid = c.oid
+        JOIN pg_namespace n ON c.relnamespace = n.oid
+        JOIN pg_type t ON a.atttypid = t.oid
+        WHERE n.nspname = $1
+        AND c.relname = $2
+        AND a.attname = 'vec'
+        AND NOT a.attisdropped;
+        """
+        result = await self.connection_manager.fetchrow_query(
+            query, (self.project_name, PostgresChunksHandler.TABLE_NAME.value)
+        )
+        return result["typname"] if result else None
 
     async def create_tables(self):
+        try:
+            await self.connection_manager.fetchrow_query(
+                "SELECT $1::text::regconfig", (self.text_search_config,)
+            )
+        except Exception as e:
+            raise ValueError(
+                f"Invalid text search configuration '{self.text_search_config}': {e}"
+            ) from e
+
+        version = await self.connection_manager.fetchrow_query(
+            "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+        )
+        if version:
+            major, minor = (
+                int(v) for v in version["extversion"].split(".")[:2]
+            )
+            self.supports_iterative_scan = (major, minor) >= (0, 8)
+
         # First check if table already exists and validate dimensions
         table_exists_query = """
         SELECT EXISTS (
@@ -131,6 +325,25 @@ class PostgresChunksHandler(Handler):
                             f"You must use the same dimension for existing tables."
                         )
 
+            existing_type = await self._get_vec_column_type()
+            expected_type = self.vector_storage_type.db_type
+            if existing_type and existing_type != expected_type:
+                raise ValueError(
+                    f"Vector type mismatch: Table '{self.project_name}.{table_name}' stores "
+                    f"`{existing_type}` vectors, but quantization type {self.quantization_type} "
+                    f"requires `{expected_type}`. Run `r2r-migrate-vectors` to convert the "
+                    f"existing table, or use the quantization type it was created with."
+                )
+
+            existing_fts = await self._get_fts_expression()
+            if existing_fts and self._regconfig not in existing_fts:
+                raise ValueError(
+                    f"Text search configuration mismatch: Table '{self.project_name}.{table_name}' "
+                    f"computes `fts` as `{existing_fts}`, but text_search_config is "
+                    f"'{self.text_search_config}'. Use the configuration the table was created "
+                    f"with, or recreate the `fts` column with the new configuration."
+                )
+
         # Check for old table name
         check_query = """
         SELECT EXISTS (
@@ -157,10 +370,17 @@ class PostgresChunksHandler(Handler):
             else f"vec_binary bit({self.dimension}),"
         )
 
+        vector_type = self.vector_storage_type.db_type
         if self.dimension > 0:
-            vector_col = f"vec vector({self.dimension})"
+            vector_col = f"vec {vector_type}({self.dimension})"
         else:
-            vector_col = "vec vector"
+            vector_col = f"vec {vector_type}"
+
+        prefix_col = (
+            f"{self._prefix_column_definition()},"
+            if self.prefix_dimension
+            else ""
+        )
 
         query = f"""
         CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} (
@@ -170,17 +390,453 @@ class PostgresChunksHandler(Handler):
             collection_ids UUID[],
             {vector_col},
             {binary_col}
+            {prefix_col}
             text TEXT,
             metadata JSONB,
-            fts tsvector GENERATED ALWAYS AS (to_tsvector('english', text)) STORED
+            fts tsvector GENERATED ALWAYS AS (to_tsvector({self._regconfig}, text)) STORED
         );
         CREATE INDEX IF NOT EXISTS idx_vectors_document_id ON {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} (document_id);
         CREATE INDEX IF NOT EXISTS idx_vectors_owner_id ON {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} (owner_id);
         CREATE INDEX IF NOT EXISTS idx_vectors_collection_ids ON {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} USING GIN (collection_ids);
-        CREATE INDEX IF NOT EXISTS idx_vectors_text ON {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} USING GIN (to_tsvector('english', text));
         """
 
         await self.connection_manager.execute_query(query)
+        await self.create_full_text_index()
+        if self.quantization_type == VectorQuantizationType.INT1:
+            await self.create_binary_index()
+        if self.prefix_dimension:
+            await self.create_prefix_column()
+
+    def _prefix_column_definition(self) -> str:
+        return f"vec_prefix halfvec({self.prefix_dimension})"
+
+    def _prefix_expression(self, column: str) -> str:
+        return (
+            f"subvector({column}, 1, {self.prefix_dimension})"
+            f"::halfvec({self.prefix_dimension})"
+        )
+
+    def _prefix_trigger_query(self) -> str:
+        """Creates the trigger keeping `vec_prefix` in sync with `vec`."""
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        function_name = self._get_table_name(PREFIX_TRIGGER_NAME)
+        return f"""
+        CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
+        BEGIN
+            NEW.vec_prefix := {self._prefix_expression("NEW.vec")};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS {PREFIX_TRIGGER_NAME} ON {table_name};
+        CREATE TRIGGER {PREFIX_TRIGGER_NAME}
+        BEFORE INSERT OR UPDATE OF vec ON {table_name}
+        FOR EACH ROW EXECUTE FUNCTION {function_name}();
+        """
+
+    async def create_prefix_column(self, batch_size: int = 10_000) -> None:
+        """Adds the `vec_prefix` column and its HNSW index.
+
+        `vec_prefix` holds the first `prefix_dimension` dimensions of `vec` as
+        a `halfvec`, for embedding models trained with Matryoshka
+        representation learning. Prefix search pulls candidates from its much
+        smaller index and reranks them exactly on `vec`.
+
+        The column is kept in sync with `vec` by a trigger, so adding it to an
+        existing table does not rewrite the table: existing rows are
+        backfilled in batches of `batch_size` before the index is built. A
+        `vec_prefix` column generated by earlier versions keeps its values.
+        """
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        existing = await self.connection_manager.fetchrow_query(
+            """
+            SELECT
+                format_type(a.atttypid, a.atttypmod) AS column_type,
+                a.attgenerated <> '' AS generated
+            FROM pg_attribute a
+            JOIN pg_class c ON a.attrelid = c.oid
+            JOIN pg_namespace n ON c.relnamespace = n.oid
+            WHERE n.nspname = $1
+            AND c.relname = $2
+            AND a.attname = 'vec_prefix'
+            AND NOT a.attisdropped
+            """,
+            (self.project_name, PostgresChunksHandler.TABLE_NAME.value),
+        )
+        expected_type = f"halfvec({self.prefix_dimension})"
+        if existing and existing["column_type"] != expected_type:
+            logger.warning(
+                f"Replacing the {existing['column_type']} vec_prefix column of {table_name} with {expected_type}"
+            )
+            await self.connection_manager.execute_query(
+                f"ALTER TABLE {table_name} DROP COLUMN vec_prefix"
+            )
+            existing = None
+
+        # The column and its trigger change together, so that no row is
+        # written without a prefix in between
+        query = ""
+        if not existing:
+            logger.info(f"Adding vec_prefix column to {table_name}")
+            query += f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {self._prefix_column_definition()};"
+        elif existing["generated"]:
+            query += f"ALTER TABLE {table_name} ALTER COLUMN vec_prefix DROP EXPRESSION;"
+        await self.connection_manager.execute_query(
+            query + self._prefix_trigger_query()
+        )
+
+        # The index is built once the column is filled, so a backfill that
+        # was interrupted is resumed until the index exists
+        if not await self._get_index_validity("idx_vectors_prefix"):
+            await self._backfill_prefix_column(batch_size)
+
+        ops = index_measure_to_ops(
+            self.search_defaults.index_measure,
+            quantization_type=VectorQuantizationType.FP16,
+        )
+        await self._create_managed_index(
+            "idx_vectors_prefix", f"hnsw (vec_prefix {ops})"
+        )
+
+    async def _get_fts_expression(self) -> Optional[str]:
+        """Returns the generation expression of the existing `fts` column."""
+        query = """
+        SELECT pg_get_expr(d.adbin, d.adrelid) AS expression
+        FROM pg_attrdef d
+        JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum
+        JOIN pg_class c ON a.attrelid = c.oid
+        JOIN pg_namespace n ON c.relnamespace = n.oid
+        WHERE n.nspname = $1
+        AND c.relname = $2
+        AND a.attname = 'fts';
+        """
+        result = await self.connection_manager.fetchrow_query(
+            query, (self.project_name, PostgresChunksHandler.TABLE_NAME.value)
+        )
+        return result["expression"] if result else None
+
+    async def _backfill_prefix_column(self, batch_size: int) -> None:
+        """Fills `vec_prefix` for the rows written before its trigger."""
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        # Keyset pagination over the primary key, as in
+        # `migrate_vector_storage`, with a transaction per batch
+        backfill_query = f"""
+        WITH batch AS (
+            SELECT id FROM {table_name}
+            WHERE id > $1
+            ORDER BY id
+            LIMIT $2
+        ), updated AS (
+            UPDATE {table_name} t
+            SET vec_prefix = {self._prefix_expression("t.vec")}
+            FROM batch
+            WHERE t.id = batch.id
+            AND t.vec_prefix IS NULL
+            AND t.vec IS NOT NULL
+            RETURNING t.id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM updated) AS updated,
+            (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id
+        """
+        rows_backfilled = 0
+        last_id = UUID(int=0)
+        while True:
+            result = await self.connection_manager.fetchrow_query(
+                backfill_query, (last_id, batch_size)
+            )
+            if not result or result["last_id"] is None:
+                break
+            rows_backfilled += result["updated"]
+            last_id = result["last_id"]
+        if rows_backfilled:
+            logger.info(
+                f"Backfilled vec_prefix of {rows_backfilled} rows in {table_name}"
+            )
+
+    async def _get_index_validity(self, index_name: str) -> Optional[bool]:
+        """Whether the index is valid, or None if it doesn't exist."""
+        query = """
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = $1
+        AND c.relname = $2;
+        """
+        index = await self.connection_manager.fetchrow_query(
+            query, (self.project_name, index_name)
+        )
+        return index["indisvalid"] if index else None
+
+    async def _create_managed_index(self, index_name: str, using: str) -> None:
+        """Creates an index on the chunks table unless a valid one exists.
+
+        The index is built concurrently so that adding it to an existing table
+        does not block writes. An invalid index left behind by an interrupted
+        build is dropped and rebuilt.
+        """
+        validity = await self._get_index_validity(index_name)
+        if validity:
+            return
+
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        async with (
+            self.connection_manager.pool.get_connection() as conn  # type: ignore
+        ):
+            if validity is not None:
+                await conn.execute(
+                    f"DROP INDEX CONCURRENTLY IF EXISTS {self._get_table_name(index_name)}"
+                )
+            logger.info(f"Creating index {index_name} on {table_name}")
+            await conn.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                f"ON {table_name} USING {using}"
+            )
+
+    async def create_full_text_index(self) -> None:
+        """Creates the GIN index on the `fts` column used by full text search.
+
+        It replaces `idx_vectors_text`, an expression index on
+        `to_tsvector('english', text)` that queries on `fts` could not use.
+        """
+        await self._create_managed_index("idx_vectors_fts", "GIN (fts)")
+        await self.connection_manager.execute_query(
+            f"DROP INDEX CONCURRENTLY IF EXISTS {self._get_table_name('idx_vectors_text')}"
+        )
+
+    async def create_binary_index(self) -> None:
+        """Creates the HNSW index on `vec_binary` used by the first stage of
+        INT1 searches, unless the column is already indexed."""
+        existing = await self.connection_manager.fetchrow_query(
+            """
+            SELECT indexname
+            FROM pg_indexes
+            WHERE schemaname = $1
+            AND tablename = $2
+            AND indexname != 'idx_vectors_binary'
+            AND indexdef LIKE '%(vec_binary %'
+            """,
+            (self.project_name, PostgresChunksHandler.TABLE_NAME.value),
+        )
+        if existing:
+            return
+        await self._create_managed_index(
+            "idx_vectors_binary", "hnsw (vec_binary bit_hamming_ops)"
+        )
+
+    async def migrate_vector_storage(
+        self,
+        batch_size: int = 10_000,
+        rebuild_indices: bool = True,
+        lock_timeout: str = "10s",
+    ) -> dict[str, Any]:
+        """Converts the `vec` column to the configured storage type online.
+
+        Used to move an existing table between `vector` (FP32) and
+        `halfvec` (FP16) storage without blocking writes for the duration of
+        the conversion:
+
+        1. A shadow column `vec_migration` is added and kept in sync with
+           `vec` by a trigger, so concurrent upserts are picked up.
+        2. Existing rows are backfilled in batches of `batch_size`, each in
+           its own transaction.
+        3. If `rebuild_indices` is set, the vector indices on `vec` are
+           rebuilt concurrently on the shadow column with matching operator
+           classes.
+        4. The columns are swapped in a single short transaction. The
+           `vec_prefix` trigger is rebuilt on the new column in the same
+           transaction; the prefixes it already holds are those of the same
+           vectors, so neither the column nor its index is rebuilt.
+
+        Args:
+            batch_size (int): Number of rows converted per statement.
+            rebuild_indices (bool): Whether to recreate the vector indices.
+            lock_timeout (str): Lock timeout used for the final swap.
+
+        Returns:
+            dict: The source and target types and the number of rows and
+                indices converted.
+        """
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        function_name = self._get_table_name("chunks_vec_migration_sync")
+        trigger_name = "chunks_vec_migration_sync"
+        source_type = await self._get_vec_column_type()
+        target = self.vector_storage_type
+        target_type = f"{target.db_type}{self._vector_dim()}"
+
+        if source_type is None:
+            raise ValueError(f"Table {table_name} has no `vec` column.")
+        if source_type == target.db_type:
+            return {
+                "source_type": source_type,
+                "target_type": target.db_type,
+                "rows_migrated": 0,
+                "indices_rebuilt": [],
+            }
+        if source_type not in ("vector", "halfvec"):
+            raise ValueError(
+                f"Cannot migrate `{source_type}` vectors to `{target.db_type}`."
+            )
+
+        await self.connection_manager.execute_query(f"""
+            ALTER TABLE {table_name}
+            ADD COLUMN IF NOT EXISTS vec_migration {target_type};
+
+            CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
+            BEGIN
+                NEW.vec_migration := NEW.vec::{target_type};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};
+            CREATE TRIGGER {trigger_name}
+            BEFORE INSERT OR UPDATE OF vec ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION {function_name}();
+            """)
+
+        # Keyset pagination over the primary key keeps every batch an index
+        # range scan, regardless of how many rows were already converted.
+        backfill_query = f"""
+        WITH batch AS (
+            SELECT id FROM {table_name}
+            WHERE id > $1
+            ORDER BY id
+            LIMIT $2
+        ), updated AS (
+            UPDATE {table_name} t
+            SET vec_migration = t.vec::{target_type}
+            FROM batch
+            WHERE t.id = batch.id
+            RETURNING t.id
+        )
+        SELECT
+            (SELECT COUNT(*) FROM updated) AS updated,
+            (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id
+        """
+        rows_migrated = 0
+        last_id = UUID(int=0)
+        while True:
+            result = await self.connection_manager.fetchrow_query(
+                backfill_query, (last_id, batch_size)
+            )
+            if not result or result["last_id"] is None:
+                break
+            rows_migrated += result["updated"]
+            last_id = result["last_id"]
+            logger.info(
+                f"Converted {rows_migrated} vectors in {table_name} to {target_type}"
+            )
+
+        # Safety net for rows that were not covered by the backfill or trigger
+        await self.connection_manager.execute_query(f"""
+            UPDATE {table_name}
+            SET vec_migration = vec::{target_type}
+            WHERE vec_migration IS NULL AND vec IS NOT NULL
+            """)
+
+        indices_rebuilt = []
+        if rebuild_indices:
+            indices = await self.connection_manager.fetch_query(
+                """
+                SELECT indexname, indexdef
+                FROM pg_indexes
+                WHERE schemaname = $1
+                AND tablename = $2
+                AND indexdef LIKE $3
+                """,
+                (
+                    self.project_name,
+                    PostgresChunksHandler.TABLE_NAME.value,
+                    f"%(vec {source_type}_%",
+                ),
+            )
+            for index in indices:
+                old_name = index["indexname"]
+                new_name = old_name.replace(
+                    f"{source_type}_", f"{target.db_type}_", 1
+                )
+                if new_name == old_name:
+                    new_name = f"{old_name}_{target.db_type}"
+                new_name = new_name[:63]
+                create_index_sql = (
+                    index["indexdef"]
+                    .replace(
+                        f"INDEX {old_name} ON",
+                        f"INDEX CONCURRENTLY {new_name} ON",
+                        1,
+                    )
+                    .replace(
+                        f"(vec {source_type}_",
+                        f"(vec_migration {target.db_type}_",
+                        1,
+                    )
+                )
+                async with (
+                    self.connection_manager.pool.get_connection() as conn  # type: ignore
+                ):
+                    await conn.execute(create_index_sql)
+                indices_rebuilt.append(new_name)
+
+        async with (
+            self.connection_manager.pool.get_connection() as conn  # type: ignore
+        ):
+            async with conn.transaction():
+                await conn.execute(
+                    f"SET LOCAL lock_timeout = '{lock_timeout}'"
+                )
+                await conn.execute(
+                    f"DROP TRIGGER IF EXISTS {trigger_name} ON {table_name}"
+                )
+                # The prefix column and its trigger depend on `vec`. Prefixes
+                # of another dimension are dropped, create_tables adds them
+                # back
+                prefix = await conn.fetchrow(
+                    """
+                    SELECT
+                        format_type(atttypid, atttypmod) AS column_type,
+                        attgenerated <> '' AS generated
+                    FROM pg_attribute
+                    WHERE attrelid = $1::regclass
+                    AND attname = 'vec_prefix'
+                    AND NOT attisdropped
+                    """,
+                    table_name,
+                )
+                keep_prefix = bool(
+                    prefix
+                    and self.prefix_dimension
+                    and prefix["column_type"]
+                    == f"halfvec({self.prefix_dimension})"
+                )
+                await conn.execute(
+                    f"DROP TRIGGER IF EXISTS {PREFIX_TRIGGER_NAME} ON {table_name}"
+                )
+                if keep_prefix and prefix["generated"]:
+                    await conn.execute(
+                        f"ALTER TABLE {table_name} ALTER COLUMN vec_prefix DROP EXPRESSION"
+                    )
+                elif prefix and not keep_prefix:
+                    await conn.execute(
+                        f"ALTER TABLE {table_name} DROP COLUMN vec_prefix"
+                    )
+                await conn.execute(f"ALTER TABLE {table_name} DROP COLUMN vec")
+                await conn.execute(
+                    f"ALTER TABLE {table_name} RENAME COLUMN vec_migration TO vec"
+                )
+                await conn.execute(
+                    f"DROP FUNCTION IF EXISTS {function_name}()"
+                )
+                if keep_prefix:
+                    await conn.execute(self._prefix_trigger_query())
+
+        return {
+            "source_type": source_type,
+            "target_type": target.db_type,
+            "rows_migrated": rows_migrated,
+            "indices_rebuilt": indices_rebuilt,
+        }
 
     async def upsert(self, entry: VectorEntry) -> None:
         """Upsert function that handles vector quantization only when
@@ -199,7 +855,7 @@ class PostgresChunksHandler(Handler):
             query = f"""
             INSERT INTO {self._get_table_name(PostgresChunksHandler.TABLE_NAME)}
             (id, document_id, owner_id, collection_ids, vec, vec_binary, text, metadata)
-            VALUES ($1, $2, $3, $4, $5, $6::bit({bit_dim}), $7, $8)
+            VALUES ($1, $2, $3, $4, $5, $6::bit{bit_dim}, $7, $8)
             ON CONFLICT (id) DO UPDATE SET
             document_id = EXCLUDED.document_id,
             owner_id = EXCLUDED.owner_id,
@@ -216,7 +872,7 @@ class PostgresChunksHandler(Handler):
                     entry.document_id,
                     entry.owner_id,
                     entry.collection_ids,
-                    str(entry.vector.data),
+                    entry.vector.data,
                     quantize_vector_to_binary(
                         entry.vector.data
                     ),  # Convert to binary
@@ -246,18 +902,23 @@ class PostgresChunksHandler(Handler):
                     entry.document_id,
                     entry.owner_id,
                     entry.collection_ids,
-                    str(entry.vector.data),
+                    entry.vector.data,
                     entry.text,
                     json.dumps(entry.metadata),
                 ),
             )
 
-    async def upsert_entries(self, entries: list[VectorEntry]) -> None:
+    async def upsert_entries(
+        self,
+        entries: list[VectorEntry],
+        max_chunks: Optional[dict[UUID, int]] = None,
+    ) -> None:
         """Batch upsert function that handles vector quantization only when
         quantization_type is INT1.
 
         Matches the table schema where vec_binary column only exists for INT1
-        quantization.
+        quantization. `max_chunks` maps owners to their chunk limit, which is
+        checked with `_reserve_chunks` in the same transaction.
         """
         if self.quantization_type == VectorQuantizationType.INT1:
             bit_dim = (
@@ -268,7 +929,7 @@ class PostgresChunksHandler(Handler):
             query = f"""
             INSERT INTO {self._get_table_name(PostgresChunksHandler.TABLE_NAME)}
             (id, document_id, owner_id, collection_ids, vec, vec_binary, text, metadata)
-            VALUES ($1, $2, $3, $4, $5, $6::bit({bit_dim}), $7, $8)
+            VALUES ($1, $2, $3, $4, $5, $6::bit{bit_dim}, $7, $8)
             ON CONFLICT (id) DO UPDATE SET
             document_id = EXCLUDED.document_id,
             owner_id = EXCLUDED.owner_id,
@@ -278,13 +939,13 @@ class PostgresChunksHandler(Handler):
             text = EXCLUDED.text,
             metadata = EXCLUDED.metadata;
             """
-            bin_params = [
+            params: list[tuple] = [
                 (
                     entry.id,
                     entry.document_id,
                     entry.owner_id,
                     entry.collection_ids,
-                    str(entry.vector.data),
+                    entry.vector.data,
                     quantize_vector_to_binary(
                         entry.vector.data
                     ),  # Convert to binary
@@ -293,7 +954,6 @@ class PostgresChunksHandler(Handler):
                 )
                 for entry in entries
             ]
-            await self.connection_manager.execute_many(query, bin_params)
 
         else:
             # For regular vectors, use vec column only
@@ -315,14 +975,138 @@ class PostgresChunksHandler(Handler):
                     entry.document_id,
                     entry.owner_id,
                     entry.collection_ids,
-                    str(entry.vector.data),
+                    entry.vector.data,
                     entry.text,
                     json.dumps(entry.metadata),
                 )
                 for entry in entries
             ]
 
+        if max_chunks is None:
             await self.connection_manager.execute_many(query, params)
+            return
+
+        async with (
+            self.connection_manager.pool.get_connection() as conn  # type: ignore
+        ):
+            async with conn.transaction():
+                await self._reserve_chunks(conn, entries, max_chunks)
+                await conn.executemany(query, params)
+
+    async def bulk_upsert_entries(
+        self,
+        entries: list[VectorEntry],
+        max_chunks: Optional[dict[UUID, int]] = None,
+    ) -> None:
+        """Upsert a large batch of entries through the binary COPY protocol.
+
+        The entries are copied into a temporary staging table with the same
+        column types as the chunks table and merged into it with a single
+        `INSERT ... SELECT ... ON CONFLICT`, all in one transaction. Entries
+        sharing an id are collapsed to the last one, matching the outcome of
+        `upsert_entries`.
+
+        The chunk limits in `max_chunks` are reserved after the copy, so that
+        concurrent writers of an owner only wait on each other for the merge.
+        """
+        if not entries:
+            return
+
+        columns = ["id", "document_id", "owner_id", "collection_ids", "vec"]
+        if self.quantization_type == VectorQuantizationType.INT1:
+            columns.append("vec_binary")
+        columns += ["text", "metadata"]
+
+        records = []
+        for entry in {entry.id: entry for entry in entries}.values():
+            record = [
+                entry.id,
+                entry.document_id,
+                entry.owner_id,
+                entry.collection_ids,
+                entry.vector.data,
+            ]
+            if self.quantization_type == VectorQuantizationType.INT1:
+                record.append(quantize_vector_to_binary(entry.vector.data))
+            record += [entry.text, json.dumps(entry.metadata)]
+            records.append(tuple(record))
+
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        staging_table = f"{PostgresChunksHandler.TABLE_NAME}_staging"
+        column_list = ", ".join(columns)
+        updates = ",\n".join(
+            f"{column} = EXCLUDED.{column}" for column in columns[1:]
+        )
+
+        async with (
+            self.connection_manager.pool.get_connection() as conn  # type: ignore
+        ):
+            async with conn.transaction():
+                await conn.execute(f"""
+                    CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                    SELECT {column_list} FROM {table_name} WITH NO DATA
+                    """)
+                await conn.copy_records_to_table(
+                    staging_table, records=records, columns=columns
+                )
+                if max_chunks is not None:
+                    await self._reserve_chunks(conn, entries, max_chunks)
+                await conn.execute(f"""
+                    INSERT INTO {table_name} ({column_list})
+                    SELECT {column_list} FROM {staging_table}
+                    ON CONFLICT (id) DO UPDATE SET
+                    {updates};
+                    """)
+
+    async def _reserve_chunks(
+        self, conn, entries: list[VectorEntry], max_chunks: dict[UUID, int]
+    ) -> None:
+        """Checks that the owners of `entries` stay within their chunk limits
+        once the entries are stored, in the transaction that stores them.
+
+        The owners are locked until the transaction ends, so concurrent
+        writers of an owner can't both count the same free room. Entries that
+        replace stored chunks don't use any more of it.
+        """
+        requested: dict[UUID, set[UUID]] = {}
+        for entry in entries:
+            if entry.owner_id in max_chunks:
+                requested.setdefault(entry.owner_id, set()).add(entry.id)
+        if not requested:
+            return
+
+        # Locked in a fixed order, so that writers don't deadlock
+        owner_ids = sorted(requested)
+        await conn.execute(
+            """
+            SELECT pg_advisory_xact_lock(hashtextextended(owner_id::text, 0))
+            FROM unnest($1::uuid[]) AS owner_id
+            ORDER BY owner_id
+            """,
+            owner_ids,
+        )
+        exceeded = await conn.fetch(
+            f"""
+            SELECT requested.owner_id, requested.max_chunks
+            FROM unnest($1::uuid[], $2::bigint[], $3::bigint[])
+                AS requested(owner_id, count, max_chunks)
+            LEFT JOIN {self._get_table_name(PostgresChunksHandler.TABLE_NAME)} chunks
+                ON chunks.owner_id = requested.owner_id
+                AND NOT chunks.id = ANY($4::uuid[])
+            GROUP BY requested.owner_id, requested.count, requested.max_chunks
+            HAVING COUNT(chunks.id) + requested.count > requested.max_chunks
+            """,
+            owner_ids,
+            [len(requested[owner_id]) for owner_id in owner_ids],
+            [int(max_chunks[owner_id]) for owner_id in owner_ids],
+            [entry.id for entry in entries],
+        )
+        if exceeded:
+            raise R2RException(
+                message=f"User {exceeded[0]['owner_id']} has exceeded the "
+                f"maximum number of allowed chunks: {exceeded[0]['max_chunks']}",
+                status_code=403,
+            )
 
     async def semantic_search(
         self, query_vector: list[float], search_settings: SearchSettings
@@ -343,94 +1127,21 @@ class PostgresChunksHandler(Handler):
             f"{table_name}.text",
         ]
 
-        params: list[str | int | bytes] = []
-
-        # For binary vectors (INT1), implement two-stage search
-        if self.quantization_type == VectorQuantizationType.INT1:
-            # Convert query vector to binary format
-            binary_query = quantize_vector_to_binary(query_vector)
-            # TODO - Put depth multiplier in config / settings
-            extended_limit = (
-                search_settings.limit * 20
-            )  # Get 20x candidates for re-ranking
+        params: list[Any] = []
 
-            if (
-                imeasure_obj == IndexMeasure.hamming_distance
-                or imeasure_obj == IndexMeasure.jaccard_distance
-            ):
-                binary_search_measure_repr = imeasure_obj.pgvector_repr
-            else:
-                binary_search_measure_repr = (
-                    IndexMeasure.hamming_distance.pgvector_repr
-                )
-
-            # Use binary column and binary-specific distance measures for first stage
-            bit_dim = (
-                "" if math.isnan(self.dimension) else f"({self.dimension})"
-            )
-            stage1_distance = f"{table_name}.vec_binary {binary_search_measure_repr} $1::bit{bit_dim}"
-            stage1_param = binary_query
-
-            cols.append(
-                f"{table_name}.vec"
-            )  # Need original vector for re-ranking
-            if search_settings.include_metadatas:
-                cols.append(f"{table_name}.metadata")
-
-            select_clause = ", ".join(cols)
-            where_clause = ""
-            params.append(stage1_param)
-
-            if search_settings.filters:
-                where_clause, params = apply_filters(
-                    search_settings.filters, params, mode="where_clause"
-                )
-
-            vector_dim = (
-                "" if math.isnan(self.dimension) else f"({self.dimension})"
-            )
-
-            # First stage: Get candidates using binary search
-            query = f"""
-            WITH candidates AS (
-                SELECT {select_clause},
-                    ({stage1_distance}) as binary_distance
-                FROM {table_name}
-                {where_clause}
-                ORDER BY {stage1_distance}
-                LIMIT ${len(params) + 1}
-                OFFSET ${len(params) + 2}
-            )
-            -- Second stage: Re-rank using original vectors
-            SELECT
-                id,
-                document_id,
-                owner_id,
-                collection_ids,
-                text,
-                {"metadata," if search_settings.include_metadatas else ""}
-                (vec <=> ${len(params) + 4}::vector{vector_dim}) as distance
-            FROM candidates
-            ORDER BY distance
-            LIMIT ${len(params) + 3}
-            """
-
-            params.extend(
-                [
-                    extended_limit,  # First stage limit
-                    search_settings.offset,
-                    search_settings.limit,  # Final limit
-                    str(query_vector),  # For re-ranking
-                ]
+        # Binary vectors (INT1) and prefix search use a two-stage search
+        if (
+            self.quantization_type == VectorQuantizationType.INT1
+            or self._use_prefix_search(search_settings)
+        ):
+            results = await self._two_stage_semantic_search(
+                query_vector, search_settings, imeasure_obj
             )
-
         else:
             # Standard float vector handling
-            vector_dim = (
-                "" if math.isnan(self.dimension) else f"({self.dimension})"
-            )
-            distance_calc = f"{table_name}.vec {search_settings.chunk_settings.index_measure.pgvector_repr} $1::vector{vector_dim}"
-            query_param = str(query_vector)
+            vector_type = self.vector_storage_type.db_type
+            distance_calc = f"{table_name}.vec {search_settings.chunk_settings.index_measure.pgvector_repr} $1::{vector_type}{self._vector_dim()}"
+            query_param = query_vector
 
             if search_settings.include_scores:
                 cols.append(f"({distance_calc}) AS distance")
@@ -458,7 +1169,11 @@ class PostgresChunksHandler(Handler):
             OFFSET ${len(params) + 2}
             """
             params.extend([search_settings.limit, search_settings.offset])
-        results = await self.connection_manager.fetch_query(query, params)
+            results = await self.connection_manager.fetch_query(
+                query,
+                params,
+                local_settings=self._index_settings(search_settings),
+            )
 
         return [
             ChunkSearchResult(
@@ -481,13 +1196,142 @@ class PostgresChunksHandler(Handler):
             for result in results
         ]
 
+    async def _two_stage_semantic_search(
+        self,
+        query_vector: list[float],
+        search_settings: SearchSettings,
+        imeasure_obj: IndexMeasure,
+    ) -> list:
+        """Searches a compact vector column first and reranks the candidates
+        exactly on `vec` with the requested measure.
+
+        INT1 tables pull candidates from `vec_binary` by Hamming (or the
+        requested Jaccard) distance; prefix search pulls them from the
+        truncated `vec_prefix` vectors. The offset is applied after the
+        rerank.
+        """
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        if self.quantization_type == VectorQuantizationType.INT1:
+            binary_measures = (
+                IndexMeasure.hamming_distance,
+                IndexMeasure.jaccard_distance,
+            )
+            rerank = imeasure_obj not in binary_measures
+            binary_measure = (
+                IndexMeasure.hamming_distance if rerank else imeasure_obj
+            )
+            params: list[Any] = [quantize_vector_to_binary(query_vector)]
+            stage1_distance = f"vec_binary {binary_measure.pgvector_repr} $1::bit{self._vector_dim()}"
+        else:
+            rerank = True
+            params = [query_vector[: self.prefix_dimension]]
+            stage1_distance = f"vec_prefix {imeasure_obj.pgvector_repr} $1::halfvec({self.prefix_dimension})"
+
+        where_clause = ""
+        if search_settings.filters:
+            where_clause, params = apply_filters(
+                search_settings.filters, params, mode="where_clause"
+            )
+
+        if rerank:
+            params.append(query_vector)
+            distance = f"vec {imeasure_obj.pgvector_repr} ${len(params)}::{self.vector_storage_type.db_type}{self._vector_dim()}"
+        else:
+            distance = "first_stage_distance"
+
+        query = f"""
+        WITH candidates AS (
+            SELECT
+                id,
+                document_id,
+                owner_id,
+                collection_ids,
+                text,
+                {"metadata," if search_settings.include_metadatas else ""}
+                vec,
+                {stage1_distance} AS first_stage_distance
+            FROM {table_name}
+            {where_clause}
+            ORDER BY {stage1_distance}
+            LIMIT ${len(params) + 1}
+        )
+        SELECT
+            id,
+            document_id,
+            owner_id,
+            collection_ids,
+            text,
+            {"metadata," if search_settings.include_metadatas else ""}
+            {distance} AS distance,
+            COUNT(*) OVER () AS candidate_count
+        FROM candidates
+        ORDER BY distance
+        LIMIT ${len(params) + 2}
+        OFFSET ${len(params) + 3}
+        """
+
+        oversampling_factor = self._oversampling_factor(search_settings)
+        adaptive = rerank and self._resolve_chunk_setting(
+            search_settings, "adaptive_oversampling"
+        )
+        max_oversampling_factor = max(
+            oversampling_factor,
+            self._resolve_chunk_setting(
+                search_settings, "max_oversampling_factor"
+            )
+            or DEFAULT_MAX_OVERSAMPLING_FACTOR,
+        )
+        requested = search_settings.limit + search_settings.offset
+
+        while True:
+            candidate_limit = requested * oversampling_factor
+            local_settings = self._index_settings(search_settings)
+            # An HNSW scan returns at most ef_search rows, make sure the
+            # index can produce the whole candidate pool
+            local_settings["hnsw.ef_search"] = str(
+                max(
+                    int(local_settings.get("hnsw.ef_search", 0)),
+                    min(candidate_limit, HNSW_MAX_EF_SEARCH),
+                )
+            )
+            results = await self.connection_manager.fetch_query(
+                query,
+                [
+                    *params,
+                    candidate_limit,
+                    search_settings.limit,
+                    search_settings.offset,
+                ],
+                local_settings=local_settings,
+            )
+
+            if (
+                not adaptive
+                or len(results) < 2
+                or results[0]["candidate_count"] < candidate_limit
+                or oversampling_factor >= max_oversampling_factor
+            ):
+                return results
+            spread = float(results[-1]["distance"]) - float(
+                results[0]["distance"]
+            )
+            if spread >= ADAPTIVE_OVERSAMPLING_SPREAD:
+                return results
+            oversampling_factor = min(
+                oversampling_factor * 2, max_oversampling_factor
+            )
+            logger.debug(
+                f"Widening candidate pool to {oversampling_factor}x, "
+                f"top-k distance spread is {spread:.4f}"
+            )
+
     async def full_text_search(
         self, query_text: str, search_settings: SearchSettings
     ) -> list[ChunkSearchResult]:
         conditions = []
         params: list[str | int | bytes] = [query_text]
 
-        conditions.append("fts @@ websearch_to_tsquery('english', $1)")
+        conditions.append(f"fts @@ {self._ts_query('$1')}")
 
         if search_settings.filters:
             filter_condition, params = apply_filters(
@@ -506,7 +1350,7 @@ class PostgresChunksHandler(Handler):
                 collection_ids,
                 text,
                 metadata,
-                ts_rank(fts, websearch_to_tsquery('english', $1), 32) as rank
+                ts_rank(fts, {self._ts_query("$1")}, 32) as rank
             FROM {self._get_table_name(PostgresChunksHandler.TABLE_NAME)}
             {where_clause}
             ORDER BY rank DESC
@@ -555,20 +1399,184 @@ class PostgresChunksHandler(Handler):
                 "The `full_text_limit` must be greater than or equal to the `limit`."
             )
 
-        semantic_settings = copy.deepcopy(search_settings)
-        semantic_settings.limit += search_settings.offset
+        if (
+            search_settings.hybrid_settings.fused
+            and self.quantization_type != VectorQuantizationType.INT1
+            and not self._use_prefix_search(search_settings)
+        ):
+            return await self._fused_hybrid_search(
+                query_text, query_vector, search_settings
+            )
+        return await self._concurrent_hybrid_search(
+            query_text, query_vector, search_settings
+        )
 
-        full_text_settings = copy.deepcopy(search_settings)
-        full_text_settings.hybrid_settings.full_text_limit += (
-            search_settings.offset
+    async def _fused_hybrid_search(
+        self,
+        query_text: str,
+        query_vector: list[float],
+        search_settings: SearchSettings,
+    ) -> list[ChunkSearchResult]:
+        """Computes both rankings and the weighted RRF merge in one query."""
+        table_name = self._get_table_name(PostgresChunksHandler.TABLE_NAME)
+        hybrid_settings = search_settings.hybrid_settings
+        distance_calc = (
+            f"vec {search_settings.chunk_settings.index_measure.pgvector_repr} "
+            f"$1::{self.vector_storage_type.db_type}{self._vector_dim()}"
         )
+        ts_query = self._ts_query("$2")
+
+        params: list[Any] = [query_vector, query_text]
+        filter_condition = ""
+        if search_settings.filters:
+            condition, params = apply_filters(
+                search_settings.filters, params, mode="condition_only"
+            )
+            if condition:
+                filter_condition = f"AND ({condition})"
 
-        semantic_results: list[ChunkSearchResult] = await self.semantic_search(
-            query_vector, semantic_settings
+        semantic_limit = search_settings.limit
+        full_text_limit = hybrid_settings.full_text_limit
+        params.extend(
+            [
+                semantic_limit + search_settings.offset,
+                full_text_limit + search_settings.offset,
+                semantic_limit,
+                full_text_limit,
+                hybrid_settings.semantic_weight,
+                hybrid_settings.full_text_weight,
+                hybrid_settings.rrf_k,
+                search_settings.limit,
+                search_settings.offset,
+            ]
+        )
+        n = len(params)
+        (
+            semantic_candidates,
+            full_text_candidates,
+            semantic_limit_param,
+            full_text_limit_param,
+            semantic_weight,
+            full_text_weight,
+            rrf_k,
+            limit,
+            offset,
+        ) = (f"${i}" for i in range(n - 8, n + 1))
+
+        query = f"""
+        WITH semantic AS (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY distance) AS semantic_rank
+            FROM (
+                SELECT id, {distance_calc} AS distance
+                FROM {table_name}
+                WHERE TRUE {filter_condition}
+                ORDER BY {distance_calc}
+                LIMIT {semantic_candidates}
+            ) semantic_candidates
+        ), full_text AS (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY rank DESC) AS full_text_rank
+            FROM (
+                SELECT id, ts_rank(fts, {ts_query}, 32) AS rank
+                FROM {table_name}
+                WHERE fts @@ {ts_query} {filter_condition}
+                ORDER BY rank DESC
+                LIMIT {full_text_candidates}
+            ) full_text_candidates
+        ), ranks AS (
+            SELECT
+                COALESCE(semantic.id, full_text.id) AS id,
+                COALESCE(semantic.semantic_rank, {semantic_limit_param}) AS semantic_rank,
+                COALESCE(full_text.full_text_rank, {full_text_limit_param}) AS full_text_rank
+            FROM semantic
+            FULL OUTER JOIN full_text ON semantic.id = full_text.id
+        ), fused AS (
+            SELECT
+                id,
+                semantic_rank,
+                full_text_rank,
+                (
+                    {semantic_weight}::float8 / ({rrf_k} + semantic_rank)
+                    + {full_text_weight}::float8 / ({rrf_k} + full_text_rank)
+                ) / ({semantic_weight}::float8 + {full_text_weight}::float8) AS rrf_score
+            FROM ranks
+            WHERE semantic_rank <= {semantic_limit_param} * 2
+            AND full_text_rank <= {full_text_limit_param} * 2
+        )
+        SELECT
+            c.id,
+            c.document_id,
+            c.owner_id,
+            c.collection_ids,
+            c.text,
+            {"c.metadata," if search_settings.include_metadatas else ""}
+            fused.semantic_rank,
+            fused.full_text_rank,
+            fused.rrf_score
+        FROM fused
+        JOIN {table_name} c ON c.id = fused.id
+        ORDER BY fused.rrf_score DESC, fused.semantic_rank, fused.full_text_rank
+        LIMIT {limit}
+        OFFSET {offset}
+        """
+
+        results = await self.connection_manager.fetch_query(
+            query,
+            params,
+            local_settings=self._index_settings(search_settings),
+        )
+        return [
+            ChunkSearchResult(
+                id=UUID(str(result["id"])),
+                document_id=UUID(str(result["document_id"])),
+                owner_id=UUID(str(result["owner_id"])),
+                collection_ids=result["collection_ids"],
+                text=result["text"],
+                score=float(result["rrf_score"]),
+                metadata={
+                    **(
+                        json.loads(result["metadata"])
+                        if search_settings.include_metadatas
+                        else {}
+                    ),
+                    "semantic_rank": result["semantic_rank"],
+                    "full_text_rank": result["full_text_rank"],
+                },
+            )
+            for result in results
+        ]
+
+    async def _concurrent_hybrid_search(
+        self,
+        query_text: str,
+        query_vector: list[float],
+        search_settings: SearchSettings,
+    ) -> list[ChunkSearchResult]:
+        """Runs the semantic and full text searches concurrently, each on its
+        own pooled connection, and merges them with weighted RRF."""
+        # Both legs fetch the first `limit + offset` candidates; the offset is
+        # applied once, after the merge.
+        semantic_settings = search_settings.model_copy(
+            update={
+                "limit": search_settings.limit + search_settings.offset,
+                "offset": 0,
+            }
+        )
+        full_text_settings = search_settings.model_copy(
+            update={
+                "offset": 0,
+                "hybrid_settings": search_settings.hybrid_settings.model_copy(
+                    update={
+                        "full_text_limit": search_settings.hybrid_settings.full_text_limit
+                        + search_settings.offset
+                    }
+                ),
+            }
+        )
+
+        semantic_results, full_text_results = await asyncio.gather(
+            self.semantic_search(query_vector, semantic_settings),
+            self.full_text_search(query_text, full_text_settings),
         )
-        full_text_results: list[
-            ChunkSearchResult
-        ] = await self.full_text_search(query_text, full_text_settings)
 
         semantic_limit = search_settings.limit
         full_text_limit = search_settings.hybrid_settings.full_text_limit
@@ -741,7 +1749,9 @@ class PostgresChunksHandler(Handler):
                     "text": result["text"],
                     "metadata": json.loads(result["metadata"]),
                     "vector": (
-                        json.loads(result["vec"]) if include_vectors else None
+                        vector_to_list(result["vec"])
+                        if include_vectors
+                        else None
                     ),
                 }
                 for result in results
@@ -874,13 +1884,33 @@ class PostgresChunksHandler(Handler):
         if index_method == IndexMethod.auto:
             index_method = IndexMethod.hnsw
 
+        if col_name == "vec_binary":
+            column_quantization = VectorQuantizationType.INT1
+        elif col_name == "vec":
+            column_quantization = self.vector_storage_type
+        else:
+            column_quantization = self.quantization_type
+
         ops = index_measure_to_ops(
-            index_measure  # , quantization_type=self.quantization_type
+            index_measure, quantization_type=column_quantization
         )
 
         if ops is None:
             raise ValueError("Unknown index measure")
 
+        max_dimension = MAX_INDEX_DIMENSIONS.get(column_quantization)
+        if (
+            max_dimension
+            and not math.isnan(self.dimension)
+            and self.dimension > max_dimension
+        ):
+            raise ValueError(
+                f"{index_method} indexes on `{column_quantization.db_type}` columns support at most "
+                f"{max_dimension} dimensions, but the configured dimension is {self.dimension}. "
+                'Set `quantization_type = "FP16"` to store vectors as `halfvec`, which can be '
+                "indexed up to 4000 dimensions."
+            )
+
         concurrently_sql = "CONCURRENTLY" if concurrently else ""
 
         index_name = (
@@ -961,7 +1991,7 @@ class PostgresChunksHandler(Handler):
             LEFT JOIN pg_stat_user_indexes psat ON psat.indexrelname = i.indexname
                 AND psat.schemaname = i.schemaname
             WHERE i.schemaname = $1
-            AND i.indexdef LIKE '%vector%'
+            AND am.amname IN ('hnsw', 'ivfflat')
             {where_clause}
         )
         SELECT *
@@ -1138,7 +2168,9 @@ class PostgresChunksHandler(Handler):
                     "text": result["text"],
                     "metadata": json.loads(result["metadata"]),
                     "vector": (
-                        json.loads(result["vec"]) if include_vectors else None
+                        vector_to_list(result["vec"])
+                        if include_vectors
+                        else None
                     ),
                 }
                 for result in results
@@ -1190,8 +2222,8 @@ class PostgresChunksHandler(Handler):
                     CASE WHEN $1 = '' THEN 0.0
                     ELSE
                         ts_rank_cd(
-                            setweight(to_tsvector('english', {metadata_fields_expr}), 'A'),
-                            websearch_to_tsquery('english', $1),
+                            setweight(to_tsvector({self._regconfig}, {metadata_fields_expr}), 'A'),
+                            {self._ts_query("$1")},
                             32
                         )
                     END as metadata_rank
@@ -1205,14 +2237,14 @@ class PostgresChunksHandler(Handler):
                     document_id,
                     AVG(
                         ts_rank_cd(
-                            setweight(to_tsvector('english', COALESCE(text, '')), 'B'),
-                            websearch_to_tsquery('english', $1),
+                            setweight(fts, 'B'),
+                            {self._ts_query("$1")},
                             32
                         )
                     ) as body_rank
                 FROM {self._get_table_name(PostgresChunksHandler.TABLE_NAME)}
                 WHERE $1 != ''
-                {"AND to_tsvector('english', text) @@ websearch_to_tsquery('english', $1)" if search_over_body else ""}
+                {f"AND fts @@ {self._ts_query('$1')}" if search_over_body else ""}
                 GROUP BY document_id
             ),
             -- Combined scores with document metadata
@@ -24,6 +24,7 @@ from core.base import (
 
 from .base import PostgresConnectionManager
 from .filters import apply_filters
+from .vector_codecs import vector_to_list
 
 logger = logging.getLogger()
 
@@ -615,7 +616,7 @@ class PostgresDocumentsHandler(Handler):
             base_query += " WHERE " + " AND ".join(conditions)
 
         # Construct SELECT fields (including total_entries via window function)
-        select_fields = """
+        select_fields = f"""
             SELECT
                 id,
                 collection_ids,
@@ -630,7 +631,7 @@ class PostgresDocumentsHandler(Handler):
                 created_at,
                 updated_at,
                 summary,
-                summary_embedding,
+                {"summary_embedding," if include_summary_embedding else ""}
                 total_tokens,
                 COUNT(*) OVER() AS total_entries
         """
@@ -658,20 +659,12 @@ class PostgresDocumentsHandler(Handler):
                 # Safely handle the embedding
                 embedding = None
                 if (
-                    "summary_embedding" in row
+                    include_summary_embedding
+                    and "summary_embedding" in row
                     and row["summary_embedding"] is not None
                 ):
                     try:
-                        # The embedding is stored as a string like "[0.1, 0.2, ...]"
-                        embedding_str = row["summary_embedding"]
-                        if embedding_str.startswith(
-                            "["
-                        ) and embedding_str.endswith("]"):
-                            embedding = [
-                                float(x)
-                                for x in embedding_str[1:-1].split(",")
-                                if x
-                            ]
+                        embedding = vector_to_list(row["summary_embedding"])
                     except Exception as e:
                         logger.warning(
                             f"Failed to parse embedding for document {row['id']}: {e}"
@@ -755,7 +748,7 @@ class PostgresDocumentsHandler(Handler):
         embeddings."""
 
         where_clauses = ["summary_embedding IS NOT NULL"]
-        params: list[str | int | bytes] = [str(query_embedding)]
+        params: list[Any] = [query_embedding]
 
         vector_dim = (
             "" if math.isnan(self.dimension) else f"({self.dimension})"
@@ -829,11 +822,7 @@ class PostgresDocumentsHandler(Handler):
                 created_at=row["created_at"],
                 updated_at=row["updated_at"],
                 summary=row["summary"],
-                summary_embedding=[
-                    float(x)
-                    for x in row["summary_embedding"][1:-1].split(",")
-                    if x
-                ],
+                summary_embedding=vector_to_list(row["summary_embedding"]),
                 total_tokens=row["total_tokens"],
             )
             for row in results
@@ -914,15 +903,7 @@ class PostgresDocumentsHandler(Handler):
                 created_at=row["created_at"],
                 updated_at=row["updated_at"],
                 summary=row["summary"],
-                summary_embedding=(
-                    [
-                        float(x)
-                        for x in row["summary_embedding"][1:-1].split(",")
-                        if x
-                    ]
-                    if row["summary_embedding"]
-                    else None
-                ),
+                summary_embedding=vector_to_list(row["summary_embedding"]),
                 total_tokens=row["total_tokens"],
             )
             for row in results
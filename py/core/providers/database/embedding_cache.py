@@ -0,0 +1,66 @@
+from typing import Optional
+
+from core.base import EmbeddingCache, Handler
+
+from .base import PostgresConnectionManager
+from .vector_codecs import vector_to_list
+
+
+class PostgresEmbeddingCacheHandler(Handler, EmbeddingCache):
+    """Embedding cache tier shared by all processes using the database.
+
+    Embeddings are stored under the key computed by the embedding provider
+    and expire `ttl_seconds` after they were written.
+    """
+
+    TABLE_NAME = "embedding_cache"
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+        ttl_seconds: float,
+    ):
+        super().__init__(project_name, connection_manager)
+        self.ttl_seconds = ttl_seconds
+
+    async def create_tables(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (
+            key TEXT PRIMARY KEY,
+            embedding vector NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresEmbeddingCacheHandler.TABLE_NAME}_created_at
+        ON {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (created_at);
+        """
+        await self.connection_manager.execute_query(query)
+
+    async def get(self, key: str) -> Optional[list[float]]:
+        query = f"""
+        SELECT embedding
+        FROM {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)}
+        WHERE key = $1
+        AND created_at > NOW() - make_interval(secs => $2)
+        """
+        result = await self.connection_manager.fetchrow_query(
+            query, [key, self.ttl_seconds]
+        )
+        return vector_to_list(result["embedding"]) if result else None
+
+    async def set(self, key: str, embedding: list[float]) -> None:
+        query = f"""
+        INSERT INTO {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)} (key, embedding)
+        VALUES ($1, $2)
+        ON CONFLICT (key) DO UPDATE SET
+        embedding = EXCLUDED.embedding,
+        created_at = NOW()
+        """
+        await self.connection_manager.execute_query(query, [key, embedding])
+
+    async def clean_expired_embeddings(self) -> None:
+        query = f"""
+        DELETE FROM {self._get_table_name(PostgresEmbeddingCacheHandler.TABLE_NAME)}
+        WHERE created_at <= NOW() - make_interval(secs => $1)
+        """
+        await self.connection_manager.execute_query(query, [self.ttl_seconds])
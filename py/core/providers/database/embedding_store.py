@@ -0,0 +1,88 @@
+from core.base import Handler
+
+from .base import PostgresConnectionManager
+from .vector_codecs import vector_to_list
+
+
+class PostgresEmbeddingStoreHandler(Handler):
+    """Content addressed store of document embeddings.
+
+    Embeddings are keyed by `EmbeddingProvider.content_key`, so unchanged
+    text is not sent to the embedding model again when a document is
+    re-ingested or shared between users. Lookups refresh `last_used_at`,
+    and `evict` keeps only the `max_entries` most recently used rows.
+    """
+
+    TABLE_NAME = "embedding_store"
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+        max_entries: int,
+    ):
+        super().__init__(project_name, connection_manager)
+        self.max_entries = max_entries
+
+    async def create_tables(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)} (
+            key TEXT PRIMARY KEY,
+            embedding vector NOT NULL,
+            last_used_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresEmbeddingStoreHandler.TABLE_NAME}_last_used_at
+        ON {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)} (last_used_at);
+        """
+        await self.connection_manager.execute_query(query)
+
+    async def get_embeddings(self, keys: list[str]) -> dict[str, list[float]]:
+        """Returns the stored embeddings of the given keys, marking them as
+        used."""
+        if not keys:
+            return {}
+        query = f"""
+        UPDATE {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)}
+        SET last_used_at = NOW()
+        WHERE key = ANY($1::text[])
+        RETURNING key, embedding
+        """
+        results = await self.connection_manager.fetch_query(query, [keys])
+        embeddings: dict[str, list[float]] = {}
+        for row in results:
+            embedding = vector_to_list(row["embedding"])
+            # The column is NOT NULL, but a missing embedding is only a miss
+            if embedding is not None:
+                embeddings[row["key"]] = embedding
+        return embeddings
+
+    async def store_embeddings(
+        self, embeddings: dict[str, list[float]]
+    ) -> None:
+        if not embeddings:
+            return
+        query = f"""
+        INSERT INTO {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)} (key, embedding)
+        VALUES ($1, $2)
+        ON CONFLICT (key) DO UPDATE SET
+        embedding = EXCLUDED.embedding,
+        last_used_at = NOW()
+        """
+        # Sorted keys keep the lock order stable across concurrent writers
+        await self.connection_manager.execute_many(
+            query, sorted(embeddings.items())
+        )
+
+    async def evict(self) -> None:
+        """Deletes the least recently used embeddings beyond
+        `max_entries`."""
+        query = f"""
+        DELETE FROM {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)}
+        WHERE key IN (
+            SELECT key
+            FROM {self._get_table_name(PostgresEmbeddingStoreHandler.TABLE_NAME)}
+            ORDER BY last_used_at DESC
+            OFFSET $1
+        )
+        """
+        await self.connection_manager.execute_query(query, [self.max_entries])
@@ -34,9 +34,39 @@ from core.base.utils import (
 
 from .base import PostgresConnectionManager
 from .collections import PostgresCollectionsHandler
+from .vector_codecs import vector_to_list
 
 logger = logging.getLogger()
 
+# Columns returned by the single query graph search, with their types
+GRAPH_SEARCH_COLUMNS = {
+    "id": "uuid",
+    "name": "text",
+    "description": "text",
+    "summary": "text",
+    "subject": "text",
+    "predicate": "text",
+    "object": "text",
+    "subject_id": "uuid",
+    "object_id": "uuid",
+    "metadata": "jsonb",
+}
+# Columns each result type provides
+GRAPH_SEARCH_PROPERTIES = {
+    "entities": ["id", "name", "description", "metadata"],
+    "relationships": [
+        "id",
+        "subject",
+        "predicate",
+        "object",
+        "description",
+        "subject_id",
+        "object_id",
+        "metadata",
+    ],
+    "communities": ["id", "name", "summary", "metadata"],
+}
+
 
 class PostgresEntitiesHandler(Handler):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
@@ -128,9 +158,6 @@ class PostgresEntitiesHandler(Handler):
             with contextlib.suppress(json.JSONDecodeError):
                 metadata = json.loads(metadata)
 
-        if isinstance(description_embedding, list):
-            description_embedding = str(description_embedding)
-
         query = f"""
             INSERT INTO {self._get_table_name(table_name)}
             (name, category, description, parent_id, description_embedding, chunk_ids, metadata)
@@ -237,6 +264,10 @@ class PostgresEntitiesHandler(Handler):
                     entity_dict["metadata"] = json.loads(
                         entity_dict["metadata"]
                     )
+            if "description_embedding" in entity_dict:
+                entity_dict["description_embedding"] = vector_to_list(
+                    entity_dict["description_embedding"]
+                )
 
             entities.append(Entity(**entity_dict))
 
@@ -781,9 +812,6 @@ class PostgresRelationshipsHandler(Handler):
             with contextlib.suppress(json.JSONDecodeError):
                 metadata = json.loads(metadata)
 
-        if isinstance(description_embedding, list):
-            description_embedding = str(description_embedding)
-
         query = f"""
             INSERT INTO {self._get_table_name(table_name)}
             (subject, predicate, object, description, subject_id, object_id,
@@ -1259,9 +1287,6 @@ class PostgresCommunitiesHandler(Handler):
     ) -> Community:
         table_name = "graphs_communities"
 
-        if isinstance(description_embedding, list):
-            description_embedding = str(description_embedding)
-
         query = f"""
             INSERT INTO {self._get_table_name(table_name)}
             (collection_id, name, summary, findings, rating, rating_explanation, description_embedding)
@@ -1493,6 +1518,10 @@ class PostgresCommunitiesHandler(Handler):
         communities = []
         for row in rows:
             community_dict = dict(row)
+            if "description_embedding" in community_dict:
+                community_dict["description_embedding"] = vector_to_list(
+                    community_dict["description_embedding"]
+                )
 
             communities.append(Community(**community_dict))
 
@@ -2061,6 +2090,10 @@ class PostgresGraphsHandler(Handler):
                     entity_dict["metadata"] = json.loads(
                         entity_dict["metadata"]
                     )
+            if "description_embedding" in entity_dict:
+                entity_dict["description_embedding"] = vector_to_list(
+                    entity_dict["description_embedding"]
+                )
 
             entities.append(Entity(**entity_dict))
 
@@ -2144,6 +2177,10 @@ class PostgresGraphsHandler(Handler):
                     relationship_dict["metadata"] = json.loads(
                         relationship_dict["metadata"]
                     )
+            if "description_embedding" in relationship_dict:
+                relationship_dict["description_embedding"] = vector_to_list(
+                    relationship_dict["description_embedding"]
+                )
 
             relationships.append(Relationship(**relationship_dict))
 
@@ -2176,9 +2213,8 @@ class PostgresGraphsHandler(Handler):
                 else []
             )
             entity_dict["description_embedding"] = (
-                str(entity_dict["description_embedding"])
-                if entity_dict.get("description_embedding")  # type: ignore
-                else None
+                vector_to_list(entity_dict.get("description_embedding"))
+                or None
             )
             cleaned_entities.append(entity_dict)
 
@@ -2299,15 +2335,16 @@ class PostgresGraphsHandler(Handler):
         communities = []
         for row in rows:
             community_dict = dict(row)
+            if "description_embedding" in community_dict:
+                community_dict["description_embedding"] = vector_to_list(
+                    community_dict["description_embedding"]
+                )
+
             communities.append(Community(**community_dict))
 
         return communities, count
 
     async def add_community(self, community: Community) -> None:
-        # TODO: Fix in the short term.
-        # we need to do this because postgres insert needs to be a string
-        community.description_embedding = str(community.description_embedding)  # type: ignore[assignment]
-
         non_null_attrs = {
             k: v for k, v in community.__dict__.items() if v is not None
         }
@@ -2582,8 +2619,8 @@ class PostgresGraphsHandler(Handler):
         property_names_str = ", ".join(property_names)
 
         # Build the WHERE clause from filters
-        params: list[str | int | bytes] = [
-            json.dumps(query_embedding),
+        params: list[Any] = [
+            query_embedding,
             limit,
         ]
         conditions_clause = self._build_filters(filters, params, search_type)
@@ -2619,6 +2656,70 @@ class PostgresGraphsHandler(Handler):
             )
             yield output
 
+    async def graph_search_all(
+        self,
+        query_embedding: list[float],
+        limits: dict[str, int],
+        filters: Optional[dict] = None,
+        embedding_type: str = "description_embedding",
+    ) -> list[dict[str, Any]]:
+        """Searches entities, relationships and communities in a single
+        round trip.
+
+        Each result type is searched by its own branch of a `UNION ALL`
+        query, with the limit given for it in `limits`. Returns the same
+        dictionaries as `graph_search`, tagged with their `search_type`.
+        """
+        params: list[Any] = [query_embedding]
+        branches = []
+        for search_type, properties in GRAPH_SEARCH_PROPERTIES.items():
+            params.append(limits[search_type])
+            limit_param = len(params)
+            conditions_clause = self._build_filters(
+                filters or {}, params, search_type
+            )
+            where_clause = (
+                f"WHERE {conditions_clause}" if conditions_clause else ""
+            )
+            columns = ", ".join(
+                column
+                if column in properties
+                else f"NULL::{type_} AS {column}"
+                for column, type_ in GRAPH_SEARCH_COLUMNS.items()
+            )
+            branches.append(f"""
+                (
+                    SELECT
+                        '{search_type}' AS search_type,
+                        {columns},
+                        ({embedding_type} <=> $1) as similarity_score
+                    FROM {self._get_table_name(f"graphs_{search_type}")}
+                    {where_clause}
+                    ORDER BY {embedding_type} <=> $1
+                    LIMIT ${limit_param}
+                )
+            """)
+
+        results = await self.connection_manager.fetch_query(
+            "UNION ALL".join(branches), tuple(params)
+        )
+
+        outputs = []
+        for result in results:
+            search_type = result["search_type"]
+            output = {
+                prop: result[prop]
+                for prop in GRAPH_SEARCH_PROPERTIES[search_type]
+            }
+            output["search_type"] = search_type
+            output["similarity_score"] = (
+                1 - float(result["similarity_score"])
+                if result.get("similarity_score")
+                else "n/a"
+            )
+            outputs.append(output)
+        return outputs
+
     def _build_filters(
         self, filter_dict: dict, parameters: list[Any], search_type: str
     ) -> str:
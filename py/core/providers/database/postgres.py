@@ -14,6 +14,8 @@ from .chunks import PostgresChunksHandler
 from .collections import PostgresCollectionsHandler
 from .conversations import PostgresConversationsHandler
 from .documents import PostgresDocumentsHandler
+from .embedding_cache import PostgresEmbeddingCacheHandler
+from .embedding_store import PostgresEmbeddingStoreHandler
 from .graphs import (
     PostgresCommunitiesHandler,
     PostgresEntitiesHandler,
@@ -23,6 +25,8 @@ from .graphs import (
 from .limits import PostgresLimitsHandler
 from .maintenance import PostgresMaintenanceHandler
 from .prompts_handler import PostgresPromptsHandler
+from .rag_cache import PostgresRAGCacheHandler
+from .search_cache import PostgresSearchCacheHandler
 from .tokens import PostgresTokensHandler
 from .users import PostgresUserHandler
 
@@ -68,6 +72,10 @@ class PostgresDatabaseProvider(DatabaseProvider):
     conversations_handler: PostgresConversationsHandler
     limits_handler: PostgresLimitsHandler
     maintenance_handler: PostgresMaintenanceHandler
+    embedding_cache_handler: Optional[PostgresEmbeddingCacheHandler]
+    embedding_store_handler: Optional[PostgresEmbeddingStoreHandler]
+    rag_cache_handler: Optional[PostgresRAGCacheHandler]
+    search_cache_handler: Optional[PostgresSearchCacheHandler]
 
     def __init__(
         self,
@@ -75,6 +83,9 @@ class PostgresDatabaseProvider(DatabaseProvider):
         dimension: int | float,
         crypto_provider: "BCryptCryptoProvider | NaClCryptoProvider",
         quantization_type: VectorQuantizationType = VectorQuantizationType.FP32,
+        prefix_dimension: Optional[int] = None,
+        embedding_cache_ttl: Optional[float] = None,
+        embedding_store_max_entries: Optional[int] = None,
         *args,
         **kwargs,
     ):
@@ -153,6 +164,10 @@ class PostgresDatabaseProvider(DatabaseProvider):
             connection_manager=self.connection_manager,
             dimension=self.dimension,
             quantization_type=(self.quantization_type),
+            text_search_config=config.text_search_config,
+            search_defaults=config.chunk_search_settings,
+            collection_oversampling_factors=config.collection_oversampling_factors,
+            prefix_dimension=prefix_dimension,
         )
         self.conversations_handler = PostgresConversationsHandler(
             self.project_name, self.connection_manager
@@ -197,6 +212,47 @@ class PostgresDatabaseProvider(DatabaseProvider):
             connection_manager=self.connection_manager,
             config=self.config,
         )
+        # Shared tier of the query embedding cache, if enabled
+        self.embedding_cache_handler = (
+            PostgresEmbeddingCacheHandler(
+                project_name=self.project_name,
+                connection_manager=self.connection_manager,
+                ttl_seconds=embedding_cache_ttl,
+            )
+            if embedding_cache_ttl is not None
+            else None
+        )
+        # Content addressed document embeddings, if enabled
+        self.embedding_store_handler = (
+            PostgresEmbeddingStoreHandler(
+                project_name=self.project_name,
+                connection_manager=self.connection_manager,
+                max_entries=embedding_store_max_entries,
+            )
+            if embedding_store_max_entries is not None
+            else None
+        )
+        # Semantic cache of RAG responses, if enabled
+        self.rag_cache_handler = (
+            PostgresRAGCacheHandler(
+                project_name=self.project_name,
+                connection_manager=self.connection_manager,
+                dimension=self.dimension,
+                settings=self.config.rag_cache,
+            )
+            if self.config.rag_cache.enabled
+            else None
+        )
+        # Exact-match cache of search results, if enabled
+        self.search_cache_handler = (
+            PostgresSearchCacheHandler(
+                project_name=self.project_name,
+                connection_manager=self.connection_manager,
+                settings=self.config.search_cache,
+            )
+            if self.config.search_cache.enabled
+            else None
+        )
 
     async def initialize(self):
         logger.info("Initializing `PostgresDatabaseProvider`.")
@@ -222,6 +278,11 @@ class PostgresDatabaseProvider(DatabaseProvider):
                 f'CREATE SCHEMA IF NOT EXISTS "{self.project_name}";'
             )
 
+        if not self.config.disable_create_extension:
+            # Connections opened before the extension existed have no vector
+            # codecs registered.
+            await self.pool.reset_connections()
+
         await self.documents_handler.create_tables()
         await self.collections_handler.create_tables()
         await self.token_handler.create_tables()
@@ -235,6 +296,14 @@ class PostgresDatabaseProvider(DatabaseProvider):
         await self.conversations_handler.create_tables()
         await self.limits_handler.create_tables()
         await self.maintenance_handler.create_tables()
+        if self.embedding_cache_handler is not None:
+            await self.embedding_cache_handler.create_tables()
+        if self.embedding_store_handler is not None:
+            await self.embedding_store_handler.create_tables()
+        if self.rag_cache_handler is not None:
+            await self.rag_cache_handler.create_tables()
+        if self.search_cache_handler is not None:
+            await self.search_cache_handler.create_tables()
 
     async def schema_exists(self, schema_name: str) -> bool:
         """Check if a PostgreSQL schema exists."""
@@ -0,0 +1,313 @@
+import json
+import math
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from core.base import Handler, RAGCacheSettings, VectorQuantizationType
+
+from .base import PostgresConnectionManager
+from .chunks import MAX_INDEX_DIMENSIONS, PostgresChunksHandler
+from .scope_versions import PostgresScopeVersionsHandler
+
+# Filter operators that restrict a field to a set of values
+_SCOPE_OPERATORS = ("$eq", "$in", "$overlap", "$contains")
+
+
+def _scope_values(condition: Any) -> Optional[set[UUID]]:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    for operator in _SCOPE_OPERATORS:
+        if operator in condition:
+            value = condition[operator]
+            values = value if isinstance(value, list) else [value]
+            try:
+                return {UUID(str(v)) for v in values}
+            except ValueError:
+                return None
+    return None
+
+
+def search_scope(
+    filters: dict[str, Any],
+) -> Optional[tuple[set[UUID], set[UUID]]]:
+    """The collection and owner IDs that bound the chunks matched by
+    `filters`, or None if the filters don't bound them."""
+    if "$or" in filters:
+        # Every branch must be bounded, and any of them may match
+        collection_ids: set[UUID] = set()
+        owner_ids: set[UUID] = set()
+        for branch in filters["$or"]:
+            scope = search_scope(branch)
+            if scope is None:
+                return None
+            collection_ids |= scope[0]
+            owner_ids |= scope[1]
+        return collection_ids, owner_ids
+
+    # Conjunctions match a subset of any of their bounded conditions
+    for branch in filters.get("$and", []):
+        scope = search_scope(branch)
+        if scope is not None:
+            return scope
+    for field, condition in filters.items():
+        if field in ("collection_id", "collection_ids"):
+            values = _scope_values(condition)
+            if values is not None:
+                return values, set()
+        elif field == "owner_id":
+            values = _scope_values(condition)
+            if values is not None:
+                return set(), values
+    return None
+
+
+def filters_key(filters: dict[str, Any]) -> str:
+    """A canonical serialization of `filters`."""
+
+    def canonical(value: Any) -> Any:
+        # Lists of IDs are often built from sets, in no particular order
+        if isinstance(value, dict):
+            return {k: canonical(v) for k, v in value.items()}
+        if isinstance(value, list):
+            items = [canonical(v) for v in value]
+            if any(isinstance(v, (dict, list)) for v in items):
+                return items
+            return sorted(items, key=str)
+        return value
+
+    return json.dumps(canonical(filters), sort_keys=True, default=str)
+
+
+class PostgresRAGCacheHandler(Handler):
+    """Semantic cache of RAG responses.
+
+    A response is served for a new query when a cached query is at least
+    `similarity_threshold` similar to it, was searched with the same
+    filters and settings, and answered by the same model. Queries are
+    stored as `halfvec`, which HNSW indexes up to 4000 dimensions. Entries are
+    keyed by the collections and owners that bound their filters, and a
+    trigger on the chunks table deletes them as soon as chunks of those
+    collections or owners are inserted, updated or deleted. Entries with
+    unbounded filters are deleted by any change. A response is only stored
+    if the versions of its collections and owners did not change while it
+    was generated, as the trigger can't delete entries stored after it.
+    """
+
+    TABLE_NAME = "rag_cache"
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+        dimension: int | float,
+        settings: RAGCacheSettings,
+    ):
+        super().__init__(project_name, connection_manager)
+        self.dimension = dimension
+        self.settings = settings
+        self.versions_handler = PostgresScopeVersionsHandler(
+            project_name, connection_manager
+        )
+
+    async def create_tables(self):
+        await self.versions_handler.create_tables()
+        table_name = self._get_table_name(PostgresRAGCacheHandler.TABLE_NAME)
+        chunks_table_name = self._get_table_name(
+            PostgresChunksHandler.TABLE_NAME
+        )
+        function_name = self._get_table_name("invalidate_rag_cache")
+        index_name = f"idx_{self.project_name}_{PostgresRAGCacheHandler.TABLE_NAME}_query_embedding"
+        dimension = "" if math.isnan(self.dimension) else f"({self.dimension})"
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id UUID PRIMARY KEY,
+            query_embedding halfvec{dimension} NOT NULL,
+            filters_key TEXT NOT NULL,
+            settings_key TEXT NOT NULL,
+            model TEXT NOT NULL,
+            collection_ids UUID[],
+            owner_ids UUID[],
+            response JSONB NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresRAGCacheHandler.TABLE_NAME}_key
+        ON {table_name} (filters_key, settings_key, model);
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresRAGCacheHandler.TABLE_NAME}_collection_ids
+        ON {table_name} USING GIN (collection_ids);
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresRAGCacheHandler.TABLE_NAME}_owner_ids
+        ON {table_name} USING GIN (owner_ids);
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresRAGCacheHandler.TABLE_NAME}_created_at
+        ON {table_name} (created_at);
+
+        CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                DELETE FROM {table_name}
+                WHERE (collection_ids IS NULL AND owner_ids IS NULL)
+                OR collection_ids && (
+                    SELECT array_agg(DISTINCT c)
+                    FROM new_rows, unnest(new_rows.collection_ids) c
+                )
+                OR owner_ids && (SELECT array_agg(DISTINCT owner_id) FROM new_rows);
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {table_name}
+                WHERE (collection_ids IS NULL AND owner_ids IS NULL)
+                OR collection_ids && (
+                    SELECT array_agg(DISTINCT c)
+                    FROM old_rows, unnest(old_rows.collection_ids) c
+                )
+                OR owner_ids && (SELECT array_agg(DISTINCT owner_id) FROM old_rows);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS invalidate_rag_cache_insert ON {chunks_table_name};
+        CREATE TRIGGER invalidate_rag_cache_insert
+        AFTER INSERT ON {chunks_table_name}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+
+        DROP TRIGGER IF EXISTS invalidate_rag_cache_update ON {chunks_table_name};
+        CREATE TRIGGER invalidate_rag_cache_update
+        AFTER UPDATE ON {chunks_table_name}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+
+        DROP TRIGGER IF EXISTS invalidate_rag_cache_delete ON {chunks_table_name};
+        CREATE TRIGGER invalidate_rag_cache_delete
+        AFTER DELETE ON {chunks_table_name}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+        """
+        await self.connection_manager.execute_query(query)
+
+        # Caches created with `vector` queries are converted, with their
+        # index, which can't index `halfvec`
+        column_type = await self.connection_manager.fetchrow_query(
+            """
+            SELECT format_type(atttypid, atttypmod) AS column_type
+            FROM pg_attribute
+            WHERE attrelid = $1::regclass AND attname = 'query_embedding'
+            """,
+            [table_name],
+        )
+        if column_type["column_type"].startswith("vector"):
+            await self.connection_manager.execute_query(f"""
+                DROP INDEX IF EXISTS {self._get_table_name(index_name)};
+                ALTER TABLE {table_name}
+                ALTER COLUMN query_embedding TYPE halfvec{dimension}
+                USING query_embedding::halfvec{dimension};
+                """)
+
+        if (
+            not math.isnan(self.dimension)
+            and self.dimension
+            <= MAX_INDEX_DIMENSIONS[VectorQuantizationType.FP16]
+        ):
+            await self.connection_manager.execute_query(f"""
+                CREATE INDEX IF NOT EXISTS {index_name}
+                ON {table_name} USING hnsw (query_embedding halfvec_cosine_ops);
+                """)
+
+    async def get_response(
+        self,
+        query_embedding: list[float],
+        filters: dict[str, Any],
+        settings_key: str,
+        model: str,
+    ) -> Optional[tuple[dict, float]]:
+        """Returns the cached response of the most similar query, and its
+        similarity, if it is similar enough."""
+        query = f"""
+        SELECT response, 1 - (query_embedding <=> $1) AS similarity
+        FROM {self._get_table_name(PostgresRAGCacheHandler.TABLE_NAME)}
+        WHERE filters_key = $2
+        AND settings_key = $3
+        AND model = $4
+        AND created_at > NOW() - make_interval(secs => $5)
+        ORDER BY query_embedding <=> $1
+        LIMIT 1
+        """
+        result = await self.connection_manager.fetchrow_query(
+            query,
+            [
+                query_embedding,
+                filters_key(filters),
+                settings_key,
+                model,
+                self.settings.ttl_seconds,
+            ],
+        )
+        if (
+            result is None
+            or result["similarity"] < self.settings.similarity_threshold
+        ):
+            return None
+        return json.loads(result["response"]), result["similarity"]
+
+    async def scope_versions(
+        self, filters: dict[str, Any]
+    ) -> list[tuple[str, int]]:
+        """The versions of the collections and owners that bound `filters`,
+        to be read before searching and passed to `store_response`."""
+        return await self.versions_handler.get_versions(
+            PostgresScopeVersionsHandler.scope_ids(search_scope(filters))
+        )
+
+    async def store_response(
+        self,
+        query_embedding: list[float],
+        filters: dict[str, Any],
+        settings_key: str,
+        model: str,
+        response: dict,
+        versions: list[tuple[str, int]],
+    ) -> Optional[UUID]:
+        """Stores `response` unless the `versions` read before it was
+        generated changed since, and returns its ID."""
+        scope = search_scope(filters)
+        collection_ids, owner_ids = (
+            (list(scope[0]), list(scope[1]))
+            if scope is not None
+            else (None, None)
+        )
+        query = f"""
+        INSERT INTO {self._get_table_name(PostgresRAGCacheHandler.TABLE_NAME)}
+        (id, query_embedding, filters_key, settings_key, model, collection_ids, owner_ids, response)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        """
+        entry_id = uuid4()
+        async with (
+            self.connection_manager.pool.get_connection() as conn  # type: ignore
+        ):
+            async with conn.transaction():
+                # Later changes to the collections and owners wait for the
+                # entry to be stored, and their trigger then deletes it
+                current_versions = await self.versions_handler.get_versions(
+                    PostgresScopeVersionsHandler.scope_ids(scope), conn
+                )
+                if current_versions != versions:
+                    return None
+                await conn.execute(
+                    query,
+                    entry_id,
+                    query_embedding,
+                    filters_key(filters),
+                    settings_key,
+                    model,
+                    collection_ids,
+                    owner_ids,
+                    json.dumps(response, default=str),
+                )
+        return entry_id
+
+    async def clean_expired_responses(self) -> None:
+        query = f"""
+        DELETE FROM {self._get_table_name(PostgresRAGCacheHandler.TABLE_NAME)}
+        WHERE created_at <= NOW() - make_interval(secs => $1)
+        """
+        await self.connection_manager.execute_query(
+            query, [self.settings.ttl_seconds]
+        )
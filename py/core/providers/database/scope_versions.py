@@ -0,0 +1,216 @@
+from typing import Optional
+from uuid import UUID
+
+from core.base import Handler
+
+from .base import PostgresConnectionManager
+from .chunks import PostgresChunksHandler
+
+# Scope of the searches that are not bounded by collections or owners. Its
+# version is the sum of all versions, so that it changes with every change
+# without all writers updating one row; rows without a scope bump it directly
+GLOBAL_SCOPE = UUID(int=0)
+
+
+class PostgresScopeVersionsHandler(Handler):
+    """Versions of the collections and owners that bound searches.
+
+    Triggers on the chunk and graph tables bump the versions of the
+    collections and owners of the rows they insert, update or delete, like
+    on ingestion, collection assignment and chunk updates or deletions.
+    Caches key their entries by these versions, or check that they did not
+    change while an entry was computed.
+    """
+
+    TABLE_NAME = "search_scope_versions"
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+    ):
+        super().__init__(project_name, connection_manager)
+
+    def _bump_versions_function(
+        self, name: str, rows_scope_ids: str
+    ) -> tuple[str, str]:
+        """A trigger function bumping the versions of the scope IDs selected
+        by `rows_scope_ids` from the `new_rows` and `old_rows` transition
+        tables, or of the global scope for rows without one."""
+        function_name = self._get_table_name(name)
+        versions_table_name = self._get_table_name(
+            PostgresScopeVersionsHandler.TABLE_NAME
+        )
+
+        def bump(rows: str) -> str:
+            # Versions are locked in order, so that concurrent writers
+            # don't deadlock
+            return f"""
+                INSERT INTO {versions_table_name} AS v (scope_id, version)
+                SELECT DISTINCT COALESCE(scope_id, '{GLOBAL_SCOPE}'::uuid), 1
+                FROM ({rows_scope_ids.format(rows=rows)}) scope_ids (scope_id)
+                ORDER BY 1
+                ON CONFLICT (scope_id) DO UPDATE SET version = v.version + 1;
+            """
+
+        return (
+            function_name,
+            f"""
+            CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    {bump("new_rows")}
+                ELSIF TG_OP = 'UPDATE' THEN
+                    {bump("(SELECT * FROM new_rows UNION ALL SELECT * FROM old_rows)")}
+                ELSE
+                    {bump("old_rows")}
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+        )
+
+    def _version_triggers(self, table: str, function_name: str) -> str:
+        table_name = self._get_table_name(table)
+        return f"""
+        DROP TRIGGER IF EXISTS bump_search_versions_insert ON {table_name};
+        CREATE TRIGGER bump_search_versions_insert
+        AFTER INSERT ON {table_name}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+
+        DROP TRIGGER IF EXISTS bump_search_versions_update ON {table_name};
+        CREATE TRIGGER bump_search_versions_update
+        AFTER UPDATE ON {table_name}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+
+        DROP TRIGGER IF EXISTS bump_search_versions_delete ON {table_name};
+        CREATE TRIGGER bump_search_versions_delete
+        AFTER DELETE ON {table_name}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+        """
+
+    async def create_tables(self):
+        # Versions must survive a crash: resetting them would let the keys
+        # of stale entries be computed again
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self._get_table_name(PostgresScopeVersionsHandler.TABLE_NAME)} (
+            scope_id UUID PRIMARY KEY,
+            version BIGINT NOT NULL
+        );
+        """
+
+        # Chunks are scoped by their collections and owner, graph elements
+        # by the collection of their graph
+        chunks_function, chunks_function_query = self._bump_versions_function(
+            "bump_chunk_search_versions",
+            """
+            SELECT DISTINCT unnest(collection_ids) FROM {rows} chunk_rows
+            UNION
+            SELECT DISTINCT owner_id FROM {rows} chunk_rows
+            """,
+        )
+        query += chunks_function_query + self._version_triggers(
+            PostgresChunksHandler.TABLE_NAME, chunks_function
+        )
+        graph_function, graph_function_query = self._bump_versions_function(
+            "bump_graph_search_versions",
+            "SELECT DISTINCT parent_id FROM {rows} graph_rows",
+        )
+        query += graph_function_query
+        for table in ("graphs_entities", "graphs_relationships"):
+            query += self._version_triggers(table, graph_function)
+        (
+            communities_function,
+            communities_function_query,
+        ) = self._bump_versions_function(
+            "bump_community_search_versions",
+            "SELECT DISTINCT collection_id FROM {rows} community_rows",
+        )
+        query += communities_function_query + self._version_triggers(
+            "graphs_communities", communities_function
+        )
+        await self.connection_manager.execute_query(query)
+
+    @staticmethod
+    def scope_ids(
+        scope: Optional[tuple[set[UUID], set[UUID]]],
+        graph_search: bool = False,
+    ) -> set[UUID]:
+        """The IDs whose versions a search bounded by `scope`, the
+        collection and owner IDs of its filters, depends on."""
+        if scope is None:
+            return {GLOBAL_SCOPE}
+        scope_ids = scope[0] | scope[1]
+        # Graph elements have no owner, so searches of the graph that
+        # aren't bounded by collections depend on every change
+        if graph_search and not scope[0]:
+            scope_ids.add(GLOBAL_SCOPE)
+        return scope_ids
+
+    async def get_versions(
+        self, scope_ids: set[UUID], conn=None
+    ) -> list[tuple[str, int]]:
+        """The current versions of `scope_ids`, sorted by ID.
+
+        With a connection `conn` in a transaction, the versions of the
+        collections and owners are locked until it ends, so that they can't
+        change before it commits.
+        """
+        versions_table_name = self._get_table_name(
+            PostgresScopeVersionsHandler.TABLE_NAME
+        )
+        scoped_ids = sorted(scope_ids - {GLOBAL_SCOPE})
+        if conn is None:
+            rows = await self.connection_manager.fetch_query(
+                f"""
+                SELECT scope_id, version
+                FROM {versions_table_name}
+                WHERE scope_id = ANY($1)
+                UNION ALL
+                SELECT $2, COALESCE(SUM(version), 0)::bigint
+                FROM {versions_table_name}
+                WHERE $3
+                """,
+                [scoped_ids, GLOBAL_SCOPE, GLOBAL_SCOPE in scope_ids],
+            )
+        else:
+            # Missing versions are added, so that writers adding them wait
+            # for the transaction too
+            await conn.execute(
+                f"""
+                INSERT INTO {versions_table_name} (scope_id, version)
+                SELECT unnest($1::uuid[]), 0
+                ON CONFLICT (scope_id) DO NOTHING
+                """,
+                scoped_ids,
+            )
+            rows = await conn.fetch(
+                f"""
+                SELECT scope_id, version
+                FROM {versions_table_name}
+                WHERE scope_id = ANY($1)
+                ORDER BY scope_id
+                FOR SHARE
+                """,
+                scoped_ids,
+            )
+            if GLOBAL_SCOPE in scope_ids:
+                rows.append(
+                    await conn.fetchrow(
+                        f"""
+                        SELECT $1::uuid AS scope_id,
+                        COALESCE(SUM(version), 0)::bigint AS version
+                        FROM {versions_table_name}
+                        """,
+                        GLOBAL_SCOPE,
+                    )
+                )
+        versions = {row["scope_id"]: row["version"] for row in rows}
+        return sorted(
+            (str(scope_id), versions.get(scope_id, 0))
+            for scope_id in scope_ids
+        )
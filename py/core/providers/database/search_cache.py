@@ -0,0 +1,153 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.base import Handler, SearchCacheSettings
+
+from .base import PostgresConnectionManager
+from .rag_cache import filters_key, search_scope
+from .scope_versions import PostgresScopeVersionsHandler
+
+
+class InMemorySearchCache:
+    """A per-process LRU cache whose entries expire after `ttl_seconds`."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    async def set(self, key: str, results: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class PostgresSearchCacheHandler(Handler):
+    """Exact-match cache of search results.
+
+    Results are keyed by the query, the search settings, the filters and
+    the current versions of the collections and owners that bound the
+    filters, which change whenever their chunks or graph elements do, so
+    the key of a stale entry is never computed again and the entry ages out
+    of the cache.
+
+    Results are cached in each process with the "memory" backend, or shared
+    between processes through an unlogged table with the "postgres" backend.
+    """
+
+    TABLE_NAME = "search_cache"
+
+    def __init__(
+        self,
+        project_name: str,
+        connection_manager: PostgresConnectionManager,
+        settings: SearchCacheSettings,
+    ):
+        super().__init__(project_name, connection_manager)
+        self.settings = settings
+        self.memory_cache: Optional[InMemorySearchCache] = (
+            InMemorySearchCache(settings.max_size, settings.ttl_seconds)
+            if settings.backend == "memory"
+            else None
+        )
+        self.versions_handler = PostgresScopeVersionsHandler(
+            project_name, connection_manager
+        )
+
+    async def create_tables(self):
+        await self.versions_handler.create_tables()
+        if self.settings.backend != "postgres":
+            return
+        query = f"""
+        CREATE UNLOGGED TABLE IF NOT EXISTS {self._get_table_name(PostgresSearchCacheHandler.TABLE_NAME)} (
+            key TEXT PRIMARY KEY,
+            results JSONB NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        CREATE INDEX IF NOT EXISTS idx_{self.project_name}_{PostgresSearchCacheHandler.TABLE_NAME}_created_at
+        ON {self._get_table_name(PostgresSearchCacheHandler.TABLE_NAME)} (created_at);
+        """
+        await self.connection_manager.execute_query(query)
+
+    async def search_key(
+        self,
+        query: str,
+        filters: dict,
+        settings_key: str,
+        graph_search: bool = False,
+    ) -> str:
+        """The cache key of a search, under the current versions of the
+        collections and owners that bound its filters.
+
+        The key must be computed before searching, so that results of a
+        search that raced with a change are stored under the old versions.
+        """
+        scope_ids = PostgresScopeVersionsHandler.scope_ids(
+            search_scope(filters), graph_search
+        )
+        versions = await self.versions_handler.get_versions(scope_ids)
+        key = {
+            "query": query,
+            "settings": settings_key,
+            "filters": filters_key(filters),
+            "versions": versions,
+        }
+        return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        if self.memory_cache is not None:
+            return await self.memory_cache.get(key)
+        query = f"""
+        SELECT results
+        FROM {self._get_table_name(PostgresSearchCacheHandler.TABLE_NAME)}
+        WHERE key = $1
+        AND created_at > NOW() - make_interval(secs => $2)
+        """
+        result = await self.connection_manager.fetchrow_query(
+            query, [key, self.settings.ttl_seconds]
+        )
+        return json.loads(result["results"]) if result else None
+
+    async def set(self, key: str, results: dict) -> None:
+        if self.memory_cache is not None:
+            await self.memory_cache.set(key, results)
+            return
+        query = f"""
+        INSERT INTO {self._get_table_name(PostgresSearchCacheHandler.TABLE_NAME)} (key, results)
+        VALUES ($1, $2)
+        ON CONFLICT (key) DO UPDATE SET
+        results = EXCLUDED.results,
+        created_at = NOW()
+        """
+        await self.connection_manager.execute_query(
+            query, [key, json.dumps(results, default=str)]
+        )
+
+    async def clean_expired_results(self) -> None:
+        if self.settings.backend != "postgres":
+            return
+        query = f"""
+        DELETE FROM {self._get_table_name(PostgresSearchCacheHandler.TABLE_NAME)}
+        WHERE created_at <= NOW() - make_interval(secs => $1)
+        """
+        await self.connection_manager.execute_query(
+            query, [self.settings.ttl_seconds]
+        )
@@ -0,0 +1,201 @@
+"""Binary asyncpg codecs for the pgvector column types.
+
+By default asyncpg exchanges `vector`, `halfvec` and `sparsevec` values in
+their text representation (e.g. "[0.1, 0.2, ...]"), which means every vector
+is formatted and parsed as decimal text in Python. The codecs registered here
+use pgvector's binary send/receive format instead:
+
+    vector     int16 dim, int16 unused, float32[dim]           (big-endian)
+    halfvec    int16 dim, int16 unused, float16[dim]           (big-endian)
+    sparsevec  int32 dim, int32 nnz, int32 unused,
+               int32[nnz] indices, float32[nnz] values         (big-endian)
+    bit        int32 bit length, packed bits (most significant bit first)
+
+Encoders accept NumPy arrays, lists/tuples of numbers and, for backwards
+compatibility, the pgvector text literal. Decoders return NumPy arrays; use
+`vector_to_list` when a plain list is needed (e.g. for API models).
+"""
+
+import json
+import logging
+import struct
+from typing import Any, Optional
+
+import asyncpg
+import numpy as np
+
+logger = logging.getLogger()
+
+_DENSE_HEADER = struct.Struct(">HH")
+_SPARSE_HEADER = struct.Struct(">iii")
+_BIT_HEADER = struct.Struct(">i")
+
+_FLOAT32_BE = np.dtype(">f4")
+_FLOAT16_BE = np.dtype(">f2")
+_INT32_BE = np.dtype(">i4")
+
+
+def _parse_vector_literal(value: str) -> list[float]:
+    """Parse the pgvector text literal, e.g. "[0.1,0.2,0.3]"."""
+    value = value.strip()
+    if not (value.startswith("[") and value.endswith("]")):
+        raise ValueError(f"Invalid vector literal: {value[:32]!r}")
+    return json.loads(value)
+
+
+def _as_dense_array(value: Any, dtype: np.dtype) -> np.ndarray:
+    if isinstance(value, str):
+        value = _parse_vector_literal(value)
+    array = np.asarray(value, dtype=dtype)
+    if array.ndim != 1:
+        raise ValueError(
+            f"Expected a one-dimensional vector, got shape {array.shape}"
+        )
+    return array
+
+
+def encode_vector(value: Any) -> bytes:
+    array = _as_dense_array(value, _FLOAT32_BE)
+    return _DENSE_HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    dim, _ = _DENSE_HEADER.unpack_from(data)
+    return np.frombuffer(
+        data, dtype=_FLOAT32_BE, count=dim, offset=_DENSE_HEADER.size
+    ).astype(np.float32)
+
+
+def encode_halfvec(value: Any) -> bytes:
+    array = _as_dense_array(value, _FLOAT16_BE)
+    return _DENSE_HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+
+def decode_halfvec(data: bytes) -> np.ndarray:
+    dim, _ = _DENSE_HEADER.unpack_from(data)
+    return np.frombuffer(
+        data, dtype=_FLOAT16_BE, count=dim, offset=_DENSE_HEADER.size
+    ).astype(np.float32)
+
+
+def encode_bit(value: Any) -> bytes:
+    """Encode a bit string.
+
+    Accepts a sequence or array of booleans, or a string / ASCII bytes of
+    '0' and '1' characters.
+    """
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    if isinstance(value, (bytes, bytearray)):
+        bits = np.frombuffer(value, dtype=np.uint8) == ord("1")
+    else:
+        bits = np.asarray(value, dtype=bool)
+    return _BIT_HEADER.pack(bits.shape[0]) + np.packbits(bits).tobytes()
+
+
+def decode_bit(data: bytes) -> np.ndarray:
+    (length,) = _BIT_HEADER.unpack_from(data)
+    packed = np.frombuffer(data, dtype=np.uint8, offset=_BIT_HEADER.size)
+    return np.unpackbits(packed, count=length).astype(bool)
+
+
+def _parse_sparsevec_literal(value: str) -> tuple[int, np.ndarray, np.ndarray]:
+    """Parse the sparsevec text literal, e.g. "{1:0.5,3:0.25}/5".
+
+    Indices in the text format are 1-based.
+    """
+    body, dim = value.strip().rsplit("/", 1)
+    items = [item for item in body.strip("{}").split(",") if item]
+    indices = np.array(
+        [int(item.split(":")[0]) - 1 for item in items], dtype=_INT32_BE
+    )
+    values = np.array(
+        [float(item.split(":")[1]) for item in items], dtype=_FLOAT32_BE
+    )
+    return int(dim), indices, values
+
+
+def encode_sparsevec(value: Any) -> bytes:
+    """Encode a sparse vector from its dense form or its text literal."""
+    if isinstance(value, str):
+        dim, indices, values = _parse_sparsevec_literal(value)
+    else:
+        dense = _as_dense_array(value, _FLOAT32_BE)
+        dim = dense.shape[0]
+        nonzero = np.flatnonzero(dense)
+        indices = nonzero.astype(_INT32_BE)
+        values = dense[nonzero]
+    return (
+        _SPARSE_HEADER.pack(dim, indices.shape[0], 0)
+        + indices.tobytes()
+        + values.tobytes()
+    )
+
+
+def decode_sparsevec(data: bytes) -> np.ndarray:
+    """Decode a sparse vector into its dense float32 form."""
+    dim, nnz, _ = _SPARSE_HEADER.unpack_from(data)
+    offset = _SPARSE_HEADER.size
+    indices = np.frombuffer(data, dtype=_INT32_BE, count=nnz, offset=offset)
+    values = np.frombuffer(
+        data, dtype=_FLOAT32_BE, count=nnz, offset=offset + 4 * nnz
+    )
+    dense = np.zeros(dim, dtype=np.float32)
+    dense[indices] = values
+    return dense
+
+
+VECTOR_CODECS = {
+    "vector": (encode_vector, decode_vector),
+    "halfvec": (encode_halfvec, decode_halfvec),
+    "sparsevec": (encode_sparsevec, decode_sparsevec),
+    "bit": (encode_bit, decode_bit),
+}
+
+
+async def register_vector_codecs(conn: asyncpg.Connection) -> None:
+    """Register the binary codecs on a connection.
+
+    Used as the `init` callback of the connection pool. Types that do not
+    exist yet (e.g. before `CREATE EXTENSION vector` has run) are skipped;
+    the pool is expected to recycle its connections once the extension has
+    been created.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT t.typname, n.nspname
+        FROM pg_type t
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE t.typname = ANY($1::text[])
+        """,
+        list(VECTOR_CODECS),
+    )
+    for row in rows:
+        encoder, decoder = VECTOR_CODECS[row["typname"]]
+        await conn.set_type_codec(
+            row["typname"],
+            schema=row["nspname"],
+            encoder=encoder,
+            decoder=decoder,
+            format="binary",
+        )
+
+    if not any(row["typname"] == "vector" for row in rows):
+        logger.debug(
+            "pgvector types not found, vector codecs will be registered on reconnect."
+        )
+
+
+def vector_to_list(value: Any) -> Optional[list[float]]:
+    """Convert a vector column value into a list of floats.
+
+    Handles the NumPy arrays produced by the binary codecs as well as the
+    text literal returned by connections without the codecs registered.
+    """
+    if value is None:
+        return None
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, str):
+        return _parse_vector_literal(value)
+    return list(value)
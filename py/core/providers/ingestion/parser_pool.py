@@ -0,0 +1,188 @@
+"""Worker processes for CPU-bound parsers.
+
+Parsers like `BasicPDFParser` spend most of a document in pure Python, which
+holds the event loop of the server, and the searches it serves, for as long
+as the document takes. A `ParserPool` runs their `extract` in worker
+processes instead, and streams the texts they yield back as they come.
+
+Each worker parses one document at a time, within a memory limit, and is
+killed once parsing the document takes longer than its time limit. Texts are
+buffered until they are consumed, so a slow consumer neither holds a worker
+nor counts toward the time limit. Workers are replaced after a number of
+documents, so that memory a parser leaks or fragments is given back.
+"""
+
+import asyncio
+import multiprocessing
+import signal
+import sys
+from multiprocessing.connection import Connection
+from typing import Any, AsyncGenerator, Optional
+
+from core.base import AsyncParser, ParserPoolSettings
+
+if sys.platform != "win32":
+    import resource
+
+
+def _run_worker(conn: Connection, max_memory_mb: Optional[int]) -> None:
+    # The server handles interrupts, and stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if max_memory_mb and sys.platform != "win32":
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        parser_cls, data, kwargs = task
+        try:
+            for text in parser_cls.extract(data, **kwargs):
+                conn.send(("text", text))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # The exception can't be pickled
+                conn.send(("error", RuntimeError(repr(e))))
+        else:
+            conn.send(("done", None))
+
+
+class _Worker:
+    def __init__(self, context, max_memory_mb: Optional[int]):
+        self.conn, self._child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_run_worker,
+            args=(self._child_conn, max_memory_mb),
+            daemon=True,
+        )
+        self.tasks = 0
+
+    def start(self) -> None:
+        self.process.start()
+        # Only the worker holds its end, so its exit ends the pipe
+        self._child_conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.conn.close()
+
+
+class ParserPool:
+    """Runs the `extract` of CPU-bound parsers in worker processes."""
+
+    def __init__(self, settings: ParserPoolSettings):
+        self.settings = settings
+        self._semaphore = asyncio.Semaphore(settings.max_workers)
+        self._idle: list[_Worker] = []
+        self._context: Any = None
+
+    def _get_context(self):
+        if self._context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                # Workers are forked from a server that has already imported
+                # the parsers, instead of from this process and its threads
+                self._context = multiprocessing.get_context("forkserver")
+                self._context.set_forkserver_preload(["core.parsers"])
+            else:
+                self._context = multiprocessing.get_context("spawn")
+        return self._context
+
+    async def _start_worker(self) -> _Worker:
+        worker = _Worker(self._get_context(), self.settings.max_memory_mb)
+        await asyncio.to_thread(worker.start)
+        return worker
+
+    async def _parse(
+        self,
+        parser_cls: type[AsyncParser],
+        data: Any,
+        kwargs: dict,
+        texts: asyncio.Queue,
+    ) -> None:
+        """Puts the messages of a worker parsing `data` in `texts`, which
+        frees the worker as soon as it is done parsing."""
+        async with self._semaphore:
+            worker = self._idle.pop() if self._idle else None
+            if worker is None or not worker.process.is_alive():
+                worker = await self._start_worker()
+
+            reusable = False
+            try:
+                await asyncio.to_thread(
+                    worker.conn.send, (parser_cls, data, kwargs)
+                )
+                worker.tasks += 1
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.settings.task_timeout_seconds
+                while True:
+                    try:
+                        kind, value = await asyncio.wait_for(
+                            asyncio.to_thread(worker.conn.recv),
+                            deadline - loop.time(),
+                        )
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(
+                            f"Parsing with {parser_cls.__name__} took longer "
+                            f"than {self.settings.task_timeout_seconds} seconds"
+                        ) from None
+                    except EOFError:
+                        raise RuntimeError(
+                            f"The worker parsing with {parser_cls.__name__} "
+                            f"exited with code {worker.process.exitcode}, it "
+                            "may have run out of memory"
+                        ) from None
+
+                    texts.put_nowait((kind, value))
+                    if kind == "error":
+                        reusable = not isinstance(value, MemoryError)
+                        return
+                    if kind == "done":
+                        reusable = True
+                        return
+            except Exception as e:
+                texts.put_nowait(("error", e))
+            finally:
+                # A worker is only given another document once it's done
+                # with this one
+                if (
+                    reusable
+                    and worker.tasks < self.settings.max_tasks_per_worker
+                ):
+                    self._idle.append(worker)
+                else:
+                    worker.kill()
+
+    async def extract(
+        self,
+        parser_cls: type[AsyncParser],
+        data: Any,
+        kwargs: dict,
+    ) -> AsyncGenerator[str, None]:
+        """Yields the texts `parser_cls.extract(data, **kwargs)` yields in a
+        worker, as the worker produces them."""
+        texts: asyncio.Queue = asyncio.Queue()
+        parsing = asyncio.create_task(
+            self._parse(parser_cls, data, kwargs, texts)
+        )
+        try:
+            while True:
+                kind, value = await texts.get()
+                if kind == "text":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            # The consumer stopped early, the worker is stopped with it
+            if not parsing.done():
+                parsing.cancel()
+                await asyncio.gather(parsing, return_exceptions=True)
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().kill()
@@ -23,7 +23,9 @@ from core.providers.llm import (
     R2RCompletionProvider,
 )
 from core.providers.ocr import MistralOCRProvider
-from core.utils import generate_extraction_id
+from core.utils import generate_extraction_id, iterate_async
+
+from ..parser_pool import ParserPool
 
 logger = logging.getLogger()
 
@@ -115,6 +117,11 @@ class R2RIngestionProvider(IngestionProvider):
         ) = llm_provider
         self.ocr_provider: MistralOCRProvider = ocr_provider
         self.parsers: dict[DocumentType, AsyncParser] = {}
+        self.parser_pool = (
+            ParserPool(config.parser_pool)
+            if config.parser_pool.max_workers > 0
+            else None
+        )
         self.text_splitter = self._build_text_splitter()
         self._initialize_parsers()
 
@@ -385,21 +392,22 @@ class R2RIngestionProvider(IngestionProvider):
                         return
 
             else:
-                # Standard parsing for non-override cases
-                async for text in self.parsers[document.document_type].ingest(
-                    file_content, **ingestion_config_override
-                ):
-                    if text is not None:
-                        contents.append({"content": text})
-
-            if not contents:
-                logging.warning(
-                    "No valid text content was extracted during parsing"
+                # Standard parsing for non-override cases, chunked as the
+                # parser yields its texts
+                contents = (
+                    {"content": text}
+                    async for text in self._ingest(
+                        self.parsers[document.document_type],
+                        file_content,
+                        ingestion_config_override,
+                    )
+                    if text is not None
                 )
-                return
 
             iteration = 0
-            for content_item in contents:
+            has_content = False
+            async for content_item in iterate_async(contents):
+                has_content = True
                 chunk_text = content_item["content"]
                 chunks = self.chunk(chunk_text, ingestion_config_override)
 
@@ -419,11 +427,31 @@ class R2RIngestionProvider(IngestionProvider):
                     iteration += 1
                     yield extraction
 
+            if not has_content:
+                logging.warning(
+                    "No valid text content was extracted during parsing"
+                )
+                return
+
             logger.debug(
                 f"Parsed document with id={document.id}, title={document.metadata.get('title', None)}, "
                 f"user_id={document.metadata.get('user_id', None)}, metadata={document.metadata} "
                 f"into {iteration} extractions in t={time.time() - t0:.2f} seconds."
             )
 
+    def _ingest(
+        self, parser: AsyncParser, data: bytes, kwargs: dict
+    ) -> AsyncGenerator[str, None]:
+        """Runs a CPU-bound parser in the parser pool, and any other parser
+        in this process."""
+        if parser.cpu_bound and self.parser_pool is not None:
+            return self.parser_pool.extract(type(parser), data, kwargs)
+        return parser.ingest(data, **kwargs)
+
     def get_parser_for_document_type(self, doc_type: DocumentType) -> Any:
         return self.parsers.get(doc_type)
+
+    def close(self) -> None:
+        # Stops the idle parser workers
+        if self.parser_pool is not None:
+            self.parser_pool.close()
@@ -1,9 +1,18 @@
 import re
-from typing import Set, Tuple
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Iterable,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 from shared.utils.base_utils import (
+    PackedContext,
     SearchResultsCollector,
     SSEFormatter,
+    SSEWriter,
     convert_nonserializable_objects,
     deep_update,
     dump_collector,
@@ -16,6 +25,7 @@ from shared.utils.base_utils import (
     generate_user_id,
     num_tokens,
     num_tokens_from_messages,
+    pack_search_results_for_llm,
     update_settings_from_dict,
     validate_uuid,
     yield_sse_event,
@@ -209,8 +219,89 @@ def find_new_citation_spans(
     return new_spans
 
 
+class CitationScanner:
+    """
+    Finds new citation spans in streamed text, scanning each part of the
+    text once.
+
+    `scan` is called with the text accumulated so far. It only looks at the
+    text after its cursor, which stays at the opening bracket of a citation
+    that may be completed by the next delta. Spans are positions in the
+    accumulated text and go through the tracker, as with
+    `find_new_citation_spans`.
+    """
+
+    CITATION_PATTERN = re.compile(r"\[([A-Za-z0-9]{7,8})\]")
+    PARTIAL_CITATION_PATTERN = re.compile(r"\[[A-Za-z0-9]{0,8}")
+    MAX_CITATION_LENGTH = len("[12345678]")
+
+    def __init__(self, tracker: CitationTracker):
+        self.tracker = tracker
+        self._cursor = 0
+
+    def scan(self, text: str) -> dict[str, list[Tuple[int, int]]]:
+        """
+        Extract the new citation spans of the text after the cursor.
+
+        Args:
+            text: The accumulated text, of which previous scans saw a prefix.
+
+        Returns:
+            Dictionary of citation IDs to lists of new (start, end) spans
+            that haven't been processed by the tracker yet.
+        """
+        if not text:
+            return {}
+
+        new_spans: dict = {}
+        scanned_until = self._cursor
+        for match in self.CITATION_PATTERN.finditer(text, self._cursor):
+            cid = match.group(1)
+            span = (match.start(), match.end())
+            if self.tracker.is_new_span(cid, span):
+                new_spans.setdefault(cid, []).append(span)
+            scanned_until = match.end()
+
+        # Keep an unfinished citation at the end of the text for the next scan
+        tail = max(scanned_until, len(text) - self.MAX_CITATION_LENGTH + 1)
+        bracket = text.rfind("[", tail)
+        if bracket != -1 and self.PARTIAL_CITATION_PATTERN.fullmatch(
+            text, bracket
+        ):
+            self._cursor = bracket
+        else:
+            self._cursor = len(text)
+        return new_spans
+
+    def reset(self) -> None:
+        """
+        Start scanning from the beginning, for a new accumulated text.
+        """
+        self._cursor = 0
+
+
+T = TypeVar("T")
+
+
+async def iterate_async(
+    items: Iterable[T] | AsyncIterable[T],
+) -> AsyncGenerator[T, None]:
+    """
+    Iterate over `items` with `async for`, whether they are a plain or an
+    async iterable.
+    """
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
 __all__ = [
     "format_search_results_for_llm",
+    "pack_search_results_for_llm",
+    "PackedContext",
     "generate_id",
     "generate_document_id",
     "generate_extraction_id",
@@ -224,6 +315,7 @@ __all__ = [
     "num_tokens",
     "num_tokens_from_messages",
     "SSEFormatter",
+    "SSEWriter",
     "SearchResultsCollector",
     "update_settings_from_dict",
     "deep_update",
@@ -234,4 +326,6 @@ __all__ = [
     "extract_citation_spans",
     "CitationTracker",
     "find_new_citation_spans",
+    "CitationScanner",
+    "iterate_async",
 ]
@@ -0,0 +1,257 @@
+"""Lightweight latency tracing of request stages.
+
+A request opens a trace, and the code on its path times its stages with
+`span(...)`. The stage timings of a trace can be returned to the caller,
+and the traces of sampled requests are added to process-wide latency
+histograms, exported in the Prometheus text format by `render_prometheus`
+along with counters of other components.
+
+Spans outside of a trace cost a single context variable lookup, so the
+instrumentation can stay in place when tracing is disabled.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import AsyncGenerator, Iterator, Optional
+
+DEFAULT_HISTOGRAM_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+METRIC_NAME = "r2r_request_stage_duration_seconds"
+
+
+class Trace:
+    """Stage timings of a single request.
+
+    Stages that run several times, or concurrently, accumulate their
+    durations, so the stages of a request can add up to more than its total.
+    """
+
+    __slots__ = ("name", "sampled", "timings", "_start", "_end")
+
+    def __init__(self, name: str, sampled: bool):
+        self.name = name
+        self.sampled = sampled
+        self.timings: dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return (self._end or time.perf_counter()) - self._start
+
+    def as_dict(self) -> dict[str, float]:
+        """Stage timings in milliseconds, with the total so far."""
+        timings = {
+            stage: round(seconds * 1000, 3)
+            for stage, seconds in self.timings.items()
+        }
+        timings["total"] = round(self.total * 1000, 3)
+        return timings
+
+    def finish(self) -> None:
+        if self._end is not None:
+            return
+        self._end = time.perf_counter()
+        if self.sampled:
+            _histograms.observe(self.name, "total", self.total)
+            for stage, seconds in self.timings.items():
+                _histograms.observe(self.name, stage, seconds)
+
+
+class LatencyHistograms:
+    """Cumulative latency histograms keyed by request and stage."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_HISTOGRAM_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # (request, stage) => [bucket counts..., count, sum]
+        self._series: dict[tuple[str, str], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, request: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get((request, stage))
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[(request, stage)] = series
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        """The histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of request stages.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for (request, stage), values in series:
+            labels = f'request="{request}",stage="{stage}"'
+            for bound, count in zip(self.buckets, values, strict=False):
+                lines.append(
+                    f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {int(count)}'
+                )
+            lines.append(
+                f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {int(values[-2])}'
+            )
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {values[-1]}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {int(values[-2])}")
+        return "\n".join(lines) + "\n"
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar(
+    "current_trace", default=None
+)
+_histograms = LatencyHistograms()
+_enabled = False
+_sample_rate = 1.0
+_excluded_stages: frozenset[str] = frozenset()
+
+
+def configure_tracing(
+    enabled: bool = False,
+    sample_rate: float = 1.0,
+    histogram_buckets: Optional[list[float]] = None,
+    excluded_stages: Optional[list[str]] = None,
+) -> None:
+    """Sets up tracing for the process.
+
+    `sample_rate` is the fraction of requests that are traced into the
+    histograms. `excluded_stages` are not timed at all, to cut the overhead
+    of the most frequent spans, like `db.query`.
+    """
+    global _enabled, _sample_rate, _excluded_stages, _histograms
+    _enabled = enabled
+    _sample_rate = sample_rate
+    _excluded_stages = frozenset(excluded_stages or ())
+    _histograms = LatencyHistograms(
+        tuple(histogram_buckets or DEFAULT_HISTOGRAM_BUCKETS)
+    )
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def new_trace(name: str, force: bool = False) -> Optional[Trace]:
+    """Creates the trace of a request, if it is sampled or `force` is set,
+    like when the caller asked for the timings of the request."""
+    sampled = _enabled and random.random() < _sample_rate
+    if not sampled and not force:
+        return None
+    return Trace(name, sampled)
+
+
+@contextmanager
+def activate(trace: Optional[Trace], finish: bool = True) -> Iterator[None]:
+    """Makes `trace` the current trace, and finishes it on exit unless
+    `finish` is False, like when the request continues in a stream."""
+    if trace is None:
+        yield
+        return
+    token = _current_trace.set(trace)
+    try:
+        yield
+    finally:
+        # A stream that is closed from another task can't restore the
+        # context it was entered in, and doesn't need to
+        with suppress(ValueError):
+            _current_trace.reset(token)
+        if finish:
+            trace.finish()
+
+
+@contextmanager
+def start_trace(name: str, force: bool = False) -> Iterator[Optional[Trace]]:
+    """Traces a request.
+
+    Yields the new trace, or None when the request is not traced or is
+    part of an enclosing trace, which then collects its spans.
+    """
+    if _current_trace.get() is not None:
+        yield None
+        return
+    trace = new_trace(name, force=force)
+    with activate(trace):
+        yield trace
+
+
+async def traced_stream(
+    stream: AsyncGenerator, trace: Trace
+) -> AsyncGenerator:
+    """Runs `stream` in `trace`, and finishes the trace with it."""
+    with activate(trace):
+        async for item in stream:
+            yield item
+
+
+class span:
+    """Times a stage of the current trace, if there is one."""
+
+    __slots__ = ("stage", "_trace", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "span":
+        self._trace = _current_trace.get()
+        if self._trace is not None:
+            if self.stage in _excluded_stages:
+                self._trace = None
+            else:
+                self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._trace is not None:
+            self._trace.add(self.stage, time.perf_counter() - self._start)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Adds a duration measured by the caller to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None and stage not in _excluded_stages:
+        trace.add(stage, seconds)
+
+
+def render_counters(counters: dict[str, tuple[str, int]]) -> str:
+    """Counters, by name, with their help text, in the Prometheus text
+    exposition format."""
+    lines = []
+    for name, (help_text, value) in counters.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def render_prometheus(
+    counters: Optional[dict[str, tuple[str, int]]] = None,
+) -> str:
+    """The latency histograms, and the given counters."""
+    return _histograms.render() + render_counters(counters or {})
@@ -0,0 +1,73 @@
+"""add_chunks_fts_gin_index.
+
+Revision ID: 9b2e4c7d1a05
+Revises: 3efc7b3b1b3d
+Create Date: 2025-02-10 10:12:00.000000
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e4c7d1a05"
+down_revision: Union[str, None] = "3efc7b3b1b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+project_name = os.getenv("R2R_PROJECT_NAME", "r2r_default")
+
+
+def check_if_upgrade_needed():
+    """Check if the upgrade has already been applied."""
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if not inspector.has_table("chunks", schema=project_name):
+        print(
+            f"Migration not needed: '{project_name}.chunks' table doesn't exist"
+        )
+        return False
+
+    indexes = {
+        index["name"]
+        for index in inspector.get_indexes("chunks", schema=project_name)
+    }
+
+    if "idx_vectors_fts" in indexes and "idx_vectors_text" not in indexes:
+        print("Migration not needed: chunks table already has idx_vectors_fts")
+        return False
+    else:
+        print("Migration needed: chunks table needs idx_vectors_fts")
+        return True
+
+
+def upgrade() -> None:
+    if not check_if_upgrade_needed():
+        return
+
+    # Full text search filters on the generated `fts` column, which the
+    # expression index on `to_tsvector('english', text)` does not cover.
+    # Both statements run outside of a transaction so that the index is
+    # built without blocking writes to the chunks table.
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vectors_fts
+            ON {project_name}.chunks USING GIN (fts)
+            """)
+        op.execute(
+            f"DROP INDEX CONCURRENTLY IF EXISTS {project_name}.idx_vectors_text"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vectors_text
+            ON {project_name}.chunks USING GIN (to_tsvector('english', text))
+            """)
+        op.execute(
+            f"DROP INDEX CONCURRENTLY IF EXISTS {project_name}.idx_vectors_fts"
+        )
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core import PostgresDatabaseProvider, R2RConfig
+    from core.providers.database.base import SemaphoreConnectionPool
+    from core.utils.logging_config import configure_logging
+except ImportError as e:
+    logger.error(
+        f"Failed to run migration: core dependencies not installed: {e}"
+    )
+    logger.error("pip install 'r2r[core]'")
+    sys.exit(1)
+
+
+async def migrate_vectors(
+    config_name: Optional[str] = None,
+    config_path: Optional[str] = None,
+    batch_size: int = 10_000,
+    rebuild_indices: bool = True,
+) -> dict:
+    """Converts the chunk vectors to the storage type of the configured
+    `quantization_type`, e.g. from `vector` to `halfvec` for FP16."""
+    config_name = config_name or os.getenv("R2R_CONFIG_NAME")
+    config_path = config_path or os.getenv("R2R_CONFIG_PATH")
+    if not config_path and not config_name:
+        config_name = "default"
+
+    config = R2RConfig.load(config_name, config_path)
+    if not config.embedding.base_dimension:
+        raise ValueError("Embedding config must have a base dimension.")
+
+    # The provider is not initialized: creating the tables would fail on the
+    # vector type mismatch this command is meant to resolve.
+    database_provider = PostgresDatabaseProvider(
+        config.database,
+        config.embedding.base_dimension,
+        crypto_provider=None,  # type: ignore
+        quantization_type=config.embedding.quantization_settings.quantization_type,
+        prefix_dimension=config.embedding.quantization_settings.prefix_dimension,
+    )
+    pool = SemaphoreConnectionPool(
+        database_provider.connection_string,
+        database_provider.postgres_configuration_settings,
+    )
+    await pool.initialize()
+    await database_provider.connection_manager.initialize(pool)
+    try:
+        return await database_provider.chunks_handler.migrate_vector_storage(
+            batch_size=batch_size, rebuild_indices=rebuild_indices
+        )
+    finally:
+        await pool.close()
+
+
+def main():
+    """
+    Parse command-line arguments and then run the migration.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert stored chunk vectors to the configured quantization type."
+    )
+    parser.add_argument(
+        "--config-path",
+        default=None,
+        help="Path to the configuration file. Overrides R2R_CONFIG_PATH env if provided.",
+    )
+    parser.add_argument(
+        "--config-name",
+        default=None,
+        help="Name of the configuration. Overrides R2R_CONFIG_NAME env if provided.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        default=10_000,
+        type=int,
+        help="Number of rows converted per batch.",
+    )
+    parser.add_argument(
+        "--skip-indices",
+        action="store_true",
+        help="Do not rebuild the vector indices on the converted column.",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        configure_logging()
+    except Exception as e:
+        logger.error(f"Failed to configure logging: {e}")
+
+    result = asyncio.run(
+        migrate_vectors(
+            config_name=args.config_name,
+            config_path=args.config_path,
+            batch_size=args.batch_size,
+            rebuild_indices=not args.skip_indices,
+        )
+    )
+    logger.info(
+        f"Migrated {result['rows_migrated']} vectors from "
+        f"{result['source_type']} to {result['target_type']}, rebuilt "
+        f"indices: {result['indices_rebuilt'] or 'none'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from io import BytesIO
+
 from shared.api.models import (
     WrappedGenericMessageResponse,
     WrappedServerStatsResponse,
@@ -41,3 +43,19 @@ class SystemSDK:
         )
 
         return WrappedServerStatsResponse(**response_dict)
+
+    async def metrics(self) -> str:
+        """Get the latency histograms of the stages of search, RAG and agent
+        requests, in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        response = await self.client._make_request(
+            "GET", "system/metrics", version="v3"
+        )
+        if not isinstance(response, BytesIO):
+            raise ValueError(
+                f"Expected BytesIO response, got {type(response)}"
+            )
+        return response.getvalue().decode()
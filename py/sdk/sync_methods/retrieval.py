@@ -4,6 +4,7 @@ from uuid import UUID
 
 from shared.api.models import (
     WrappedAgentResponse,
+    WrappedBatchSearchResponse,
     WrappedEmbeddingResponse,
     WrappedLLMChatCompletion,
     WrappedRAGResponse,
@@ -188,6 +189,53 @@ class RetrievalSDK:
 
         return WrappedSearchResponse(**response_dict)
 
+    def search_batch(
+        self,
+        queries: list[str],
+        search_mode: Optional[str | SearchMode] = SearchMode.custom,
+        search_settings: Optional[dict | SearchSettings] = None,
+        query_search_settings: Optional[
+            list[Optional[dict | SearchSettings]]
+        ] = None,
+    ) -> WrappedBatchSearchResponse:
+        """
+        Conduct many searches in a single request.
+
+        Args:
+            queries (list[str]): The search queries.
+            search_mode (Optional[str | SearchMode]): Search mode of all queries ('basic', 'advanced', 'custom'). Defaults to 'custom'.
+            search_settings (Optional[dict | SearchSettings]): Search settings shared by all queries.
+            query_search_settings (Optional[list[Optional[dict | SearchSettings]]]): Settings of each query, overriding the shared settings.
+
+        Returns:
+            WrappedBatchSearchResponse: The search results, in the order of the queries.
+        """
+        if search_settings and not isinstance(search_settings, dict):
+            search_settings = search_settings.model_dump()
+
+        data: dict[str, Any] = {
+            "queries": queries,
+            "search_settings": search_settings,
+        }
+        if query_search_settings is not None:
+            # Only the fields set on each query override the shared settings
+            data["query_search_settings"] = [
+                settings.model_dump(exclude_unset=True)
+                if isinstance(settings, SearchSettings)
+                else settings
+                for settings in query_search_settings
+            ]
+        if search_mode:
+            data["search_mode"] = search_mode
+
+        response_dict = self.client._make_request(
+            "POST",
+            "retrieval/search/batch",
+            json=data,
+            version="v3",
+        )
+        return WrappedBatchSearchResponse(**response_dict)
+
     def completion(
         self,
         messages: list[dict | Message],
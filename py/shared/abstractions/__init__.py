@@ -48,6 +48,8 @@ from .search import (
     GraphSearchResultType,
     GraphSearchSettings,
     HybridSearchSettings,
+    HydeMode,
+    IterativeScan,
     SearchMode,
     SearchSettings,
     WebPageSearchResult,
@@ -121,6 +123,8 @@ __all__ = [
     "SearchSettings",
     "select_search_filters",
     "HybridSearchSettings",
+    "IterativeScan",
+    "HydeMode",
     "SearchMode",
     # graph abstractions
     "GraphCreationSettings",
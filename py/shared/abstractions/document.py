@@ -203,11 +203,6 @@ class DocumentResponse(R2RSerializable):
         fields from metadata."""
         now = datetime.now()
 
-        # Format the embedding properly for Postgres vector type
-        embedding = None
-        if self.summary_embedding is not None:
-            embedding = f"[{','.join(str(x) for x in self.summary_embedding)}]"
-
         return {
             "id": self.id,
             "collection_ids": self.collection_ids,
@@ -223,7 +218,7 @@ class DocumentResponse(R2RSerializable):
             "updated_at": self.updated_at or now,
             "ingestion_attempt_number": self.ingestion_attempt_number or 0,
             "summary": self.summary,
-            "summary_embedding": embedding,
+            "summary_embedding": self.summary_embedding,
             "total_tokens": self.total_tokens or 0,  # ensure we pass 0 if None
         }
 
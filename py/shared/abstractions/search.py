@@ -263,6 +263,8 @@ class AggregateSearchResult(R2RSerializable):
     generic_tool_result: Optional[Any] = (
         None  # FIXME: Give this a proper generic type
     )
+    # Stage timings in milliseconds, when requested with `include_timings`
+    timings: Optional[dict[str, float]] = None
 
     def __str__(self) -> str:
         fields = [
@@ -304,6 +306,7 @@ class AggregateSearchResult(R2RSerializable):
                 if self.generic_tool_result
                 else []
             ),
+            **({"timings": self.timings} if self.timings else {}),
         }
 
     class Config:
@@ -405,23 +408,73 @@ class HybridSearchSettings(R2RSerializable):
     rrf_k: int = Field(
         default=50, description="K-value for RRF (Rank Reciprocal Fusion)"
     )
+    fused: bool = Field(
+        default=True,
+        description="Compute both rankings and the RRF merge in a single query. When disabled, the semantic and full text searches run concurrently and are merged in Python.",
+    )
+
+
+class IterativeScan(str, Enum):
+    """pgvector iterative index scan modes (pgvector >= 0.8)."""
+
+    off = "off"
+    relaxed_order = "relaxed_order"
+    strict_order = "strict_order"
+
+
+class HydeMode(str, Enum):
+    """How the hypothetical documents of a HyDE search are searched."""
+
+    # One search per hypothetical document, merged and reranked
+    fanout = "fanout"
+    # One search with the mean of the hypothetical document embeddings
+    centroid = "centroid"
 
 
 class ChunkSearchSettings(R2RSerializable):
-    """Settings specific to chunk/vector search."""
+    """Settings specific to chunk/vector search.
+
+    The index tuning parameters are applied with `SET LOCAL` for the duration
+    of the search. When left unset, the server defaults from
+    `database.chunk_search_settings` are used.
+    """
 
     index_measure: IndexMeasure = Field(
         default=IndexMeasure.cosine_distance,
         description="The distance measure to use for indexing",
     )
-    probes: int = Field(
-        default=10,
+    probes: Optional[int] = Field(
+        default=None,
         description="Number of ivfflat index lists to query. Higher increases accuracy but decreases speed.",
     )
-    ef_search: int = Field(
-        default=40,
+    ef_search: Optional[int] = Field(
+        default=None,
         description="Size of the dynamic candidate list for HNSW index search. Higher increases accuracy but decreases speed.",
     )
+    iterative_scan: Optional[IterativeScan] = Field(
+        default=None,
+        description="Keep scanning the index until enough rows pass the filters. `relaxed_order` may return results slightly out of order; `strict_order` is only supported by HNSW indexes.",
+    )
+    max_scan_tuples: Optional[int] = Field(
+        default=None,
+        description="Maximum number of tuples an iterative HNSW scan visits.",
+    )
+    prefix_search: Optional[bool] = Field(
+        default=None,
+        description="Pull candidates from the truncated prefix vectors (see `prefix_dimension` in the quantization settings) and rerank them exactly with the full vectors.",
+    )
+    oversampling_factor: Optional[int] = Field(
+        default=None,
+        description="For two-stage searches (INT1 quantized tables and prefix search), the number of first stage candidates fetched per requested result before reranking with the full vectors. Defaults to 20.",
+    )
+    adaptive_oversampling: Optional[bool] = Field(
+        default=None,
+        description="For two-stage searches, retry with a doubled oversampling factor while the reranked distances of the results are nearly identical, since the first stage cannot order such candidates reliably.",
+    )
+    max_oversampling_factor: Optional[int] = Field(
+        default=None,
+        description="Upper bound for the adaptive oversampling factor. Defaults to 160.",
+    )
     enabled: bool = Field(
         default=True,
         description="Whether to enable chunk search",
@@ -438,6 +491,10 @@ class GraphSearchSettings(R2RSerializable):
         default=True,
         description="Whether to enable graph search",
     )
+    fused: bool = Field(
+        default=True,
+        description="Whether to search entities, relationships and communities with a single `UNION ALL` query instead of one query per result type",
+    )
 
 
 class SearchSettings(R2RSerializable):
@@ -493,6 +550,26 @@ class SearchSettings(R2RSerializable):
         description="""Whether to include search score values in the
         search results""",
     )
+    use_embedding_cache: bool = Field(
+        default=True,
+        description="""Whether the query embedding may be served from, and
+        stored in, the embedding provider's cache""",
+    )
+    use_rag_cache: bool = Field(
+        default=True,
+        description="""Whether a RAG response may be served from, and stored
+        in, the semantic response cache, when it is enabled on the server""",
+    )
+    use_search_cache: bool = Field(
+        default=True,
+        description="""Whether search results may be served from, and stored
+        in, the search result cache, when it is enabled on the server""",
+    )
+    include_timings: bool = Field(
+        default=False,
+        description="""Whether to return the time spent in each stage of the
+        request, in milliseconds, with the response""",
+    )
 
     # Search strategy and settings
     search_strategy: str = Field(
@@ -521,6 +598,14 @@ class SearchSettings(R2RSerializable):
         default=5,
         description="Number of sub-queries/hypothetical docs to generate when using hyde or rag_fusion search strategies.",
     )
+    hyde_mode: HydeMode = Field(
+        default=HydeMode.fanout,
+        description="When using hyde, either search once per hypothetical document and rerank the merged results ('fanout'), or search once with the mean of the hypothetical document embeddings ('centroid').",
+    )
+    stream_sub_queries: bool = Field(
+        default=False,
+        description="When using rag_fusion, search each sub-query as soon as the LLM has generated it, instead of embedding all sub-queries in one batch once generation is complete.",
+    )
 
     class Config:
         populate_by_name = True
@@ -11,6 +11,8 @@ class Tool(R2RSerializable):
     stream_function: Optional[Callable] = None
     parameters: Optional[dict[str, Any]] = None
     context: Optional[Any] = None
+    # Whether calls of the tool may run alongside other calls of the same turn
+    concurrency_safe: bool = False
 
     class Config:
         populate_by_name = True
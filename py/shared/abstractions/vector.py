@@ -153,6 +153,10 @@ class VectorQuantizationSettings(R2RSerializable):
     quantization_type: VectorQuantizationType = Field(
         default=VectorQuantizationType.FP32
     )
+    prefix_dimension: Optional[int] = Field(
+        default=None,
+        description="For embedding models trained with Matryoshka representation learning, additionally store and index the first `prefix_dimension` dimensions of each vector for fast first stage searches.",
+    )
 
 
 class Vector(R2RSerializable):
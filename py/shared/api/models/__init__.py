@@ -85,6 +85,7 @@ from shared.api.models.retrieval.responses import (
     ToolResultEvent,
     UnknownEvent,
     WrappedAgentResponse,
+    WrappedBatchSearchResponse,
     WrappedDocumentSearchResponse,
     WrappedEmbeddingResponse,
     WrappedLLMChatCompletion,
@@ -186,6 +187,7 @@ __all__ = [
     "AgentResponse",
     "AggregateSearchResult",
     "WrappedSearchResponse",
+    "WrappedBatchSearchResponse",
     "WrappedDocumentSearchResponse",
     "WrappedVectorSearchResponse",
     "WrappedAgentResponse",
@@ -596,6 +596,7 @@ WrappedCompletionResponse = R2RResults[LLMChatCompletion]
 # Create wrapped versions of the responses
 WrappedVectorSearchResponse = R2RResults[list[ChunkSearchResult]]
 WrappedSearchResponse = R2RResults[AggregateSearchResult]
+WrappedBatchSearchResponse = R2RResults[list[AggregateSearchResult]]
 # FIXME: This is returning DocumentResponse, but should be DocumentSearchResult
 WrappedDocumentSearchResponse = R2RResults[list[DocumentResponse]]
 WrappedRAGResponse = R2RResults[RAGResponse]
@@ -1,9 +1,12 @@
 from .base_utils import (
+    PackedContext,
+    SSEWriter,
     _decorate_vector_type,
     _get_vector_column_str,
     deep_update,
     dump_collector,
     dump_obj,
+    dumps_sse_data,
     format_search_results_for_llm,
     generate_default_prompt_id,
     generate_default_user_collection_id,
@@ -12,6 +15,7 @@ from .base_utils import (
     generate_extraction_id,
     generate_id,
     generate_user_id,
+    pack_search_results_for_llm,
     validate_uuid,
     yield_sse_event,
 )
@@ -19,6 +23,8 @@ from .splitter.text import RecursiveCharacterTextSplitter, TextSplitter
 
 __all__ = [
     "format_search_results_for_llm",
+    "pack_search_results_for_llm",
+    "PackedContext",
     # ID generation
     "generate_id",
     "generate_document_id",
@@ -37,6 +43,8 @@ __all__ = [
     "_decorate_vector_type",
     "_get_vector_column_str",
     "yield_sse_event",
+    "dumps_sse_data",
+    "SSEWriter",
     "dump_collector",
     "dump_obj",
 ]
@@ -1,21 +1,27 @@
+import asyncio
 import json
 import logging
 import math
 import uuid
 from abc import ABCMeta
 from copy import deepcopy
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Optional, Tuple, TypeVar
+from functools import lru_cache
+from typing import Any, AsyncIterable, Optional, Tuple, TypeVar
 from uuid import NAMESPACE_DNS, UUID, uuid4, uuid5
 
+import orjson
 import tiktoken
 
 from ..abstractions import (
     AggregateSearchResult,
     AsyncSyncMeta,
+    ChunkSearchResult,
     GraphCommunityResult,
     GraphEntityResult,
     GraphRelationshipResult,
+    GraphSearchResult,
 )
 from ..abstractions.vector import VectorQuantizationType
 
@@ -26,6 +32,34 @@ def id_to_shorthand(id: str | UUID):
     return str(id)[:7]
 
 
+def _chunk_result_lines(c: ChunkSearchResult) -> list[str]:
+    return [f"Source ID [{id_to_shorthand(c.id)}]:", c.text or ""]
+
+
+def _graph_result_lines(g: GraphSearchResult) -> list[str]:
+    lines = [f"Source ID [{id_to_shorthand(g.id)}]:"]
+    if isinstance(g.content, GraphCommunityResult):
+        lines.extend(
+            (
+                f"Community Name: {g.content.name}",
+                f"ID: {g.content.id}",
+                f"Summary: {g.content.summary}",
+            )
+        )
+    elif isinstance(g.content, GraphEntityResult):
+        lines.extend(
+            (
+                f"Entity Name: {g.content.name}",
+                f"Description: {g.content.description}",
+            )
+        )
+    elif isinstance(g.content, GraphRelationshipResult):
+        lines.append(
+            f"Relationship: {g.content.subject}-{g.content.predicate}-{g.content.object}"
+        )
+    return lines
+
+
 def format_search_results_for_llm(
     results: AggregateSearchResult,
 ) -> str:
@@ -45,34 +79,13 @@ def format_search_results_for_llm(
     if results.chunk_search_results:
         lines.append("Vector Search Results:")
         for c in results.chunk_search_results:
-            lines.extend(
-                (f"Source ID [{id_to_shorthand(c.id)}]:", (c.text or ""))
-            )
+            lines.extend(_chunk_result_lines(c))
 
     # 2) Graph search
     if results.graph_search_results:
         lines.append("Graph Search Results:")
         for g in results.graph_search_results:
-            lines.append(f"Source ID [{id_to_shorthand(g.id)}]:")
-            if isinstance(g.content, GraphCommunityResult):
-                lines.extend(
-                    (
-                        f"Community Name: {g.content.name}",
-                        f"ID: {g.content.id}",
-                        f"Summary: {g.content.summary}",
-                    )
-                )
-            elif isinstance(g.content, GraphEntityResult):
-                lines.extend(
-                    (
-                        f"Entity Name: {g.content.name}",
-                        f"Description: {g.content.description}",
-                    )
-                )
-            elif isinstance(g.content, GraphRelationshipResult):
-                lines.append(
-                    f"Relationship: {g.content.subject}-{g.content.predicate}-{g.content.object}"
-                )
+            lines.extend(_graph_result_lines(g))
 
     # Web page search results
     if results.web_page_search_results:
@@ -134,6 +147,153 @@ def format_search_results_for_llm(
     return "\n".join(lines)
 
 
+@dataclass
+class PackedContext:
+    """Search results packed into the token budget of a prompt."""
+
+    context: str
+    results: AggregateSearchResult
+    tokens: int
+    # {"id", "type", "reason"} of the results left out of the context
+    dropped: list[dict[str, str]] = field(default_factory=list)
+
+
+_SECTION_HEADERS = {
+    "chunk": "Vector Search Results:",
+    "graph": "Graph Search Results:",
+}
+
+
+def _shingles(text: str, size: int = 5) -> set[tuple[str, ...]]:
+    words = text.lower().split()
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def pack_search_results_for_llm(
+    results: AggregateSearchResult,
+    max_tokens: int,
+    model: str = "gpt-4o",
+    max_chunks_per_document: Optional[int] = None,
+    dedup_threshold: Optional[float] = 0.8,
+) -> PackedContext:
+    """Formats the search results that fit in `max_tokens` tokens.
+
+    Chunk and graph results are added by decreasing score, as long as they
+    fit. A chunk is dropped as a duplicate when at least `dedup_threshold`
+    of its text overlaps a chunk already added, like chunks of overlapping
+    windows or of copies of a document. Chunks of a document beyond its
+    first `max_chunks_per_document` are only added with the budget left
+    by the other documents. Web, document and tool results are always
+    kept, and all results keep the order `format_search_results_for_llm`
+    gives them.
+    """
+    encoder = _token_encoder(model)
+
+    def count(lines: list[str]) -> int:
+        return len(encoder.encode("\n".join(lines), disallowed_special=()))
+
+    chunks = results.chunk_search_results or []
+    graphs = results.graph_search_results or []
+    others = results.model_copy(
+        update={"chunk_search_results": None, "graph_search_results": None}
+    )
+    other_context = format_search_results_for_llm(others)
+    used = count([other_context]) if other_context else 0
+
+    selected: dict[str, list[int]] = {"chunk": [], "graph": []}
+    documents: dict[UUID, int] = {}
+    kept_shingles: list[set[tuple[str, ...]]] = []
+    dropped: list[dict[str, str]] = []
+
+    def is_duplicate(shingles: set[tuple[str, ...]]) -> bool:
+        return dedup_threshold is not None and any(
+            len(shingles & kept)
+            >= dedup_threshold * min(len(shingles), len(kept))
+            for kept in kept_shingles
+        )
+
+    def drop(kind: str, item: Any, reason: str) -> None:
+        dropped.append({"id": str(item.id), "type": kind, "reason": reason})
+
+    def add(kind: str, index: int, item: Any) -> bool:
+        nonlocal used
+        lines = (
+            _chunk_result_lines(item)
+            if kind == "chunk"
+            else _graph_result_lines(item)
+        )
+        if not selected[kind]:
+            lines.insert(0, _SECTION_HEADERS[kind])
+        # Lines are joined by newlines
+        tokens = count(lines) + 1
+        if used + tokens > max_tokens:
+            return False
+        used += tokens
+        selected[kind].append(index)
+        return True
+
+    candidates = sorted(
+        [("chunk", i, c) for i, c in enumerate(chunks)]
+        + [("graph", i, g) for i, g in enumerate(graphs)],
+        key=lambda candidate: -(candidate[2].score or 0.0),
+    )
+    deferred: list[tuple[str, int, ChunkSearchResult]] = []
+    for kind, index, item in candidates:
+        if isinstance(item, ChunkSearchResult):
+            shingles = _shingles(item.text or "")
+            if is_duplicate(shingles):
+                drop(kind, item, "duplicate")
+                continue
+            if (
+                max_chunks_per_document is not None
+                and documents.get(item.document_id, 0)
+                >= max_chunks_per_document
+            ):
+                deferred.append((kind, index, item))
+                continue
+        if not add(kind, index, item):
+            drop(kind, item, "budget")
+        elif isinstance(item, ChunkSearchResult):
+            documents[item.document_id] = (
+                documents.get(item.document_id, 0) + 1
+            )
+            kept_shingles.append(shingles)
+
+    # Fill the budget left with the chunks of the best documents
+    for kind, index, item in deferred:
+        shingles = _shingles(item.text or "")
+        if is_duplicate(shingles):
+            drop(kind, item, "duplicate")
+        elif not add(kind, index, item):
+            drop(kind, item, "budget")
+        else:
+            kept_shingles.append(shingles)
+
+    packed = results.model_copy(
+        update={
+            "chunk_search_results": (
+                [chunks[i] for i in sorted(selected["chunk"])]
+                if results.chunk_search_results is not None
+                else None
+            ),
+            "graph_search_results": (
+                [graphs[i] for i in sorted(selected["graph"])]
+                if results.graph_search_results is not None
+                else None
+            ),
+        }
+    )
+    context = format_search_results_for_llm(packed)
+    return PackedContext(
+        context=context,
+        results=packed,
+        tokens=count([context]) if context else 0,
+        dropped=dropped,
+    )
+
+
 def _generate_id_from_label(label) -> UUID:
     return uuid5(NAMESPACE_DNS, label)
 
@@ -271,11 +431,7 @@ def tokens_count_for_message(message, encoding):
 
 def num_tokens_from_messages(messages, model="gpt-4.1"):
     """Return the number of tokens used by a list of messages for both user and assistant."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.warning("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = _token_encoder(model)
 
     tokens = 0
     for message_ in messages:
@@ -291,9 +447,49 @@ class SearchResultsCollector:
     Handles both object-oriented and dictionary-based search results.
     """
 
+    # Length of the ID prefixes in the short ID index, as in citations
+    SHORT_ID_LENGTH = 7
+
     def __init__(self):
         # We'll store a list of (source_type, result_obj)
         self._results_in_order = []
+        # Short ID prefix -> [(position, full ID, result)], for results and
+        # for the chunks nested in documents, which only match when no
+        # result does
+        self._short_id_index: dict[str, list[tuple[int, str, Any]]] = {}
+        self._nested_short_id_index: dict[str, list[tuple[int, str, Any]]] = {}
+
+    def _append(self, source_type, result_obj):
+        self._results_in_order.append((source_type, result_obj))
+
+        result_id = self._result_id(result_obj)
+        if result_id:
+            self._short_id_index.setdefault(
+                result_id[: self.SHORT_ID_LENGTH], []
+            ).append((len(self._results_in_order), result_id, result_obj))
+
+        if source_type == "doc":
+            chunks = None
+            if isinstance(result_obj, dict) and "chunks" in result_obj:
+                chunks = result_obj["chunks"]
+            elif (
+                hasattr(result_obj, "chunks") and result_obj.chunks is not None
+            ):
+                chunks = result_obj.chunks
+            for chunk in chunks or []:
+                chunk_id = self._result_id(chunk)
+                if chunk_id:
+                    self._nested_short_id_index.setdefault(
+                        chunk_id[: self.SHORT_ID_LENGTH], []
+                    ).append((len(self._results_in_order), chunk_id, chunk))
+
+    @staticmethod
+    def _result_id(result_obj) -> Optional[str]:
+        if isinstance(result_obj, dict):
+            result_id = result_obj.get("id")
+        else:
+            result_id = getattr(result_obj, "id", None)
+        return str(result_id) if result_id else None
 
     @property
     def results(self):
@@ -307,6 +503,8 @@ class SearchResultsCollector:
         Handles the format: [('unknown', {...}), ('unknown', {...})]
         """
         self._results_in_order = []
+        self._short_id_index = {}
+        self._nested_short_id_index = {}
 
         if not isinstance(value, list):
             raise ValueError("Results must be a list")
@@ -318,13 +516,13 @@ class SearchResultsCollector:
                 # Only auto-detect if the source type is "unknown"
                 if source_type == "unknown":
                     detected_type = self._detect_result_type(result_obj)
-                    self._results_in_order.append((detected_type, result_obj))
+                    self._append(detected_type, result_obj)
                 else:
-                    self._results_in_order.append((source_type, result_obj))
+                    self._append(source_type, result_obj)
             else:
                 # If not a tuple, detect and add
                 detected_type = self._detect_result_type(item)
-                self._results_in_order.append((detected_type, item))
+                self._append(detected_type, item)
 
     def add_aggregate_result(self, agg):
         """
@@ -333,22 +531,22 @@ class SearchResultsCollector:
         """
         if hasattr(agg, "chunk_search_results") and agg.chunk_search_results:
             for c in agg.chunk_search_results:
-                self._results_in_order.append(("chunk", c))
+                self._append("chunk", c)
 
         if hasattr(agg, "graph_search_results") and agg.graph_search_results:
             for g in agg.graph_search_results:
-                self._results_in_order.append(("graph", g))
+                self._append("graph", g)
 
         if (
             hasattr(agg, "web_page_search_results")
             and agg.web_page_search_results
         ):
             for w in agg.web_page_search_results:
-                self._results_in_order.append(("web", w))
+                self._append("web", w)
 
         if hasattr(agg, "web_search_results") and agg.web_search_results:
             for w in agg.web_search_results:
-                self._results_in_order.append(("web", w))
+                self._append("web", w)
 
         # Add documents and extract their chunks
         if (
@@ -357,7 +555,7 @@ class SearchResultsCollector:
         ):
             for doc in agg.document_search_results:
                 # Add the document itself
-                self._results_in_order.append(("doc", doc))
+                self._append("doc", doc)
 
                 # Extract and add chunks from the document
                 chunks = None
@@ -371,9 +569,9 @@ class SearchResultsCollector:
                         # Ensure each chunk has the minimum required attributes
                         if isinstance(chunk, dict) and "id" in chunk:
                             # Add the chunk directly to results for citation lookup
-                            self._results_in_order.append(("chunk", chunk))
+                            self._append("chunk", chunk)
                         elif hasattr(chunk, "id"):
-                            self._results_in_order.append(("chunk", chunk))
+                            self._append("chunk", chunk)
 
     def add_result(self, result_obj, source_type=None):
         """
@@ -381,11 +579,11 @@ class SearchResultsCollector:
         If source_type is not provided, automatically detect the type.
         """
         if source_type:
-            self._results_in_order.append((source_type, result_obj))
+            self._append(source_type, result_obj)
             return source_type
 
         detected_type = self._detect_result_type(result_obj)
-        self._results_in_order.append((detected_type, result_obj))
+        self._append(detected_type, result_obj)
         return detected_type
 
     def _detect_result_type(self, obj):
@@ -487,53 +685,40 @@ class SearchResultsCollector:
         if not short_id:
             return None
 
-        # First try direct lookup using regular iteration
-        for _, result_obj in self._results_in_order:
-            # Check dictionary objects
-            if isinstance(result_obj, dict) and "id" in result_obj:
-                result_id = str(result_obj["id"])
-                if result_id.startswith(short_id):
-                    return result_obj
-
-            # Check object with id attribute
-            elif hasattr(result_obj, "id"):
-                obj_id = getattr(result_obj, "id", None)
-                if obj_id and str(obj_id).startswith(short_id):
-                    # Convert to dict if possible
-                    if hasattr(result_obj, "as_dict"):
-                        return result_obj.as_dict()
-                    elif hasattr(result_obj, "model_dump"):
-                        return result_obj.model_dump()
-                    elif hasattr(result_obj, "dict"):
-                        return result_obj.dict()
-                    else:
-                        return result_obj
+        if result_obj := self._lookup(self._short_id_index, short_id):
+            if isinstance(result_obj, dict):
+                return result_obj
+            # Convert to dict if possible
+            if hasattr(result_obj, "as_dict"):
+                return result_obj.as_dict()
+            elif hasattr(result_obj, "model_dump"):
+                return result_obj.model_dump()
+            elif hasattr(result_obj, "dict"):
+                return result_obj.dict()
+            return result_obj
 
         # If not found, look for chunks inside documents that weren't extracted properly
-        for source_type, result_obj in self._results_in_order:
-            if source_type == "doc":
-                # Try various ways to access chunks
-                chunks = None
-                if isinstance(result_obj, dict) and "chunks" in result_obj:
-                    chunks = result_obj["chunks"]
-                elif (
-                    hasattr(result_obj, "chunks")
-                    and result_obj.chunks is not None
-                ):
-                    chunks = result_obj.chunks
-
-                if chunks:
-                    for chunk in chunks:
-                        # Try each chunk
-                        chunk_id = None
-                        if isinstance(chunk, dict) and "id" in chunk:
-                            chunk_id = chunk["id"]
-                        elif hasattr(chunk, "id"):
-                            chunk_id = chunk.id
-
-                        if chunk_id and str(chunk_id).startswith(short_id):
-                            return chunk
+        return self._lookup(self._nested_short_id_index, short_id)
 
+    def _lookup(self, index, short_id):
+        """The first indexed result whose ID starts with `short_id`."""
+        if len(short_id) >= self.SHORT_ID_LENGTH:
+            candidates = index.get(short_id[: self.SHORT_ID_LENGTH], [])
+        else:
+            # Shorter than the indexed prefixes: the matching buckets, back
+            # in the order of the results
+            candidates = sorted(
+                (
+                    candidate
+                    for prefix, bucket in index.items()
+                    if prefix.startswith(short_id)
+                    for candidate in bucket
+                ),
+                key=lambda candidate: candidate[0],
+            )
+        for _, result_id, result_obj in candidates:
+            if result_id.startswith(short_id):
+                return result_obj
         return None
 
     def get_results_by_type(self, type_name):
@@ -634,42 +819,153 @@ def dump_collector(collector: SearchResultsCollector) -> list[dict[str, Any]]:
 
 # FIXME: Tiktoken does not support gpt-4.1, so continue using gpt-4o
 # https://github.com/openai/tiktoken/issues/395
-def num_tokens(text, model="gpt-4o"):
+@lru_cache(maxsize=64)
+def _token_encoder(model: str) -> tiktoken.Encoding:
+    """The tiktoken encoding of `model`, built once per model."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         # Fallback to a known encoding if model not recognized
-        encoding = tiktoken.get_encoding("cl100k_base")
+        logger.warning(f"Model {model} not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
 
-    return len(encoding.encode(text, disallowed_special=()))
+def num_tokens(text, model="gpt-4o"):
+    return len(_token_encoder(model).encode(text, disallowed_special=()))
 
 
 class CombinedMeta(AsyncSyncMeta, ABCMeta):
     pass
 
 
-async def yield_sse_event(event_name: str, payload: dict, chunk_size=1024):
+def dumps_sse_data(payload: Any) -> str:
+    """
+    Serialize the payload of an SSE event with orjson. Values that are not
+    JSON types are written as their `str`, as with
+    `json.dumps(payload, default=str)`.
+    """
+    try:
+        return orjson.dumps(
+            payload,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS,
+        ).decode()
+    except TypeError:
+        # e.g. integers beyond 64 bits
+        return json.dumps(payload, default=str)
+
+
+async def yield_sse_event(event_name: str, payload: dict):
     """
-    Helper that yields a single SSE event in properly chunked lines.
+    Helper that yields a single SSE event, with its event line, data line and
+    the blank line that ends it in one string.
 
     e.g. event: event_name
-         data: (partial JSON 1)
-         data: (partial JSON 2)
-         ...
+         data: (JSON)
          [blank line to end event]
     """
+    yield f"event: {event_name}\ndata: {dumps_sse_data(payload)}\n\n"
 
-    # SSE: first the "event: ..."
-    yield f"event: {event_name}\n"
 
-    # Convert payload to JSON
-    content_str = json.dumps(payload, default=str)
+_END_OF_STREAM = object()
 
-    # data
-    yield f"data: {content_str}\n"
 
-    # blank line signals end of SSE event
-    yield "\n"
+class SSEWriter:
+    """
+    Writes a stream of SSE events as bytes, coalescing the events that
+    arrive close together, like the token deltas of a message, into one
+    write.
+
+    A write holds the events that arrive within `flush_interval` seconds of
+    its first one, up to `max_chunk_bytes`. Events are read from the source
+    by a task into a queue of `max_pending_events`, so that a client that
+    reads slowly holds back its own stream.
+    """
+
+    def __init__(
+        self,
+        events: AsyncIterable[str | bytes],
+        flush_interval: float = 0.02,
+        max_chunk_bytes: int = 256,
+        max_pending_events: int = 64,
+    ):
+        self.events = events
+        self.flush_interval = flush_interval
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_pending_events = max_pending_events
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        try:
+            async for event in self.events:
+                await queue.put(
+                    event.encode() if isinstance(event, str) else event
+                )
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            if hasattr(self.events, "aclose"):
+                await self.events.aclose()
+        await queue.put(_END_OF_STREAM)
+
+    async def __aiter__(self):
+        queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(1, self.max_pending_events)
+        )
+        producer = asyncio.create_task(self._produce(queue))
+        loop = asyncio.get_running_loop()
+        pending_get: Optional[asyncio.Future] = None
+        chunk = bytearray()
+        deadline: Optional[float] = None
+        try:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    # Wait for the next event, until the end of the window
+                    if pending_get is None:
+                        pending_get = asyncio.ensure_future(queue.get())
+                    timeout = (
+                        None
+                        if deadline is None
+                        else max(0.0, deadline - loop.time())
+                    )
+                    done, _ = await asyncio.wait(
+                        {pending_get}, timeout=timeout
+                    )
+                    if not done:
+                        yield bytes(chunk)
+                        chunk.clear()
+                        deadline = None
+                        continue
+                    item = pending_get.result()
+                    pending_get = None
+
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, BaseException):
+                    if chunk:
+                        yield bytes(chunk)
+                    raise item
+
+                chunk += item
+                if deadline is None:
+                    deadline = loop.time() + self.flush_interval
+                if (
+                    len(chunk) >= self.max_chunk_bytes
+                    or loop.time() >= deadline
+                ):
+                    yield bytes(chunk)
+                    chunk.clear()
+                    deadline = None
+
+            if chunk:
+                yield bytes(chunk)
+        finally:
+            for task in (pending_get, producer):
+                if task is not None and not task.done():
+                    task.cancel()
 
 
 class SSEFormatter:
@@ -0,0 +1,87 @@
+"""Measure the cost of resolving citations with `SearchResultsCollector`.
+
+Fills collectors with growing numbers of chunk results, plus documents with
+nested chunks, and times `find_by_short_id` on the short IDs that citations
+use. With the short ID index, the time per lookup stays flat as the number
+of results grows.
+
+Usage:
+    python -m tests.scaling.citation_lookup_benchmark
+"""
+
+import os
+import random
+import time
+import uuid
+
+from core.base import AggregateSearchResult, ChunkSearchResult
+from core.utils import SearchResultsCollector
+
+RESULT_COUNTS = [
+    int(n)
+    for n in os.environ.get("BENCHMARK_RESULTS", "100,1000,10000").split(",")
+]
+NUM_LOOKUPS = int(os.environ.get("BENCHMARK_LOOKUPS", 10000))
+CHUNKS_PER_DOCUMENT = 5
+
+
+def chunk_result() -> ChunkSearchResult:
+    return ChunkSearchResult(
+        id=uuid.uuid4(),
+        document_id=uuid.uuid4(),
+        owner_id=None,
+        collection_ids=[],
+        score=random.random(),
+        text="chunk",
+        metadata={},
+    )
+
+
+def collector_with(num_results: int) -> tuple[SearchResultsCollector, list]:
+    collector = SearchResultsCollector()
+    chunks = [chunk_result() for _ in range(num_results)]
+    collector.add_aggregate_result(
+        AggregateSearchResult(chunk_search_results=chunks)
+    )
+    short_ids = [str(c.id)[:7] for c in chunks]
+
+    # Chunks of documents added on their own are only found nested
+    for _ in range(num_results // CHUNKS_PER_DOCUMENT):
+        nested = [
+            {"id": str(uuid.uuid4()), "text": "nested"}
+            for _ in range(CHUNKS_PER_DOCUMENT)
+        ]
+        collector.add_result(
+            {"id": str(uuid.uuid4()), "document": {}, "chunks": nested},
+            "doc",
+        )
+        short_ids.extend(c["id"][:8] for c in nested)
+    return collector, short_ids
+
+
+def main():
+    print(f"lookups={NUM_LOOKUPS}")
+    for num_results in RESULT_COUNTS:
+        collector, short_ids = collector_with(num_results)
+        lookups = random.choices(short_ids, k=NUM_LOOKUPS)
+        # Citations the model made up are not found at all
+        misses = [uuid.uuid4().hex[:7] for _ in range(NUM_LOOKUPS // 10)]
+
+        start = time.perf_counter()
+        for short_id in lookups:
+            assert collector.find_by_short_id(short_id) is not None
+        hit_us = (time.perf_counter() - start) / len(lookups) * 1e6
+
+        start = time.perf_counter()
+        for short_id in misses:
+            collector.find_by_short_id(short_id)
+        miss_us = (time.perf_counter() - start) / len(misses) * 1e6
+
+        print(
+            f"results={len(collector.results):>6}: "
+            f"hit={hit_us:.2f} us/lookup, miss={miss_us:.2f} us/lookup"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+
+from core.agent.base import R2RAgent
+from core.base import GenerationConfig, LLMChatCompletion
+from core.base.agent import AgentConfig
+from shared.abstractions.tool import Tool
+
+
+class ToolAgent(R2RAgent):
+
+    def _register_tools(self):
+        pass
+
+
+class Tools:
+    """Tools that record the calls running at the same time."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.events = []
+
+    def tool(self, name, concurrency_safe=True, delay=0.01):
+
+        async def run(query, **kwargs):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.events.append(("start", name, query))
+            await asyncio.sleep(delay)
+            self.running -= 1
+            self.events.append(("end", name, query))
+            return f"{name}: {query}"
+
+        return Tool(
+            name=name,
+            description=name,
+            results_function=run,
+            llm_format_function=str,
+            parameters={"type": "object"},
+            context=object(),
+            concurrency_safe=concurrency_safe,
+        )
+
+
+def _agent(tools, max_concurrent_tool_calls=5):
+    agent = ToolAgent(
+        llm_provider=None,
+        database_provider=None,
+        config=AgentConfig(
+            max_concurrent_tool_calls=max_concurrent_tool_calls),
+        rag_generation_config=GenerationConfig(model="openai/gpt-4o"),
+    )
+    agent.tools = tools
+    return agent
+
+
+def _response(calls):
+    return LLMChatCompletion.model_validate({
+        "id": "response",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls",
+            "message": {
+                "role":
+                "assistant",
+                "content":
+                None,
+                "tool_calls": [{
+                    "id": f"call_{i}",
+                    "type": "function",
+                    "function": {
+                        "name": name,
+                        "arguments": json.dumps({"query": query}),
+                    },
+                } for i, (name, query) in enumerate(calls)],
+            },
+        }],
+    })
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_of_a_turn_run_concurrently():
+    tools = Tools()
+    agent = _agent([tools.tool("search_file_knowledge", delay=0.05)])
+    calls = [("search_file_knowledge", f"query {i}") for i in range(4)]
+
+    await agent.process_llm_response(_response(calls))
+
+    assert tools.max_running == 4
+    # Tool messages follow the order of the calls, not of their completion
+    messages = agent.conversation.messages[1:]
+    assert [m.tool_call_id for m in messages] == [f"call_{i}" for i in range(4)]
+    assert messages[2].content == "search_file_knowledge: query 2"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_calls_are_limited():
+    tools = Tools()
+    agent = _agent([tools.tool("search")], max_concurrent_tool_calls=2)
+
+    results = await agent.handle_tool_calls([
+        ("search", json.dumps({"query": str(i)}), f"call_{i}")
+        for i in range(5)
+    ])
+
+    assert tools.max_running == 2
+    assert [r.raw_result for r in results] == [f"search: {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_unsafe_tools_run_alone():
+    tools = Tools()
+    agent = _agent([tools.tool("search"), tools.tool("python", False)])
+
+    await agent.handle_tool_calls([
+        ("search", json.dumps({"query": "a"}), "call_0"),
+        ("python", json.dumps({"query": "b"}), "call_1"),
+        ("search", json.dumps({"query": "c"}), "call_2"),
+    ])
+
+    assert tools.events == [
+        ("start", "search", "a"),
+        ("end", "search", "a"),
+        ("start", "python", "b"),
+        ("end", "python", "b"),
+        ("start", "search", "c"),
+        ("end", "search", "c"),
+    ]
+    # The results of earlier calls are in the conversation before a call
+    # that may depend on them
+    assert [m.tool_call_id for m in agent.conversation.messages
+            ] == ["call_0", "call_1", "call_2"]
@@ -0,0 +1,66 @@
+import uuid
+
+from core.base import AggregateSearchResult, ChunkSearchResult
+from core.utils import SearchResultsCollector
+
+
+def _chunk(id=None):
+    return ChunkSearchResult(
+        id=id or uuid.uuid4(),
+        document_id=uuid.uuid4(),
+        owner_id=None,
+        collection_ids=[],
+        score=1.0,
+        text="chunk",
+        metadata={},
+    )
+
+
+def test_results_are_found_by_short_id():
+    collector = SearchResultsCollector()
+    chunks = [_chunk() for _ in range(3)]
+    collector.add_aggregate_result(
+        AggregateSearchResult(chunk_search_results=chunks)
+    )
+    web = {"id": "abcdef0123", "title": "t", "link": "l", "snippet": "s"}
+    collector.add_result(web)
+
+    assert (
+        collector.find_by_short_id(str(chunks[1].id)[:7])
+        == chunks[1].model_dump()
+    )
+    assert (
+        collector.find_by_short_id(str(chunks[2].id)[:8])
+        == chunks[2].model_dump()
+    )
+    assert collector.find_by_short_id("abcdef0") is web
+    assert collector.find_by_short_id("abc") is web
+    assert collector.find_by_short_id("zzzzzzz") is None
+    assert collector.find_by_short_id("") is None
+
+
+def test_first_result_with_a_prefix_wins():
+    collector = SearchResultsCollector()
+    first = _chunk(uuid.UUID("12345678-0000-0000-0000-000000000001"))
+    second = _chunk(uuid.UUID("12345679-0000-0000-0000-000000000002"))
+    collector.add_result(first, "chunk")
+    collector.add_result(second, "chunk")
+
+    assert collector.find_by_short_id("1234567")["id"] == first.id
+    assert collector.find_by_short_id("12345679")["id"] == second.id
+    assert collector.find_by_short_id("123")["id"] == first.id
+
+
+def test_chunks_nested_in_documents_are_found():
+    collector = SearchResultsCollector()
+    chunk_id = str(uuid.uuid4())
+    nested = {"id": chunk_id, "text": "nested"}
+    collector.add_result(
+        {"id": str(uuid.uuid4()), "document": {}, "chunks": [nested]}, "doc"
+    )
+
+    assert collector.find_by_short_id(chunk_id[:7]) is nested
+
+    # The index is rebuilt when the results are replaced
+    collector.results = [("unknown", _chunk())]
+    assert collector.find_by_short_id(chunk_id[:7]) is None
@@ -0,0 +1,154 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    ChunkSearchSettings,
+    IndexMeasure,
+    SearchSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import (
+    PostgresChunksHandler,
+    _filtered_collection_ids,
+)
+
+QUERY = [1.0, 1.0, 1.0, 0.01]
+VECTORS = {
+    # Same sign pattern as the query, but further away
+    "a1": [1.0, 1.0, 1.0, 0.5],
+    "a2": [1.0, 1.0, 1.0, 0.52],
+    # One bit away from the query, but much closer
+    "b": [1.0, 1.0, 1.0, -0.01],
+    "c": [1.0, 1.0, 1.0, -0.02],
+}
+
+
+@pytest.fixture
+async def binary_handler(db_provider):
+    schema = f"test_int1_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    handler = PostgresChunksHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.INT1,
+    )
+    await handler.create_tables()
+    await handler.upsert_entries([
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=uuid.uuid4(),
+            owner_id=uuid.uuid4(),
+            collection_ids=[],
+            vector=Vector(data=vector),
+            text=name,
+            metadata={},
+        ) for name, vector in VECTORS.items()
+    ])
+    yield handler
+    await connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+def _settings(**chunk_settings):
+    limit = chunk_settings.pop("limit", 2)
+    offset = chunk_settings.pop("offset", 0)
+    return SearchSettings(
+        limit=limit,
+        offset=offset,
+        chunk_settings=ChunkSearchSettings(**chunk_settings),
+    )
+
+
+@pytest.mark.asyncio
+async def test_binary_index_is_managed(binary_handler):
+    indices = await binary_handler.list_indices(offset=0, limit=10)
+    [index] = indices["indices"]
+    assert index["name"] == "idx_vectors_binary"
+    assert "(vec_binary bit_hamming_ops)" in index["definition"]
+
+
+@pytest.mark.asyncio
+async def test_oversampling_factor(binary_handler):
+    # A 1x pool only holds the candidates with the closest bit pattern
+    results = await binary_handler.semantic_search(
+        QUERY, _settings(oversampling_factor=1))
+    assert {r.text for r in results} == {"a1", "a2"}
+
+    results = await binary_handler.semantic_search(
+        QUERY, _settings(oversampling_factor=2))
+    assert [r.text for r in results] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_adaptive_oversampling(binary_handler):
+    results = await binary_handler.semantic_search(
+        QUERY, _settings(oversampling_factor=1, adaptive_oversampling=True))
+    assert [r.text for r in results] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_offset_applies_after_rerank(binary_handler):
+    results = await binary_handler.semantic_search(
+        QUERY, _settings(limit=1, offset=1))
+    assert [r.text for r in results] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_rerank_uses_requested_measure(binary_handler):
+    results = await binary_handler.semantic_search(
+        [10.0, 10.0, 10.0, 5.0],
+        _settings(limit=1, index_measure=IndexMeasure.l2_distance),
+    )
+    # The closest vector by l2 distance, not by cosine distance
+    assert [r.text for r in results] == ["a2"]
+
+    results = await binary_handler.semantic_search(
+        QUERY,
+        _settings(limit=4, index_measure=IndexMeasure.hamming_distance),
+    )
+    assert [r.text for r in results[:2]] in (["a1", "a2"], ["a2", "a1"])
+
+
+def test_collection_oversampling_factor():
+    collection_id, other_id = uuid.uuid4(), uuid.uuid4()
+    handler = PostgresChunksHandler(
+        project_name="test_project",
+        connection_manager=None,
+        dimension=4,
+        quantization_type=VectorQuantizationType.INT1,
+        search_defaults=ChunkSearchSettings(oversampling_factor=10),
+        collection_oversampling_factors={
+            str(collection_id): 50,
+            other_id: 30
+        },
+    )
+    filters = {
+        "$or": [
+            {
+                "owner_id": {
+                    "$eq": str(uuid.uuid4())
+                }
+            },
+            {
+                "collection_ids": {
+                    "$overlap": [str(collection_id),
+                                 str(other_id)]
+                }
+            },
+        ]
+    }
+    assert _filtered_collection_ids(filters) == {collection_id, other_id}
+    assert handler._oversampling_factor(SearchSettings(filters=filters)) == 50
+    assert (handler._oversampling_factor(
+        SearchSettings(filters={"collection_id": str(other_id)})) == 30)
+    assert handler._oversampling_factor(SearchSettings()) == 10
+    assert (handler._oversampling_factor(
+        SearchSettings(
+            filters=filters,
+            chunk_settings=ChunkSearchSettings(oversampling_factor=5),
+        )) == 5)
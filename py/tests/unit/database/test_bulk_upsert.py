@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+
+import pytest
+
+from core.base import (
+    R2RException,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+
+
+def _entry(document_id, vector, text, entry_id=None, chunk_order=0):
+    return VectorEntry(
+        id=entry_id or uuid.uuid4(),
+        document_id=document_id,
+        owner_id=uuid.uuid4(),
+        collection_ids=[uuid.uuid4()],
+        vector=Vector(data=vector),
+        text=text,
+        metadata={"chunk_order": chunk_order},
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_inserts_and_updates(chunks_handler):
+    document_id = uuid.uuid4()
+    dimension = chunks_handler.dimension
+    entries = [
+        _entry(document_id, [float(i)] * dimension, f"chunk {i}",
+               chunk_order=i) for i in range(5)
+    ]
+    await chunks_handler.bulk_upsert_entries(entries)
+
+    listed = await chunks_handler.list_document_chunks(
+        document_id=document_id, offset=0, limit=-1, include_vectors=True)
+    assert [chunk["text"] for chunk in listed["results"]
+            ] == [f"chunk {i}" for i in range(5)]
+    assert listed["results"][3]["vector"] == [3.0] * dimension
+    assert listed["results"][3]["collection_ids"] == entries[3].collection_ids
+
+    # Existing ids are updated; duplicates within a batch keep the last entry
+    updated = _entry(document_id, [9.0] * dimension, "updated",
+                     entry_id=entries[0].id)
+    await chunks_handler.bulk_upsert_entries([
+        _entry(document_id, [8.0] * dimension, "stale",
+               entry_id=entries[0].id),
+        updated,
+    ])
+    listed = await chunks_handler.list_document_chunks(
+        document_id=document_id, offset=0, limit=-1, include_vectors=True)
+    assert len(listed["results"]) == 5
+    chunk = next(chunk for chunk in listed["results"]
+                 if chunk["id"] == entries[0].id)
+    assert chunk["text"] == "updated"
+    assert chunk["vector"] == [9.0] * dimension
+
+    # The generated full text column is filled in by the merge
+    results = await chunks_handler.connection_manager.fetch_query(
+        f"SELECT id FROM {chunks_handler._get_table_name('chunks')} "
+        "WHERE document_id = $1 AND fts @@ to_tsquery('english', 'updated')",
+        [document_id])
+    assert [row["id"] for row in results] == [entries[0].id]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_quantizes_binary_vectors(db_provider):
+    schema = f"test_bulk_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    try:
+        handler = PostgresChunksHandler(
+            project_name=schema,
+            connection_manager=connection_manager,
+            dimension=4,
+            quantization_type=VectorQuantizationType.INT1,
+        )
+        await handler.create_tables()
+        entry = _entry(uuid.uuid4(), [1.0, -1.0, 0.5, -0.5], "binary")
+        await handler.bulk_upsert_entries([entry])
+
+        row = await connection_manager.fetchrow_query(
+            f"SELECT vec_binary FROM {handler._get_table_name('chunks')}")
+        assert row["vec_binary"].tolist() == [True, False, True, False]
+    finally:
+        await connection_manager.execute_query(
+            f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["upsert_entries", "bulk_upsert_entries"])
+async def test_upsert_reserves_chunks_within_owner_limit(
+        chunks_handler, method):
+    upsert = getattr(chunks_handler, method)
+    owner_id = uuid.uuid4()
+    dimension = chunks_handler.dimension
+
+    def entries(count, entry_ids=None):
+        batch = [
+            _entry(uuid.uuid4(), [1.0] * dimension, f"chunk {i}",
+                   entry_id=entry_ids[i] if entry_ids else None)
+            for i in range(count)
+        ]
+        for entry in batch:
+            entry.owner_id = owner_id
+        return batch
+
+    stored = entries(3)
+    await upsert(stored, max_chunks={owner_id: 4})
+
+    # The batch is rejected as a whole, and nothing of it is stored
+    with pytest.raises(R2RException, match="maximum number of allowed"):
+        await upsert(entries(2), max_chunks={owner_id: 4})
+    usage = await chunks_handler.list_chunks(
+        limit=1, offset=0, filters={"owner_id": owner_id})
+    assert usage["total_entries"] == 3
+
+    # Replacing stored chunks doesn't take up more room
+    await upsert(entries(3, [entry.id for entry in stored]) + entries(1),
+                 max_chunks={owner_id: 4})
+    usage = await chunks_handler.list_chunks(
+        limit=1, offset=0, filters={"owner_id": owner_id})
+    assert usage["total_entries"] == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_cannot_overrun_owner_limit(chunks_handler):
+    owner_id = uuid.uuid4()
+    dimension = chunks_handler.dimension
+    batches = []
+    for _ in range(5):
+        batch = [
+            _entry(uuid.uuid4(), [1.0] * dimension, "chunk")
+            for _ in range(4)
+        ]
+        for entry in batch:
+            entry.owner_id = owner_id
+        batches.append(batch)
+
+    results = await asyncio.gather(
+        *(chunks_handler.bulk_upsert_entries(batch,
+                                             max_chunks={owner_id: 10})
+          for batch in batches),
+        return_exceptions=True,
+    )
+
+    assert sum(result is None for result in results) == 2
+    assert all(
+        isinstance(result, R2RException) for result in results
+        if result is not None)
+    usage = await chunks_handler.list_chunks(
+        limit=1, offset=0, filters={"owner_id": owner_id})
+    assert usage["total_entries"] == 8
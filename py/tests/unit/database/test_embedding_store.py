@@ -0,0 +1,90 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from core.base import EmbeddingConfig, EmbeddingProvider
+from core.main.services.ingestion_service import IngestionService
+from core.providers.database.embedding_store import (
+    PostgresEmbeddingStoreHandler,
+)
+
+
+class CountingEmbeddingProvider(EmbeddingProvider):
+    """Embeds a text as [len(text)] and records the texts it embeds."""
+
+    def __init__(self):
+        super().__init__(
+            EmbeddingConfig(
+                provider="litellm",
+                base_model="test/model",
+                base_dimension=1,
+            ))
+        self.embedded: list[str] = []
+
+    async def _execute_task(self, task):
+        self.embedded.extend(task["texts"])
+        return [[float(len(text))] for text in task["texts"]]
+
+    def _execute_task_sync(self, task):
+        raise NotImplementedError
+
+    def rerank(self, query, results, stage=None, limit=10):
+        return results[:limit]
+
+    async def arerank(self, query, results, stage=None, limit=10):
+        return results[:limit]
+
+
+@pytest.fixture
+async def store_handler(db_provider):
+    schema = f"test_store_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    handler = PostgresEmbeddingStoreHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        max_entries=2,
+    )
+    await handler.create_tables()
+    yield handler
+    await connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+@pytest.mark.asyncio
+async def test_store_and_evict(store_handler):
+    await store_handler.store_embeddings({"a": [1.0], "b": [2.0]})
+    await store_handler.store_embeddings({"c": [3.0]})
+    # Reading "a" makes "b" the least recently used entry
+    assert await store_handler.get_embeddings(["a", "x"]) == {"a": [1.0]}
+
+    await store_handler.evict()
+    assert await store_handler.get_embeddings(["a", "b", "c"]) == {
+        "a": [1.0],
+        "c": [3.0],
+    }
+
+
+@pytest.mark.asyncio
+async def test_ingestion_only_embeds_new_text(store_handler):
+    provider = CountingEmbeddingProvider()
+    service = IngestionService(
+        config=SimpleNamespace(),
+        providers=SimpleNamespace(
+            embedding=provider,
+            database=SimpleNamespace(embedding_store_handler=store_handler),
+        ),
+    )
+
+    texts = ["page one", "page two", "page one"]
+    assert await service._embed_texts(texts) == [[8.0], [8.0], [8.0]]
+    assert provider.embedded == ["page one", "page two"]
+
+    # Re-ingesting after an edit only embeds the changed text
+    provider.embedded.clear()
+    assert await service._embed_texts(["page one", "page 2"]) == [
+        [8.0],
+        [6.0],
+    ]
+    assert provider.embedded == ["page 2"]
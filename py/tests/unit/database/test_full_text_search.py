@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    SearchSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+
+
+def _entry(document_id, text):
+    return VectorEntry(
+        id=uuid.uuid4(),
+        document_id=document_id,
+        owner_id=uuid.uuid4(),
+        collection_ids=[],
+        vector=Vector(data=[0.1, 0.2, 0.3, 0.4]),
+        text=text,
+        metadata={},
+    )
+
+
+@pytest.fixture
+async def simple_config_schema(db_provider):
+    schema = f"test_fts_{uuid.uuid4().hex[:8]}"
+    await db_provider.connection_manager.execute_query(
+        f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+    yield schema
+    await db_provider.connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_uses_fts_index(chunks_handler):
+    document_id = uuid.uuid4()
+    await chunks_handler.upsert_entries(
+        [_entry(document_id, "gin indexes speed up full text search")])
+
+    table_name = chunks_handler._get_table_name(
+        PostgresChunksHandler.TABLE_NAME)
+    async with chunks_handler.connection_manager.pool.get_connection(
+    ) as conn:
+        async with conn.transaction():
+            # The test table is tiny, make sure the planner considers the index
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            plan = await conn.fetch(
+                f"""
+                EXPLAIN SELECT id FROM {table_name}
+                WHERE fts @@ {chunks_handler._ts_query("$1")}
+                """,
+                "search",
+            )
+    plan_text = "\n".join(row[0] for row in plan)
+    assert "idx_vectors_fts" in plan_text
+
+    results = await chunks_handler.full_text_search(
+        "gin search",
+        SearchSettings(filters={"document_id": {
+            "$eq": str(document_id)
+        }}),
+    )
+    assert [r.text for r in results
+            ] == ["gin indexes speed up full text search"]
+
+
+@pytest.mark.asyncio
+async def test_full_text_index_replaces_expression_index(chunks_handler):
+    indices = await chunks_handler.connection_manager.fetch_query(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = $1",
+        (chunks_handler.project_name, ),
+    )
+    names = {index["indexname"] for index in indices}
+    assert "idx_vectors_fts" in names
+    assert "idx_vectors_text" not in names
+
+
+@pytest.mark.asyncio
+async def test_text_search_config(db_provider, simple_config_schema):
+    handler = PostgresChunksHandler(
+        project_name=simple_config_schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.FP32,
+        text_search_config="simple",
+    )
+    await handler.create_tables()
+    document_id = uuid.uuid4()
+    await handler.upsert_entries([_entry(document_id, "to be or not to be")])
+
+    # The english configuration drops all of these as stop words
+    results = await handler.full_text_search("not to be", SearchSettings())
+    assert [r.text for r in results] == ["to be or not to be"]
+
+    english_handler = PostgresChunksHandler(
+        project_name=simple_config_schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.FP32,
+    )
+    with pytest.raises(ValueError, match="Text search configuration"):
+        await english_handler.create_tables()
+
+
+@pytest.mark.asyncio
+async def test_invalid_text_search_config(db_provider, simple_config_schema):
+    handler = PostgresChunksHandler(
+        project_name=simple_config_schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.FP32,
+        text_search_config="klingon",
+    )
+    with pytest.raises(ValueError, match="Invalid text search"):
+        await handler.create_tables()
@@ -556,3 +556,66 @@ async def test_filter_by_collection_ids_in_entities(graphs_handler):
 #         DELETE FROM "{graphs_handler.project_name}"."graphs_entities" WHERE id = $1
 #     """
 #     await graphs_handler.connection_manager.execute_query(delete_sql, [row_id])
+
+
+@pytest.mark.asyncio
+async def test_graph_search_all_matches_per_type_search(graphs_handler):
+    coll_id = uuid.uuid4()
+    await graphs_handler.create(collection_id=coll_id, name="SearchGraph")
+    entities = []
+    for name, embedding in (("Near", [1.0, 0.0, 0.0, 0.0]),
+                            ("Far", [0.0, 1.0, 0.0, 0.0])):
+        entities.append(await graphs_handler.entities.create(
+            parent_id=coll_id,
+            store_type=StoreType.GRAPHS,
+            name=name,
+            description=f"{name} entity",
+            description_embedding=embedding,
+        ))
+    await graphs_handler.relationships.create(
+        subject="Near",
+        subject_id=entities[0].id,
+        predicate="knows",
+        object="Far",
+        object_id=entities[1].id,
+        parent_id=coll_id,
+        store_type=StoreType.GRAPHS,
+        description="Near knows Far",
+        description_embedding=[1.0, 1.0, 0.0, 0.0],
+    )
+    await graphs_handler.communities.create(
+        parent_id=coll_id,
+        store_type=StoreType.GRAPHS,
+        name="Neighbours",
+        summary="Near and Far",
+        findings=[],
+        rating=1.0,
+        rating_explanation="",
+        description_embedding=[1.0, 0.0, 1.0, 0.0],
+    )
+
+    query_embedding = [1.0, 0.0, 0.0, 0.0]
+    filters = {"collection_ids": {"$in": [str(coll_id)]}}
+    rows = await graphs_handler.graph_search_all(
+        query_embedding=query_embedding,
+        limits={"entities": 1, "relationships": 5, "communities": 5},
+        filters=filters,
+    )
+    assert [(row["search_type"], row.get("name") or row.get("subject"))
+            for row in rows] == [
+                ("entities", "Near"),
+                ("relationships", "Near"),
+                ("communities", "Neighbours"),
+            ]
+    assert rows[1]["object_id"] == entities[1].id
+
+    # Scores match the per-type searches
+    async for entity in graphs_handler.graph_search(
+            "query",
+            search_type="entities",
+            limit=1,
+            query_embedding=query_embedding,
+            filters=filters,
+    ):
+        assert entity["similarity_score"] == pytest.approx(
+            rows[0]["similarity_score"])
@@ -0,0 +1,147 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    IndexMeasure,
+    IndexMethod,
+    SearchSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+    VectorTableName,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+
+
+async def _create_handler(db_provider, schema, quantization_type):
+    await db_provider.connection_manager.execute_query(
+        f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+    handler = PostgresChunksHandler(
+        project_name=schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=quantization_type,
+    )
+    await handler.create_tables()
+    return handler
+
+
+def _entries(document_id, vectors):
+    return [
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=document_id,
+            owner_id=uuid.uuid4(),
+            collection_ids=[],
+            vector=Vector(data=vector),
+            text=f"chunk {i}",
+            metadata={"chunk_order": i},
+        ) for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+async def halfvec_schema(db_provider):
+    schema = f"test_halfvec_{uuid.uuid4().hex[:8]}"
+    yield schema
+    await db_provider.connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+@pytest.mark.asyncio
+async def test_fp16_storage_and_search(db_provider, halfvec_schema):
+    handler = await _create_handler(db_provider, halfvec_schema,
+                                    VectorQuantizationType.FP16)
+    assert await handler._get_vec_column_type() == "halfvec"
+
+    document_id = uuid.uuid4()
+    vectors = [[1.0, 0.0, 0.0, 0.0], [0.0, 0.5, 0.5, 0.0]]
+    await handler.upsert_entries(_entries(document_id, vectors))
+
+    listed = await handler.list_document_chunks(document_id=document_id,
+                                                offset=0,
+                                                limit=-1,
+                                                include_vectors=True)
+    assert [chunk["vector"] for chunk in listed["results"]] == vectors
+
+    await handler.create_index(
+        table_name=VectorTableName.CHUNKS,
+        index_measure=IndexMeasure.cosine_distance,
+        index_method=IndexMethod.hnsw,
+        index_name="ix_halfvec_test",
+        concurrently=False,
+    )
+    indices = await handler.list_indices(
+        offset=0, limit=10, filters={"table_name": "chunks"})
+    assert [index["name"] for index in indices["indices"]
+            ] == ["ix_halfvec_test"]
+    assert "halfvec_cosine_ops" in indices["indices"][0]["definition"]
+
+    results = await handler.semantic_search(
+        [0.0, 1.0, 1.0, 0.0],
+        SearchSettings(limit=1),
+    )
+    assert results[0].text == "chunk 1"
+    assert results[0].score == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_fp16_index_dimension_limit(db_provider, halfvec_schema):
+    handler = await _create_handler(db_provider, halfvec_schema,
+                                    VectorQuantizationType.FP32)
+    handler.dimension = 2560
+    with pytest.raises(ValueError, match="FP16"):
+        await handler.create_index(
+            table_name=VectorTableName.CHUNKS,
+            index_method=IndexMethod.hnsw,
+            concurrently=False,
+        )
+
+
+@pytest.mark.asyncio
+async def test_migrate_fp32_to_fp16(db_provider, halfvec_schema):
+    fp32_handler = await _create_handler(db_provider, halfvec_schema,
+                                         VectorQuantizationType.FP32)
+    document_id = uuid.uuid4()
+    vectors = [[float(i), 1.0, 0.0, 0.25] for i in range(25)]
+    await fp32_handler.upsert_entries(_entries(document_id, vectors))
+    await fp32_handler.create_index(
+        table_name=VectorTableName.CHUNKS,
+        index_method=IndexMethod.hnsw,
+        index_name="ix_vector_cosine_ops_hnsw__vec_test",
+        concurrently=False,
+    )
+
+    with pytest.raises(ValueError, match="Vector type mismatch"):
+        await _create_handler(db_provider, halfvec_schema,
+                              VectorQuantizationType.FP16)
+
+    fp16_handler = PostgresChunksHandler(
+        project_name=halfvec_schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.FP16,
+    )
+    result = await fp16_handler.migrate_vector_storage(batch_size=10)
+    assert result["source_type"] == "vector"
+    assert result["target_type"] == "halfvec"
+    assert result["rows_migrated"] == len(vectors)
+    assert result["indices_rebuilt"] == [
+        "ix_halfvec_cosine_ops_hnsw__vec_test"
+    ]
+
+    # The table now passes validation and keeps its data and index
+    await fp16_handler.create_tables()
+    assert await fp16_handler._get_vec_column_type() == "halfvec"
+    listed = await fp16_handler.list_document_chunks(document_id=document_id,
+                                                     offset=0,
+                                                     limit=-1,
+                                                     include_vectors=True)
+    assert sorted(chunk["vector"] for chunk in listed["results"]) == vectors
+    indices = await fp16_handler.list_indices(offset=0, limit=10)
+    assert "(vec halfvec_cosine_ops)" in indices["indices"][0]["definition"]
+
+    # Running the migration again is a no-op
+    result = await fp16_handler.migrate_vector_storage()
+    assert result["rows_migrated"] == 0
@@ -0,0 +1,90 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    HybridSearchSettings,
+    SearchSettings,
+    Vector,
+    VectorEntry,
+)
+
+TEXTS = [
+    "postgres vector search with hnsw indexes",
+    "full text search ranks documents with tsvector",
+    "reciprocal rank fusion merges search rankings",
+    "cooking pasta requires salted boiling water",
+    "hybrid search combines vector and full text search",
+    "the weather today is sunny",
+]
+
+
+@pytest.fixture
+async def hybrid_document(chunks_handler):
+    document_id = uuid.uuid4()
+    owner_id = uuid.uuid4()
+    entries = [
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=document_id,
+            owner_id=owner_id,
+            collection_ids=[],
+            vector=Vector(data=[1.0, float(i), float(i % 3), 0.5]),
+            text=text,
+            metadata={"chunk_order": i},
+        ) for i, text in enumerate(TEXTS)
+    ]
+    await chunks_handler.upsert_entries(entries)
+    return document_id
+
+
+def _settings(document_id, fused, limit=3, offset=0):
+    return SearchSettings(
+        use_hybrid_search=True,
+        limit=limit,
+        offset=offset,
+        filters={"document_id": {
+            "$eq": str(document_id)
+        }},
+        hybrid_settings=HybridSearchSettings(full_text_limit=10, fused=fused),
+    )
+
+
+def _summary(results):
+    return [(
+        r.text,
+        round(r.score, 9),
+        r.metadata["semantic_rank"],
+        r.metadata["full_text_rank"],
+    ) for r in results]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("offset", [0, 2])
+async def test_fused_matches_concurrent(chunks_handler, hybrid_document,
+                                        offset):
+    query_vector = [1.0, 4.0, 1.0, 0.5]
+    fused = await chunks_handler.hybrid_search(
+        "search", query_vector,
+        _settings(hybrid_document, fused=True, offset=offset))
+    concurrent = await chunks_handler.hybrid_search(
+        "search", query_vector,
+        _settings(hybrid_document, fused=False, offset=offset))
+
+    assert len(fused) == 3
+    assert _summary(fused) == _summary(concurrent)
+    assert fused[0].metadata["chunk_order"] == concurrent[0].metadata[
+        "chunk_order"]
+
+
+@pytest.mark.asyncio
+async def test_fused_hybrid_ranks(chunks_handler, hybrid_document):
+    results = await chunks_handler.hybrid_search(
+        "hybrid search", [1.0, 4.0, 1.0, 0.5],
+        _settings(hybrid_document, fused=True, limit=1))
+
+    # Closest vector and the only full text match for both terms
+    assert results[0].text == TEXTS[4]
+    assert results[0].metadata["semantic_rank"] == 1
+    assert results[0].metadata["full_text_rank"] == 1
+    assert results[0].score == pytest.approx(1 / 51)
@@ -0,0 +1,107 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    ChunkSearchSettings,
+    IndexMethod,
+    IterativeScan,
+    SearchSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+    VectorTableName,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+
+
+def _handler(connection_manager=None, schema="test_project", **defaults):
+    return PostgresChunksHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        dimension=4,
+        quantization_type=VectorQuantizationType.FP32,
+        search_defaults=ChunkSearchSettings(**defaults),
+    )
+
+
+def test_index_settings_request_overrides_defaults():
+    handler = _handler(ef_search=100, probes=5)
+    settings = SearchSettings(chunk_settings=ChunkSearchSettings(
+        ef_search=200, iterative_scan=IterativeScan.relaxed_order))
+    assert handler._index_settings(settings) == {
+        "hnsw.ef_search": "200",
+        "ivfflat.probes": "5",
+        "hnsw.iterative_scan": "relaxed_order",
+        "ivfflat.iterative_scan": "relaxed_order",
+    }
+
+
+def test_index_settings_unset():
+    assert _handler()._index_settings(SearchSettings()) == {}
+
+
+def test_index_settings_strict_order_is_hnsw_only():
+    handler = _handler(iterative_scan="strict_order", max_scan_tuples=1000)
+    assert handler._index_settings(SearchSettings()) == {
+        "hnsw.iterative_scan": "strict_order",
+        "hnsw.max_scan_tuples": "1000",
+    }
+
+    handler.supports_iterative_scan = False
+    assert handler._index_settings(SearchSettings()) == {}
+
+
+@pytest.fixture
+async def indexed_handler(db_provider):
+    schema = f"test_ann_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    handler = _handler(connection_manager, schema)
+    await handler.create_tables()
+    await handler.upsert_entries([
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=uuid.uuid4(),
+            owner_id=uuid.uuid4(),
+            collection_ids=[],
+            vector=Vector(data=[1.0, i / 100, 0.0, 0.0]),
+            text=f"chunk {i}",
+            metadata={"group": "far" if i >= 90 else "near"},
+        ) for i in range(100)
+    ])
+    await handler.create_index(
+        table_name=VectorTableName.CHUNKS,
+        index_method=IndexMethod.hnsw,
+        concurrently=False,
+    )
+
+    # Make sure the tiny test table is searched through the HNSW index
+    index_settings = handler._index_settings
+    handler._index_settings = lambda settings: {
+        **index_settings(settings),
+        "enable_seqscan": "off",
+    }
+    yield handler
+    await connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+@pytest.mark.asyncio
+async def test_iterative_scan_fills_filtered_search(indexed_handler):
+    settings = SearchSettings(
+        limit=5,
+        filters={"metadata.group": {
+            "$eq": "far"
+        }},
+        chunk_settings=ChunkSearchSettings(ef_search=5),
+    )
+    query_vector = [1.0, 0.0, 0.0, 0.0]
+
+    # The 5 nearest candidates all fail the filter
+    results = await indexed_handler.semantic_search(query_vector, settings)
+    assert len(results) == 0
+
+    settings.chunk_settings.iterative_scan = IterativeScan.strict_order
+    results = await indexed_handler.semantic_search(query_vector, settings)
+    assert [r.text for r in results] == [f"chunk {i}" for i in range(90, 95)]
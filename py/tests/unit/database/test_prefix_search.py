@@ -0,0 +1,178 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    ChunkSearchSettings,
+    SearchSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+
+QUERY = [1.0, 0.0, 1.0, 0.0]
+VECTORS = {
+    # Identical prefix to the query, different tail
+    "prefix_match": [1.0, 0.0, -1.0, 0.0],
+    # Close on all four dimensions
+    "full_match": [0.9, 0.2, 1.0, 0.1],
+    "far": [-1.0, 1.0, -1.0, 1.0],
+}
+
+
+def _handler(db_provider,
+             schema,
+             prefix_dimension=None,
+             quantization_type=VectorQuantizationType.FP32):
+    return PostgresChunksHandler(
+        project_name=schema,
+        connection_manager=db_provider.connection_manager,
+        dimension=4,
+        quantization_type=quantization_type,
+        search_defaults=ChunkSearchSettings(prefix_search=True),
+        prefix_dimension=prefix_dimension,
+    )
+
+
+@pytest.fixture
+async def prefix_schema(db_provider):
+    schema = f"test_prefix_{uuid.uuid4().hex[:8]}"
+    await db_provider.connection_manager.execute_query(
+        f'CREATE SCHEMA "{schema}"')
+    yield schema
+    await db_provider.connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+async def _insert(handler):
+    await handler.upsert_entries([
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=uuid.uuid4(),
+            owner_id=uuid.uuid4(),
+            collection_ids=[],
+            vector=Vector(data=vector),
+            text=name,
+            metadata={},
+        ) for name, vector in VECTORS.items()
+    ])
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_reranks_on_full_vectors(db_provider,
+                                                     prefix_schema):
+    handler = _handler(db_provider, prefix_schema, prefix_dimension=2)
+    await handler.create_tables()
+    await _insert(handler)
+
+    indices = await handler.list_indices(offset=0, limit=10)
+    assert [index["name"] for index in indices["indices"]
+            ] == ["idx_vectors_prefix"]
+
+    # A pool of one candidate only holds the best prefix match
+    results = await handler.semantic_search(
+        QUERY,
+        SearchSettings(
+            limit=1,
+            chunk_settings=ChunkSearchSettings(oversampling_factor=1)),
+    )
+    assert [r.text for r in results] == ["prefix_match"]
+
+    # With a larger pool the exact rerank decides the order
+    results = await handler.semantic_search(QUERY, SearchSettings(limit=2))
+    assert [r.text for r in results] == ["full_match", "prefix_match"]
+    assert results[0].score > 0.9
+
+
+@pytest.mark.asyncio
+async def test_prefix_column_added_to_existing_table(db_provider,
+                                                     prefix_schema):
+    await _handler(db_provider, prefix_schema).create_tables()
+    await _insert(_handler(db_provider, prefix_schema))
+
+    handler = _handler(db_provider, prefix_schema, prefix_dimension=2)
+    await handler.create_tables()
+    prefixes = await db_provider.connection_manager.fetch_query(
+        f"SELECT text, vec_prefix FROM {handler._get_table_name('chunks')}")
+    # The prefix is stored as halfvec, so compare with half precision
+    assert {row["text"]: row["vec_prefix"].tolist()
+            for row in prefixes} == {
+                name: pytest.approx(vector[:2], abs=1e-3)
+                for name, vector in VECTORS.items()
+            }
+
+    results = await handler.semantic_search(QUERY, SearchSettings(limit=1))
+    assert [r.text for r in results] == ["full_match"]
+
+
+async def _prefixes(handler):
+    rows = await handler.connection_manager.fetch_query(
+        f"SELECT text, vec_prefix FROM {handler._get_table_name('chunks')}")
+    return {row["text"]: row["vec_prefix"].tolist() for row in rows}
+
+
+async def _relfilenode(handler):
+    row = await handler.connection_manager.fetchrow_query(
+        "SELECT relfilenode FROM pg_class WHERE oid = $1::regclass",
+        [handler._get_table_name("chunks")])
+    return row["relfilenode"]
+
+
+@pytest.mark.asyncio
+async def test_generated_prefix_column_is_kept_without_rewrite(
+        db_provider, prefix_schema):
+    handler = _handler(db_provider, prefix_schema)
+    await handler.create_tables()
+    await _insert(handler)
+    # The prefix column of earlier versions was generated from `vec`
+    await db_provider.connection_manager.execute_query(
+        f"ALTER TABLE {handler._get_table_name('chunks')} "
+        "ADD COLUMN vec_prefix halfvec(2) GENERATED ALWAYS AS "
+        "(subvector(vec, 1, 2)::halfvec(2)) STORED")
+    relfilenode = await _relfilenode(handler)
+
+    handler = _handler(db_provider, prefix_schema, prefix_dimension=2)
+    await handler.create_tables()
+    assert await _relfilenode(handler) == relfilenode
+
+    # The trigger keeps the prefix of new and updated vectors
+    await _insert(handler)
+    await db_provider.connection_manager.execute_query(
+        f"UPDATE {handler._get_table_name('chunks')} "
+        "SET vec = '[0, 1, 0, 0]' WHERE text = 'far'")
+    prefixes = await _prefixes(handler)
+    assert prefixes["far"] == pytest.approx([0.0, 1.0])
+    assert all(prefix is not None for prefix in prefixes.values())
+
+
+@pytest.mark.asyncio
+async def test_prefix_column_survives_vector_migration(db_provider,
+                                                       prefix_schema):
+    handler = _handler(db_provider, prefix_schema, prefix_dimension=2)
+    await handler.create_tables()
+    await _insert(handler)
+
+    handler = _handler(db_provider,
+                       prefix_schema,
+                       prefix_dimension=2,
+                       quantization_type=VectorQuantizationType.FP16)
+    await handler.migrate_vector_storage()
+    relfilenode = await _relfilenode(handler)
+    await handler.create_tables()
+    assert await _relfilenode(handler) == relfilenode
+
+    await db_provider.connection_manager.execute_query(
+        f"UPDATE {handler._get_table_name('chunks')} "
+        "SET vec = '[0, 1, 0, 0]' WHERE text = 'far'")
+    prefixes = await _prefixes(handler)
+    assert prefixes["far"] == pytest.approx([0.0, 1.0])
+    assert prefixes["full_match"] == pytest.approx([0.9, 0.2], abs=1e-3)
+
+    results = await handler.semantic_search(QUERY, SearchSettings(limit=1))
+    assert [r.text for r in results] == ["full_match"]
+
+
+def test_prefix_dimension_must_be_smaller(db_provider):
+    with pytest.raises(ValueError, match="prefix dimension"):
+        _handler(db_provider, "test_project", prefix_dimension=4)
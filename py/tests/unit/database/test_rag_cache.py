@@ -0,0 +1,246 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    ChunkSearchSettings,
+    RAGCacheSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+from core.providers.database.documents import PostgresDocumentsHandler
+from core.providers.database.graphs import PostgresGraphsHandler
+from core.providers.database.rag_cache import (
+    PostgresRAGCacheHandler,
+    search_scope,
+)
+
+COLLECTION = uuid.uuid4()
+OTHER_COLLECTION = uuid.uuid4()
+OWNER = uuid.uuid4()
+FILTERS = {"collection_ids": {"$overlap": [str(COLLECTION)]}}
+RESPONSE = {"generated_answer": "Paris", "completion": "Paris"}
+
+
+@pytest.fixture
+async def cache_schema(db_provider):
+    schema = f"test_rag_cache_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    chunks_handler = PostgresChunksHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        dimension=2,
+        quantization_type=VectorQuantizationType.FP32,
+        search_defaults=ChunkSearchSettings(),
+    )
+    await chunks_handler.create_tables()
+    # The versions of the cache are bumped by graph changes too
+    await PostgresDocumentsHandler(project_name=schema,
+                                   connection_manager=connection_manager,
+                                   dimension=2).create_tables()
+    graphs_handler = PostgresGraphsHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        dimension=2,
+        quantization_type=VectorQuantizationType.FP32,
+    )
+    await graphs_handler.create_tables()
+    for handler in graphs_handler.handlers:
+        await handler.create_tables()
+    cache_handler = PostgresRAGCacheHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        dimension=2,
+        settings=RAGCacheSettings(enabled=True, similarity_threshold=0.9),
+    )
+    await cache_handler.create_tables()
+    yield chunks_handler, cache_handler
+    await connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+def _chunk(collection_ids, owner_id=None):
+    return VectorEntry(
+        id=uuid.uuid4(),
+        document_id=uuid.uuid4(),
+        owner_id=owner_id or uuid.uuid4(),
+        collection_ids=collection_ids,
+        vector=Vector(data=[1.0, 0.0]),
+        text="chunk",
+        metadata={},
+    )
+
+
+async def _store(cache, embedding, filters, *args):
+    versions = await cache.scope_versions(filters)
+    return await cache.store_response(embedding,
+                                      filters,
+                                      *args,
+                                      versions=versions)
+
+
+@pytest.mark.asyncio
+async def test_similar_queries_share_a_response(cache_schema):
+    _, cache = cache_schema
+    await _store(cache, [1.0, 0.0], FILTERS, "settings", "model", RESPONSE)
+
+    response, similarity = await cache.get_response([0.99, 0.1], FILTERS,
+                                                    "settings", "model")
+    assert response == RESPONSE
+    assert similarity > 0.9
+
+    # Too far from the cached query
+    assert await cache.get_response([0.0, 1.0], FILTERS, "settings",
+                                    "model") is None
+    # Different filters, settings or model
+    other_filters = {"collection_ids": {"$overlap": [str(OTHER_COLLECTION)]}}
+    assert await cache.get_response([1.0, 0.0], other_filters, "settings",
+                                    "model") is None
+    assert await cache.get_response([1.0, 0.0], FILTERS, "other",
+                                    "model") is None
+    assert await cache.get_response([1.0, 0.0], FILTERS, "settings",
+                                    "other") is None
+
+
+@pytest.mark.asyncio
+async def test_filter_lists_are_matched_in_any_order(cache_schema):
+    _, cache = cache_schema
+    ids = [str(COLLECTION), str(OTHER_COLLECTION)]
+    await _store(cache, [1.0, 0.0], {"collection_ids": {
+        "$overlap": ids
+    }}, "settings", "model", RESPONSE)
+
+    assert await cache.get_response(
+        [1.0, 0.0], {"collection_ids": {
+            "$overlap": ids[::-1]
+        }}, "settings", "model") is not None
+
+
+@pytest.mark.asyncio
+async def test_chunk_changes_invalidate_scoped_responses(cache_schema):
+    chunks, cache = cache_schema
+    await _store(cache, [1.0, 0.0], FILTERS, "settings", "model", RESPONSE)
+    owner_filters = {"owner_id": {"$eq": str(OWNER)}}
+    await _store(cache, [1.0, 0.0], owner_filters, "settings", "model",
+                 RESPONSE)
+
+    # Chunks outside of the scope of a response keep it
+    await chunks.upsert_entries([_chunk([OTHER_COLLECTION])])
+    assert await cache.get_response([1.0, 0.0], FILTERS, "settings",
+                                    "model") is not None
+    assert await cache.get_response([1.0, 0.0], owner_filters, "settings",
+                                    "model") is not None
+
+    await chunks.upsert_entries([_chunk([COLLECTION])])
+    assert await cache.get_response([1.0, 0.0], FILTERS, "settings",
+                                    "model") is None
+
+    # New chunks of an owner invalidate the responses scoped to them
+    await chunks.upsert_entries([_chunk([], owner_id=OWNER)])
+    assert await cache.get_response([1.0, 0.0], owner_filters, "settings",
+                                    "model") is None
+
+
+@pytest.mark.asyncio
+async def test_unscoped_responses_are_invalidated_by_any_change(
+        cache_schema):
+    chunks, cache = cache_schema
+    chunk = _chunk([OTHER_COLLECTION])
+    await chunks.upsert_entries([chunk])
+    await _store(cache, [1.0, 0.0], {}, "settings", "model", RESPONSE)
+
+    await chunks.delete({"id": {"$eq": str(chunk.id)}})
+    assert await cache.get_response([1.0, 0.0], {}, "settings",
+                                    "model") is None
+
+
+@pytest.mark.asyncio
+async def test_large_query_embeddings_are_indexed(cache_schema):
+    _, cache = cache_schema
+    connection_manager = cache.connection_manager
+    table_name = cache._get_table_name(PostgresRAGCacheHandler.TABLE_NAME)
+    await connection_manager.execute_query(f"DROP TABLE {table_name}")
+    # Caches created before queries were stored as `halfvec`
+    await connection_manager.execute_query(
+        f"CREATE TABLE {table_name} (id UUID PRIMARY KEY, "
+        "query_embedding vector(2560) NOT NULL, filters_key TEXT NOT NULL, "
+        "settings_key TEXT NOT NULL, model TEXT NOT NULL, "
+        "collection_ids UUID[], owner_ids UUID[], response JSONB NOT NULL, "
+        "created_at TIMESTAMPTZ DEFAULT NOW())")
+    cache = PostgresRAGCacheHandler(
+        project_name=cache.project_name,
+        connection_manager=connection_manager,
+        dimension=2560,
+        settings=cache.settings,
+    )
+    await cache.create_tables()
+
+    index = await connection_manager.fetchrow_query(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = $1 "
+        "AND indexname LIKE '%query_embedding'",
+        [cache.project_name],
+    )
+    assert "hnsw (query_embedding halfvec_cosine_ops)" in index["indexdef"]
+
+    embedding = [1.0] + [0.0] * 2559
+    await _store(cache, embedding, FILTERS, "settings", "model", RESPONSE)
+    response, similarity = await cache.get_response(embedding, FILTERS,
+                                                    "settings", "model")
+    assert response == RESPONSE
+    assert similarity == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_responses_generated_during_changes_are_not_stored(
+        cache_schema):
+    chunks, cache = cache_schema
+    for filters in (FILTERS, {}):
+        # Read before searching
+        versions = await cache.scope_versions(filters)
+        await chunks.upsert_entries([_chunk([COLLECTION])])
+
+        assert await cache.store_response([1.0, 0.0],
+                                          filters,
+                                          "settings",
+                                          "model",
+                                          RESPONSE,
+                                          versions=versions) is None
+        assert await cache.get_response([1.0, 0.0], filters, "settings",
+                                        "model") is None
+
+
+def test_search_scope():
+    user_filters = {
+        "$or": [
+            {
+                "owner_id": {
+                    "$eq": str(OWNER)
+                }
+            },
+            {
+                "collection_ids": {
+                    "$overlap": [str(COLLECTION)]
+                }
+            },
+        ]
+    }
+    assert search_scope(user_filters) == ({COLLECTION}, {OWNER})
+    assert search_scope({
+        "$and": [user_filters, {
+            "document_type": {
+                "$eq": "pdf"
+            }
+        }]
+    }) == ({COLLECTION}, {OWNER})
+    # A branch that isn't bounded by collections or owners
+    assert search_scope({
+        "$or": [user_filters, {
+            "document_type": {
+                "$eq": "pdf"
+            }
+        }]
+    }) is None
+    assert search_scope({}) is None
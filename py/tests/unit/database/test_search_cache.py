@@ -0,0 +1,234 @@
+import uuid
+
+import pytest
+
+from core.base import (
+    AggregateSearchResult,
+    ChunkSearchResult,
+    ChunkSearchSettings,
+    GraphCommunityResult,
+    GraphEntityResult,
+    GraphSearchResult,
+    SearchCacheSettings,
+    Vector,
+    VectorEntry,
+    VectorQuantizationType,
+)
+from core.providers.database.chunks import PostgresChunksHandler
+from core.providers.database.documents import PostgresDocumentsHandler
+from core.providers.database.graphs import PostgresGraphsHandler
+from core.providers.database.search_cache import (
+    InMemorySearchCache,
+    PostgresSearchCacheHandler,
+)
+
+COLLECTION = uuid.uuid4()
+OTHER_COLLECTION = uuid.uuid4()
+OWNER = uuid.uuid4()
+FILTERS = {"collection_ids": {"$overlap": [str(COLLECTION)]}}
+RESULTS = {"chunk_search_results": [], "graph_search_results": []}
+
+
+@pytest.fixture(params=["memory", "postgres"])
+async def cache_schema(request, db_provider):
+    schema = f"test_search_cache_{uuid.uuid4().hex[:8]}"
+    connection_manager = db_provider.connection_manager
+    await connection_manager.execute_query(f'CREATE SCHEMA "{schema}"')
+    handler_kwargs = {
+        "project_name": schema,
+        "connection_manager": connection_manager,
+        "dimension": 2,
+        "quantization_type": VectorQuantizationType.FP32,
+    }
+    chunks_handler = PostgresChunksHandler(
+        search_defaults=ChunkSearchSettings(), **handler_kwargs)
+    await chunks_handler.create_tables()
+    await PostgresDocumentsHandler(project_name=schema,
+                                   connection_manager=connection_manager,
+                                   dimension=2).create_tables()
+    graphs_handler = PostgresGraphsHandler(**handler_kwargs)
+    await graphs_handler.create_tables()
+    for handler in graphs_handler.handlers:
+        await handler.create_tables()
+    cache_handler = PostgresSearchCacheHandler(
+        project_name=schema,
+        connection_manager=connection_manager,
+        settings=SearchCacheSettings(enabled=True, backend=request.param),
+    )
+    await cache_handler.create_tables()
+    yield chunks_handler, cache_handler
+    await connection_manager.execute_query(
+        f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+
+
+def _chunk(collection_ids, owner_id=None):
+    return VectorEntry(
+        id=uuid.uuid4(),
+        document_id=uuid.uuid4(),
+        owner_id=owner_id or uuid.uuid4(),
+        collection_ids=collection_ids,
+        vector=Vector(data=[1.0, 0.0]),
+        text="chunk",
+        metadata={},
+    )
+
+
+async def _cached(cache, filters, graph_search=False):
+    key = await cache.search_key("query",
+                                 filters,
+                                 "settings",
+                                 graph_search=graph_search)
+    return await cache.get(key)
+
+
+@pytest.mark.asyncio
+async def test_identical_searches_share_results(cache_schema):
+    _, cache = cache_schema
+    key = await cache.search_key("query", FILTERS, "settings")
+    await cache.set(key, RESULTS)
+
+    assert await _cached(cache, FILTERS) == RESULTS
+    # Filter lists are matched in any order
+    assert await cache.get(await cache.search_key(
+        "query",
+        {"collection_ids": {
+            "$overlap": [str(COLLECTION)]
+        }},
+        "settings",
+    )) == RESULTS
+    assert await cache.get(await cache.search_key("other", FILTERS,
+                                                  "settings")) is None
+    assert await cache.get(await cache.search_key("query", FILTERS,
+                                                  "other")) is None
+    assert await _cached(
+        cache,
+        {"collection_ids": {
+            "$overlap": [str(OTHER_COLLECTION)]
+        }}) is None
+
+
+@pytest.mark.asyncio
+async def test_chunk_changes_invalidate_scoped_results(cache_schema):
+    chunks, cache = cache_schema
+    owner_filters = {"owner_id": {"$eq": str(OWNER)}}
+    for filters in (FILTERS, owner_filters):
+        await cache.set(await cache.search_key("query", filters, "settings"),
+                        RESULTS)
+
+    # Chunks outside of the scope of a search keep its results
+    await chunks.upsert_entries([_chunk([OTHER_COLLECTION])])
+    assert await _cached(cache, FILTERS) == RESULTS
+    assert await _cached(cache, owner_filters) == RESULTS
+
+    chunk = _chunk([COLLECTION], owner_id=OWNER)
+    await chunks.upsert_entries([chunk])
+    assert await _cached(cache, FILTERS) is None
+    assert await _cached(cache, owner_filters) is None
+
+    # Moving a chunk out of a collection, and deleting it
+    await cache.set(await cache.search_key("query", FILTERS, "settings"),
+                    RESULTS)
+    await chunks.connection_manager.execute_query(
+        f"UPDATE {chunks._get_table_name(PostgresChunksHandler.TABLE_NAME)} "
+        "SET collection_ids = ARRAY[]::uuid[] WHERE id = $1",
+        [chunk.id],
+    )
+    assert await _cached(cache, FILTERS) is None
+
+    await cache.set(await cache.search_key("query", {}, "settings"), RESULTS)
+    await chunks.delete({"id": {"$eq": str(chunk.id)}})
+    assert await _cached(cache, {}) is None
+
+
+@pytest.mark.asyncio
+async def test_graph_changes_invalidate_scoped_results(cache_schema):
+    chunks, cache = cache_schema
+    await cache.set(await cache.search_key("query", FILTERS, "settings"),
+                    RESULTS)
+
+    connection_manager = chunks.connection_manager
+    await connection_manager.execute_query(
+        f"INSERT INTO {chunks._get_table_name('graphs')} "
+        "(id, collection_id, name, status) VALUES ($1, $1, 'graph', 'ok')",
+        [COLLECTION],
+    )
+    await connection_manager.execute_query(
+        f"INSERT INTO {chunks._get_table_name('graphs_entities')} "
+        "(name, parent_id) VALUES ('entity', $1)",
+        [COLLECTION],
+    )
+    assert await _cached(cache, FILTERS) is None
+
+
+@pytest.mark.asyncio
+async def test_writers_to_other_scopes_do_not_wait(cache_schema):
+    chunks, cache = cache_schema
+    await cache.set(await cache.search_key("query", {}, "settings"), RESULTS)
+    pool = chunks.connection_manager.pool
+    query = (
+        f"INSERT INTO {chunks._get_table_name(PostgresChunksHandler.TABLE_NAME)} "
+        "(id, document_id, owner_id, collection_ids, vec, text, metadata) "
+        "VALUES ($1, $1, $1, $2, '[1, 0]', 'chunk', '{}')")
+
+    async with pool.get_connection() as conn, conn.transaction():
+        await conn.execute(query, uuid.uuid4(), [COLLECTION])
+        async with pool.get_connection() as other_conn:
+            async with other_conn.transaction():
+                await other_conn.execute("SET LOCAL lock_timeout = '1s'")
+                await other_conn.execute(query, uuid.uuid4(),
+                                         [OTHER_COLLECTION])
+
+            # Searches that aren't bounded by a scope see every change
+            assert await _cached(cache, {}) is None
+
+
+@pytest.mark.asyncio
+async def test_results_round_trip(cache_schema):
+    _, cache = cache_schema
+    results = AggregateSearchResult(
+        chunk_search_results=[
+            ChunkSearchResult(
+                id=uuid.uuid4(),
+                document_id=uuid.uuid4(),
+                owner_id=OWNER,
+                collection_ids=[COLLECTION],
+                score=0.5,
+                text="chunk",
+                metadata={"title": "doc"},
+            )
+        ],
+        graph_search_results=[
+            GraphSearchResult(
+                id=uuid.uuid4(),
+                content=GraphEntityResult(name="Paris",
+                                          description="A city"),
+                result_type="entity",
+            ),
+            GraphSearchResult(
+                id=uuid.uuid4(),
+                content=GraphCommunityResult(name="Cities",
+                                             summary="Large cities"),
+                result_type="community",
+            ),
+        ],
+    )
+    key = await cache.search_key("query", FILTERS, "settings")
+    await cache.set(key, results.model_dump(mode="json"))
+
+    cached = AggregateSearchResult.model_validate(await cache.get(key))
+    assert cached == results
+    assert isinstance(cached.graph_search_results[1].content,
+                      GraphCommunityResult)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemorySearchCache(max_size=2, ttl_seconds=60)
+    await cache.set("a", {"a": 1})
+    await cache.set("b", {"b": 1})
+    await cache.get("a")
+    await cache.set("c", {"c": 1})
+
+    assert await cache.get("a") == {"a": 1}
+    assert await cache.get("b") is None
+    assert len(cache) == 2
@@ -0,0 +1,105 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from core.base import SearchSettings, Vector, VectorEntry
+from core.providers.database.vector_codecs import (
+    decode_bit,
+    decode_halfvec,
+    decode_sparsevec,
+    decode_vector,
+    encode_bit,
+    encode_halfvec,
+    encode_sparsevec,
+    encode_vector,
+    vector_to_list,
+)
+
+
+def test_vector_roundtrip():
+    data = [0.25, -1.5, 3.0, 0.0]
+    encoded = encode_vector(data)
+    # 4 byte header + 4 bytes per float32 element
+    assert len(encoded) == 4 + 4 * len(data)
+    decoded = decode_vector(encoded)
+    assert decoded.dtype == np.float32
+    assert decoded.tolist() == data
+
+
+def test_vector_accepts_text_literal_and_ndarray():
+    expected = encode_vector([0.5, 1.0, 2.0])
+    assert encode_vector("[0.5, 1.0, 2.0]") == expected
+    assert encode_vector(np.array([0.5, 1.0, 2.0],
+                                  dtype=np.float64)) == expected
+
+
+def test_vector_rejects_nested_input():
+    with pytest.raises(ValueError):
+        encode_vector([[0.1, 0.2], [0.3, 0.4]])
+
+
+def test_halfvec_roundtrip():
+    data = [0.5, -2.0, 1024.0]
+    encoded = encode_halfvec(data)
+    assert len(encoded) == 4 + 2 * len(data)
+    assert decode_halfvec(encoded).tolist() == data
+
+
+def test_bit_roundtrip():
+    bits = np.array([1, 0, 1, 1, 0, 0, 1, 1, 1, 0], dtype=bool)
+    decoded = decode_bit(encode_bit(bits))
+    assert decoded.tolist() == bits.tolist()
+    # ASCII bit strings are accepted as well
+    assert encode_bit(b"1011001110") == encode_bit(bits)
+    assert encode_bit("1011001110") == encode_bit(bits)
+
+
+def test_sparsevec_roundtrip():
+    dense = [0.0, 1.5, 0.0, 2.0, 0.0]
+    assert decode_sparsevec(encode_sparsevec(dense)).tolist() == dense
+    # Text literal indices are 1-based
+    assert encode_sparsevec("{2:1.5,4:2}/5") == encode_sparsevec(dense)
+
+
+def test_vector_to_list():
+    assert vector_to_list(None) is None
+    assert vector_to_list(np.array([1.0, 2.0],
+                                   dtype=np.float32)) == [1.0, 2.0]
+    assert vector_to_list("[1.0,2.0]") == [1.0, 2.0]
+    assert vector_to_list((1.0, 2.0)) == [1.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_chunk_vectors_roundtrip_binary(chunks_handler):
+    document_id = uuid.uuid4()
+    owner_id = uuid.uuid4()
+    vectors = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]
+    entries = [
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=document_id,
+            owner_id=owner_id,
+            collection_ids=[],
+            vector=Vector(data=vector),
+            text=f"chunk {i}",
+            metadata={"chunk_order": i},
+        ) for i, vector in enumerate(vectors)
+    ]
+    await chunks_handler.upsert_entries(entries)
+
+    listed = await chunks_handler.list_document_chunks(
+        document_id=document_id, offset=0, limit=-1, include_vectors=True)
+    assert [chunk["vector"] for chunk in listed["results"]] == vectors
+
+    results = await chunks_handler.semantic_search(
+        [0.0, 1.0, 0.0, 0.0],
+        SearchSettings(
+            limit=1,
+            filters={"document_id": {
+                "$eq": str(document_id)
+            }},
+        ),
+    )
+    assert results[0].text == "chunk 1"
+    assert results[0].score == pytest.approx(1.0)
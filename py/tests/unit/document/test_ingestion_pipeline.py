@@ -0,0 +1,202 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from core.base import DocumentChunk, R2RException, Vector, VectorEntry
+from core.main.orchestration.simple.ingestion_workflow import _Pipeline
+from core.main.services.ingestion_service import IngestionService
+
+DOCUMENT_ID = uuid.uuid4()
+OWNER_ID = uuid.uuid4()
+
+
+class FakeChunksHandler:
+    """Records the stored vectors, how far parsing was at each upsert, and
+    the concurrent writers."""
+
+    def __init__(self, progress):
+        self.progress = progress
+        self.stored = 0
+        self.max_in_flight = 0
+        self.writers = 0
+        self.max_writers = 0
+        self.max_chunks = []
+
+    async def upsert_entries(self, entries, max_chunks=None):
+        self.max_chunks.append(max_chunks)
+        self.writers += 1
+        self.max_writers = max(self.max_writers, self.writers)
+        await asyncio.sleep(0.001)
+        self.writers -= 1
+        limit = (max_chunks or {}).get(entries[0].owner_id)
+        if limit is not None and len(entries) > limit:
+            raise R2RException(
+                message="User has exceeded the maximum number of allowed "
+                f"chunks: {limit}",
+                status_code=403,
+            )
+        self.stored += len(entries)
+        self.max_in_flight = max(
+            self.max_in_flight, self.progress["parsed"] - self.stored
+        )
+        if self.progress["first_store_at"] is None:
+            self.progress["first_store_at"] = self.progress["parsed"]
+
+    bulk_upsert_entries = upsert_entries
+
+
+def _service(progress, bulk_upsert_threshold=16, users=None):
+    users = users or {}
+    user_lookups = []
+
+    async def embed(texts):
+        await asyncio.sleep(0.001)
+        return [[1.0] for _ in texts]
+
+    async def get_user_by_id(id):
+        user_lookups.append(id)
+        return SimpleNamespace(limits_overrides=users.get(id))
+
+    service = IngestionService(
+        config=SimpleNamespace(
+            ingestion=SimpleNamespace(
+                bulk_upsert_threshold=bulk_upsert_threshold,
+                storage_concurrency=2,
+            )
+        ),
+        providers=SimpleNamespace(
+            embedding=SimpleNamespace(
+                config=SimpleNamespace(concurrent_request_limit=2),
+                async_get_embeddings=embed,
+            ),
+            database=SimpleNamespace(
+                embedding_store_handler=None,
+                chunks_handler=FakeChunksHandler(progress),
+                users_handler=SimpleNamespace(get_user_by_id=get_user_by_id),
+                config=SimpleNamespace(
+                    app=SimpleNamespace(default_max_chunks_per_user=1_000_000)
+                ),
+            ),
+        ),
+    )
+    service.user_lookups = user_lookups
+    return service
+
+
+async def _parse(progress, num_chunks, fail_at=None):
+    for i in range(num_chunks):
+        if i == fail_at:
+            raise ValueError("parsing failed")
+        progress["parsed"] += 1
+        yield DocumentChunk(
+            id=uuid.uuid4(),
+            document_id=DOCUMENT_ID,
+            owner_id=OWNER_ID,
+            collection_ids=[],
+            data=f"chunk {i}",
+            metadata={},
+        )
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap_with_bounded_memory():
+    progress = {"parsed": 0, "first_store_at": None}
+    service = _service(progress)
+
+    async with _Pipeline(queue_size=8) as pipeline:
+        chunks = pipeline.stage(_parse(progress, 500))
+        embeddings = pipeline.stage(service.embed_document(chunks))
+        messages = [
+            m
+            async for m in service.store_embeddings(
+                embeddings, storage_batch_size=16
+            )
+        ]
+
+    handler = service.providers.database.chunks_handler
+    assert handler.stored == 500
+    assert "vector count: 500" in messages[-1]
+    # Storage started long before parsing finished
+    assert progress["first_store_at"] < 100
+    # Chunks between parsing and storage are bounded by the queues, the
+    # embedding batches in flight and the storage batch
+    assert handler.max_in_flight <= 2 * 8 + 2 * 8 + 16 + 8
+
+
+@pytest.mark.asyncio
+async def test_failures_stop_the_pipeline():
+    progress = {"parsed": 0, "first_store_at": None}
+    service = _service(progress)
+
+    with pytest.raises(ValueError, match="parsing failed"):
+        async with _Pipeline(queue_size=8) as pipeline:
+            chunks = pipeline.stage(_parse(progress, 500, fail_at=50))
+            embeddings = pipeline.stage(service.embed_document(chunks))
+            async for _ in service.store_embeddings(embeddings):
+                pass
+
+    assert progress["parsed"] == 50
+    assert all(task.done() for task in pipeline._tasks)
+
+
+def _entries(owner_id, count):
+    return [
+        VectorEntry(
+            id=uuid.uuid4(),
+            document_id=DOCUMENT_ID,
+            owner_id=owner_id,
+            collection_ids=[],
+            vector=Vector(data=[1.0]),
+            text=f"chunk {i}",
+            metadata={},
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_storage_resolves_limits_once_per_owner():
+    progress = {"parsed": 0, "first_store_at": None}
+    other_owner = uuid.uuid4()
+    service = _service(
+        progress,
+        bulk_upsert_threshold=1_000,
+        users={other_owner: {"max_chunks": 10}},
+    )
+
+    messages = [
+        m
+        async for m in service.store_embeddings(
+            _entries(OWNER_ID, 40) + _entries(other_owner, 8),
+            storage_batch_size=8,
+        )
+    ]
+
+    handler = service.providers.database.chunks_handler
+    assert sorted(service.user_lookups) == sorted([OWNER_ID, other_owner])
+    assert handler.max_chunks[0] == {OWNER_ID: 1_000_000}
+    assert handler.max_chunks[-1] == {other_owner: 10}
+    # Batches are written concurrently, up to the storage concurrency
+    assert handler.max_writers == 2
+    assert handler.stored == 48
+    assert "vector count: 48" in messages[-1]
+
+
+@pytest.mark.asyncio
+async def test_storage_reports_exceeded_limits():
+    progress = {"parsed": 0, "first_store_at": None}
+    service = _service(progress, users={OWNER_ID: {"max_chunks": 4}})
+
+    messages = [
+        m
+        async for m in service.store_embeddings(
+            _entries(OWNER_ID, 8), storage_batch_size=8
+        )
+    ]
+
+    assert messages == [
+        "User has exceeded the maximum number of allowed chunks: 4"
+    ]
@@ -0,0 +1,200 @@
+import asyncio
+import os
+import time
+import uuid
+from io import BytesIO
+
+import docx
+import pytest
+
+from core.base import AsyncParser, Document, DocumentType, ParserPoolSettings
+from core.providers.ingestion import R2RIngestionConfig, R2RIngestionProvider
+from core.providers.ingestion.parser_pool import ParserPool
+
+
+class BusyParser(AsyncParser[bytes]):
+    """Holds the CPU for `seconds` before each of its pages."""
+
+    cpu_bound = True
+
+    async def ingest(self, data, **kwargs):
+        for text in self.extract(data, **kwargs):
+            yield text
+
+    @classmethod
+    def extract(cls, data, pages=3, seconds=0.1, **kwargs):
+        for page in range(pages):
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                pass
+            yield f"{data.decode()} {page} {os.getpid()}"
+
+
+class FailingParser(BusyParser):
+
+    @classmethod
+    def extract(cls, data, **kwargs):
+        yield "first page"
+        raise ValueError("broken document")
+
+
+class HungryParser(BusyParser):
+
+    @classmethod
+    def extract(cls, data, **kwargs):
+        yield str(len(bytearray(1024 * 1024 * 1024)))
+
+
+@pytest.fixture
+async def make_pool():
+    pools = []
+
+    def make_pool(**settings):
+        pools.append(ParserPool(ParserPoolSettings(**settings)))
+        return pools[-1]
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+async def _parse(pool, parser_cls, data=b"page", **kwargs):
+    return [text async for text in pool.extract(parser_cls, data, kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_pages_stream_back_without_blocking_the_loop(make_pool):
+    pool = make_pool(max_workers=1)
+    # Start the worker, so that only the parsing is timed
+    await _parse(pool, BusyParser, pages=1, seconds=0)
+
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    received = []
+    async for text in pool.extract(BusyParser, b"page", {"pages": 5}):
+        received.append((time.monotonic(), text))
+    ticker.cancel()
+
+    assert [text.rsplit(" ", 1)[0] for _, text in received
+            ] == [f"page {page}" for page in range(5)]
+    # Pages arrive as they are parsed, not all at the end
+    assert received[-1][0] - received[0][0] > 0.3
+    assert max(b - a for a, b in zip(ticks, ticks[1:], strict=False)) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_workers_are_reused_then_recycled(make_pool):
+    pool = make_pool(max_workers=1, max_tasks_per_worker=2)
+
+    pids = [(await _parse(pool, BusyParser, pages=1,
+                          seconds=0))[0].split()[-1] for _ in range(3)]
+
+    assert pids[0] == pids[1]
+    assert pids[2] != pids[1]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_after_the_pages_before_them(make_pool):
+    pool = make_pool(max_workers=1)
+    received = []
+
+    with pytest.raises(ValueError, match="broken document"):
+        async for text in pool.extract(FailingParser, b"", {}):
+            received.append(text)
+
+    assert received == ["first page"]
+    assert await _parse(pool, BusyParser, pages=1, seconds=0)
+
+
+@pytest.mark.asyncio
+async def test_slow_documents_are_stopped(make_pool):
+    pool = make_pool(max_workers=1, task_timeout_seconds=0.5)
+    # Start the worker, so that only the parsing is timed
+    await _parse(pool, BusyParser, pages=1, seconds=0)
+    worker = pool._idle[0]
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError, match="took longer than 0.5 seconds"):
+        await _parse(pool, BusyParser, pages=1, seconds=10)
+
+    assert time.monotonic() - start < 2
+    assert not pool._idle
+    worker.process.join(1)
+    assert not worker.process.is_alive()
+
+
+@pytest.mark.asyncio
+async def test_slow_consumers_do_not_count_toward_the_time_limit(make_pool):
+    pool = make_pool(max_workers=1, task_timeout_seconds=1)
+    received = []
+
+    async for text in pool.extract(BusyParser, b"page", {
+            "pages": 3,
+            "seconds": 0.01
+    }):
+        received.append(text)
+        # e.g. embedding and storing the text
+        await asyncio.sleep(0.6)
+        # The worker is free once it has parsed the document
+        assert pool._semaphore._value == 1
+
+    assert len(received) == 3
+    assert len(pool._idle) == 1
+
+
+@pytest.mark.asyncio
+async def test_workers_are_limited_in_memory(make_pool):
+    pool = make_pool(max_workers=1, max_memory_mb=512)
+
+    with pytest.raises(MemoryError):
+        await _parse(pool, HungryParser)
+
+    assert not pool._idle
+
+
+@pytest.mark.asyncio
+async def test_provider_parses_cpu_bound_documents_in_the_pool():
+    provider = R2RIngestionProvider(
+        R2RIngestionConfig(
+            provider="r2r",
+            chunk_size=64,
+            chunk_overlap=0,
+            parser_pool=ParserPoolSettings(max_workers=1),
+        ),
+        database_provider=None,
+        llm_provider=None,
+        ocr_provider=None,
+    )
+    data = BytesIO()
+    document = docx.Document()
+    for i in range(3):
+        document.add_paragraph(f"Paragraph {i}")
+    document.save(data)
+
+    try:
+        chunks = [
+            chunk async for chunk in provider.parse(
+                data.getvalue(),
+                Document(
+                    collection_ids=[],
+                    owner_id=uuid.uuid4(),
+                    document_type=DocumentType.DOCX,
+                    metadata={},
+                ),
+                {},
+            )
+        ]
+        # The worker is kept for the next document
+        assert len(provider.parser_pool._idle) == 1
+    finally:
+        provider.close()
+
+    assert [chunk.data for chunk in chunks
+            ] == [f"Paragraph {i}" for i in range(3)]
+    assert [chunk.metadata["chunk_order"] for chunk in chunks] == [0, 1, 2]
@@ -0,0 +1,109 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ChunkSearchResult, R2RException, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+
+
+class FakeChunksHandler:
+    """Returns the query vector as the text of the result, and records how
+    many searches run at the same time."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def semantic_search(self, query_vector, search_settings):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return [
+            ChunkSearchResult(
+                id=uuid.uuid4(),
+                document_id=uuid.uuid4(),
+                owner_id=None,
+                collection_ids=[],
+                score=1.0,
+                text=str(query_vector),
+                metadata={},
+            )
+        ]
+
+    async def full_text_search(self, query_text, search_settings):
+        return []
+
+
+def _service():
+
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    async def embed(texts, use_cache=True):
+        return [[float(len(text))] for text in texts]
+
+    embedding = SimpleNamespace(
+        async_get_query_embedding=AsyncMock(return_value=[0.0]),
+        async_get_query_embeddings=AsyncMock(side_effect=embed),
+        arerank=AsyncMock(side_effect=rerank),
+    )
+    providers = SimpleNamespace(
+        completion_embedding=embedding,
+        database=SimpleNamespace(chunks_handler=FakeChunksHandler(),
+                                 search_cache_handler=None),
+    )
+    config = SimpleNamespace(app=SimpleNamespace(
+        max_concurrent_batch_searches=3))
+    return RetrievalService(config=config, providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(graph_settings={"enabled": False}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_queries_are_embedded_together_and_searched_concurrently():
+    service = _service()
+    queries = ["a" * i for i in range(1, 9)]
+
+    results = await service.search_batch(queries,
+                                         [_settings() for _ in queries])
+
+    embedding = service.providers.completion_embedding
+    embedding.async_get_query_embeddings.assert_awaited_once()
+    assert embedding.async_get_query_embeddings.await_args.args[0] == queries
+    embedding.async_get_query_embedding.assert_not_awaited()
+    # Results are in the order of the queries
+    assert [r.chunk_search_results[0].text
+            for r in results] == [str([float(i)]) for i in range(1, 9)]
+    assert 1 < service.providers.database.chunks_handler.max_running <= (
+        service.config.app.max_concurrent_batch_searches)
+
+
+@pytest.mark.asyncio
+async def test_queries_have_their_own_settings():
+    service = _service()
+
+    results = await service.search_batch(
+        ["semantic", "full text"],
+        [
+            _settings(),
+            _settings(use_semantic_search=False, use_fulltext_search=True),
+        ],
+    )
+
+    embedding = service.providers.completion_embedding
+    assert embedding.async_get_query_embeddings.await_args.args[0] == [
+        "semantic"
+    ]
+    assert len(results) == 2
+
+
+@pytest.mark.asyncio
+async def test_queries_and_settings_must_match():
+    with pytest.raises(R2RException):
+        await _service().search_batch(["a", "b"], [_settings()])
@@ -0,0 +1,58 @@
+import random
+
+from core.utils import (
+    CitationScanner,
+    CitationTracker,
+    extract_citation_spans,
+)
+
+TEXT = ("Paris is the capital [abc1234] of France [abc1234][def56789]. "
+        "Not citations: [short], [toolong123], [abc 123], [abc1234. "
+        "End [9999999]")
+
+
+def _stream(text, cuts):
+    """Scan the text, accumulated in the pieces between the cuts."""
+    scanner = CitationScanner(CitationTracker())
+    found = {}
+    buffer = ""
+    bounds = [0, *sorted(cuts), len(text)]
+    for start, end in zip(bounds, bounds[1:]):
+        buffer += text[start:end]
+        for cid, spans in scanner.scan(buffer).items():
+            found.setdefault(cid, []).extend(spans)
+    return found
+
+
+def test_citations_split_across_deltas_are_found():
+    expected = extract_citation_spans(TEXT)
+
+    # One character at a time, and at random cuts
+    assert _stream(TEXT, range(1, len(TEXT))) == expected
+    rng = random.Random(0)
+    for _ in range(50):
+        cuts = rng.sample(range(1, len(TEXT)), rng.randint(1, 20))
+        assert _stream(TEXT, cuts) == expected
+
+
+def test_only_new_text_is_scanned():
+    scanner = CitationScanner(CitationTracker())
+    text = "word " * 1000
+
+    assert scanner.scan(text + "[abc12") == {}
+    # The cursor waits at the unfinished citation
+    assert scanner._cursor == len(text)
+    assert scanner.scan(text + "[abc1234] more") == {
+        "abc1234": [(len(text), len(text) + 9)]
+    }
+    assert scanner._cursor == len(text) + 14
+
+
+def test_reset_starts_a_new_text():
+    tracker = CitationTracker()
+    scanner = CitationScanner(tracker)
+    assert scanner.scan("Before tools [abc1234]") == {"abc1234": [(13, 22)]}
+
+    scanner.reset()
+    assert scanner.scan("After [def5678]") == {"def5678": [(6, 15)]}
+    assert set(tracker.get_all_spans()) == {"abc1234", "def5678"}
@@ -0,0 +1,178 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from core.agent.rag import RAGAgentMixin
+from core.base import (
+    AggregateSearchResult,
+    ChunkSearchResult,
+    ContextPackingSettings,
+    GenerationConfig,
+    GraphEntityResult,
+    GraphSearchResult,
+)
+from core.main.services.retrieval_service import RetrievalService
+from shared.utils import base_utils
+from shared.utils.base_utils import pack_search_results_for_llm
+
+
+class WordEncoder:
+    """One token per word, so that budgets are easy to reason about."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+@pytest.fixture(autouse=True)
+def word_encoder(monkeypatch):
+    monkeypatch.setattr(base_utils, "_token_encoder",
+                        lambda model: WordEncoder())
+
+
+DOC_A = uuid.uuid4()
+DOC_B = uuid.uuid4()
+
+
+def _chunk(text, score, document_id=DOC_A):
+    return ChunkSearchResult(
+        id=uuid.uuid4(),
+        document_id=document_id,
+        owner_id=None,
+        collection_ids=[],
+        score=score,
+        text=text,
+        metadata={},
+    )
+
+
+def _words(prefix, n):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_results_fit_the_budget_by_score():
+    low, high, mid = (_chunk(_words("low", 10), 0.1),
+                      _chunk(_words("high", 10), 0.9),
+                      _chunk(_words("mid", 10), 0.5))
+    results = AggregateSearchResult(chunk_search_results=[low, high, mid])
+
+    # A chunk costs its words, 3 for its source ID line and 1 newline, and
+    # the first one 3 more for the section header
+    packed = pack_search_results_for_llm(results, max_tokens=35)
+
+    # The best results are kept, in their original order
+    assert packed.results.chunk_search_results == [high, mid]
+    assert packed.dropped == [{
+        "id": str(low.id),
+        "type": "chunk",
+        "reason": "budget"
+    }]
+    assert packed.tokens <= 35
+    assert "low0" not in packed.context
+
+
+def test_overlapping_chunks_are_deduplicated():
+    text = _words("word", 20)
+    first = _chunk(text, 0.9)
+    # The same text, cut by another chunking of the document
+    overlapping = _chunk(_words("word", 15), 0.8, document_id=DOC_B)
+    other = _chunk(_words("other", 20), 0.7)
+    results = AggregateSearchResult(
+        chunk_search_results=[first, overlapping, other])
+
+    packed = pack_search_results_for_llm(results, max_tokens=1000)
+
+    assert packed.results.chunk_search_results == [first, other]
+    assert packed.dropped == [{
+        "id": str(overlapping.id),
+        "type": "chunk",
+        "reason": "duplicate"
+    }]
+
+
+def test_chunks_of_other_documents_come_first():
+    a1, a2, a3 = (_chunk(_words(f"a{i}x", 10), 0.9 - i / 10)
+                  for i in range(3))
+    b1 = _chunk(_words("b", 10), 0.1, document_id=DOC_B)
+    results = AggregateSearchResult(chunk_search_results=[a1, a2, a3, b1])
+
+    packed = pack_search_results_for_llm(results,
+                                         max_tokens=45,
+                                         max_chunks_per_document=2)
+    assert packed.results.chunk_search_results == [a1, a2, b1]
+    assert [d["id"] for d in packed.dropped] == [str(a3.id)]
+
+    # Budget left by the other documents goes to the best documents
+    packed = pack_search_results_for_llm(results,
+                                         max_tokens=1000,
+                                         max_chunks_per_document=2)
+    assert packed.results.chunk_search_results == [a1, a2, a3, b1]
+
+
+def test_graph_results_compete_for_the_budget():
+    chunk = _chunk(_words("chunk", 10), 0.2)
+    entity = GraphSearchResult(
+        id=uuid.uuid4(),
+        content=GraphEntityResult(name="Paris", description="A city"),
+        result_type="entity",
+        score=0.9,
+    )
+    results = AggregateSearchResult(chunk_search_results=[chunk],
+                                    graph_search_results=[entity])
+
+    packed = pack_search_results_for_llm(results, max_tokens=15)
+
+    assert packed.results.graph_search_results == [entity]
+    assert packed.results.chunk_search_results == []
+    assert packed.dropped[0]["type"] == "chunk"
+
+
+def test_rag_context_reports_packing():
+
+    def service(enabled):
+        settings = ContextPackingSettings(enabled=enabled, max_tokens=20)
+        config = SimpleNamespace(app=SimpleNamespace(
+            context_packing=settings))
+        return RetrievalService(config=config, providers=SimpleNamespace())
+
+    results = AggregateSearchResult(chunk_search_results=[
+        _chunk(_words("kept", 10), 0.9),
+        _chunk(_words("dropped", 10), 0.1, document_id=DOC_B),
+    ])
+
+    context, report = service(True)._build_rag_context(
+        results, GenerationConfig(model="openai/gpt-4o"))
+    assert "kept0" in context and "dropped0" not in context
+    assert report["tokens"] <= 20
+    assert report["dropped"][0]["reason"] == "budget"
+
+    context, report = service(False)._build_rag_context(
+        results, GenerationConfig(model="openai/gpt-4o"))
+    assert "dropped0" in context
+    assert report is None
+
+
+def test_agent_tool_context_follows_packing_settings():
+
+    def agent(enabled):
+        return RAGAgentMixin(
+            search_settings=None,
+            knowledge_search_method=None,
+            content_method=None,
+            file_search_method=None,
+            max_tool_context_length=1000,
+            context_packing=ContextPackingSettings(
+                enabled=enabled, max_chunks_per_document=None),
+        )
+
+    text = _words("word", 20)
+    results = AggregateSearchResult(chunk_search_results=[
+        _chunk(text, 0.9),
+        _chunk(text, 0.8, document_id=DOC_B),
+    ])
+
+    packed = agent(True).format_search_results_for_llm(results)
+    assert packed.count("word0") == 1
+
+    unpacked = agent(False).format_search_results_for_llm(results)
+    assert unpacked.count("word0") == 2
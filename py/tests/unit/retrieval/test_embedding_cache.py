@@ -0,0 +1,160 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import (
+    EmbeddingConfig,
+    EmbeddingProvider,
+    InMemoryEmbeddingCache,
+)
+from core.providers.database.embedding_cache import (
+    PostgresEmbeddingCacheHandler,
+)
+from core.utils import tracing
+
+
+class CountingEmbeddingProvider(EmbeddingProvider):
+    """Embeds a text as [len(text), calls] and counts the model calls."""
+
+    def __init__(self, config: EmbeddingConfig):
+        super().__init__(config)
+        self.calls = 0
+
+    async def _execute_task(self, task):
+        self.calls += 1
+        return [[float(len(text)), float(self.calls)]
+                for text in task["texts"]]
+
+    def _execute_task_sync(self, task):
+        raise NotImplementedError
+
+    async def async_get_embedding(self, text, stage=None, **kwargs):
+        return (await self._execute_task({"texts": [text]}))[0]
+
+    def rerank(self, query, results, stage=None, limit=10):
+        return results[:limit]
+
+    async def arerank(self, query, results, stage=None, limit=10):
+        return results[:limit]
+
+
+def _provider(**cache_settings):
+    return CountingEmbeddingProvider(
+        EmbeddingConfig(
+            provider="litellm",
+            base_model="test/model",
+            base_dimension=2,
+            cache_settings=cache_settings,
+        ))
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_hit_the_cache():
+    provider = _provider()
+    first = await provider.async_get_query_embedding("what is r2r?")
+    # Whitespace differences map to the same cache entry
+    assert await provider.async_get_query_embedding(
+        "  what is\nr2r? ") == first
+    assert provider.calls == 1
+
+    # A different model or dimension is a different entry
+    await provider.async_get_query_embedding("what is r2r?", dimensions=4)
+    assert provider.calls == 2
+
+    assert provider.get_cache_metrics() == {
+        "hits": 1,
+        "shared_hits": 0,
+        "misses": 2,
+        "hit_rate": pytest.approx(1 / 3),
+        "size": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_cache_metrics_are_exported():
+    provider = _provider()
+    for _ in range(3):
+        await provider.async_get_query_embedding("what is r2r?")
+
+    metrics = tracing.render_prometheus(provider.get_cache_counters())
+
+    assert "# TYPE r2r_query_embedding_cache_hits_total counter" in metrics
+    assert "\nr2r_query_embedding_cache_hits_total 2\n" in metrics
+    assert "\nr2r_query_embedding_cache_shared_hits_total 0\n" in metrics
+    assert "\nr2r_query_embedding_cache_misses_total 1\n" in metrics
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_bypassed_or_disabled():
+    provider = _provider()
+    await provider.async_get_query_embedding("query")
+    await provider.async_get_query_embedding("query", use_cache=False)
+    assert provider.calls == 2
+
+    provider = _provider(enabled=False)
+    await provider.async_get_query_embedding("query")
+    await provider.async_get_query_embedding("query")
+    assert provider.calls == 2
+    assert provider.get_cache_metrics()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_and_expires():
+    cache = InMemoryEmbeddingCache(max_size=2, ttl_seconds=60)
+    await cache.set("a", [1.0])
+    await cache.set("b", [2.0])
+    # Reading "a" makes "b" the least recently used entry
+    assert await cache.get("a") == [1.0]
+    await cache.set("c", [3.0])
+    assert await cache.get("b") is None
+    assert len(cache) == 2
+
+    cache = InMemoryEmbeddingCache(max_size=2, ttl_seconds=0.01)
+    await cache.set("a", [1.0])
+    await asyncio.sleep(0.02)
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_tier(db_provider):
+    handler = PostgresEmbeddingCacheHandler(
+        project_name=db_provider.project_name,
+        connection_manager=db_provider.connection_manager,
+        ttl_seconds=60,
+    )
+    await handler.create_tables()
+
+    query = f"shared query {uuid.uuid4()}"
+    writer = _provider(shared=True)
+    writer.shared_cache = handler
+    embedding = await writer.async_get_query_embedding(query)
+
+    # Another process finds the embedding in the shared tier
+    reader = _provider(shared=True)
+    reader.shared_cache = handler
+    assert await reader.async_get_query_embedding(query) == embedding
+    assert reader.calls == 0
+    assert reader.cache_metrics["shared_hits"] == 1
+
+    key = reader._cache_key(query)
+    handler.ttl_seconds = 0
+    assert await handler.get(key) is None
+    await handler.clean_expired_embeddings()
+    handler.ttl_seconds = 60
+    assert await handler.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_batched_query_embeddings_only_embed_misses():
+    provider = _provider()
+    cached = await provider.async_get_query_embedding("cached")
+
+    provider.async_get_embeddings = AsyncMock(
+        return_value=[[1.0, 0.0], [2.0, 0.0]])
+    embeddings = await provider.async_get_query_embeddings(
+        ["new", "cached", "other", "new"])
+
+    provider.async_get_embeddings.assert_awaited_once_with(["new", "other"])
+    assert embeddings == [[1.0, 0.0], cached, [2.0, 0.0], [1.0, 0.0]]
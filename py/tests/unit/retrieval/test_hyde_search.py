@@ -0,0 +1,98 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ChunkSearchResult, HydeMode, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+
+HYDE_DOCS = ["first hypothetical doc", "second hypothetical doc"]
+
+
+class FakeChunksHandler:
+    """Returns one result per query vector and records the vectors."""
+
+    def __init__(self):
+        self.searched: list[list[float]] = []
+
+    async def semantic_search(self, query_vector, search_settings):
+        self.searched.append(query_vector)
+        return [
+            ChunkSearchResult(
+                id=uuid.uuid5(uuid.NAMESPACE_OID, str(query_vector)),
+                document_id=uuid.uuid4(),
+                owner_id=None,
+                collection_ids=[],
+                score=1.0,
+                text=f"result {query_vector}",
+                metadata={},
+            )
+        ]
+
+
+def _service():
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    embedding = SimpleNamespace(
+        async_get_query_embedding=AsyncMock(),
+        async_get_query_embeddings=AsyncMock(
+            return_value=[[3.0, 0.0], [0.0, 4.0]]),
+        arerank=AsyncMock(side_effect=rerank),
+    )
+    response = SimpleNamespace(choices=[
+        SimpleNamespace(message=SimpleNamespace(
+            content="\n\n".join(HYDE_DOCS)))
+    ])
+    providers = SimpleNamespace(
+        completion_embedding=embedding,
+        database=SimpleNamespace(
+            chunks_handler=FakeChunksHandler(),
+            search_cache_handler=None,
+            prompts_handler=SimpleNamespace(
+                get_cached_prompt=AsyncMock(return_value="hyde prompt")),
+        ),
+        llm=SimpleNamespace(aget_completion=AsyncMock(return_value=response)),
+    )
+    config = SimpleNamespace(app=SimpleNamespace(fast_llm="fast-llm"))
+    return RetrievalService(config=config, providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(
+        search_strategy="hyde",
+        num_sub_queries=len(HYDE_DOCS),
+        graph_settings={"enabled": False},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_hypothetical_docs_are_embedded_in_one_batch():
+    service = _service()
+
+    results = await service.search("original query", _settings())
+
+    embedding = service.providers.completion_embedding
+    embedding.async_get_query_embeddings.assert_awaited_once_with(
+        HYDE_DOCS, use_cache=True)
+    embedding.async_get_query_embedding.assert_not_awaited()
+
+    chunks_handler = service.providers.database.chunks_handler
+    assert sorted(chunks_handler.searched) == [[0.0, 4.0], [3.0, 0.0]]
+    assert len(results.chunk_search_results) == 2
+
+
+@pytest.mark.asyncio
+async def test_centroid_mode_runs_a_single_search():
+    service = _service()
+
+    results = await service.search(
+        "original query", _settings(hyde_mode=HydeMode.centroid))
+
+    chunks_handler = service.providers.database.chunks_handler
+    assert len(chunks_handler.searched) == 1
+    # Mean of [3, 0] and [0, 4], normalized to unit length
+    assert chunks_handler.searched[0] == pytest.approx([0.6, 0.8])
+    assert len(results.chunk_search_results) == 1
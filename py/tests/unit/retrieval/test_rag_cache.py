@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ContextPackingSettings, GenerationConfig, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+
+CACHED = {
+    "generated_answer": "cached answer",
+    "search_results": {},
+    "citations": [],
+    "metadata": {},
+    "completion": "cached answer",
+}
+
+
+def _service(cached):
+
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    completion = SimpleNamespace(
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content="new answer"))
+        ],
+        dict=lambda: {"choices": [{
+            "message": {
+                "content": "new answer"
+            }
+        }]},
+    )
+    providers = SimpleNamespace(
+        completion_embedding=SimpleNamespace(
+            async_get_query_embedding=AsyncMock(return_value=[1.0, 0.0]),
+            arerank=AsyncMock(side_effect=rerank),
+        ),
+        database=SimpleNamespace(
+            rag_cache_handler=SimpleNamespace(
+                get_response=AsyncMock(return_value=cached),
+                store_response=AsyncMock(),
+                scope_versions=AsyncMock(return_value=[("scope", 1)]),
+            ),
+            search_cache_handler=None,
+            chunks_handler=SimpleNamespace(semantic_search=AsyncMock(
+                return_value=[])),
+            prompts_handler=SimpleNamespace(get_message_payload=AsyncMock(
+                return_value=[{
+                    "role": "user",
+                    "content": "prompt"
+                }])),
+        ),
+        llm=SimpleNamespace(aget_completion=AsyncMock(
+            return_value=completion)),
+    )
+    config = SimpleNamespace(app=SimpleNamespace(
+        context_packing=ContextPackingSettings()))
+    return RetrievalService(config=config, providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(graph_settings={"enabled": False}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_search_and_generation():
+    service = _service(cached=(CACHED, 0.98))
+
+    response = await service.rag("query", GenerationConfig(model="m"),
+                                 _settings())
+
+    assert response.generated_answer == "cached answer"
+    assert response.metadata["cache"] == {"hit": True, "similarity": 0.98}
+    service.providers.llm.aget_completion.assert_not_awaited()
+    service.providers.database.chunks_handler.semantic_search.assert_not_awaited(
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_stores_the_response():
+    service = _service(cached=None)
+
+    response = await service.rag("query", GenerationConfig(model="m"),
+                                 _settings())
+
+    assert response.generated_answer == "new answer"
+    cache = service.providers.database.rag_cache_handler
+    lookup_key = cache.get_response.await_args.args
+    store_call = cache.store_response.await_args
+    assert store_call.args == lookup_key
+    assert lookup_key[0] == [1.0, 0.0]
+    assert lookup_key[3] == "m"
+    assert store_call.kwargs["response"]["generated_answer"] == "new answer"
+    # The versions read before searching
+    assert store_call.kwargs["versions"] == [("scope", 1)]
+
+
+@pytest.mark.asyncio
+async def test_settings_are_part_of_the_key():
+    service = _service(cached=None)
+
+    await service.rag("query", GenerationConfig(model="m"),
+                      _settings(limit=5))
+    await service.rag("query", GenerationConfig(model="m"),
+                      _settings(limit=6))
+    await service.rag("query", GenerationConfig(model="m", temperature=0.5),
+                      _settings(limit=6))
+
+    calls = service.providers.database.rag_cache_handler.get_response.await_args_list
+    assert len({call.args[2] for call in calls}) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_bypassed():
+    service = _service(cached=(CACHED, 0.98))
+
+    response = await service.rag("query", GenerationConfig(model="m"),
+                                 _settings(use_rag_cache=False))
+
+    assert response.generated_answer == "new answer"
+    cache = service.providers.database.rag_cache_handler
+    cache.get_response.assert_not_awaited()
+    cache.store_response.assert_not_awaited()
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ChunkSearchResult, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+
+REPHRASINGS = ["first rephrasing", "second rephrasing", "third rephrasing"]
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[
+        SimpleNamespace(message=SimpleNamespace(content=content))
+    ])
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[
+        SimpleNamespace(delta=SimpleNamespace(content=content))
+    ])
+
+
+class FakeChunksHandler:
+    """Returns one result per query vector and tracks concurrent calls."""
+
+    def __init__(self):
+        self.searched: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def semantic_search(self, query_vector, search_settings):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.searched.append(query_vector[0])
+        return [
+            ChunkSearchResult(
+                id=uuid.uuid5(uuid.NAMESPACE_OID, str(query_vector[0])),
+                document_id=uuid.uuid4(),
+                owner_id=None,
+                collection_ids=[],
+                score=1.0,
+                text=f"result {query_vector[0]}",
+                metadata={},
+            )
+        ]
+
+
+def _service(llm):
+    async def embed_batch(texts, use_cache):
+        return [[float(i + 1)] for i in range(len(texts))]
+
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    embedding = SimpleNamespace(
+        async_get_query_embedding=AsyncMock(return_value=[0.0]),
+        async_get_query_embeddings=AsyncMock(side_effect=embed_batch),
+        arerank=AsyncMock(side_effect=rerank),
+    )
+    providers = SimpleNamespace(
+        completion_embedding=embedding,
+        database=SimpleNamespace(chunks_handler=FakeChunksHandler(),
+                                 search_cache_handler=None),
+        llm=llm,
+    )
+    config = SimpleNamespace(app=SimpleNamespace(
+        fast_llm="fast-llm", max_concurrent_sub_query_searches=3))
+    return RetrievalService(config=config, providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(
+        search_strategy="rag_fusion",
+        num_sub_queries=len(REPHRASINGS) + 1,
+        graph_settings={"enabled": False},
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sub_queries_are_embedded_in_one_batch():
+    llm = SimpleNamespace(aget_completion=AsyncMock(
+        return_value=_completion("\n".join(REPHRASINGS))))
+    service = _service(llm)
+
+    results = await service.search("original query", _settings())
+
+    embedding = service.providers.completion_embedding
+    embedding.async_get_query_embedding.assert_awaited_once_with(
+        "original query", use_cache=True)
+    embedding.async_get_query_embeddings.assert_awaited_once_with(
+        REPHRASINGS, use_cache=True)
+
+    chunks_handler = service.providers.database.chunks_handler
+    assert sorted(chunks_handler.searched) == [0.0, 1.0, 2.0, 3.0]
+    assert 1 < chunks_handler.max_in_flight <= (
+        service.config.app.max_concurrent_sub_query_searches)
+    assert len(results.chunk_search_results) == 4
+
+
+@pytest.mark.asyncio
+async def test_streamed_sub_queries_are_searched_during_generation():
+    searched_during_generation = []
+
+    async def completion_stream(messages, generation_config):
+        for rephrasing in REPHRASINGS:
+            yield _chunk(rephrasing[:5])
+            await asyncio.sleep(0.02)
+            yield _chunk(rephrasing[5:] + "\n")
+        searched_during_generation.extend(chunks_handler.searched)
+
+    service = _service(SimpleNamespace(
+        aget_completion_stream=completion_stream))
+    chunks_handler = service.providers.database.chunks_handler
+
+    results = await service.search("original query",
+                                   _settings(stream_sub_queries=True))
+
+    # The original query did not wait for the rephrasings
+    assert 0.0 in searched_during_generation
+    assert [
+        call.args[0] for call in service.providers.completion_embedding.
+        async_get_query_embedding.await_args_list
+    ] == ["original query", *REPHRASINGS]
+    assert len(results.chunk_search_results) == 1
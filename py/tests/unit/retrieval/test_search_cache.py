@@ -0,0 +1,100 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ChunkSearchResult, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+from core.providers.database.search_cache import InMemorySearchCache
+
+
+class FakeSearchCache:
+    """Keys searches by query, filters and settings, at a fixed version."""
+
+    def __init__(self):
+        self.cache = InMemorySearchCache(max_size=16, ttl_seconds=60)
+        self.search_key = AsyncMock(side_effect=self._search_key)
+
+    async def _search_key(self, query, filters, settings_key,
+                          graph_search=False):
+        return f"{query}|{filters}|{settings_key}"
+
+    async def get(self, key):
+        return await self.cache.get(key)
+
+    async def set(self, key, results):
+        await self.cache.set(key, results)
+
+
+def _service():
+
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    chunk = ChunkSearchResult(
+        id=uuid.uuid4(),
+        document_id=uuid.uuid4(),
+        owner_id=None,
+        collection_ids=[],
+        score=1.0,
+        text="result",
+        metadata={},
+    )
+    providers = SimpleNamespace(
+        completion_embedding=SimpleNamespace(
+            async_get_query_embedding=AsyncMock(return_value=[1.0]),
+            arerank=AsyncMock(side_effect=rerank),
+        ),
+        database=SimpleNamespace(
+            chunks_handler=SimpleNamespace(semantic_search=AsyncMock(
+                return_value=[chunk])),
+            search_cache_handler=FakeSearchCache(),
+        ),
+    )
+    return RetrievalService(config=SimpleNamespace(), providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(graph_settings={"enabled": False}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_identical_searches_are_served_from_the_cache():
+    service = _service()
+    search = service.providers.database.chunks_handler.semantic_search
+
+    first = await service.search("query", _settings())
+    second = await service.search("query", _settings(include_timings=True))
+
+    assert search.await_count == 1
+    assert second.chunk_search_results == first.chunk_search_results
+    # The timings of the cached search are its own
+    assert "search_cache" in second.timings
+    assert "search" not in second.timings
+
+
+@pytest.mark.asyncio
+async def test_settings_and_filters_are_part_of_the_key():
+    service = _service()
+
+    await service.search("query", _settings(limit=5))
+    await service.search("query", _settings(limit=6))
+    await service.search("query",
+                         _settings(limit=6, filters={"a": {
+                             "$eq": 1
+                         }}))
+
+    assert service.providers.database.chunks_handler.semantic_search.await_count == 3
+    calls = service.providers.database.search_cache_handler.search_key.await_args_list
+    assert len({call.args[2] for call in calls}) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_bypassed():
+    service = _service()
+
+    await service.search("query", _settings())
+    await service.search("query", _settings(use_search_cache=False))
+
+    assert service.providers.database.chunks_handler.semantic_search.await_count == 2
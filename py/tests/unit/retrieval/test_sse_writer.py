@@ -0,0 +1,106 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from core.utils import SSEFormatter, SSEWriter
+from shared.utils import dumps_sse_data
+
+
+async def _events(events, delay=0.0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+async def _written(writer):
+    return [chunk async for chunk in writer]
+
+
+@pytest.mark.asyncio
+async def test_events_are_single_strings():
+    events = [
+        line async for line in SSEFormatter.yield_message_event("Hello",
+                                                                "msg_1")
+    ]
+
+    assert len(events) == 1
+    event_line, data_line, blank, end = events[0].split("\n")
+    assert event_line == "event: message"
+    assert json.loads(data_line[len("data: "):])["id"] == "msg_1"
+    assert (blank, end) == ("", "")
+
+
+def test_data_serialization_matches_json_dumps():
+    payload = {
+        "id": uuid.uuid4(),
+        "created_at": datetime(2024, 1, 2, 3, 4, 5),
+        "text": "café \"quoted\"",
+        1: [1.5, None, True],
+    }
+    assert json.loads(dumps_sse_data(payload)) == json.loads(
+        json.dumps(payload, default=str))
+
+
+@pytest.mark.asyncio
+async def test_close_events_share_a_write():
+    events = [f"event: message\ndata: {i}\n\n" for i in range(10)]
+
+    chunks = await _written(
+        SSEWriter(_events(events), flush_interval=1, max_chunk_bytes=10_000))
+
+    assert chunks == ["".join(events).encode()]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_bounded_by_size_and_time():
+    events = [f"event: message\ndata: {i}\n\n" for i in range(10)]
+    event_bytes = len(events[0])
+
+    chunks = await _written(
+        SSEWriter(_events(events),
+                  flush_interval=1,
+                  max_chunk_bytes=3 * event_bytes))
+    assert [len(c) for c in chunks] == [3 * event_bytes] * 3 + [event_bytes]
+
+    # Events further apart than the window are written on their own
+    chunks = await _written(
+        SSEWriter(_events(events[:3], delay=0.02), flush_interval=0.001))
+    assert chunks == [e.encode() for e in events[:3]]
+
+
+@pytest.mark.asyncio
+async def test_slow_clients_hold_back_the_stream():
+    produced = []
+
+    async def events():
+        for i in range(100):
+            produced.append(i)
+            yield f"data: {i}\n\n"
+
+    writer = SSEWriter(events(),
+                       flush_interval=0,
+                       max_chunk_bytes=1,
+                       max_pending_events=4)
+    stream = writer.__aiter__()
+    await stream.__anext__()
+    await asyncio.sleep(0.01)
+
+    assert len(produced) < 10
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_the_client_after_earlier_events():
+
+    async def events():
+        yield "data: 1\n\n"
+        raise RuntimeError("boom")
+
+    stream = SSEWriter(events(), flush_interval=1).__aiter__()
+    assert await stream.__anext__() == b"data: 1\n\n"
+    with pytest.raises(RuntimeError):
+        await stream.__anext__()
@@ -0,0 +1,121 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.base import ChunkSearchResult, SearchSettings
+from core.main.services.retrieval_service import RetrievalService
+from core.utils import tracing
+
+
+@pytest.fixture(autouse=True)
+def reset_tracing():
+    yield
+    tracing.configure_tracing()
+
+
+class FakeChunksHandler:
+
+    async def semantic_search(self, query_vector, search_settings):
+        return [
+            ChunkSearchResult(
+                id=uuid.uuid4(),
+                document_id=uuid.uuid4(),
+                owner_id=None,
+                collection_ids=[],
+                score=1.0,
+                text="result",
+                metadata={},
+            )
+        ]
+
+
+def _service():
+
+    async def rerank(query, results, limit):
+        return results[:limit]
+
+    embedding = SimpleNamespace(
+        async_get_query_embedding=AsyncMock(return_value=[1.0]),
+        arerank=AsyncMock(side_effect=rerank),
+    )
+    providers = SimpleNamespace(
+        completion_embedding=embedding,
+        database=SimpleNamespace(chunks_handler=FakeChunksHandler(),
+                                 search_cache_handler=None),
+    )
+    return RetrievalService(config=SimpleNamespace(), providers=providers)
+
+
+def _settings(**kwargs):
+    return SearchSettings(graph_settings={"enabled": False}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_search_returns_requested_timings():
+    results = await _service().search(
+        "query", _settings(include_timings=True))
+
+    assert set(results.timings) == {
+        "search",
+        "chunk_search.semantic",
+        "rerank",
+        "total",
+    }
+    assert results.timings["search"] <= results.timings["total"]
+    assert "timings" in results.as_dict()
+
+
+@pytest.mark.asyncio
+async def test_search_without_timings_is_not_traced():
+    results = await _service().search("query", _settings())
+
+    assert results.timings is None
+    assert tracing.current_trace() is None
+
+
+@pytest.mark.asyncio
+async def test_sampled_traces_are_exported():
+    tracing.configure_tracing(enabled=True,
+                              sample_rate=1.0,
+                              histogram_buckets=[0.1, 1.0],
+                              excluded_stages=["rerank"])
+
+    results = await _service().search("query", _settings())
+    metrics = tracing.render_prometheus()
+
+    assert results.timings is None
+    assert "# TYPE r2r_request_stage_duration_seconds histogram" in metrics
+    assert ('r2r_request_stage_duration_seconds_count'
+            '{request="search",stage="chunk_search.semantic"} 1') in metrics
+    assert ('r2r_request_stage_duration_seconds_bucket'
+            '{request="search",stage="total",le="+Inf"} 1') in metrics
+    assert 'stage="rerank"' not in metrics
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traces_are_not_exported():
+    tracing.configure_tracing(enabled=True, sample_rate=0.0)
+
+    results = await _service().search(
+        "query", _settings(include_timings=True))
+
+    assert "total" in results.timings
+    assert "r2r_request_stage_duration_seconds_count" not in (
+        tracing.render_prometheus())
+
+
+def test_histogram_buckets_are_cumulative():
+    histograms = tracing.LatencyHistograms((0.1, 1.0))
+    histograms.observe("rag", "total", 0.05)
+    histograms.observe("rag", "total", 0.5)
+
+    rendered = histograms.render()
+
+    assert ('r2r_request_stage_duration_seconds_bucket'
+            '{request="rag",stage="total",le="0.1"} 1') in rendered
+    assert ('r2r_request_stage_duration_seconds_bucket'
+            '{request="rag",stage="total",le="1.0"} 2') in rendered
+    assert ('r2r_request_stage_duration_seconds_sum'
+            '{request="rag",stage="total"} 0.55') in rendered